@@ -0,0 +1,244 @@
+"""
+批量上传API接口
+一次请求上传多个PDF简历或一个ZIP压缩包，每个文件独立校验和保存，
+通过批次ID统一查询各文件的上传状态
+"""
+
+import os
+import uuid
+import asyncio
+import zipfile
+import mimetypes
+import contextlib
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
+import logging
+from datetime import datetime
+
+from backend.api import upload as upload_api
+from backend.api.upload import ingest_upload
+from backend.services.status_store import create_status_store
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(prefix="/api", tags=["文件上传"])
+
+# 配置常量
+MAX_BATCH_FILES = 500  # 单个批次最多包含的文件数
+BATCH_CONCURRENCY = 4  # 同时写入磁盘的文件数
+
+# 批次信息存储，配置为Redis时多个worker进程共享
+batch_status = create_status_store("upload_batch")
+
+
+class ZipEntryUpload:
+    """将ZIP压缩包中的条目包装成与UploadFile相同的读取接口，按块解压"""
+
+    def __init__(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+        self.filename = os.path.basename(info.filename)
+        self.size = info.file_size  # 压缩包声明的大小，实际大小在写入时校验
+        self.content_type = mimetypes.guess_type(self.filename)[0]
+        self._archive = archive
+        self._info = info
+        self._stream = None
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._stream is None:
+            self._stream = await run_in_threadpool(self._archive.open, self._info)
+        return await run_in_threadpool(self._stream.read, size)
+
+    async def close(self):
+        if self._stream is not None:
+            await run_in_threadpool(self._stream.close)
+
+
+def _is_zip_upload(file: UploadFile) -> bool:
+    """判断上传的文件是否为ZIP压缩包"""
+    return bool(file.filename) and file.filename.lower().endswith('.zip')
+
+
+def _iter_zip_entries(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """列出压缩包中的文件条目，跳过目录和系统生成的隐藏文件"""
+    entries = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        entries.append(info)
+    return entries
+
+
+async def _ingest_one(file, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    上传批次中的单个文件，失败不影响其他文件
+
+    Returns:
+        Dict[str, Any]: 该文件的上传结果
+    """
+    upload_id = str(uuid.uuid4())
+    async with semaphore:
+        try:
+            file_info = await ingest_upload(file, upload_id)
+            return {
+                "upload_id": upload_id,
+                "filename": file_info["filename"],
+                "status": upload_api.UploadStatus.SUCCESS,
+                "message": "文件上传成功",
+                "size": file_info["size"],
+                "sha256": file_info["sha256"],
+                "is_duplicate": file_info["is_duplicate"]
+            }
+        except HTTPException as e:
+            return {
+                "upload_id": upload_id,
+                "filename": file.filename,
+                "status": upload_api.UploadStatus.ERROR,
+                "message": e.detail
+            }
+        finally:
+            if isinstance(file, ZipEntryUpload):
+                await file.close()
+
+
+async def _open_zip(file: UploadFile) -> Optional[zipfile.ZipFile]:
+    """
+    打开上传的ZIP压缩包
+
+    压缩包本身已由multipart解析器写入临时文件，这里只读取中央目录，
+    各条目在上传时按块解压后直接写入磁盘，不会把整个压缩包或条目读入内存。
+
+    Returns:
+        Optional[zipfile.ZipFile]: 压缩包，损坏或格式错误时返回None
+    """
+    try:
+        return await run_in_threadpool(zipfile.ZipFile, file.file)
+    except zipfile.BadZipFile:
+        return None
+
+
+@router.post("/upload/batch")
+async def upload_batch(
+    files: List[UploadFile] = File(..., description="多个PDF简历文件或ZIP压缩包")
+) -> JSONResponse:
+    """
+    批量上传简历接口
+
+    接受多个PDF文件和/或ZIP压缩包，每个PDF使用与单文件上传相同的规则校验，
+    多个文件的磁盘写入并发进行。
+
+    Args:
+        files: 上传的文件列表
+
+    Returns:
+        JSONResponse: 批次ID和每个文件的上传结果
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"单个批次最多包含 {MAX_BATCH_FILES} 个文件"
+        )
+
+    batch_id = str(uuid.uuid4())
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    logger.info(f"开始处理批量上传: {batch_id}, 文件数: {len(files)}")
+
+    results: List[Dict[str, Any]] = []
+    pdf_files = [file for file in files if not _is_zip_upload(file)]
+    with contextlib.ExitStack() as archives:
+        zip_entries = []
+        for file in files:
+            if not _is_zip_upload(file):
+                continue
+            archive = await _open_zip(file)
+            if archive is None:
+                results.append({
+                    "upload_id": None,
+                    "filename": file.filename,
+                    "status": upload_api.UploadStatus.ERROR,
+                    "message": "ZIP文件损坏或格式错误"
+                })
+                continue
+            archives.enter_context(archive)
+            zip_entries.extend(ZipEntryUpload(archive, info) for info in _iter_zip_entries(archive))
+
+        # 先统计所有压缩包的条目数，超出上限时在写入任何文件之前拒绝整个批次
+        if len(pdf_files) + len(zip_entries) > MAX_BATCH_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"单个批次最多包含 {MAX_BATCH_FILES} 个文件"
+            )
+        results.extend(await asyncio.gather(*[_ingest_one(file, semaphore) for file in zip_entries + pdf_files]))
+
+    batch_status.update(batch_id, {
+        "upload_ids": [result["upload_id"] for result in results if result["upload_id"]],
+        "created_at": datetime.now().isoformat()
+    })
+
+    succeeded = sum(1 for result in results if result["status"] == upload_api.UploadStatus.SUCCESS)
+    logger.info(f"批量上传完成: {batch_id}, 成功: {succeeded}, 失败: {len(results) - succeeded}")
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "batch_id": batch_id,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "uploads": results,
+            "status_url": f"/api/upload/batch/{batch_id}"
+        }
+    )
+
+
+@router.get("/upload/batch/{batch_id}")
+async def get_batch_status(batch_id: str) -> JSONResponse:
+    """
+    查询批次中所有文件的上传状态接口
+
+    Args:
+        batch_id: 批次ID
+
+    Returns:
+        JSONResponse: 每个文件的上传状态
+    """
+    batch_info = batch_status.get(batch_id)
+    if batch_info is None:
+        raise HTTPException(
+            status_code=404,
+            detail="批量上传任务不存在"
+        )
+
+    uploads = []
+    upload_ids = batch_info["upload_ids"]
+    for upload_id, status_info in zip(upload_ids, upload_api.upload_status.get_many(upload_ids)):
+        if not status_info:
+            # 单个文件已被删除
+            continue
+        uploads.append({
+            "upload_id": upload_id,
+            "status": status_info["status"],
+            "progress": status_info["progress"],
+            "message": status_info["message"],
+            "updated_at": status_info["updated_at"],
+            "file_info": status_info.get("file_info", {})
+        })
+
+    counts: Dict[str, int] = {}
+    for upload in uploads:
+        counts[upload["status"]] = counts.get(upload["status"], 0) + 1
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "batch_id": batch_id,
+            "total": len(uploads),
+            "status_counts": counts,
+            "created_at": batch_info["created_at"],
+            "uploads": uploads
+        }
+    )
@@ -12,9 +12,16 @@ from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
-from backend.services.pdf_parser import PDFParser
+from backend.services.extraction_pool import extraction_pool
+from backend.services.pdf_parser import EXTRACTOR_VERSION, CLEANING_VERSION
 from backend.services.qwen_parser import QwenResumeParser
+from backend.services.llm_cache import create_llm_cache
+from backend.services.rate_limiter import create_rate_limiter
+from backend.services.response_formats import RESPONSE_FORMATS
+from backend.services.tiered_parser import TieredResumeParser, TIER_HEURISTIC
 from backend.services.redis_manager import RedisDataManager
+from backend.services.status_store import create_status_store
+from backend.config.pipeline_config import STATUS_STORE_CONFIG
 from backend.models.resume import ResumeData
 
 # 配置日志
@@ -24,12 +31,17 @@ logger = logging.getLogger(__name__)
 # 创建路由器
 router = APIRouter(prefix="/api", tags=["简历解析"])
 
-# 全局存储解析状态（生产环境应使用Redis）
-parse_status = {}
+# 解析状态存储，配置为Redis时多个worker进程共享
+# 状态中只保存简历ID，简历数据本身从RedisDataManager读取
+parse_status = create_status_store("parse")
+
+# 文件内容哈希和解析流水线版本（见reuse_key） -> 已完成解析的简历ID，相同简历直接复用
+parse_results_by_hash = create_status_store("parse_result")
 
 # 初始化服务
-pdf_parser = PDFParser()
-qwen_parser = QwenResumeParser()
+qwen_parser = QwenResumeParser(cache=create_llm_cache(), rate_limiter=create_rate_limiter())
+# 结构清晰的简历由本地规则解析，置信度不足时才调用通义千问
+tiered_parser = TieredResumeParser(qwen_parser)
 redis_manager = RedisDataManager()
 
 class ParseStatus:
@@ -42,6 +54,56 @@ class ParseStatus:
     SUCCESS = "success"
     ERROR = "error"
 
+def reuse_key(content_hash: str, response_format: Optional[str] = None) -> str:
+    """
+    生成解析结果复用的键
+    
+    除文件内容哈希外还包含响应格式和解析流水线的版本（与提取缓存和AI解析缓存的键相同），
+    升级提取器、清洗规则、提示模板或模型后，旧的解析结果不再复用。
+    
+    Args:
+        content_hash: 文件内容的SHA-256
+        response_format: AI响应格式，不传时使用配置中的格式
+        
+    Returns:
+        str: 复用键
+    """
+    response_format = response_format or qwen_parser.response_format
+    return (f"{content_hash}-e{EXTRACTOR_VERSION}-c{CLEANING_VERSION}"
+            f"-{qwen_parser.model}-t{qwen_parser.temperature:g}-p{qwen_parser.prompt_version}-{response_format}")
+
+async def find_reusable_result(content_hash: Optional[str], response_format: Optional[str] = None) -> Optional[str]:
+    """
+    查找可复用的解析结果
+    
+    登记的简历可能已被删除或过期，复用前确认简历数据仍然存在；不存在时清除登记。
+    
+    Args:
+        content_hash: 文件内容的SHA-256
+        response_format: AI响应格式
+        
+    Returns:
+        Optional[str]: 可复用的简历ID，没有时返回None
+    """
+    if not content_hash:
+        return None
+    key = reuse_key(content_hash, response_format)
+    previous_result = parse_results_by_hash.get(key)
+    if not previous_result:
+        return None
+    
+    resume_id = previous_result["resume_id"]
+    try:
+        resume_data = await redis_manager.get_resume(resume_id)
+    except Exception as e:
+        logger.warning(f"检查可复用的简历失败，重新解析: {e}")
+        return None
+    if not resume_data:
+        logger.info(f"可复用的简历已不存在，重新解析: {resume_id}")
+        parse_results_by_hash.delete(key)
+        return None
+    return resume_id
+
 async def update_parse_progress(parse_id: str, status: str, progress: int = 0, message: str = "", data: Optional[Dict] = None):
     """
     更新解析进度状态
@@ -53,15 +115,16 @@ async def update_parse_progress(parse_id: str, status: str, progress: int = 0, m
         message: 状态消息
         data: 解析结果数据
     """
-    parse_status[parse_id] = {
+    parse_status.update(parse_id, {
         "status": status,
         "progress": progress,
         "message": message,
         "data": data,
         "updated_at": datetime.now().isoformat()
-    }
+    })
 
-async def parse_resume_background(parse_id: str, file_path: str, upload_id: str):
+async def parse_resume_background(parse_id: str, file_path: str, upload_id: str, content_hash: Optional[str] = None,
+                                  response_format: Optional[str] = None):
     """
     后台异步解析简历任务
     
@@ -69,6 +132,8 @@ async def parse_resume_background(parse_id: str, file_path: str, upload_id: str)
         parse_id: 解析任务ID
         file_path: PDF文件路径
         upload_id: 上传任务ID
+        content_hash: 文件内容的SHA-256，用于登记可复用的解析结果
+        response_format: AI响应格式（full或compact），默认使用配置中的格式
     """
     try:
         logger.info(f"开始后台解析任务: {parse_id}")
@@ -79,7 +144,26 @@ async def parse_resume_background(parse_id: str, file_path: str, upload_id: str)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        extracted_text = await pdf_parser.extract_text_from_pdf(file_path)
+        async def report_pages(done_pages: int, total_pages: int):
+            await update_parse_progress(
+                parse_id,
+                ParseStatus.EXTRACTING,
+                20 + 25 * done_pages // total_pages,
+                f"正在提取PDF文本内容（{done_pages}/{total_pages}页）"
+            )
+        
+        # 在进程池中提取，不阻塞事件循环；长文档分段提取时上报页级进度
+        document = await extraction_pool.extract_document(
+            file_path,
+            progress_callback=report_pages,
+            content_hash=content_hash
+        )
+        extracted_text = document["text"]
+        # 记录使用的提取引擎和选择原因，便于排查提取质量问题；章节区间与提取结果一起保存
+        parse_status.update(parse_id, {
+            "extraction": document.get("metadata"),
+            "sections": document.get("sections", [])
+        })
         
         if not extracted_text or len(extracted_text.strip()) < 50:
             raise ValueError("PDF文本提取失败或内容过少，请检查文件是否为有效的简历")
@@ -88,19 +172,53 @@ async def parse_resume_background(parse_id: str, file_path: str, upload_id: str)
         
         # 步骤2: AI解析结构化数据
         await update_parse_progress(parse_id, ParseStatus.PARSING, 50, "正在使用AI解析简历内容")
+        # 清除重试之前留下的部分结果
+        parse_status.remove_fields(parse_id, "partial_result")
+        
+        async def report_queue(position: int, waited: float):
+            # AI接口额度用尽时请求排队等待，向用户展示排队位置而不是直接失败
+            await update_parse_progress(
+                parse_id,
+                ParseStatus.PARSING,
+                50,
+                f"AI解析排队中（第{position}位，已等待{int(waited)}秒）"
+            )
         
-        parsed_data = await qwen_parser.parse_resume_text(extracted_text)
+        async def report_generation(update: Dict[str, Any]):
+            # 流式生成时按已生成的token估计进度，已完成的字段作为部分结果供前端提前展示
+            parse_status.update(parse_id, {
+                "status": ParseStatus.PARSING,
+                "progress": 50 + int(19 * update["progress"]),
+                "message": f"正在使用AI解析简历内容（已生成约{update['generated_tokens']}个token）",
+                "partial_result": update["partial_result"],
+                "updated_at": datetime.now().isoformat()
+            })
+        
+        parse_result = await tiered_parser.parse(
+            extracted_text,
+            on_queued=report_queue,
+            response_format=response_format,
+            on_progress=report_generation
+        )
+        parse_status.remove_fields(parse_id, "partial_result")
+        parsed_resume = parse_result["resume"]
         
-        if not parsed_data:
+        if not parsed_resume:
             raise ValueError("AI解析失败，请检查简历内容格式")
         
-        logger.info("AI解析完成")
+        # 记录由哪一层解析和本地解析的置信度
+        parse_status.update(parse_id, {
+            "parse_tier": parse_result["tier"],
+            "heuristic_confidence": parse_result["confidence"]
+        })
+        logger.info("本地规则解析完成" if parse_result["tier"] == TIER_HEURISTIC else "AI解析完成")
         
         # 步骤3: 数据验证和转换
         await update_parse_progress(parse_id, ParseStatus.VALIDATING, 70, "正在验证和格式化数据")
         
         # 生成简历ID
         resume_id = str(uuid.uuid4())
+        parsed_data = parsed_resume.model_dump()
         parsed_data["id"] = resume_id
         parsed_data["created_at"] = datetime.now()
         parsed_data["updated_at"] = datetime.now()
@@ -128,11 +246,13 @@ async def parse_resume_background(parse_id: str, file_path: str, upload_id: str)
             "简历解析完成",
             {
                 "resume_id": resume_id,
-                "resume_data": resume_data.model_dump(),
                 "upload_id": upload_id
             }
         )
         
+        if content_hash:
+            parse_results_by_hash.update(reuse_key(content_hash, response_format), {"resume_id": resume_id})
+        
         logger.info(f"简历解析任务完成: {parse_id}, 简历ID: {resume_id}")
         
     except FileNotFoundError as e:
@@ -150,29 +270,35 @@ async def parse_resume_background(parse_id: str, file_path: str, upload_id: str)
 @router.post("/parse/{upload_id}")
 async def parse_resume(
     upload_id: str,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    response_format: Optional[str] = None
 ) -> JSONResponse:
     """
     开始解析简历接口
     
     Args:
         upload_id: 上传任务ID
+        response_format: AI响应格式（full或compact），不传时使用配置中的格式
         
     Returns:
         JSONResponse: 解析任务信息
     """
-    # 导入上传状态（这里应该从实际的存储中获取）
     from backend.api.upload import upload_status
     
+    if response_format is not None and response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的响应格式: {response_format}，可选值: {', '.join(RESPONSE_FORMATS)}"
+        )
+    
     # 检查上传任务是否存在
-    if upload_id not in upload_status:
+    upload_info = upload_status.get(upload_id)
+    if upload_info is None:
         raise HTTPException(
             status_code=404,
             detail="上传任务不存在，请先上传文件"
         )
     
-    upload_info = upload_status[upload_id]
-    
     # 检查上传是否成功
     if upload_info["status"] != "success":
         raise HTTPException(
@@ -191,12 +317,42 @@ async def parse_resume(
     # 生成解析任务ID
     parse_id = str(uuid.uuid4())
     
+    # 相同内容的简历已经解析过，直接复用结果
+    content_hash = upload_info.get("file_info", {}).get("sha256")
+    reused_resume_id = await find_reusable_result(content_hash, response_format)
+    if reused_resume_id:
+        await update_parse_progress(
+            parse_id,
+            ParseStatus.SUCCESS,
+            100,
+            "检测到相同简历，已复用解析结果",
+            {
+                "resume_id": reused_resume_id,
+                "upload_id": upload_id
+            }
+        )
+        parse_status.update(parse_id, {"upload_id": upload_id})
+        
+        logger.info(f"复用已有解析结果: {parse_id}, 简历ID: {reused_resume_id}")
+        
+        return JSONResponse(
+            status_code=200,
+            content={
+                "parse_id": parse_id,
+                "upload_id": upload_id,
+                "message": "检测到相同简历，已复用解析结果",
+                "status_url": f"/api/parse/{parse_id}/status",
+                "reused": True
+            }
+        )
+    
     try:
         # 初始化解析状态
         await update_parse_progress(parse_id, ParseStatus.PENDING, 0, "解析任务已创建，等待开始")
+        parse_status.update(parse_id, {"upload_id": upload_id, "response_format": response_format})
         
         # 添加后台解析任务
-        background_tasks.add_task(parse_resume_background, parse_id, file_path, upload_id)
+        background_tasks.add_task(parse_resume_background, parse_id, file_path, upload_id, content_hash, response_format)
         
         logger.info(f"解析任务已创建: {parse_id}, 上传ID: {upload_id}")
         
@@ -228,14 +384,13 @@ async def get_parse_status(parse_id: str) -> JSONResponse:
     Returns:
         JSONResponse: 解析状态信息
     """
-    if parse_id not in parse_status:
+    status_info = parse_status.get(parse_id)
+    if status_info is None:
         raise HTTPException(
             status_code=404,
             detail="解析任务不存在"
         )
     
-    status_info = parse_status[parse_id]
-    
     # 构建响应数据
     response_data = {
         "parse_id": parse_id,
@@ -245,10 +400,25 @@ async def get_parse_status(parse_id: str) -> JSONResponse:
         "updated_at": status_info["updated_at"]
     }
     
-    # 如果解析成功，包含简历数据
+    if status_info.get("extraction"):
+        response_data["extraction"] = status_info["extraction"]
+    if status_info.get("sections"):
+        response_data["sections"] = status_info["sections"]
+    if status_info["status"] == ParseStatus.PARSING and status_info.get("partial_result"):
+        response_data["partial_result"] = status_info["partial_result"]
+    
+    # 如果解析成功，从简历存储中读取简历数据
     if status_info["status"] == ParseStatus.SUCCESS and status_info["data"]:
-        response_data["resume_id"] = status_info["data"]["resume_id"]
-        response_data["resume_data"] = status_info["data"]["resume_data"]
+        resume_id = status_info["data"]["resume_id"]
+        response_data["resume_id"] = resume_id
+        try:
+            response_data["resume_data"] = await redis_manager.get_resume(resume_id)
+        except Exception as e:
+            logger.error(f"获取简历数据失败: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="获取简历数据失败"
+            )
     
     return JSONResponse(
         status_code=200,
@@ -269,14 +439,13 @@ async def retry_parse(
     Returns:
         JSONResponse: 重试结果
     """
-    if parse_id not in parse_status:
+    status_info = parse_status.get(parse_id)
+    if status_info is None:
         raise HTTPException(
             status_code=404,
             detail="解析任务不存在"
         )
     
-    status_info = parse_status[parse_id]
-    
     # 只有失败的任务才能重试
     if status_info["status"] != ParseStatus.ERROR:
         raise HTTPException(
@@ -288,20 +457,16 @@ async def retry_parse(
         # 获取原始文件信息
         from backend.api.upload import upload_status
         
-        # 从解析状态中获取上传ID（如果有的话）
-        upload_id = None
-        for uid, uinfo in upload_status.items():
-            if uinfo.get("file_path") and "file_path" in status_info:
-                upload_id = uid
-                break
+        # 从解析状态中获取上传ID
+        upload_id = status_info.get("upload_id")
+        upload_info = upload_status.get(upload_id) if upload_id else None
         
-        if not upload_id:
+        if not upload_info:
             raise HTTPException(
                 status_code=400,
                 detail="无法找到原始上传文件信息"
             )
         
-        upload_info = upload_status[upload_id]
         file_path = upload_info.get("file_path")
         
         if not file_path or not os.path.exists(file_path):
@@ -313,8 +478,11 @@ async def retry_parse(
         # 重置解析状态
         await update_parse_progress(parse_id, ParseStatus.PENDING, 0, "准备重试解析")
         
-        # 添加后台解析任务
-        background_tasks.add_task(parse_resume_background, parse_id, file_path, upload_id)
+        # 添加后台解析任务，沿用创建任务时指定的响应格式
+        content_hash = upload_info.get("file_info", {}).get("sha256")
+        background_tasks.add_task(
+            parse_resume_background, parse_id, file_path, upload_id, content_hash, status_info.get("response_format")
+        )
         
         logger.info(f"解析任务重试: {parse_id}")
         
@@ -355,7 +523,7 @@ async def delete_parse_task(parse_id: str) -> JSONResponse:
     
     try:
         # 删除解析状态记录
-        del parse_status[parse_id]
+        parse_status.delete(parse_id)
         
         logger.info(f"解析任务删除成功: {parse_id}")
         
@@ -383,7 +551,7 @@ async def list_parse_tasks() -> JSONResponse:
         JSONResponse: 解析任务列表
     """
     tasks = []
-    for parse_id, status_info in parse_status.items():
+    for parse_id, status_info in parse_status.items(limit=STATUS_STORE_CONFIG["list_limit"]):
         task_info = {
             "parse_id": parse_id,
             "status": status_info["status"],
@@ -404,4 +572,28 @@ async def list_parse_tasks() -> JSONResponse:
             "total": len(tasks),
             "tasks": tasks
         }
-    )
\ No newline at end of file
+    )
+
+@router.get("/parse/stats")
+async def get_parse_stats() -> JSONResponse:
+    """
+    获取解析流水线运行统计接口
+    
+    Returns:
+        JSONResponse: 提取进程池、提取缓存、AI接口客户端、AI解析缓存、调用限流器、AI输出修复和分层解析的统计信息
+    """
+    cache = extraction_pool.cache
+    llm_cache = qwen_parser.cache
+    rate_limiter = qwen_parser.rate_limiter
+    return JSONResponse(
+        status_code=200,
+        content={
+            "extraction_pool": extraction_pool.get_stats(),
+            "extraction_cache": cache.get_stats() if cache is not None else None,
+            "llm_client": qwen_parser.client.get_stats(),
+            "llm_cache": llm_cache.get_stats() if llm_cache is not None else None,
+            "rate_limiter": rate_limiter.get_stats() if rate_limiter is not None else None,
+            "json_repair": qwen_parser.get_repair_stats(),
+            "tiered_parsing": tiered_parser.get_stats()
+        }
+    )
@@ -4,15 +4,22 @@
 """
 
 import os
+import time
 import uuid
+import hashlib
 import aiofiles
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional, Callable, Awaitable
 import logging
 from datetime import datetime
 import mimetypes
 
+from backend.services.upload_store import ContentAddressedUploadStore
+from backend.services.status_store import create_status_store
+from backend.config.pipeline_config import STATUS_STORE_CONFIG
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,12 +31,21 @@ router = APIRouter(prefix="/api", tags=["文件上传"])
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_MIME_TYPES = ["application/pdf"]
 UPLOAD_DIR = "backend/uploads"
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 流式写入的分块大小（64KB）
+PDF_MAGIC = b'%PDF-'
+ORPHAN_REF_SWEEP_INTERVAL = 600  # 清理状态记录已过期的上传引用的最小间隔（秒）
 
 # 确保上传目录存在
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# 全局存储上传状态（生产环境应使用Redis）
-upload_status = {}
+# 上传状态存储，配置为Redis时多个worker进程共享
+upload_status = create_status_store("upload")
+
+# 按内容哈希存储上传文件，相同简历只保存一份；引用计数需要长期保存，
+# 状态记录过期或被淘汰的上传由_maybe_release_orphaned_refs定期释放引用
+upload_store = ContentAddressedUploadStore(UPLOAD_DIR, create_status_store("upload_refs", persistent=True))
+
+_last_ref_sweep = 0.0
 
 class UploadStatus:
     """上传状态类"""
@@ -42,6 +58,9 @@ async def validate_pdf_file(file: UploadFile) -> Dict[str, Any]:
     """
     验证PDF文件的格式和大小
     
+    这里只检查客户端声明的信息（文件名、MIME类型、声明大小），
+    客户端可能不提供文件大小，因此实际字节数和文件头在写入磁盘时再校验。
+    
     Args:
         file: 上传的文件对象
         
@@ -73,87 +92,206 @@ async def validate_pdf_file(file: UploadFile) -> Dict[str, Any]:
             detail="文件格式不正确，请上传PDF文件"
         )
     
-    # 读取文件头部验证PDF格式
-    content = await file.read(1024)  # 读取前1KB
-    await file.seek(0)  # 重置文件指针
-    
-    if not content.startswith(b'%PDF-'):
-        raise HTTPException(
-            status_code=400,
-            detail="文件格式验证失败，请确保是有效的PDF文件"
-        )
-    
+    # 文件头（%PDF-）和实际大小在流式写入时校验，见 stream_upload_to_disk
     return {
         "filename": file.filename,
         "content_type": file.content_type,
-        "size": len(content) if not hasattr(file, 'size') else file.size
+        "size": getattr(file, 'size', None)
     }
 
-async def save_uploaded_file(file: UploadFile, upload_id: str) -> str:
+async def stream_upload_to_disk(
+    file: UploadFile,
+    upload_id: str,
+    progress_callback: Optional[Callable[[int], Awaitable[None]]] = None
+) -> Dict[str, Any]:
     """
-    保存上传的文件到本地存储
+    以固定大小的分块将上传文件流式写入磁盘
+    
+    文件先写入临时文件，写入过程中同时计算SHA-256、校验PDF文件头，
+    并按实际接收的字节数限制文件大小，超限时立即中止。全部写入成功后
+    按内容哈希原子提交到上传存储，因此单个上传占用的内存与文件大小无关。
     
     Args:
-        file: 上传的文件对象
+        file: 上传的文件对象（任何提供异步read(size)方法的对象）
         upload_id: 上传任务ID
+        progress_callback: 进度回调，参数为已写入的字节数
         
     Returns:
-        str: 保存的文件路径
+        Dict[str, Any]: 包含file_path、size、sha256、is_duplicate的写入结果
+        
+    Raises:
+        HTTPException: 文件过大、格式不正确或写入失败时抛出异常
     """
-    # 生成安全的文件名
-    file_extension = os.path.splitext(file.filename)[1]
-    safe_filename = f"{upload_id}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+    temp_path = os.path.join(UPLOAD_DIR, f".{upload_id}.part")
+    
+    sha256 = hashlib.sha256()
+    header = b''
+    size = 0
     
     try:
-        # 异步保存文件
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"文件大小超过限制，最大允许 {MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                
+                # 文件头可能被拆分在多个分块中
+                if len(header) < len(PDF_MAGIC):
+                    header += chunk[:len(PDF_MAGIC) - len(header)]
+                    if len(header) == len(PDF_MAGIC) and header != PDF_MAGIC:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="文件格式验证失败，请确保是有效的PDF文件"
+                        )
+                
+                sha256.update(chunk)
+                await f.write(chunk)
+                
+                if progress_callback:
+                    await progress_callback(size)
+        
+        if header != PDF_MAGIC:
+            raise HTTPException(
+                status_code=400,
+                detail="文件格式验证失败，请确保是有效的PDF文件"
+            )
+        
+        # 按内容哈希原子提交，重复内容直接复用已有文件
+        file_path, is_duplicate = upload_store.commit(temp_path, sha256.hexdigest(), upload_id)
         
-        logger.info(f"文件保存成功: {file_path}")
-        return file_path
+    except HTTPException:
+        _remove_quietly(temp_path)
+        raise
         
     except Exception as e:
+        _remove_quietly(temp_path)
         logger.error(f"文件保存失败: {e}")
         raise HTTPException(
             status_code=500,
             detail="文件保存失败，请重试"
         )
+    
+    logger.info(f"文件保存成功: {file_path}, 大小: {size} 字节")
+    return {
+        "file_path": file_path,
+        "size": size,
+        "sha256": sha256.hexdigest(),
+        "is_duplicate": is_duplicate
+    }
+
+async def save_uploaded_file(file: UploadFile, upload_id: str) -> str:
+    """
+    保存上传的文件到本地存储
+    
+    Args:
+        file: 上传的文件对象
+        upload_id: 上传任务ID
+        
+    Returns:
+        str: 保存的文件路径
+    """
+    stored = await stream_upload_to_disk(file, upload_id)
+    return stored["file_path"]
+
+def _remove_quietly(path: str):
+    """删除文件，文件不存在时忽略"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"临时文件删除失败: {path}, {e}")
+
+def _release_orphaned_refs() -> int:
+    """释放状态记录已不存在的上传对文件的引用，返回释放的引用数"""
+    return upload_store.release_orphans(
+        lambda upload_ids: [status_info is not None for status_info in upload_status.get_many(upload_ids)]
+    )
+
+async def _maybe_release_orphaned_refs():
+    """距离上次清理超过ORPHAN_REF_SWEEP_INTERVAL时释放过期上传的引用，清理失败不影响上传"""
+    global _last_ref_sweep
+    now = time.time()
+    if now - _last_ref_sweep < ORPHAN_REF_SWEEP_INTERVAL:
+        return
+    _last_ref_sweep = now
+    try:
+        released = await run_in_threadpool(_release_orphaned_refs)
+    except Exception as e:
+        logger.warning(f"释放过期上传的文件引用失败: {e}")
+        return
+    if released:
+        logger.info(f"已释放过期上传的文件引用: {released} 个")
 
 async def update_upload_progress(upload_id: str, status: str, progress: int = 0, message: str = ""):
     """
     更新上传进度状态
     
+    只更新状态相关字段，文件信息、分块上传会话等其他字段保持不变
+    
     Args:
         upload_id: 上传任务ID
         status: 状态
         progress: 进度百分比
         message: 状态消息
     """
-    upload_status[upload_id] = {
+    upload_status.update(upload_id, {
         "status": status,
         "progress": progress,
         "message": message,
         "updated_at": datetime.now().isoformat()
-    }
+    })
 
-@router.post("/upload")
-async def upload_resume(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(..., description="PDF简历文件")
-) -> JSONResponse:
+class ByteProgressReporter:
+    """按实际写入的字节数换算上传进度，进度百分比变化时才更新状态"""
+    
+    def __init__(self, upload_id: str, total_size: Optional[int], start: int = 0, message: str = "正在接收文件"):
+        """
+        Args:
+            upload_id: 上传任务ID
+            total_size: 文件总字节数，未知时不更新进度
+            start: 起始进度百分比
+            message: 状态消息
+        """
+        self.upload_id = upload_id
+        self.total_size = total_size
+        self.start = start
+        self.message = message
+        self._last_progress = -1
+    
+    async def __call__(self, received: int):
+        if not self.total_size:
+            return
+        
+        # 写入完成前最多到99%，100%留给提交成功
+        ratio = min(received, self.total_size) / self.total_size
+        progress = min(self.start + int((100 - self.start) * ratio), 99)
+        if progress != self._last_progress:
+            self._last_progress = progress
+            await update_upload_progress(self.upload_id, UploadStatus.UPLOADING, progress, self.message)
+
+async def ingest_upload(file: UploadFile, upload_id: str) -> Dict[str, Any]:
     """
-    上传PDF简历文件接口
+    处理单个上传文件：验证、流式保存并记录上传状态
     
     Args:
-        file: 上传的PDF文件
+        file: 上传的文件对象（任何提供filename、size和异步read的对象）
+        upload_id: 上传任务ID
         
     Returns:
-        JSONResponse: 包含上传ID和状态信息的响应
+        Dict[str, Any]: 文件信息
+        
+    Raises:
+        HTTPException: 验证或保存失败时抛出异常，上传状态同时标记为失败
     """
-    # 生成唯一的上传ID
-    upload_id = str(uuid.uuid4())
+    await _maybe_release_orphaned_refs()
     
     try:
         # 初始化上传状态
@@ -162,51 +300,80 @@ async def upload_resume(
         logger.info(f"开始处理文件上传: {file.filename}, 上传ID: {upload_id}")
         
         # 验证文件
-        await update_upload_progress(upload_id, UploadStatus.UPLOADING, 20, "验证文件格式")
+        await update_upload_progress(upload_id, UploadStatus.UPLOADING, 10, "验证文件格式")
         file_info = await validate_pdf_file(file)
         
-        # 保存文件
-        await update_upload_progress(upload_id, UploadStatus.UPLOADING, 60, "保存文件")
-        file_path = await save_uploaded_file(file, upload_id)
+        # 流式保存文件，同时校验文件头和实际大小，进度按实际写入字节计算
+        await update_upload_progress(upload_id, UploadStatus.UPLOADING, 20, "保存文件")
+        progress_reporter = ByteProgressReporter(upload_id, file_info["size"], start=20, message="保存文件")
+        stored = await stream_upload_to_disk(file, upload_id, progress_reporter)
+        file_path = stored["file_path"]
+        file_info["size"] = stored["size"]
+        file_info["sha256"] = stored["sha256"]
+        file_info["is_duplicate"] = stored["is_duplicate"]
         
         # 更新状态为成功
         await update_upload_progress(upload_id, UploadStatus.SUCCESS, 100, "文件上传成功")
         
         # 存储文件信息
-        upload_status[upload_id].update({
+        upload_status.update(upload_id, {
             "file_info": file_info,
             "file_path": file_path,
             "created_at": datetime.now().isoformat()
         })
         
         logger.info(f"文件上传成功: {upload_id}")
+        return file_info
         
-        return JSONResponse(
-            status_code=200,
-            content={
-                "upload_id": upload_id,
-                "message": "文件上传成功",
-                "file_info": {
-                    "filename": file_info["filename"],
-                    "size": file_info["size"]
-                }
-            }
-        )
-        
-    except HTTPException:
+    except HTTPException as e:
         # 重新抛出HTTP异常
-        await update_upload_progress(upload_id, UploadStatus.ERROR, 0, "文件验证失败")
+        await update_upload_progress(upload_id, UploadStatus.ERROR, 0, f"上传失败: {e.detail}")
+        upload_status.update(upload_id, {"file_info": {"filename": file.filename}})
         raise
         
     except Exception as e:
         logger.error(f"文件上传失败: {e}")
         await update_upload_progress(upload_id, UploadStatus.ERROR, 0, f"上传失败: {str(e)}")
+        upload_status.update(upload_id, {"file_info": {"filename": file.filename}})
         
         raise HTTPException(
             status_code=500,
             detail="文件上传失败，请重试"
         )
 
+@router.post("/upload")
+async def upload_resume(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="PDF简历文件")
+) -> JSONResponse:
+    """
+    上传PDF简历文件接口
+    
+    Args:
+        file: 上传的PDF文件
+        
+    Returns:
+        JSONResponse: 包含上传ID和状态信息的响应
+    """
+    # 生成唯一的上传ID
+    upload_id = str(uuid.uuid4())
+    
+    file_info = await ingest_upload(file, upload_id)
+    
+    return JSONResponse(
+        status_code=200,
+        content={
+            "upload_id": upload_id,
+            "message": "文件上传成功",
+            "file_info": {
+                "filename": file_info["filename"],
+                "size": file_info["size"],
+                "sha256": file_info["sha256"],
+                "is_duplicate": file_info["is_duplicate"]
+            }
+        }
+    )
+
 @router.get("/upload/{upload_id}/status")
 async def get_upload_status(upload_id: str) -> JSONResponse:
     """
@@ -218,14 +385,13 @@ async def get_upload_status(upload_id: str) -> JSONResponse:
     Returns:
         JSONResponse: 上传状态信息
     """
-    if upload_id not in upload_status:
+    status_info = upload_status.get(upload_id)
+    if status_info is None:
         raise HTTPException(
             status_code=404,
             detail="上传任务不存在"
         )
     
-    status_info = upload_status[upload_id]
-    
     return JSONResponse(
         status_code=200,
         content={
@@ -248,21 +414,26 @@ async def delete_upload(upload_id: str) -> JSONResponse:
     Returns:
         JSONResponse: 删除结果
     """
-    if upload_id not in upload_status:
+    status_info = upload_status.get(upload_id)
+    if status_info is None:
         raise HTTPException(
             status_code=404,
             detail="上传任务不存在"
         )
     
     try:
-        # 删除文件
-        status_info = upload_status[upload_id]
-        if "file_path" in status_info and os.path.exists(status_info["file_path"]):
-            os.remove(status_info["file_path"])
-            logger.info(f"文件删除成功: {status_info['file_path']}")
+        # 释放对共享文件的引用，最后一个引用释放时才删除文件
+        content_hash = status_info.get("file_info", {}).get("sha256")
+        if content_hash:
+            upload_store.release(content_hash, upload_id)
+        
+        # 未完成的分块上传会话，删除已接收的临时文件
+        session = status_info.get("session")
+        if session and not content_hash:
+            _remove_quietly(session["temp_path"])
         
         # 删除状态记录
-        del upload_status[upload_id]
+        upload_status.delete(upload_id)
         
         return JSONResponse(
             status_code=200,
@@ -288,7 +459,7 @@ async def list_uploads() -> JSONResponse:
         JSONResponse: 上传任务列表
     """
     uploads = []
-    for upload_id, status_info in upload_status.items():
+    for upload_id, status_info in upload_status.items(limit=STATUS_STORE_CONFIG["list_limit"]):
         uploads.append({
             "upload_id": upload_id,
             "status": status_info["status"],
@@ -0,0 +1,471 @@
+"""
+可续传的分块上传API接口
+参考tus协议：创建上传会话、按偏移量PATCH数据块、查询当前偏移量、最后提交文件
+连接中断后客户端从最后一次写入磁盘的偏移量继续上传即可
+"""
+
+import os
+import time
+import uuid
+import hashlib
+import aiofiles
+from fastapi import APIRouter, HTTPException, Request, Header
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+from typing import Dict, Any, Tuple
+import logging
+from datetime import datetime
+
+from backend.api import upload as upload_api
+from backend.api.upload import (
+    UploadStatus,
+    ByteProgressReporter,
+    update_upload_progress,
+    PDF_MAGIC,
+    UPLOAD_CHUNK_SIZE,
+    _remove_quietly,
+    _maybe_release_orphaned_refs,
+)
+from backend.config.pipeline_config import STATUS_STORE_CONFIG
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(prefix="/api", tags=["文件上传"])
+
+# 写入锁超时时间（秒）
+WRITE_LOCK_TIMEOUT = 300
+# 未提交的会话超过该时间没有写入数据视为放弃，与状态记录的保留时间一致（秒）
+SESSION_TTL = STATUS_STORE_CONFIG["ttl"]
+# 清理放弃的会话临时文件的最小间隔（秒）
+SESSION_SWEEP_INTERVAL = 600
+
+_last_sweep = 0.0
+
+
+class UploadSessionRequest(BaseModel):
+    """创建上传会话请求模型"""
+    filename: str = Field(..., min_length=1, description="文件名")
+    size: int = Field(..., gt=0, description="文件总字节数")
+
+
+def _session_dir() -> str:
+    """分块上传临时文件目录"""
+    path = os.path.join(upload_api.UPLOAD_DIR, "sessions")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _get_session(upload_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    获取上传会话信息
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: (上传状态, 会话信息)
+
+    Raises:
+        HTTPException: 会话不存在时抛出异常
+    """
+    status_info = upload_api.upload_status.get(upload_id)
+    if not status_info or "session" not in status_info:
+        raise HTTPException(
+            status_code=404,
+            detail="上传会话不存在"
+        )
+    return status_info, status_info["session"]
+
+
+def _committed_offset(session: Dict[str, Any]) -> int:
+    """已写入磁盘的字节数，即客户端续传的起始偏移量"""
+    try:
+        return os.path.getsize(session["temp_path"])
+    except FileNotFoundError:
+        return 0
+
+
+def _offset_headers(offset: int, length: int) -> Dict[str, str]:
+    """构建tus风格的偏移量响应头"""
+    return {
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(length),
+        "Cache-Control": "no-store"
+    }
+
+
+def _acquire_write_lock(upload_id: str) -> bool:
+    """
+    获取会话的写入锁
+
+    持有锁的worker异常退出时锁不会被释放，超过WRITE_LOCK_TIMEOUT的锁视为失效。
+    抢占失效的锁是比较并替换：只有字段仍是读到的失效时间时才写入，
+    多个worker同时抢占同一个失效的锁时只有一个成功
+    """
+    now = time.time()
+    if upload_api.upload_status.set_field_if_absent(upload_id, "writing", now):
+        return True
+
+    status_info = upload_api.upload_status.get(upload_id) or {}
+    locked_at = status_info.get("writing")
+    if locked_at is None:
+        # 锁在读取之前刚被释放
+        return upload_api.upload_status.set_field_if_absent(upload_id, "writing", now)
+    if now - locked_at > WRITE_LOCK_TIMEOUT:
+        if upload_api.upload_status.replace_field_if_equal(upload_id, "writing", locked_at, now):
+            logger.warning(f"上传会话写入锁已超时，强制释放: {upload_id}")
+            return True
+    return False
+
+
+def _sweep_stale_sessions(now: float) -> int:
+    """
+    删除放弃的会话留下的临时文件
+
+    状态记录已不存在（过期或被删除）或已不是未完成的会话、或超过SESSION_TTL没有写入数据的
+    .part文件视为放弃；后者同时删除状态记录。刚创建的文件可能还没有写入状态记录，
+    只检查超过WRITE_LOCK_TIMEOUT没有写入的文件。
+
+    Returns:
+        int: 删除的临时文件数
+    """
+    candidates = []
+    for entry in os.scandir(_session_dir()):
+        if not entry.name.endswith(".part"):
+            continue
+        try:
+            idle = now - entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if idle > WRITE_LOCK_TIMEOUT:
+            candidates.append((entry.name[:-len(".part")], entry.path, idle))
+    if not candidates:
+        return 0
+
+    removed = 0
+    statuses = upload_api.upload_status.get_many([upload_id for upload_id, _, _ in candidates])
+    for (upload_id, path, idle), status_info in zip(candidates, statuses):
+        pending = bool(status_info) and "session" in status_info and status_info["status"] != UploadStatus.SUCCESS
+        if pending and idle <= SESSION_TTL:
+            continue
+        if pending:
+            upload_api.upload_status.delete(upload_id)
+        _remove_quietly(path)
+        removed += 1
+    return removed
+
+
+async def _maybe_sweep_stale_sessions():
+    """距离上次清理超过SESSION_SWEEP_INTERVAL时清理放弃的会话，清理失败不影响创建会话"""
+    global _last_sweep
+    now = time.time()
+    if now - _last_sweep < SESSION_SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    try:
+        removed = await run_in_threadpool(_sweep_stale_sessions, now)
+    except Exception as e:
+        logger.warning(f"清理放弃的上传会话失败: {e}")
+        return
+    if removed:
+        logger.info(f"已清理放弃的上传会话临时文件: {removed} 个")
+
+
+def _hash_file(path: str) -> str:
+    """分块计算文件的SHA-256"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@router.post("/upload/sessions")
+async def create_upload_session(request: UploadSessionRequest) -> JSONResponse:
+    """
+    创建分块上传会话接口
+
+    Args:
+        request: 文件名和文件总大小
+
+    Returns:
+        JSONResponse: 包含上传ID和初始偏移量的响应
+    """
+    if not request.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="只支持PDF格式的文件"
+        )
+
+    if request.size > upload_api.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"文件大小超过限制，最大允许 {upload_api.MAX_FILE_SIZE // (1024*1024)}MB"
+        )
+
+    await _maybe_sweep_stale_sessions()
+    await _maybe_release_orphaned_refs()
+
+    upload_id = str(uuid.uuid4())
+    temp_path = os.path.join(_session_dir(), f"{upload_id}.part")
+
+    # 创建空文件，偏移量以磁盘上的文件大小为准
+    async with aiofiles.open(temp_path, 'wb'):
+        pass
+
+    await update_upload_progress(upload_id, UploadStatus.UPLOADING, 0, "等待上传数据")
+    upload_api.upload_status.update(upload_id, {
+        "session": {
+            "filename": request.filename,
+            "length": request.size,
+            "temp_path": temp_path,
+            "created_at": datetime.now().isoformat()
+        }
+    })
+
+    logger.info(f"分块上传会话已创建: {upload_id}, 文件: {request.filename}, 大小: {request.size}")
+
+    return JSONResponse(
+        status_code=201,
+        headers={
+            "Location": f"/api/upload/sessions/{upload_id}",
+            **_offset_headers(0, request.size)
+        },
+        content={
+            "upload_id": upload_id,
+            "offset": 0,
+            "length": request.size,
+            "session_url": f"/api/upload/sessions/{upload_id}"
+        }
+    )
+
+
+@router.api_route("/upload/sessions/{upload_id}", methods=["GET", "HEAD"])
+async def get_upload_session(upload_id: str) -> JSONResponse:
+    """
+    查询上传会话当前偏移量接口
+
+    Args:
+        upload_id: 上传任务ID
+
+    Returns:
+        JSONResponse: 当前已提交的偏移量，同时通过Upload-Offset响应头返回
+    """
+    status_info, session = _get_session(upload_id)
+    offset = _committed_offset(session)
+
+    return JSONResponse(
+        status_code=200,
+        headers=_offset_headers(offset, session["length"]),
+        content={
+            "upload_id": upload_id,
+            "offset": offset,
+            "length": session["length"],
+            "status": status_info["status"],
+            "progress": status_info["progress"]
+        }
+    )
+
+
+@router.patch("/upload/sessions/{upload_id}")
+async def upload_session_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", description="本次数据块的起始偏移量")
+) -> JSONResponse:
+    """
+    按偏移量追加数据块接口
+
+    请求体为原始字节流，边接收边写入磁盘。Upload-Offset必须等于服务端
+    当前的偏移量，否则返回409，客户端应先查询偏移量再续传。
+
+    Args:
+        upload_id: 上传任务ID
+        request: 请求对象，请求体为数据块内容
+        upload_offset: 数据块的起始偏移量
+
+    Returns:
+        JSONResponse: 写入后的偏移量
+    """
+    status_info, session = _get_session(upload_id)
+    if status_info["status"] == UploadStatus.SUCCESS:
+        raise HTTPException(
+            status_code=409,
+            detail="上传已完成"
+        )
+
+    # 通过共享状态加锁，防止同一会话的并发PATCH（可能落在不同worker上）交错写入
+    if not _acquire_write_lock(upload_id):
+        raise HTTPException(
+            status_code=409,
+            detail="该上传会话正在写入数据，请稍后重试"
+        )
+
+    try:
+        # 加锁之前可能有提交请求刚刚完成，临时文件已被移走
+        status_info = upload_api.upload_status.get(upload_id) or status_info
+        if status_info["status"] == UploadStatus.SUCCESS:
+            raise HTTPException(
+                status_code=409,
+                detail="上传已完成"
+            )
+
+        offset = _committed_offset(session)
+        if upload_offset != offset:
+            raise HTTPException(
+                status_code=409,
+                headers=_offset_headers(offset, session["length"]),
+                detail=f"偏移量不匹配，当前偏移量为 {offset}"
+            )
+
+        length = session["length"]
+        progress_reporter = ByteProgressReporter(upload_id, length, message="正在接收文件")
+
+        async with aiofiles.open(session["temp_path"], 'ab') as f:
+            try:
+                async for chunk in request.stream():
+                    if not chunk:
+                        continue
+
+                    if offset + len(chunk) > length:
+                        raise HTTPException(
+                            status_code=413,
+                            detail="数据超出声明的文件大小"
+                        )
+
+                    # 覆盖文件开头的数据块校验PDF文件头
+                    if offset < len(PDF_MAGIC):
+                        expected = PDF_MAGIC[offset:offset + len(chunk)]
+                        if chunk[:len(expected)] != expected:
+                            raise HTTPException(
+                                status_code=400,
+                                detail="文件格式验证失败，请确保是有效的PDF文件"
+                            )
+
+                    await f.write(chunk)
+                    offset += len(chunk)
+                    await progress_reporter(offset)
+
+            except ClientDisconnect:
+                # 已写入的数据保留，客户端从最后的偏移量续传
+                logger.warning(f"分块上传连接中断: {upload_id}, 已提交偏移量: {offset}")
+
+            await f.flush()
+            await run_in_threadpool(os.fsync, f.fileno())
+
+    finally:
+        upload_api.upload_status.remove_fields(upload_id, "writing")
+
+    status_info = upload_api.upload_status.get(upload_id) or status_info
+    return JSONResponse(
+        status_code=200,
+        headers=_offset_headers(offset, length),
+        content={
+            "upload_id": upload_id,
+            "offset": offset,
+            "length": length,
+            "progress": status_info["progress"]
+        }
+    )
+
+
+@router.post("/upload/sessions/{upload_id}/finalize")
+async def finalize_upload_session(upload_id: str) -> JSONResponse:
+    """
+    提交分块上传的文件接口
+
+    所有数据块写入完成后调用，校验文件大小和文件头，计算SHA-256并提交到上传存储，
+    之后即可像普通上传一样使用upload_id发起解析。提交期间持有会话的写入锁，
+    重复提交和提交期间的PATCH返回409。
+
+    Args:
+        upload_id: 上传任务ID
+
+    Returns:
+        JSONResponse: 与单次上传接口一致的上传结果
+    """
+    status_info, session = _get_session(upload_id)
+    if status_info["status"] == UploadStatus.SUCCESS:
+        raise HTTPException(
+            status_code=409,
+            detail="上传已完成"
+        )
+
+    if not _acquire_write_lock(upload_id):
+        raise HTTPException(
+            status_code=409,
+            detail="该上传会话正在写入数据或提交，请稍后重试"
+        )
+
+    try:
+        # 加锁之前的读取可能已过期：另一个请求可能刚刚提交完成
+        status_info = upload_api.upload_status.get(upload_id) or status_info
+        if status_info["status"] == UploadStatus.SUCCESS:
+            raise HTTPException(
+                status_code=409,
+                detail="上传已完成"
+            )
+
+        offset = _committed_offset(session)
+        if offset != session["length"]:
+            raise HTTPException(
+                status_code=409,
+                headers=_offset_headers(offset, session["length"]),
+                detail=f"文件尚未上传完整，当前偏移量为 {offset}"
+            )
+
+        temp_path = session["temp_path"]
+        async with aiofiles.open(temp_path, 'rb') as f:
+            header = await f.read(len(PDF_MAGIC))
+        if header != PDF_MAGIC:
+            raise HTTPException(
+                status_code=400,
+                detail="文件格式验证失败，请确保是有效的PDF文件"
+            )
+
+        try:
+            content_hash = await run_in_threadpool(_hash_file, temp_path)
+            file_path, is_duplicate = upload_api.upload_store.commit(temp_path, content_hash, upload_id)
+        except Exception as e:
+            logger.error(f"分块上传提交失败: {e}")
+            await update_upload_progress(upload_id, UploadStatus.ERROR, status_info["progress"], f"上传失败: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail="文件保存失败，请重试"
+            )
+
+        file_info = {
+            "filename": session["filename"],
+            "content_type": "application/pdf",
+            "size": offset,
+            "sha256": content_hash,
+            "is_duplicate": is_duplicate
+        }
+
+        await update_upload_progress(upload_id, UploadStatus.SUCCESS, 100, "文件上传成功")
+        upload_api.upload_status.update(upload_id, {
+            "file_info": file_info,
+            "file_path": file_path,
+            "created_at": datetime.now().isoformat()
+        })
+
+    finally:
+        upload_api.upload_status.remove_fields(upload_id, "writing")
+
+    logger.info(f"分块上传完成: {upload_id}")
+
+    return JSONResponse(
+        status_code=200,
+        content={
+            "upload_id": upload_id,
+            "message": "文件上传成功",
+            "file_info": {
+                "filename": file_info["filename"],
+                "size": file_info["size"],
+                "sha256": file_info["sha256"],
+                "is_duplicate": file_info["is_duplicate"]
+            }
+        }
+    )
@@ -0,0 +1,4 @@
+"""
+性能基准测试
+用于测量PDF提取、文本清理和AI解析流水线的吞吐量和延迟
+"""
@@ -0,0 +1,112 @@
+"""
+PDF提取进程池并发基准测试
+测量不同进程数下的提取吞吐量，以及提取期间事件循环的响应延迟
+
+用法:
+    python -m backend.benchmarks.bench_extraction_pool --workers 1 2 4 --files 32 --pages 5
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Dict, Any, List
+
+from backend.benchmarks.synthetic_pdf import write_resume_pdf
+from backend.services.extraction_pool import ExtractionPool
+from backend.config.pipeline_config import EXTRACTION_POOL_CONFIG
+
+# 事件循环探测间隔（秒），模拟/health和状态轮询请求
+PROBE_INTERVAL = 0.01
+
+
+async def _probe_loop_lag(stop: asyncio.Event, lags: List[float]):
+    """周期性休眠并记录实际唤醒时间与预期的差值"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+async def run_benchmark(paths: List[str], workers: int) -> Dict[str, Any]:
+    """
+    用指定进程数提取所有文件
+
+    Args:
+        paths: PDF文件路径列表
+        workers: 工作进程数
+
+    Returns:
+        Dict[str, Any]: 耗时、吞吐量和事件循环延迟
+    """
+    pool = ExtractionPool(
+        max_workers=workers,
+        max_tasks_per_child=EXTRACTION_POOL_CONFIG["max_tasks_per_child"],
+        max_pending=len(paths),
+        preload_modules=EXTRACTION_POOL_CONFIG["preload_modules"]
+    )
+    try:
+        # 预热：启动所有工作进程，不计入耗时
+        await asyncio.gather(*[pool.extract(paths[0]) for _ in range(workers)])
+
+        stop = asyncio.Event()
+        lags: List[float] = []
+        probe = asyncio.create_task(_probe_loop_lag(stop, lags))
+
+        start = time.perf_counter()
+        await asyncio.gather(*[pool.extract(path) for path in paths])
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+    finally:
+        pool.shutdown()
+
+    return {
+        "workers": workers,
+        "files": len(paths),
+        "elapsed_seconds": elapsed,
+        "files_per_second": len(paths) / elapsed,
+        "loop_lag_p99_ms": _percentile(lags, 99) * 1000,
+        "loop_lag_max_ms": max(lags, default=0.0) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF提取进程池并发基准测试")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--files", type=int, default=32, help="提取的文件数")
+    parser.add_argument("--pages", type=int, default=5, help="每个文件的页数")
+    args = parser.parse_args()
+
+    print(f"CPU核数: {os.cpu_count()}, 文件数: {args.files}, 每个文件页数: {args.pages}")
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = [
+            write_resume_pdf(os.path.join(workdir, f"resume_{i}.pdf"), num_pages=args.pages)
+            for i in range(args.files)
+        ]
+
+        baseline = None
+        print(f"{'进程数':>6} {'耗时(s)':>9} {'文件/秒':>9} {'加速比':>7} {'循环延迟p99(ms)':>16} {'最大(ms)':>9}")
+        for workers in args.workers:
+            result = asyncio.run(run_benchmark(paths, workers))
+            baseline = baseline or result["files_per_second"]
+            print(
+                f"{workers:>6} {result['elapsed_seconds']:>9.2f} {result['files_per_second']:>9.2f} "
+                f"{result['files_per_second'] / baseline:>7.2f} {result['loop_lag_p99_ms']:>16.1f} "
+                f"{result['loop_lag_max_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
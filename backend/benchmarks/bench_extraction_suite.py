@@ -0,0 +1,209 @@
+"""
+PDF提取基准测试套件
+在确定性生成的合成简历语料上（不同页数和版式），分别测量validate_pdf_file、
+extract_text_from_pdf和clean_and_preprocess_text的延迟分位数和峰值内存，输出JSON报告
+
+用法:
+    python -m backend.benchmarks.bench_extraction_suite --pages 1 5 20 --docs 3 --repeat 5 --output report.json
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import PyPDF2
+import pdfplumber
+
+from backend.benchmarks.synthetic_pdf import CORPUS_VARIANTS, write_corpus
+from backend.services.pdf_parser import PDFParser, EXTRACTOR_VERSION, CLEANING_VERSION
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 测量的操作
+OPERATIONS = ["validate_pdf_file", "extract_text_from_pdf", "clean_and_preprocess_text"]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """
+    计算延迟分位数（最近秩法）
+
+    Args:
+        samples: 延迟样本（毫秒）
+
+    Returns:
+        Dict[str, float]: p50、p90、p99、mean、min、max（毫秒）
+    """
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "mean": 0.0, "min": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+
+    def percentile(percent: float) -> float:
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    return {
+        "p50": round(percentile(50), 3),
+        "p90": round(percentile(90), 3),
+        "p99": round(percentile(99), 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "min": round(ordered[0], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def measure_peak_memory(func: Callable[[], Any]) -> int:
+    """
+    执行一次func，返回执行期间Python分配的峰值内存（字节）
+
+    tracemalloc会拖慢执行，峰值内存单独测量，不与计时混在一起
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_document(parser: PDFParser, path: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """
+    测量单个文档上各操作的延迟样本和峰值内存
+
+    clean_and_preprocess_text的输入是pdfplumber提取的原始文本（含页面分隔符），在计时前准备好。
+
+    Args:
+        parser: PDF解析器（不带提取缓存）
+        path: PDF文件路径
+        repeat: 每个操作的重复次数
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 操作名 -> samples（毫秒列表）和peak_memory_bytes
+    """
+    raw_text = parser._extract_with_pdfplumber(path)
+    calls = {
+        "validate_pdf_file": lambda: parser.validate_pdf_file(path),
+        "extract_text_from_pdf": lambda: parser.extract_text_from_pdf(path),
+        "clean_and_preprocess_text": lambda: parser.clean_and_preprocess_text(raw_text),
+    }
+
+    results = {}
+    for operation in OPERATIONS:
+        call = calls[operation]
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[operation] = {"samples": samples, "peak_memory_bytes": measure_peak_memory(call)}
+    return results
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pdfplumber": pdfplumber.__version__,
+        "PyPDF2": PyPDF2.__version__,
+        "extractor_version": EXTRACTOR_VERSION,
+        "cleaning_version": CLEANING_VERSION,
+    }
+
+
+def run_suite(page_counts: Iterable[int], variants: Dict[str, Dict[str, Any]], docs_per_size: int = 3,
+              repeat: int = 5, seed: int = 0, workdir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    生成语料并运行全部测量
+
+    Args:
+        page_counts: 页数列表
+        variants: 版式名称 -> 生成参数
+        docs_per_size: 每种组合的文档数
+        repeat: 每个文档上每个操作的重复次数
+        seed: 语料随机种子
+        workdir: 语料目录，不传时使用临时目录
+
+    Returns:
+        Dict[str, Any]: 报告，results中每项为一个(版式, 页数, 操作)组合的延迟分位数和峰值内存
+    """
+    page_counts = list(page_counts)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manifest = write_corpus(workdir or tmpdir, page_counts, variants, docs_per_size, seed)
+        parser = PDFParser()
+
+        grouped: Dict[tuple, Dict[str, Any]] = {}
+        for entry in manifest:
+            document_results = benchmark_document(parser, entry["path"], repeat)
+            for operation, measured in document_results.items():
+                group = grouped.setdefault(
+                    (entry["variant"], entry["pages"], operation),
+                    {"samples": [], "peak_memory_bytes": 0}
+                )
+                group["samples"].extend(measured["samples"])
+                group["peak_memory_bytes"] = max(group["peak_memory_bytes"], measured["peak_memory_bytes"])
+
+    results = [
+        {
+            "variant": variant,
+            "pages": pages,
+            "operation": operation,
+            "samples": len(group["samples"]),
+            "latency_ms": latency_summary(group["samples"]),
+            "peak_memory_kb": round(group["peak_memory_bytes"] / 1024, 1),
+        }
+        for (variant, pages, operation), group in grouped.items()
+    ]
+
+    report = {
+        "environment": _environment(),
+        "config": {
+            "page_counts": page_counts,
+            "variants": variants,
+            "docs_per_size": docs_per_size,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+    if resource is not None:
+        # Linux上单位为KB
+        report["process_max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF提取基准测试套件")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20], help="页数列表")
+    parser.add_argument("--docs", type=int, default=3, help="每种组合的文档数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个操作的重复次数")
+    parser.add_argument("--variants", nargs="+", default=list(CORPUS_VARIANTS), choices=list(CORPUS_VARIANTS))
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--output", help="报告输出路径，不传时输出到标准输出")
+    args = parser.parse_args()
+
+    report = run_suite(
+        args.pages,
+        {name: CORPUS_VARIANTS[name] for name in args.variants},
+        docs_per_size=args.docs,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"报告已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
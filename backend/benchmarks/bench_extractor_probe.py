@@ -0,0 +1,104 @@
+"""
+提取引擎探测基准测试
+在文本PDF和扫描件混合的语料上，比较原先"pdfplumber全量提取，文本过少再用PyPDF2全量提取"
+的两遍策略与先探测再选择单一引擎的耗时，并检查文本PDF的提取结果是否一致
+
+用法:
+    python -m backend.benchmarks.bench_extractor_probe --text-docs 20 --scanned-docs 10 --pages 5
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+
+from backend.benchmarks.synthetic_pdf import build_image_only_pdf, write_resume_pdf
+from backend.services.pdf_parser import PDFParser, PDFParseError, MIN_TEXT_CHARS
+
+
+def extract_two_pass(parser: PDFParser, path: str) -> Optional[str]:
+    """
+    原先的提取策略：pdfplumber提取全部页面，文本过少时再用PyPDF2提取全部页面
+
+    Returns:
+        Optional[str]: 清理后的文本，没有可提取文本时返回None
+    """
+    with parser.open_session(path) as session:
+        validation_result = parser.validate_pdf_file(path, session=session)
+        if not validation_result['is_valid']:
+            raise PDFParseError(validation_result['error_message'])
+        text = parser._extract_with_pdfplumber(path, session)
+        if len(text.strip()) < MIN_TEXT_CHARS:
+            pypdf2_text = parser._extract_with_pypdf2(path, session)
+            if len(pypdf2_text.strip()) > len(text.strip()):
+                text = pypdf2_text
+        if not text.strip():
+            return None
+        return parser.clean_and_preprocess_text(text)
+
+
+def extract_probed(parser: PDFParser, path: str) -> Optional[str]:
+    """
+    先探测再选择单一引擎的提取策略
+
+    Returns:
+        Optional[str]: 清理后的文本，没有可提取文本时返回None
+    """
+    try:
+        return parser.extract_document(path)["text"]
+    except PDFParseError:
+        return None
+
+
+def time_corpus(parser: PDFParser, corpus: Dict[str, List[str]], extract) -> Dict[str, Dict]:
+    """
+    按类别统计提取整个语料的耗时
+
+    Returns:
+        Dict[str, Dict]: 每个类别的耗时和提取结果
+    """
+    results = {}
+    for category, paths in corpus.items():
+        start = time.perf_counter()
+        texts = [extract(parser, path) for path in paths]
+        results[category] = {"seconds": time.perf_counter() - start, "texts": texts}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取引擎探测基准测试")
+    parser.add_argument("--text-docs", type=int, default=20, help="文本PDF数量")
+    parser.add_argument("--scanned-docs", type=int, default=10, help="扫描件数量")
+    parser.add_argument("--pages", type=int, default=5, help="每个文档的页数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = {"text": [], "scanned": []}
+        for i in range(args.text_docs):
+            corpus["text"].append(write_resume_pdf(os.path.join(workdir, f"text_{i}.pdf"), num_pages=args.pages))
+        for i in range(args.scanned_docs):
+            path = os.path.join(workdir, f"scanned_{i}.pdf")
+            with open(path, 'wb') as f:
+                f.write(build_image_only_pdf(args.pages, producer="Canon ScanGear" if i % 2 else ""))
+            corpus["scanned"].append(path)
+
+        pdf_parser = PDFParser()
+        legacy = time_corpus(pdf_parser, corpus, extract_two_pass)
+        probed = time_corpus(pdf_parser, corpus, extract_probed)
+
+        print(f"文本PDF: {args.text_docs}份, 扫描件: {args.scanned_docs}份, 每份{args.pages}页")
+        print(f"{'类别':>8} {'两遍提取(s)':>12} {'探测后提取(s)':>14} {'加速比':>7} {'结果一致':>8}")
+        for category in corpus:
+            before, after = legacy[category], probed[category]
+            print(
+                f"{category:>8} {before['seconds']:>12.3f} {after['seconds']:>14.3f} "
+                f"{before['seconds'] / after['seconds']:>7.2f} {str(before['texts'] == after['texts']):>8}"
+            )
+        total_before = sum(result["seconds"] for result in legacy.values())
+        total_after = sum(result["seconds"] for result in probed.values())
+        print(f"{'合计':>8} {total_before:>12.3f} {total_after:>14.3f} {total_before / total_after:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+AI输出JSON修复评估
+在合成简历语料上构造常见的格式错误（说明文字、多余和缺少的逗号、未转义的引号、输出截断），
+比较本地修复和不修复时的解析成功率，以及修复避免的重新调用的输出token和延迟，输出JSON报告
+
+完整格式的模型输出按标注构造；未转义的引号在标注的第一条工作描述中加入带引号的词，
+把输出中的转义引号还原为未转义。截断在输出的--truncate-ratio处切断，统计修复后保留的经历比例。
+重新调用的延迟按"首token延迟 + 输出token数 / 生成速度"估计。
+
+用法:
+    python -m backend.benchmarks.bench_json_repair --docs 50 --output report.json
+    python -m backend.benchmarks.bench_json_repair --docs 50 --truncate-ratio 0.5
+"""
+
+import re
+import sys
+import copy
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+from backend.benchmarks.bench_extraction_suite import latency_summary
+from backend.benchmarks.bench_response_format import format_output
+from backend.benchmarks.synthetic_resume import build_synthetic_resume
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.response_formats import RESPONSE_FORMAT_FULL
+
+_CLOSER = re.compile(r'(["\]}\d])(\n\s*[\]}])')
+
+
+def _quoted(data: Dict[str, Any]) -> Dict[str, Any]:
+    """在第一条工作描述中加入带引号的词"""
+    data = copy.deepcopy(data)
+    description = data["work_experience"][0]["description"]
+    description[0] = '负责"核心"' + description[0]
+    return data
+
+
+def corruptions(truncate_ratio: float) -> Dict[str, Callable[[Dict[str, Any]], Tuple[str, Dict[str, Any]]]]:
+    """
+    各类格式错误的构造函数
+
+    Args:
+        truncate_ratio: 截断时保留的输出比例
+
+    Returns:
+        Dict[str, Callable]: 错误类型 -> 函数（参数为标注，返回有错误的输出和修复后应得到的标注）
+    """
+    def output(data):
+        return format_output(data, RESPONSE_FORMAT_FULL)
+
+    return {
+        "leading_text": lambda data: ("好的，以下是解析结果：\n" + output(data), data),
+        "trailing_text": lambda data: (output(data) + "\n\n以上是根据简历内容提取的信息。", data),
+        "trailing_comma": lambda data: (_CLOSER.sub(r'\1,\2', output(data)), data),
+        "missing_comma": lambda data: (output(data).replace('},\n  "work_experience"', '}\n  "work_experience"'), data),
+        "unescaped_quote": lambda data: (output(_quoted(data)).replace('\\"', '"'), _quoted(data)),
+        "truncated": lambda data: (output(data)[:int(len(output(data)) * truncate_ratio)], data),
+    }
+
+
+def run_offline(docs: int, seed: int, truncate_ratio: float,
+                tokens_per_second: float, first_token_latency: float) -> Dict[str, Any]:
+    """
+    离线评估各类格式错误的修复效果
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+        truncate_ratio: 截断时保留的输出比例
+        tokens_per_second: 估计的生成速度（token/秒）
+        first_token_latency: 估计的首token延迟（秒）
+
+    Returns:
+        Dict[str, Any]: 每类错误的解析成功率（修复和不修复）、与标注完全一致的比例、修复耗时，
+            截断时保留的经历比例，以及修复避免的重新调用
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+
+    results: Dict[str, Any] = {}
+    avoided_tokens: List[int] = []
+    for kind, corrupt in corruptions(truncate_ratio).items():
+        measured = {"baseline": 0, "repaired": 0, "exact": 0, "repair_ms": [], "retained": []}
+        for index in range(docs):
+            _, truth = build_synthetic_resume(seed + index)
+            output, expected = corrupt(truth)
+
+            parser.json_repair = False
+            try:
+                parser._build_resume_data(parser._parse_api_response(output))
+                measured["baseline"] += 1
+            except Exception:
+                pass
+
+            parser.json_repair = True
+            start = time.perf_counter()
+            try:
+                resume = parser._build_resume_data(parser._parse_api_response(output))
+            except Exception:
+                continue
+            finally:
+                measured["repair_ms"].append((time.perf_counter() - start) * 1000)
+            measured["repaired"] += 1
+            avoided_tokens.append(estimate_tokens(format_output(truth, RESPONSE_FORMAT_FULL)))
+            measured["exact"] += parser._cache_payload(resume) == parser._cache_payload(parser._build_resume_data(expected))
+            if expected["work_experience"]:
+                measured["retained"].append(len(resume.work_experience) / len(expected["work_experience"]))
+
+        results[kind] = {
+            "baseline_success_rate": round(measured["baseline"] / docs, 3) if docs else 0.0,
+            "repair_success_rate": round(measured["repaired"] / docs, 3) if docs else 0.0,
+            "exact_match_rate": round(measured["exact"] / docs, 3) if docs else 0.0,
+            "repair_ms": latency_summary(measured["repair_ms"]),
+            "retained_work_experience": latency_summary(measured["retained"]),
+        }
+
+    return {
+        "mode": "estimated",
+        "docs": docs,
+        "corruptions": results,
+        "recalls_avoided": len(avoided_tokens),
+        "recall_output_tokens_avoided": latency_summary(avoided_tokens),
+        "recall_latency_avoided_ms": latency_summary([
+            (first_token_latency + count / tokens_per_second) * 1000 for count in avoided_tokens
+        ]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI输出JSON修复评估")
+    parser.add_argument("--docs", type=int, default=50, help="合成简历数")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--truncate-ratio", type=float, default=0.7, help="截断时保留的输出比例")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="估计重新调用延迟使用的生成速度")
+    parser.add_argument("--first-token-latency", type=float, default=0.8, help="估计重新调用延迟使用的首token延迟（秒）")
+    parser.add_argument("--output", help="报告输出路径，不传时输出到标准输出")
+    args = parser.parse_args()
+
+    results = run_offline(args.docs, args.seed, args.truncate_ratio, args.tokens_per_second, args.first_token_latency)
+
+    output = json.dumps({"config": vars(args), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"报告已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+长文档分段并行提取基准测试
+比较不同进程数下提取同一份多页PDF的耗时
+
+用法:
+    python -m backend.benchmarks.bench_page_parallel --workers 1 2 4 8 --pages 50
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Dict, Any
+
+from backend.benchmarks.synthetic_pdf import write_resume_pdf
+from backend.services.extraction_pool import ExtractionPool, plan_page_shards
+from backend.services.pdf_parser import PDFParser
+
+
+async def run_benchmark(path: str, workers: int, shard_min_pages: int, repeat: int) -> Dict[str, Any]:
+    """
+    用指定进程数重复提取同一文件，返回平均耗时
+
+    Args:
+        path: PDF文件路径
+        workers: 工作进程数
+        shard_min_pages: 每段最少页数
+        repeat: 重复次数
+
+    Returns:
+        Dict[str, Any]: 平均耗时和提取结果
+    """
+    pool = ExtractionPool(max_workers=workers, max_pending=workers, shard_min_pages=shard_min_pages)
+    try:
+        # 预热：启动所有工作进程，不计入耗时
+        await pool.extract(path)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            text = await pool.extract(path)
+        elapsed = (time.perf_counter() - start) / repeat
+    finally:
+        pool.shutdown()
+
+    return {"workers": workers, "seconds": elapsed, "text": text}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长文档分段并行提取基准测试")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pages", type=int, default=50, help="PDF页数")
+    parser.add_argument("--shard-min-pages", type=int, default=4, help="每段最少页数")
+    parser.add_argument("--repeat", type=int, default=3, help="每组重复次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_resume_pdf(os.path.join(workdir, "long.pdf"), num_pages=args.pages)
+
+        start = time.perf_counter()
+        expected = PDFParser().extract_text_from_pdf(path)
+        serial = time.perf_counter() - start
+
+        print(f"CPU核数: {os.cpu_count()}, 页数: {args.pages}")
+        print(f"进程内串行提取: {serial:.2f}s")
+        print(f"{'进程数':>6} {'分段数':>6} {'耗时(s)':>9} {'加速比':>7} {'结果一致':>8}")
+        baseline = None
+        for workers in args.workers:
+            result = asyncio.run(run_benchmark(path, workers, args.shard_min_pages, args.repeat))
+            baseline = baseline or result["seconds"]
+            shards = len(plan_page_shards(args.pages, workers, args.shard_min_pages))
+            print(
+                f"{workers:>6} {shards:>6} {result['seconds']:>9.2f} "
+                f"{baseline / result['seconds']:>7.2f} {str(result['text'] == expected):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
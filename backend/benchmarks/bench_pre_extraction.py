@@ -0,0 +1,227 @@
+"""
+联系方式和时间段预提取评估
+在合成简历语料上评估规则预提取的准确率，以及预提取后提示词和模型输出减少的token数，输出JSON报告
+
+默认离线运行：直接比较本地提取结果和标注；输出token按模型在两种提示下应输出的内容估计
+（预提取时联系方式为null、时间段为标记），并检查合并后能否还原为与标注一致的简历对象。
+传--live时实际调用通义千问（需要DASHSCOPE_API_KEY），分别在开启和关闭预提取时解析同一份简历，
+比较联系方式和时间段字段的准确率、接口返回的token用量和延迟。
+
+用法:
+    python -m backend.benchmarks.bench_pre_extraction --docs 50 --output report.json
+    python -m backend.benchmarks.bench_pre_extraction --docs 5 --live
+"""
+
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.bench_extraction_suite import latency_summary
+from backend.benchmarks.bench_response_format import format_output
+from backend.benchmarks.synthetic_resume import build_synthetic_resume
+from backend.services.contact_extractor import contact_extractor
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.response_formats import RESPONSE_FORMAT_FULL
+
+# 评估的联系方式字段
+CONTACT_FIELDS = ["email", "phone", "linkedin", "github"]
+
+
+def _digits(value: Optional[str]) -> str:
+    """电话号码只比较数字"""
+    return re.sub(r'\D', '', value or "")
+
+
+def _periods(data: Dict[str, Any]) -> List[tuple]:
+    return [
+        (entry.get("start_date"), entry.get("end_date"))
+        for key in ("work_experience", "education") for entry in data.get(key) or []
+    ]
+
+
+def score_fields(data: Dict[str, Any], truth: Dict[str, Any]) -> Dict[str, bool]:
+    """
+    按字段比较解析结果和标注
+
+    Args:
+        data: 完整格式的简历字典
+        truth: 合成简历的结构化标注
+
+    Returns:
+        Dict[str, bool]: 联系方式各字段和dates（全部时间段，按顺序）是否正确
+    """
+    info, expected = data.get("personal_info") or {}, truth["personal_info"]
+    scores = {}
+    for field in CONTACT_FIELDS:
+        if field == "phone":
+            scores[field] = _digits(info.get(field)) == _digits(expected[field])
+        else:
+            scores[field] = (info.get(field) or None) == expected[field]
+    scores["dates"] = _periods(data) == _periods(truth)
+    return scores
+
+
+def score_extraction(extracted: Dict[str, Any], truth: Dict[str, Any]) -> Dict[str, bool]:
+    """比较本地提取结果和标注，时间段不区分属于哪段经历，只比较提取到的集合"""
+    scores = score_fields({"personal_info": extracted["personal_info"]}, truth)
+    spans = [(span["start_date"], span["end_date"]) for span in extracted["date_ranges"].values()]
+    scores["dates"] = sorted(spans, key=str) == sorted(_periods(truth), key=str)
+    return scores
+
+
+def pre_extracted_output(truth: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, Any]:
+    """构造预提取时模型应输出的内容：不含联系方式，时间段只有开始时间中的标记"""
+    markers = {(span["start_date"], span["end_date"]): marker for marker, span in extracted["date_ranges"].items()}
+
+    def with_markers(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = []
+        for entry in entries:
+            marker = markers.get((entry["start_date"], entry["end_date"]))
+            if marker:
+                entry = {field: value for field, value in entry.items() if field != "end_date"}
+                entry["start_date"] = marker
+            result.append(entry)
+        return result
+
+    return {
+        "personal_info": {
+            field: value for field, value in truth["personal_info"].items() if field not in extracted["personal_info"]
+        },
+        "work_experience": with_markers(truth["work_experience"]),
+        "education": with_markers(truth["education"]),
+        "skills": truth["skills"]
+    }
+
+
+def _accuracy(scores: List[Dict[str, bool]]) -> Dict[str, float]:
+    if not scores:
+        return {}
+    return {field: round(sum(score[field] for score in scores) / len(scores), 3) for field in scores[0]}
+
+
+def run_offline(docs: int, seed: int) -> Dict[str, Any]:
+    """
+    离线评估预提取的准确率和token节省
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+
+    Returns:
+        Dict[str, Any]: 本地提取的字段准确率、合并后还原率，以及提示和输出token的对比
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+
+    scores, merged_ok = [], 0
+    tokens = {"prompt_before": [], "prompt_after": [], "output_before": [], "output_after": []}
+    for index in range(docs):
+        text, truth = build_synthetic_resume(seed + index)
+        extracted = contact_extractor.extract(text)
+        scores.append(score_extraction(extracted, truth))
+
+        output = pre_extracted_output(truth, extracted)
+        merged = parser._build_resume_data(output, extracted)
+        merged_ok += parser._cache_payload(merged) == parser._cache_payload(parser._build_resume_data(truth))
+
+        tokens["prompt_before"].append(estimate_tokens(parser._build_parse_prompt(text)))
+        tokens["prompt_after"].append(estimate_tokens(parser._build_parse_prompt(extracted["text"], pre_extracted=True)))
+        tokens["output_before"].append(estimate_tokens(format_output(truth, RESPONSE_FORMAT_FULL)))
+        tokens["output_after"].append(estimate_tokens(format_output(output, RESPONSE_FORMAT_FULL)))
+
+    return {
+        "mode": "offline",
+        "docs": docs,
+        "local_accuracy": _accuracy(scores),
+        "merge_success_rate": round(merged_ok / docs, 3) if docs else 0.0,
+        "tokens": {name: latency_summary(values) for name, values in tokens.items()},
+    }
+
+
+async def run_live(docs: int, seed: int) -> Dict[str, Any]:
+    """
+    实际调用通义千问，比较开启和关闭预提取时的字段准确率、token用量和延迟
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+
+    Returns:
+        Dict[str, Any]: with_pre_extraction和without_pre_extraction两组结果
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+
+    modes = {"with_pre_extraction": True, "without_pre_extraction": False}
+    measured = {mode: {"scores": [], "input": [], "output": [], "latency": [], "failures": 0} for mode in modes}
+    try:
+        for index in range(docs):
+            text, truth = build_synthetic_resume(seed + index)
+            for mode, enabled in modes.items():
+                extracted = contact_extractor.extract(text) if enabled else None
+                prompt = parser._build_parse_prompt(extracted["text"] if enabled else text, pre_extracted=enabled)
+                start = time.perf_counter()
+                output, usage = await parser.client.generate_with_usage(
+                    prompt,
+                    model=parser.model,
+                    max_tokens=parser.max_tokens,
+                    temperature=parser.temperature,
+                    top_p=parser.top_p
+                )
+                result = measured[mode]
+                result["latency"].append((time.perf_counter() - start) * 1000)
+                result["input"].append(usage.get("input_tokens", estimate_tokens(prompt)))
+                result["output"].append(usage.get("output_tokens", estimate_tokens(output)))
+                try:
+                    resume = parser._build_resume_data(parser._parse_api_response(output), extracted)
+                except Exception:
+                    result["failures"] += 1
+                    continue
+                result["scores"].append(score_fields(parser._cache_payload(resume), truth))
+    finally:
+        await parser.client.aclose()
+
+    return {
+        "mode": "live",
+        "docs": docs,
+        **{
+            mode: {
+                "accuracy": _accuracy(result["scores"]),
+                "parse_failures": result["failures"],
+                "input_tokens": latency_summary(result["input"]),
+                "output_tokens": latency_summary(result["output"]),
+                "latency_ms": latency_summary(result["latency"]),
+            }
+            for mode, result in measured.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="联系方式和时间段预提取评估")
+    parser.add_argument("--docs", type=int, default=50, help="合成简历数")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--live", action="store_true", help="实际调用通义千问（需要DASHSCOPE_API_KEY）")
+    parser.add_argument("--output", help="报告输出路径，不传时输出到标准输出")
+    args = parser.parse_args()
+
+    if args.live:
+        results = asyncio.run(run_live(args.docs, args.seed))
+    else:
+        results = run_offline(args.docs, args.seed)
+
+    output = json.dumps({"config": vars(args), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"报告已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+AI解析响应格式对比
+在合成简历语料上比较完整格式（full）和紧凑格式（compact）的输出token数和端到端延迟，输出JSON报告
+
+默认离线运行：按标注数据构造两种格式的模型输出，估计输出token数，
+延迟按"首token延迟 + 输出token数 / 生成速度"估计，并检查紧凑格式能否还原为同样的简历对象。
+传--live时实际调用通义千问（需要DASHSCOPE_API_KEY），记录接口返回的输出token数、实测延迟和解析成功率。
+
+用法:
+    python -m backend.benchmarks.bench_response_format --docs 20 --output report.json
+    python -m backend.benchmarks.bench_response_format --docs 5 --live
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List
+
+from backend.benchmarks.bench_extraction_suite import latency_summary
+from backend.benchmarks.synthetic_resume import build_synthetic_resume, full_format_labels
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.response_formats import (
+    RESPONSE_FORMAT_FULL,
+    RESPONSE_FORMAT_COMPACT,
+    RESPONSE_FORMATS,
+    encode_compact_response,
+)
+
+
+def format_output(data: Dict[str, Any], response_format: str) -> str:
+    """
+    按响应格式构造模型输出文本
+
+    完整格式按提示中的示例输出（缩进的JSON，技能分类和熟练程度为中文），紧凑格式不含多余空格
+
+    Args:
+        data: 合成简历的结构化标注
+        response_format: 响应格式
+
+    Returns:
+        str: 模型输出文本
+    """
+    if response_format == RESPONSE_FORMAT_COMPACT:
+        return json.dumps(encode_compact_response(data), ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(full_format_labels(data), ensure_ascii=False, indent=2)
+
+
+def _same_resume(parser, expected: Dict[str, Any], output: str, response_format: str) -> bool:
+    """检查模型输出解析后的简历对象与标注是否一致（不比较ID和时间）"""
+    try:
+        actual = parser._build_resume_data(parser._parse_api_response(output, response_format))
+    except Exception:
+        return False
+    return parser._cache_payload(actual) == parser._cache_payload(parser._build_resume_data(expected))
+
+
+def run_offline(docs: int, seed: int, tokens_per_second: float, first_token_latency: float) -> List[Dict[str, Any]]:
+    """
+    离线估计两种格式的输出token数和延迟
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+        tokens_per_second: 估计的生成速度（token/秒）
+        first_token_latency: 估计的首token延迟（秒）
+
+    Returns:
+        List[Dict[str, Any]]: 每种格式一项汇总结果
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+
+    tokens: Dict[str, List[int]] = {response_format: [] for response_format in RESPONSE_FORMATS}
+    round_trips: Dict[str, int] = {response_format: 0 for response_format in RESPONSE_FORMATS}
+    for index in range(docs):
+        _, data = build_synthetic_resume(seed + index)
+        for response_format in RESPONSE_FORMATS:
+            output = format_output(data, response_format)
+            tokens[response_format].append(estimate_tokens(output))
+            round_trips[response_format] += _same_resume(parser, data, output, response_format)
+
+    return [
+        {
+            "response_format": response_format,
+            "mode": "estimated",
+            "docs": docs,
+            "output_tokens": latency_summary(tokens[response_format]),
+            "latency_ms": latency_summary([
+                (first_token_latency + count / tokens_per_second) * 1000 for count in tokens[response_format]
+            ]),
+            "parse_success_rate": round(round_trips[response_format] / docs, 3) if docs else 0.0,
+        }
+        for response_format in RESPONSE_FORMATS
+    ]
+
+
+async def run_live(docs: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    实际调用通义千问，比较两种格式的输出token数、端到端延迟和解析成功率
+
+    两种格式交替调用同一份简历，减少网络波动对比较的影响；不使用解析缓存和限流器。
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+
+    Returns:
+        List[Dict[str, Any]]: 每种格式一项汇总结果
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+
+    measured = {response_format: {"tokens": [], "latency": [], "success": 0} for response_format in RESPONSE_FORMATS}
+    try:
+        for index in range(docs):
+            text, data = build_synthetic_resume(seed + index)
+            for response_format in RESPONSE_FORMATS:
+                prompt = parser._build_parse_prompt(text, response_format)
+                start = time.perf_counter()
+                output, usage = await parser.client.generate_with_usage(
+                    prompt,
+                    model=parser.model,
+                    max_tokens=parser.max_tokens,
+                    temperature=parser.temperature,
+                    top_p=parser.top_p
+                )
+                measured[response_format]["latency"].append((time.perf_counter() - start) * 1000)
+                measured[response_format]["tokens"].append(usage.get("output_tokens", estimate_tokens(output)))
+                measured[response_format]["success"] += _same_resume(parser, data, output, response_format)
+    finally:
+        await parser.client.aclose()
+
+    return [
+        {
+            "response_format": response_format,
+            "mode": "live",
+            "docs": docs,
+            "output_tokens": latency_summary(result["tokens"]),
+            "latency_ms": latency_summary(result["latency"]),
+            "parse_success_rate": round(result["success"] / docs, 3) if docs else 0.0,
+        }
+        for response_format, result in measured.items()
+    ]
+
+
+def compare(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """计算紧凑格式相对完整格式的输出token和平均延迟的下降比例"""
+    by_format = {result["response_format"]: result for result in results}
+    full, compact = by_format[RESPONSE_FORMAT_FULL], by_format[RESPONSE_FORMAT_COMPACT]
+
+    def reduction(metric: str) -> float:
+        baseline = full[metric]["mean"]
+        return round(1 - compact[metric]["mean"] / baseline, 3) if baseline else 0.0
+
+    return {"output_tokens_reduction": reduction("output_tokens"), "latency_reduction": reduction("latency_ms")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI解析响应格式对比")
+    parser.add_argument("--docs", type=int, default=20, help="合成简历数")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--live", action="store_true", help="实际调用通义千问（需要DASHSCOPE_API_KEY）")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="离线估计使用的生成速度")
+    parser.add_argument("--first-token-latency", type=float, default=0.8, help="离线估计使用的首token延迟（秒）")
+    parser.add_argument("--output", help="报告输出路径，不传时输出到标准输出")
+    args = parser.parse_args()
+
+    if args.live:
+        results = asyncio.run(run_live(args.docs, args.seed))
+    else:
+        results = run_offline(args.docs, args.seed, args.tokens_per_second, args.first_token_latency)
+
+    report = {
+        "config": vars(args),
+        "results": results,
+        "comparison": compare(results),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"报告已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
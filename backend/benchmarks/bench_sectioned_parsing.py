@@ -0,0 +1,255 @@
+"""
+按章节并发解析评估
+在合成简历语料上比较整体解析（一次调用）和按章节并发解析的输出token、端到端延迟和输出截断，输出JSON报告
+
+默认离线运行：整体解析的模型输出按标注构造；按章节解析时每个请求的输出由模拟模型按片段内容生成
+（逐行识别经历标题行、工作描述、技术栈和技能行），合并后检查能否还原为标注的简历。
+每个请求的延迟按"首token延迟 + 输出token数 / 生成速度"估计，按章节解析的延迟取最慢的请求；
+输出token超过max_tokens的请求视为被截断。--jobs指定较多的工作经历可以模拟超长简历。
+传--live时实际调用通义千问（需要DASHSCOPE_API_KEY），记录两种方式的实测延迟和解析成功率。
+
+用法:
+    python -m backend.benchmarks.bench_sectioned_parsing --docs 20 --output report.json
+    python -m backend.benchmarks.bench_sectioned_parsing --docs 20 --jobs 12 --chunk-token-budget 600
+    python -m backend.benchmarks.bench_sectioned_parsing --docs 5 --live
+"""
+
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, Optional
+
+from backend.benchmarks.bench_extraction_suite import latency_summary
+from backend.benchmarks.bench_pre_extraction import pre_extracted_output
+from backend.benchmarks.bench_response_format import format_output
+from backend.benchmarks.synthetic_resume import build_synthetic_resume
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.response_formats import RESPONSE_FORMAT_FULL
+from backend.services.sectioned_extraction import (
+    SectionedExtractor,
+    PART_PERSONAL_INFO,
+    PART_WORK_EXPERIENCE,
+    PART_EDUCATION,
+    PART_SKILLS,
+)
+
+_MARKER = re.compile(r'\[(D\d+)\]')
+_SKILL_ITEM = re.compile(r'^(.+?)（(.+)）$')
+
+
+def _fragment(prompt: str) -> str:
+    """从按章节解析的提示中取出简历片段"""
+    return prompt.split("简历片段：\n", 1)[1].split("\n\n说明：", 1)[0].split("\n\n请严格按照", 1)[0]
+
+
+def simulate_section_output(part: str, prompt: str, truth: Dict[str, Any]) -> str:
+    """
+    模拟模型对按章节解析请求的输出：只使用片段中出现的内容
+
+    Args:
+        part: 请求的部分
+        prompt: 按章节解析的提示
+        truth: 合成简历的结构化标注（只用于识别片段中的姓名和所在地区）
+
+    Returns:
+        str: 完整格式的JSON输出
+    """
+    lines = [line.strip() for line in _fragment(prompt).split("\n") if line.strip()]
+    if part == PART_PERSONAL_INFO:
+        info = truth["personal_info"]
+        value: Any = {
+            field: info[field] for field in ("name", "location")
+            if any(info[field] and info[field] in line for line in lines)
+        }
+        return json.dumps({part: value}, ensure_ascii=False, indent=2)
+
+    value = []
+    for line in lines:
+        marker = _MARKER.search(line)
+        fields = [field for field in line.split(" | ") if not _MARKER.search(field)]
+        if part == PART_WORK_EXPERIENCE and marker:
+            value.append({"company": fields[0], "position": fields[1], "start_date": marker.group(1),
+                          "description": [], "technologies": []})
+        elif part == PART_WORK_EXPERIENCE and value and line.startswith("- "):
+            value[-1]["description"].append(line[2:])
+        elif part == PART_WORK_EXPERIENCE and value and line.startswith("技术栈："):
+            value[-1]["technologies"] = line[len("技术栈："):].split("、")
+        elif part == PART_EDUCATION and marker:
+            value.append({"institution": fields[0], "degree": fields[1], "major": fields[2],
+                          "start_date": marker.group(1), "gpa": None})
+        elif part == PART_SKILLS and "：" in line:
+            category, names = line.split("：", 1)
+            for name in names.split("、"):
+                match = _SKILL_ITEM.match(name)
+                value.append({"category": category, "name": match.group(1) if match else name,
+                              "level": match.group(2) if match else None})
+    return json.dumps({part: value}, ensure_ascii=False, indent=2)
+
+
+def _latency_ms(output_tokens: int, tokens_per_second: float, first_token_latency: float) -> float:
+    return (first_token_latency + output_tokens / tokens_per_second) * 1000
+
+
+def run_offline(docs: int, seed: int, num_jobs: Optional[int], chunk_token_budget: int,
+                tokens_per_second: float, first_token_latency: float) -> Dict[str, Any]:
+    """
+    离线估计整体解析和按章节解析的延迟、token用量和截断情况
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+        num_jobs: 每份简历的工作经历数，默认随机
+        chunk_token_budget: 按章节解析时每个请求中简历片段的token上限
+        tokens_per_second: 估计的生成速度（token/秒）
+        first_token_latency: 估计的首token延迟（秒）
+
+    Returns:
+        Dict[str, Any]: single和sectioned两组结果，以及按章节解析合并后的还原率
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+    parser.sectioned = SectionedExtractor({"chunk_token_budget": chunk_token_budget})
+    # 合成简历中不同经历可能有相同的工作描述，压缩会去掉重复行，评估合并结果时不压缩
+    parser.compactor = None
+
+    measured = {
+        mode: {"prompt": [], "output": [], "latency": [], "requests": [], "truncated": 0}
+        for mode in ("single", "sectioned")
+    }
+    restored = 0
+    for index in range(docs):
+        text, truth = build_synthetic_resume(seed + index, num_jobs)
+        extracted = parser._pre_extract(text)
+        masked = extracted["text"] if extracted else text
+
+        single = measured["single"]
+        expected = pre_extracted_output(truth, extracted) if extracted else truth
+        output_tokens = estimate_tokens(format_output(expected, RESPONSE_FORMAT_FULL))
+        single["prompt"].append(estimate_tokens(parser._build_parse_prompt(masked, pre_extracted=extracted is not None)))
+        single["output"].append(output_tokens)
+        single["latency"].append(_latency_ms(output_tokens, tokens_per_second, first_token_latency))
+        single["requests"].append(1)
+        single["truncated"] += output_tokens > parser.max_tokens
+
+        sectioned = measured["sectioned"]
+        sections = parser._plan_sections(masked, extracted is not None)
+        outputs = [simulate_section_output(part, prompt, truth) for part, prompt in sections]
+        tokens = [estimate_tokens(output) for output in outputs]
+        sectioned["prompt"].append(sum(estimate_tokens(prompt) for _, prompt in sections))
+        sectioned["output"].append(sum(tokens))
+        sectioned["latency"].append(max(_latency_ms(count, tokens_per_second, first_token_latency) for count in tokens))
+        sectioned["requests"].append(len(sections))
+        sectioned["truncated"] += any(count > parser.max_tokens for count in tokens)
+
+        merged = parser.sectioned.reduce(
+            (part, parser._parse_section_response(output, part)) for (part, _), output in zip(sections, outputs)
+        )
+        try:
+            resume = parser._build_resume_data(merged, extracted)
+        except Exception:
+            continue
+        restored += parser._cache_payload(resume) == parser._cache_payload(parser._build_resume_data(truth))
+
+    return {
+        "mode": "estimated",
+        "docs": docs,
+        **{
+            mode: {
+                "requests": latency_summary(result["requests"]),
+                "prompt_tokens": latency_summary(result["prompt"]),
+                "output_tokens": latency_summary(result["output"]),
+                "latency_ms": latency_summary(result["latency"]),
+                "truncated": result["truncated"],
+            }
+            for mode, result in measured.items()
+        },
+        "sectioned_restore_rate": round(restored / docs, 3) if docs else 0.0,
+    }
+
+
+async def run_live(docs: int, seed: int, num_jobs: Optional[int], chunk_token_budget: int) -> Dict[str, Any]:
+    """
+    实际调用通义千问，比较整体解析和按章节解析的端到端延迟和解析成功率
+
+    两种方式交替解析同一份简历，不使用解析缓存和限流器。
+
+    Args:
+        docs: 合成简历数
+        seed: 语料随机种子
+        num_jobs: 每份简历的工作经历数，默认随机
+        chunk_token_budget: 按章节解析时每个请求中简历片段的token上限
+
+    Returns:
+        Dict[str, Any]: single和sectioned两组结果
+    """
+    from backend.services.qwen_parser import QwenResumeParser
+    parser = QwenResumeParser()
+    extractor = SectionedExtractor({"chunk_token_budget": chunk_token_budget})
+
+    modes = {"single": None, "sectioned": extractor}
+    measured = {mode: {"latency": [], "success": 0} for mode in modes}
+    try:
+        for index in range(docs):
+            text, truth = build_synthetic_resume(seed + index, num_jobs)
+            for mode, sectioned in modes.items():
+                parser.sectioned = sectioned
+                start = time.perf_counter()
+                try:
+                    resume = await parser.parse_resume_text_async(text)
+                except Exception:
+                    continue
+                finally:
+                    measured[mode]["latency"].append((time.perf_counter() - start) * 1000)
+                measured[mode]["success"] += (
+                    parser._cache_payload(resume) == parser._cache_payload(parser._build_resume_data(truth))
+                )
+    finally:
+        await parser.client.aclose()
+
+    return {
+        "mode": "live",
+        "docs": docs,
+        **{
+            mode: {
+                "latency_ms": latency_summary(result["latency"]),
+                "exact_match_rate": round(result["success"] / docs, 3) if docs else 0.0,
+            }
+            for mode, result in measured.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按章节并发解析评估")
+    parser.add_argument("--docs", type=int, default=20, help="合成简历数")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--jobs", type=int, default=None, help="每份简历的工作经历数，默认随机1到4段")
+    parser.add_argument("--chunk-token-budget", type=int, default=1500, help="每个请求中简历片段的token上限")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="离线估计使用的生成速度")
+    parser.add_argument("--first-token-latency", type=float, default=0.8, help="离线估计使用的首token延迟（秒）")
+    parser.add_argument("--live", action="store_true", help="实际调用通义千问（需要DASHSCOPE_API_KEY）")
+    parser.add_argument("--output", help="报告输出路径，不传时输出到标准输出")
+    args = parser.parse_args()
+
+    if args.live:
+        results = asyncio.run(run_live(args.docs, args.seed, args.jobs, args.chunk_token_budget))
+    else:
+        results = run_offline(
+            args.docs, args.seed, args.jobs, args.chunk_token_budget,
+            args.tokens_per_second, args.first_token_latency
+        )
+
+    output = json.dumps({"config": vars(args), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"报告已写入: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+合成简历文本和标注数据
+按随机种子确定性地生成简历文本，同时给出对应的结构化标注（与AI解析结果相同的字典结构），
+用于评估响应格式的输出token、规则抽取的准确率等，不需要真实简历
+
+标注中技能分类和熟练程度使用SkillCategory、SkillLevel的取值，日期为YYYY-MM格式，
+当前工作的结束时间为None。简历文本中的日期写法（见DATE_STYLES）和时间段分隔符随种子变化。
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+_SURNAMES = [("张", "zhang"), ("王", "wang"), ("李", "li"), ("刘", "liu"), ("陈", "chen"), ("杨", "yang")]
+_GIVEN_NAMES = [("伟", "wei"), ("芳", "fang"), ("娜", "na"), ("洋", "yang"), ("静", "jing"), ("磊", "lei")]
+_CITIES = ["北京", "上海", "深圳", "杭州", "成都"]
+_COMPANIES = ["星辰科技有限公司", "蓝海数据有限公司", "云帆网络科技有限公司", "北辰软件股份有限公司", "极光智能科技有限公司"]
+_POSITIONS = ["后端开发工程师", "高级后端工程师", "数据工程师", "技术负责人", "前端开发工程师"]
+_DUTIES = [
+    "负责订单系统的架构设计和核心模块开发",
+    "主导支付服务从单体到微服务的拆分",
+    "优化数据库慢查询，接口平均延迟降低40%",
+    "搭建持续集成流水线，发布耗时从1小时缩短到10分钟",
+    "负责数据仓库建设和离线报表开发",
+    "带领5人小组完成推荐系统重构",
+]
+_TECHNOLOGIES = ["Python", "Go", "Java", "MySQL", "Redis", "Kafka", "Docker", "Kubernetes", "Vue", "Spark"]
+_SCHOOLS = ["清华大学", "浙江大学", "复旦大学", "华中科技大学", "电子科技大学"]
+_MAJORS = ["计算机科学与技术", "软件工程", "信息安全", "数学与应用数学"]
+_DEGREES = ["本科", "硕士"]
+_SOFT_SKILLS = ["团队合作", "沟通能力", "项目管理"]
+_LANGUAGES = ["英语", "日语"]
+_LEVEL_LABELS = {"beginner": "了解", "intermediate": "熟练", "advanced": "精通", "expert": "专家"}
+_CATEGORY_LABELS = {"technical": "技术技能", "soft": "软技能", "language": "语言"}
+# 简历中常见的日期写法
+DATE_STYLES = {
+    "dash": "{year}-{month:02d}",
+    "dot": "{year}.{month:02d}",
+    "slash": "{year}/{month:02d}",
+    "cjk": "{year}年{month}月",
+}
+_RANGE_SEPARATORS = [" - ", " ~ ", "–", " 至 "]
+_PRESENT_LABELS = ["至今", "现在", "Present"]
+
+
+def _month(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+def build_synthetic_resume(seed: int, num_jobs: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    生成一份合成简历
+
+    Args:
+        seed: 随机种子，相同种子生成相同的简历
+        num_jobs: 工作经历数，默认随机1到4段
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: (简历文本, 结构化标注)
+    """
+    rng = random.Random(seed)
+    surname, surname_pinyin = rng.choice(_SURNAMES)
+    given, given_pinyin = rng.choice(_GIVEN_NAMES)
+    account = f"{surname_pinyin}{given_pinyin}{seed}"
+    personal_info = {
+        "name": f"{surname}{given}",
+        "email": f"{account}@example.com",
+        "phone": f"1{rng.randint(30, 89)}-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "location": rng.choice(_CITIES),
+        "summary": None,
+        "linkedin": f"https://www.linkedin.com/in/{account}" if rng.random() < 0.4 else None,
+        "github": f"https://github.com/{account}" if rng.random() < 0.6 else None,
+        "website": None
+    }
+
+    # 教育经历在前，工作经历从毕业后开始，最近的工作排在最前
+    graduation_year = rng.randint(2008, 2016)
+    degree = rng.choice(_DEGREES)
+    education = [{
+        "institution": rng.choice(_SCHOOLS),
+        "degree": degree,
+        "major": rng.choice(_MAJORS),
+        "start_date": _month(graduation_year - (4 if degree == "本科" else 3), 9),
+        "end_date": _month(graduation_year, 6),
+        "gpa": None
+    }]
+
+    jobs = num_jobs if num_jobs is not None else rng.randint(1, 4)
+    work_experience: List[Dict[str, Any]] = []
+    year, month = graduation_year, 7
+    for index in range(jobs):
+        start = _month(year, month)
+        year += rng.randint(1, 3)
+        month = rng.randint(1, 12)
+        current = index == jobs - 1
+        work_experience.append({
+            "company": rng.choice(_COMPANIES),
+            "position": rng.choice(_POSITIONS),
+            "start_date": start,
+            "end_date": None if current else _month(year, month),
+            "description": rng.sample(_DUTIES, rng.randint(2, 3)),
+            "technologies": rng.sample(_TECHNOLOGIES, rng.randint(2, 4))
+        })
+    work_experience.reverse()
+
+    skills = [
+        {"category": "technical", "name": name, "level": rng.choice(["intermediate", "advanced", "expert"])}
+        for name in rng.sample(_TECHNOLOGIES, rng.randint(3, 6))
+    ]
+    skills += [{"category": "soft", "name": name, "level": None} for name in rng.sample(_SOFT_SKILLS, 2)]
+    skills.append({"category": "language", "name": rng.choice(_LANGUAGES), "level": "intermediate"})
+
+    data = {
+        "personal_info": personal_info,
+        "work_experience": work_experience,
+        "education": education,
+        "skills": skills
+    }
+    style = {
+        "date_style": rng.choice(list(DATE_STYLES)),
+        "separator": rng.choice(_RANGE_SEPARATORS),
+        "present": rng.choice(_PRESENT_LABELS)
+    }
+    return render_resume_text(data, **style), data
+
+
+def render_resume_text(data: Dict[str, Any], date_style: str = "dash", separator: str = " - ",
+                       present: str = "至今") -> str:
+    """
+    把结构化标注渲染为简历文本（与PDF提取并规范化后的文本形式相同）
+
+    Args:
+        data: build_synthetic_resume生成的结构化标注
+        date_style: 日期写法，DATE_STYLES中的键
+        separator: 时间段的分隔符
+        present: 当前工作结束时间的写法
+
+    Returns:
+        str: 简历文本
+    """
+    def period(start: str, end: Optional[str]) -> str:
+        def render(date: str) -> str:
+            year, month = date.split("-")
+            return DATE_STYLES[date_style].format(year=year, month=int(month))
+        return f"{render(start)}{separator}{render(end) if end else present}"
+
+    info = data["personal_info"]
+    lines = [info["name"], f"邮箱：{info['email']} | 电话：{info['phone']} | {info['location']}"]
+    links = [f"{label}：{info[field]}" for label, field in (("GitHub", "github"), ("LinkedIn", "linkedin")) if info[field]]
+    if links:
+        lines.append(" | ".join(links))
+
+    lines.append("工作经历")
+    for job in data["work_experience"]:
+        lines.append(f"{job['company']} | {job['position']} | {period(job['start_date'], job['end_date'])}")
+        lines.extend(f"- {duty}" for duty in job["description"])
+        lines.append(f"技术栈：{'、'.join(job['technologies'])}")
+
+    lines.append("教育背景")
+    for school in data["education"]:
+        lines.append(f"{school['institution']} | {school['degree']} | {school['major']} | "
+                     f"{period(school['start_date'], school['end_date'])}")
+
+    lines.append("专业技能")
+    for category, label in _CATEGORY_LABELS.items():
+        names = [
+            f"{skill['name']}（{_LEVEL_LABELS[skill['level']]}）" if skill["level"] else skill["name"]
+            for skill in data["skills"] if skill["category"] == category
+        ]
+        if names:
+            lines.append(f"{label}：{'、'.join(names)}")
+    return "\n".join(lines)
+
+
+def full_format_labels(data: Dict[str, Any]) -> Dict[str, Any]:
+    """把标注中的技能分类和熟练程度换成完整格式提示要求的中文取值（模型按完整格式输出时的样子）"""
+    skills = [
+        {**skill, "category": _CATEGORY_LABELS[skill["category"]],
+         "level": _LEVEL_LABELS.get(skill["level"], skill["level"])}
+        for skill in data["skills"]
+    ]
+    return {**data, "skills": skills}
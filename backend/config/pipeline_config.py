@@ -0,0 +1,234 @@
+"""
+解析流水线配置文件
+定义任务状态存储等服务的配置选项
+"""
+
+import os
+from typing import Dict, Any
+
+
+# 任务状态存储配置
+# backend为redis时多个uvicorn worker共享状态，memory只适用于单进程部署
+STATUS_STORE_CONFIG: Dict[str, Any] = {
+    "backend": os.getenv("STATUS_STORE_BACKEND", "memory"),
+    "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379"),
+    "key_prefix": "status:",
+    "ttl": int(os.getenv("STATUS_TTL_SECONDS", "86400")),        # 状态记录保留1天
+    "max_entries": int(os.getenv("STATUS_MAX_ENTRIES", "10000")),  # 内存存储每个命名空间的最大记录数
+    "list_limit": 1000                                             # 列表接口最多返回的记录数
+}
+
+
+def get_status_store_config() -> Dict[str, Any]:
+    """
+    获取任务状态存储配置
+
+    Returns:
+        Dict[str, Any]: 状态存储配置字典
+    """
+    return STATUS_STORE_CONFIG.copy()
+
+
+# PDF文本提取进程池配置
+# 提取是CPU密集型任务，放在独立进程中执行，避免阻塞事件循环
+EXTRACTION_POOL_CONFIG: Dict[str, Any] = {
+    "max_workers": int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1))),
+    "max_tasks_per_child": int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", "50")),  # 每个进程处理N个任务后重启，回收内存
+    "max_pending": int(os.getenv("EXTRACTION_MAX_PENDING", "32")),                  # 排队等待的提取任务上限
+    "shard_min_pages": int(os.getenv("EXTRACTION_SHARD_MIN_PAGES", "8")),           # 超过该页数的文档分段并行提取，0表示不分段
+    "document_timeout": float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60")),       # 每个文档的提取时间上限，0表示不限制
+    "memory_limit_mb": int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024")),        # 每个工作进程的地址空间上限，0表示不限制
+    "recycle_rss_mb": int(os.getenv("EXTRACTION_RECYCLE_RSS_MB", "512")),           # 任务结束后常驻内存超过该值时回收工作进程，0表示不回收
+    "preload_modules": ["pdfplumber", "PyPDF2"]                                     # 子进程启动前预先导入的模块
+}
+
+
+# PDF提取结果缓存配置
+# 按(文件SHA-256, 提取器版本, 清理规则版本)缓存清理后的文本，重试和重复解析不再重新提取
+EXTRACTION_CACHE_CONFIG: Dict[str, Any] = {
+    "backend": os.getenv("EXTRACTION_CACHE_BACKEND", "disk"),                        # disk、redis或none
+    "cache_dir": os.getenv("EXTRACTION_CACHE_DIR", "backend/cache/extraction"),
+    "max_bytes": int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),  # 磁盘缓存总大小上限，超出时按LRU淘汰
+    "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379"),
+    "key_prefix": "extraction:",
+    "ttl": int(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", str(30 * 86400)))          # Redis缓存保留30天
+}
+
+
+def get_extraction_pool_config() -> Dict[str, Any]:
+    """
+    获取PDF提取进程池配置
+
+    Returns:
+        Dict[str, Any]: 进程池配置字典
+    """
+    return EXTRACTION_POOL_CONFIG.copy()
+
+
+def get_extraction_cache_config() -> Dict[str, Any]:
+    """
+    获取PDF提取结果缓存配置
+
+    Returns:
+        Dict[str, Any]: 提取缓存配置字典
+    """
+    return EXTRACTION_CACHE_CONFIG.copy()
+
+
+# 通义千问异步HTTP客户端配置
+# 所有解析任务共享一个长连接池，并发请求数超过max_concurrency时在事件循环中排队
+LLM_CLIENT_CONFIG: Dict[str, Any] = {
+    "base_url": os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com"),  # 测试时可指向本地替身服务
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "16")),               # 同时进行的请求数，也是连接池大小
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+    "read_timeout": float(os.getenv("LLM_READ_TIMEOUT", "120")),                  # 长简历生成可能需要较长时间
+    "write_timeout": float(os.getenv("LLM_WRITE_TIMEOUT", "10")),
+    "pool_timeout": float(os.getenv("LLM_POOL_TIMEOUT", "10")),
+    "keepalive_expiry": float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),           # 空闲连接保留时间
+    "max_retries": int(os.getenv("LLM_MAX_RETRIES", "2")),                        # 限流、服务端错误和网络错误的重试次数
+    "retry_backoff": float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))                 # 指数退避的初始等待秒数
+}
+
+
+def get_llm_client_config() -> Dict[str, Any]:
+    """
+    获取通义千问异步客户端配置
+
+    Returns:
+        Dict[str, Any]: 客户端配置字典
+    """
+    return LLM_CLIENT_CONFIG.copy()
+
+
+# AI解析结果缓存配置
+# 按(规范化文本哈希, 模型, 温度, 提示模板版本)缓存通过校验的结构化简历，相同内容不再重复调用API
+# tiered为进程内缓存加Redis共享缓存，memory只在单个进程内有效
+LLM_CACHE_CONFIG: Dict[str, Any] = {
+    "backend": os.getenv("LLM_CACHE_BACKEND", "tiered"),                              # tiered、redis、memory或none
+    "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379"),
+    "key_prefix": "llm:",
+    "ttl": int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 86400))),                  # Redis缓存保留7天，0表示不过期
+    "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000")),                # Redis缓存条目上限，超出时按LRU淘汰，0表示不限制
+    "local_ttl": int(os.getenv("LLM_CACHE_LOCAL_TTL_SECONDS", "3600")),              # 进程内缓存保留1小时，0表示不过期
+    "local_max_entries": int(os.getenv("LLM_CACHE_LOCAL_MAX_ENTRIES", "1000"))       # 进程内缓存条目上限，超出时按LRU淘汰
+}
+
+
+def get_llm_cache_config() -> Dict[str, Any]:
+    """
+    获取AI解析结果缓存配置
+
+    Returns:
+        Dict[str, Any]: AI解析缓存配置字典
+    """
+    return LLM_CACHE_CONFIG.copy()
+
+
+# 通义千问调用限流配置
+# 所有worker通过Redis共享每秒请求数、每分钟token数和并发请求数额度，超出时按到达顺序排队
+RATE_LIMIT_CONFIG: Dict[str, Any] = {
+    "backend": os.getenv("QWEN_RATE_LIMIT_BACKEND", "redis"),              # redis、memory或none
+    "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379"),
+    "key_prefix": "ratelimit:qwen:",
+    "rps": float(os.getenv("QWEN_RPS", "5")),                              # 每秒请求数，0表示不限制
+    "rps_burst": float(os.getenv("QWEN_RPS_BURST", "10")),                 # 允许的突发请求数
+    "tpm": int(os.getenv("QWEN_TPM", "300000")),                           # 每分钟token数（输入加输出），0表示不限制
+    "max_in_flight": int(os.getenv("QWEN_MAX_IN_FLIGHT", "16")),           # 所有worker同时进行的请求数，0表示不限制
+    "lease_ttl": float(os.getenv("QWEN_LEASE_TTL_SECONDS", "300")),        # 并发名额的租约时间，worker崩溃后到期自动释放
+    "waiter_ttl": 10.0,                                                    # 排队请求超过该时间没有轮询视为已退出
+    "poll_interval": 0.05,                                                 # 排队时的最短轮询间隔（秒）
+    "max_poll_interval": 1.0,                                              # 排队时的最长轮询间隔（秒）
+    "report_interval": 2.0,                                                # 排队位置不变时上报等待时间的间隔（秒）
+    "max_wait": float(os.getenv("QWEN_MAX_QUEUE_WAIT_SECONDS", "600"))     # 排队等待上限，超过后解析失败
+}
+
+
+def get_rate_limit_config() -> Dict[str, Any]:
+    """
+    获取通义千问调用限流配置
+
+    Returns:
+        Dict[str, Any]: 限流配置字典
+    """
+    return RATE_LIMIT_CONFIG.copy()
+
+
+# 提示词压缩配置
+# 调用通义千问之前去除页码、套话和重复行，超出预算时先截短低价值章节
+PROMPT_COMPACTION_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() == "true",
+    "text_token_budget": int(os.getenv("PROMPT_TEXT_TOKEN_BUDGET", "5000")),  # 简历文本的token预算（不含指令部分），0表示不限制
+    "min_duplicate_chars": 12,                                                 # 不短于该长度的重复行只保留第一次出现
+    "repeat_threshold": 3,                                                     # 出现不少于该次数的短行视为页眉页脚，只保留第一次出现
+    "low_value_sections": ["summary", "projects"]                              # 超出预算时优先截短的章节，按顺序
+}
+
+
+def get_prompt_compaction_config() -> Dict[str, Any]:
+    """
+    获取提示词压缩配置
+
+    Returns:
+        Dict[str, Any]: 提示词压缩配置字典
+    """
+    return PROMPT_COMPACTION_CONFIG.copy()
+
+
+# AI解析配置
+QWEN_PARSE_CONFIG: Dict[str, Any] = {
+    "response_format": os.getenv("QWEN_RESPONSE_FORMAT", "full"),  # full（完整JSON）或compact（短键名和位置数组，输出token更少），可按请求指定
+    "pre_extract": os.getenv("QWEN_PRE_EXTRACT", "true").lower() == "true",  # 联系方式和时间段用规则在本地提取，不再由AI输出
+    "stream": os.getenv("QWEN_STREAM", "true").lower() == "true",            # 流式生成，边生成边解析已完成的字段，未启用JSON修复时输出格式错误提前中止
+    "stream_progress_tokens": 50,                                             # 没有新完成的字段时，每生成多少token上报一次进度
+    "expected_output_ratio": {"full": 2.0, "compact": 1.0},                   # 预计输出token数 / 简历文本token数，用于估计生成进度
+    "json_repair": os.getenv("QWEN_JSON_REPAIR", "true").lower() == "true",  # 输出不是有效的JSON时先在本地修复（截断、多余逗号和文字、未转义引号）
+    "repair_recalls": int(os.getenv("QWEN_REPAIR_RECALLS", "1"))             # 输出无法修复时重新调用的次数，0表示直接失败
+}
+
+
+def get_qwen_parse_config() -> Dict[str, Any]:
+    """
+    获取AI解析配置
+
+    Returns:
+        Dict[str, Any]: AI解析配置字典
+    """
+    return QWEN_PARSE_CONFIG.copy()
+
+
+# 分层解析配置
+# 先用本地规则解析，置信度（完整性评分 × 规则覆盖率）达到阈值时不再调用通义千问
+TIERED_PARSING_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("TIERED_PARSING_ENABLED", "true").lower() == "true",
+    "confidence_threshold": float(os.getenv("TIERED_PARSING_THRESHOLD", "0.7")),  # 只有姓名、联系方式、工作、教育和技能齐全（5/7）且几乎全部行被识别时才直接使用
+    "latency_samples": 1000                                                       # 每层保留最近多少次的延迟用于计算分位数
+}
+
+
+def get_tiered_parsing_config() -> Dict[str, Any]:
+    """
+    获取分层解析配置
+
+    Returns:
+        Dict[str, Any]: 分层解析配置字典
+    """
+    return TIERED_PARSING_CONFIG.copy()
+
+
+# 按章节并发解析配置
+# 简历按工作经历、教育背景、技能和个人信息拆分为多个较小的并发请求，总耗时取决于最慢的请求；
+# 超出分块预算的章节在经历边界切块后分别解析，结果合并去重
+SECTIONED_PARSING_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("SECTIONED_PARSING_ENABLED", "false").lower() == "true",
+    "chunk_token_budget": int(os.getenv("SECTIONED_PARSING_CHUNK_TOKENS", "1500"))  # 每个请求中简历片段的token上限，0表示不切块
+}
+
+
+def get_sectioned_parsing_config() -> Dict[str, Any]:
+    """
+    获取按章节并发解析配置
+
+    Returns:
+        Dict[str, Any]: 按章节并发解析配置字典
+    """
+    return SECTIONED_PARSING_CONFIG.copy()
@@ -8,8 +8,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # 导入API路由
 from backend.api.upload import router as upload_router
-from backend.api.parse import router as parse_router
+from backend.api.upload_session import router as upload_session_router
+from backend.api.batch_upload import router as batch_upload_router
+from backend.api.parse import router as parse_router, qwen_parser
 from backend.api.website import router as website_router
+from backend.services.extraction_pool import extraction_pool
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -29,9 +32,21 @@ app.add_middleware(
 
 # 注册API路由
 app.include_router(upload_router)
+app.include_router(upload_session_router)
+app.include_router(batch_upload_router)
 app.include_router(parse_router)
 app.include_router(website_router)
 
+@app.on_event("shutdown")
+async def shutdown_extraction_pool():
+    """关闭PDF提取进程池"""
+    extraction_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """关闭通义千问客户端的连接池"""
+    await qwen_parser.client.aclose()
+
 @app.get("/")
 async def root():
     """根路径健康检查接口"""
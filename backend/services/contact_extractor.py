@@ -0,0 +1,200 @@
+"""
+联系方式和时间段预提取
+在调用通义千问之前，用规则在本地提取格式固定的信息：
+
+- 邮箱、电话、LinkedIn、GitHub和个人网站：提取后从文本中移除，提示中不再要求AI输出
+- 时间段（如"2020.01 - 至今"、"2016年9月-2020年6月"）：统一为YYYY-MM格式，
+  文本中替换为[D1]、[D2]等标记，AI只需在start_date中填写标记，不再输出日期
+
+AI返回的结果在_build_resume_data中与本地提取的值合并，本地值优先。
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 提取规则版本，规则或提示说明变化时AI解析缓存随之失效
+PRE_EXTRACTION_VERSION = "1"
+
+# 联系方式
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(
+    r'(?<![\d\w])(?:'
+    r'(?:\+?86[-\s]?)?1[3-9]\d[-\s]?\d{4}[-\s]?\d{4}'                   # 手机号
+    r'|0\d{2,3}-\d{7,8}'                                                  # 固定电话
+    r'|\+\d{1,3}[-\s]?\(?\d{1,4}\)?(?:[-\s]?\d{2,4}){2,3}'                # 国际号码
+    r'|\(?\d{3}\)?[-.\s]\d{3}[-.\s]\d{4}'                                 # 北美号码
+    r')(?![\d\w])'
+)
+LINKEDIN_PATTERN = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/[\w\-%]+/?', re.IGNORECASE)
+GITHUB_PATTERN = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[\w-]+(?:/[\w.-]+)?/?', re.IGNORECASE)
+_URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s|｜，,；;）)]+', re.IGNORECASE)
+# 个人网站只在带有标签的行中提取，避免把项目地址当成个人网站
+_WEBSITE_LABEL = re.compile(r'个人网站|个人主页|博客|作品集|website|homepage|blog|portfolio', re.IGNORECASE)
+
+# 联系方式移除后留下的空标签
+_CONTACT_LABEL = re.compile(
+    r'(?:电子邮箱|邮箱|邮件|e-?mail|联系电话|电话|手机|phone|mobile|tel'
+    r'|github|linkedin|个人网站|个人主页|博客|website|homepage|blog|portfolio)\s*[:：]?\s*(?=$|\s|[|｜/,，;；])',
+    re.IGNORECASE
+)
+_FIELD_SEPARATOR = re.compile(r'\s*[|｜/,，;；]\s*')
+
+# 时间段：开始年月 分隔符 结束年月或"至今"
+_DATE = r'((?:19|20)\d{2})(?:\s*[-./年]\s*(\d{1,2})(?!\d)\s*月?)?'
+_PRESENT = r'至今|现在|目前|今|present|now|current'
+DATE_RANGE_PATTERN = re.compile(
+    rf'(?<!\d){_DATE}\s*(?:-|–|—|~|～|至|到|to)\s*(?:{_DATE}|({_PRESENT}))',
+    re.IGNORECASE
+)
+
+# 合并时识别AI返回的时间段标记
+_DATE_MARKER = re.compile(r'^\[?(D\d+)\]?$')
+
+# 启用预提取时附加在简历文本之后的说明
+PRE_EXTRACTION_INSTRUCTIONS = """说明：联系方式（邮箱、电话、LinkedIn、GitHub、个人网站）已在本地提取，无需输出；
+文本中的[D1]、[D2]等标记代表时间段，对应经历的开始时间只填写标记（如"D1"），结束时间不填。"""
+
+
+def _normalize_date(year: str, month: Optional[str]) -> Optional[str]:
+    """统一为YYYY-MM格式，只有年份时为YYYY，月份不合法时返回None"""
+    if month is None:
+        return year
+    if not 1 <= int(month) <= 12:
+        return None
+    return f"{year}-{int(month):02d}"
+
+
+def _normalize_url(url: str) -> str:
+    url = url.rstrip('/')
+    return url if url.lower().startswith(('http://', 'https://')) else f"https://{url}"
+
+
+class ContactExtractor:
+    """联系方式和时间段预提取器"""
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        提取联系方式和时间段
+
+        Args:
+            text: 规范化后的简历文本
+
+        Returns:
+            Dict[str, Any]: 提取结果
+                text: 移除联系方式、时间段替换为标记后的文本
+                personal_info: 提取到的联系方式（email、phone、linkedin、github、website，未找到的字段为None）
+                date_ranges: 标记 -> {"start_date", "end_date"}，当前工作的end_date为None
+        """
+        personal_info = {
+            "email": self._first(EMAIL_PATTERN, text),
+            "phone": self._first(PHONE_PATTERN, text),
+            "linkedin": self._first(LINKEDIN_PATTERN, text),
+            "github": self._first(GITHUB_PATTERN, text),
+            "website": self._find_website(text)
+        }
+        for field in ("linkedin", "github", "website"):
+            if personal_info[field]:
+                personal_info[field] = _normalize_url(personal_info[field])
+
+        date_ranges: Dict[str, Dict[str, Optional[str]]] = {}
+        lines = [self._mask_line(line, date_ranges) for line in text.split('\n')]
+        return {
+            "text": '\n'.join(line for line in lines if line is not None),
+            "personal_info": personal_info,
+            "date_ranges": date_ranges
+        }
+
+    @staticmethod
+    def _first(pattern: re.Pattern, text: str) -> Optional[str]:
+        match = pattern.search(text)
+        return match.group(0).strip() if match else None
+
+    @staticmethod
+    def _find_website(text: str) -> Optional[str]:
+        """在带有个人网站标签的行中找第一个不是LinkedIn、GitHub的链接"""
+        for line in text.split('\n'):
+            if not _WEBSITE_LABEL.search(line):
+                continue
+            for match in _URL_PATTERN.finditer(line):
+                url = match.group(0)
+                if not LINKEDIN_PATTERN.search(url) and not GITHUB_PATTERN.search(url):
+                    return url
+        return None
+
+    def _mask_line(self, line: str, date_ranges: Dict[str, Dict[str, Optional[str]]]) -> Optional[str]:
+        """移除一行中的联系方式，时间段替换为标记；整行只剩标签时返回None"""
+        masked = line
+        for pattern in (EMAIL_PATTERN, LINKEDIN_PATTERN, GITHUB_PATTERN, PHONE_PATTERN):
+            masked = pattern.sub('', masked)
+        if _WEBSITE_LABEL.search(masked):
+            masked = _URL_PATTERN.sub('', masked)
+
+        if masked != line:
+            # 去掉空标签和多余的分隔符，如"邮箱： | 电话： | 北京" -> "北京"
+            masked = _CONTACT_LABEL.sub('', masked)
+            parts = [part for part in _FIELD_SEPARATOR.split(masked) if part.strip()]
+            masked = ' | '.join(part.strip() for part in parts)
+            if not masked:
+                return None
+
+        return DATE_RANGE_PATTERN.sub(lambda match: self._date_marker(match, date_ranges), masked)
+
+    @staticmethod
+    def _date_marker(match: re.Match, date_ranges: Dict[str, Dict[str, Optional[str]]]) -> str:
+        start_year, start_month, end_year, end_month, present = match.groups()
+        start_date = _normalize_date(start_year, start_month)
+        end_date = None if present else _normalize_date(end_year, end_month)
+        if start_date is None or (end_date is None and not present):
+            return match.group(0)
+
+        marker = f"D{len(date_ranges) + 1}"
+        date_ranges[marker] = {"start_date": start_date, "end_date": end_date}
+        return f"[{marker}]"
+
+    @staticmethod
+    def merge(parsed_data: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把本地提取的值合并到AI返回的结果中，本地值优先
+
+        Args:
+            parsed_data: AI返回并解析后的字典（完整格式）
+            extracted: extract的返回值
+
+        Returns:
+            Dict[str, Any]: 合并后的新字典，不修改parsed_data
+        """
+        personal_info = dict(parsed_data.get('personal_info') or {})
+        for field, value in extracted["personal_info"].items():
+            if value:
+                personal_info[field] = value
+
+        def resolve(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resolved = []
+            for entry in entries:
+                entry = dict(entry) if isinstance(entry, dict) else entry
+                if isinstance(entry, dict):
+                    for field in ("start_date", "end_date"):
+                        value = entry.get(field)
+                        match = _DATE_MARKER.match(value.strip()) if isinstance(value, str) else None
+                        if match and match.group(1) in extracted["date_ranges"]:
+                            entry.update(extracted["date_ranges"][match.group(1)])
+                            break
+                resolved.append(entry)
+            return resolved
+
+        return {
+            **parsed_data,
+            "personal_info": personal_info,
+            "work_experience": resolve(parsed_data.get('work_experience') or []),
+            "education": resolve(parsed_data.get('education') or [])
+        }
+
+
+# 创建全局实例
+contact_extractor = ContactExtractor()
@@ -0,0 +1,307 @@
+"""
+PDF提取结果缓存
+按(文件内容SHA-256, 提取器版本, 清理规则版本)缓存清理后的文本，
+解析重试和相同文件的重复解析直接读取缓存，不再重新提取
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import redis
+
+from backend.config.pipeline_config import EXTRACTION_CACHE_CONFIG
+from backend.services.pdf_parser import EXTRACTOR_VERSION, CLEANING_VERSION
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def compute_file_sha256(file_path: str) -> str:
+    """
+    分块计算文件内容的SHA-256
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def make_cache_key(content_hash: str) -> str:
+    """生成包含提取器和清理规则版本的缓存键，任一版本变化时旧结果自然失效"""
+    return f"{content_hash}-e{EXTRACTOR_VERSION}-c{CLEANING_VERSION}"
+
+
+class ExtractionCache(ABC):
+    """
+    提取结果缓存接口
+
+    缓存内容为JSON可序列化的字典，至少包含text字段。
+    """
+
+    backend_name = "none"
+
+    def __init__(self):
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存，不存在时返回None"""
+
+    @abstractmethod
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        """写入缓存"""
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        读取文件的提取结果
+
+        Args:
+            content_hash: 文件内容的SHA-256
+
+        Returns:
+            Optional[Dict[str, Any]]: 缓存的提取结果，未命中时返回None
+        """
+        try:
+            payload = self._load(make_cache_key(content_hash))
+        except Exception as e:
+            # 缓存不可用时退化为重新提取
+            logger.warning(f"读取提取缓存失败: {e}")
+            payload = None
+        self._record(payload is not None)
+        return payload
+
+    def set(self, content_hash: str, payload: Dict[str, Any]) -> None:
+        """
+        写入文件的提取结果
+
+        Args:
+            content_hash: 文件内容的SHA-256
+            payload: 提取结果，至少包含text字段
+        """
+        try:
+            self._store(make_cache_key(content_hash), payload)
+        except Exception as e:
+            logger.warning(f"写入提取缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存命中统计
+
+        Returns:
+            Dict[str, Any]: 命中数、未命中数和命中率
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "backend": self.backend_name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0
+        }
+
+
+class DiskExtractionCache(ExtractionCache):
+    """
+    磁盘提取缓存，总大小超过上限时淘汰最久未使用的条目
+
+    每个条目是一个JSON文件，文件修改时间作为最近使用时间，
+    进程启动时扫描目录重建LRU索引，多个进程共享同一目录。
+    """
+
+    backend_name = "disk"
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存文件总大小上限
+        """
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        # 缓存键 -> 文件大小，按最近使用时间排序
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._scan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _scan(self):
+        """扫描缓存目录，按修改时间重建LRU索引"""
+        entries = []
+        # 目录不存在时os.walk不返回任何条目，首次写入时再创建目录
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name[:-len('.json')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+            return None
+
+        # 更新修改时间作为最近使用时间，其他进程重启扫描时也能看到
+        os.utime(path)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._entries[key] = os.path.getsize(path)
+                self._total_bytes += self._entries[key]
+        return payload
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 先写临时文件再原子替换，读取方不会看到写了一半的文件
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        """淘汰最久未使用的条目直到总大小不超过上限"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            logger.info(f"淘汰提取缓存: {key}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            })
+        return stats
+
+
+class RedisExtractionCache(ExtractionCache):
+    """
+    Redis提取缓存，多个worker进程和服务实例共享
+
+    条目按TTL过期，命中统计同时累加到Redis中，反映整个集群的命中率。
+    """
+
+    backend_name = "redis"
+
+    def __init__(self, redis_client: redis.Redis, ttl: Optional[int] = None,
+                 key_prefix: str = "extraction:"):
+        """
+        Args:
+            redis_client: Redis客户端（需要decode_responses=True）
+            ttl: 条目存活秒数，None表示不过期
+            key_prefix: 键前缀
+        """
+        super().__init__()
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._stats_key = f"{key_prefix}stats"
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis_client.get(f"{self.key_prefix}{key}")
+        return json.loads(raw) if raw else None
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        self.redis_client.set(f"{self.key_prefix}{key}", json.dumps(payload, ensure_ascii=False), ex=self.ttl)
+
+    def _record(self, hit: bool):
+        super()._record(hit)
+        try:
+            self.redis_client.hincrby(self._stats_key, "hits" if hit else "misses", 1)
+        except Exception as e:
+            logger.warning(f"更新提取缓存统计失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        try:
+            shared = self.redis_client.hgetall(self._stats_key)
+            hits, misses = int(shared.get("hits", 0)), int(shared.get("misses", 0))
+            stats["cluster"] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0
+            }
+        except Exception as e:
+            logger.warning(f"读取提取缓存统计失败: {e}")
+        return stats
+
+
+def create_extraction_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ExtractionCache]:
+    """
+    根据配置创建提取缓存
+
+    Args:
+        config: 缓存配置，默认使用EXTRACTION_CACHE_CONFIG
+
+    Returns:
+        Optional[ExtractionCache]: 缓存实例，配置为none时返回None
+    """
+    config = config or EXTRACTION_CACHE_CONFIG
+    backend = config["backend"]
+    if backend == "none":
+        return None
+    if backend == "disk":
+        return DiskExtractionCache(config["cache_dir"], config["max_bytes"])
+    if backend == "redis":
+        client = redis.from_url(config["redis_url"], decode_responses=True, health_check_interval=30)
+        return RedisExtractionCache(client, config["ttl"], config["key_prefix"])
+    raise ValueError(f"不支持的提取缓存类型: {backend}")
@@ -0,0 +1,406 @@
+"""
+PDF文本提取进程池
+PDF文本提取是CPU密集型任务（pdfplumber布局分析和PyPDF2回退），
+在独立的工作进程中执行，事件循环只负责提交任务和等待结果。
+页数较多的文档按页码范围分段，由多个工作进程并行提取后按顺序拼接。
+每个文档的提取受看门狗的时间和内存限制，内存占用上涨的工作进程会被回收
+"""
+
+import math
+import time
+import asyncio
+import importlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from backend.config.pipeline_config import EXTRACTION_POOL_CONFIG
+from backend.services.pdf_parser import (
+    PDFParser, PDFParseError, PDFExtractionTimeoutError, PDFExtractionMemoryError, ENGINE_NONE
+)
+from backend.services.extraction_watchdog import apply_memory_limit, run_with_watchdog
+from backend.services.extraction_cache import ExtractionCache, create_extraction_cache, compute_file_sha256
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ExtractionPoolBusyError(Exception):
+    """提取任务排队已满"""
+    pass
+
+
+# 工作进程内的提取器实例，由_init_worker创建
+_worker_parser: Optional[PDFParser] = None
+
+
+def _init_worker(preload_modules: List[str], memory_limit_mb: Optional[int] = None):
+    """
+    工作进程初始化
+
+    forkserver模式下预加载的模块已在fork前导入，这里再导入一次只是查表；
+    spawn模式下则在处理第一个任务前完成导入，避免首个任务承担导入耗时。
+    导入完成后再设置内存上限，上限只作用于工作进程。
+    """
+    global _worker_parser
+    for module_name in preload_modules:
+        importlib.import_module(module_name)
+    _worker_parser = PDFParser()
+    apply_memory_limit(memory_limit_mb)
+
+
+def _get_worker_parser() -> PDFParser:
+    return _worker_parser or PDFParser()
+
+
+def _extract_document(file_path: str) -> Dict[str, Any]:
+    """在工作进程中提取PDF文本和提取元数据"""
+    return _get_worker_parser().extract_document(file_path)
+
+
+def _extract_or_probe(file_path: str, max_inline_pages: int) -> Dict[str, Any]:
+    """
+    在工作进程中验证并探测文件，页数不超过max_inline_pages时直接提取
+
+    Returns:
+        Dict[str, Any]: 提取结果（包含text），或需要分段提取时返回num_pages和probe
+    """
+    parser = _get_worker_parser()
+    with parser.open_session(file_path) as session:
+        validation_result = parser.validate_pdf_file(file_path, session=session)
+        if not validation_result['is_valid']:
+            raise PDFParseError(validation_result['error_message'])
+        if session.num_pages <= max_inline_pages:
+            return parser.extract_document(file_path, session)
+
+        probe = parser.probe_document(session)
+        if probe["engine"] == ENGINE_NONE:
+            raise PDFParseError("PDF文件中未找到可提取的文本内容")
+        return {"num_pages": session.num_pages, "probe": probe}
+
+
+def _extract_page_range(file_path: str, start: int, end: int, engine: str) -> List[str]:
+    """在工作进程中用探测选定的引擎提取一段页面的文本"""
+    return _get_worker_parser().extract_page_range(file_path, start, end, engine)
+
+
+def _assemble_page_texts(file_path: str, page_texts: List[str], probe: Dict[str, Any]) -> Dict[str, Any]:
+    """在工作进程中拼接并清理分段提取的文本"""
+    return _get_worker_parser().assemble_page_texts(file_path, page_texts, probe)
+
+
+class DocumentDeadline:
+    """文档提取的截止时间，从文档第一次拿到进程槽位时开始计时，排队等待的时间不计入"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._expires_at: Optional[float] = None
+
+    def remaining(self) -> float:
+        """剩余秒数，第一次调用时开始计时"""
+        if self._expires_at is None:
+            self._expires_at = time.monotonic() + self.timeout
+        return self._expires_at - time.monotonic()
+
+
+def plan_page_shards(num_pages: int, max_shards: int, min_pages_per_shard: int) -> List[range]:
+    """
+    将页码划分为连续的分段
+
+    Args:
+        num_pages: 总页数
+        max_shards: 最多分段数（通常为进程数）
+        min_pages_per_shard: 每段最少页数，避免分段过细导致重复打开文件的开销超过收益
+
+    Returns:
+        List[range]: 按页码顺序排列的分段
+    """
+    shard_size = max(min_pages_per_shard, math.ceil(num_pages / max(1, max_shards)))
+    return [range(start, min(start + shard_size, num_pages)) for start in range(0, num_pages, shard_size)]
+
+
+def _get_mp_context(preload_modules: List[str]):
+    """
+    获取工作进程的启动方式
+
+    max_tasks_per_child不支持fork启动方式。优先使用forkserver，
+    由已导入pdfplumber/PyPDF2的服务进程fork出工作进程；不支持时（Windows）使用spawn。
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(preload_modules)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ExtractionPool:
+    """PDF文本提取进程池"""
+
+    def __init__(self, max_workers: int, max_tasks_per_child: Optional[int] = None,
+                 max_pending: int = 0, preload_modules: Optional[List[str]] = None,
+                 shard_min_pages: Optional[int] = None, cache: Optional[ExtractionCache] = None,
+                 document_timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+                 recycle_rss_mb: Optional[int] = None):
+        """
+        初始化进程池，工作进程在第一次提交任务时才启动
+
+        Args:
+            max_workers: 工作进程数
+            max_tasks_per_child: 每个工作进程处理的任务数上限，达到后重启，None表示不重启
+            max_pending: 除正在执行的任务外，最多排队等待的任务数
+            preload_modules: 工作进程预先导入的模块
+            shard_min_pages: 页数超过该值的文档分段并行提取，每段至少包含该页数，None表示不分段
+            cache: 提取结果缓存，命中时不提交到工作进程
+            document_timeout: 每个文档的提取时间上限（秒，包括分段提取的所有步骤），None表示不限制
+            memory_limit_mb: 每个工作进程的地址空间上限（MB），None表示不限制
+            recycle_rss_mb: 工作进程执行完任务后常驻内存超过该值（MB）时重建进程池，None表示不回收
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.max_pending = max_pending
+        self.preload_modules = preload_modules or []
+        self.shard_min_pages = shard_min_pages
+        self.cache = cache
+        self.document_timeout = document_timeout or None
+        self.memory_limit_mb = memory_limit_mb or None
+        self.recycle_rss_mb = recycle_rss_mb or None
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 限制同时提交给进程池的任务数，排队的任务在事件循环中等待，可以被取消
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._memory_errors = 0
+        self._recycled = 0
+
+    def start(self) -> ProcessPoolExecutor:
+        """启动进程池（已启动时直接返回）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=_get_mp_context(self.preload_modules),
+                initializer=_init_worker,
+                initargs=(self.preload_modules, self.memory_limit_mb),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+            logger.info(f"PDF提取进程池已启动，进程数: {self.max_workers}")
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info("PDF提取进程池已关闭")
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    def _recycle(self, executor: ProcessPoolExecutor, reason: str):
+        """
+        重建进程池，新任务提交到新的工作进程
+
+        旧进程池中正在执行的任务不受影响，完成后旧的工作进程退出。
+        """
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+            self._recycled += 1
+            logger.info(f"回收PDF提取进程: {reason}")
+
+    async def _run(self, func: Callable, *args, deadline: Optional[DocumentDeadline] = None):
+        """
+        占用一个进程槽位，在工作进程中由看门狗执行func
+
+        Args:
+            func: 工作进程中执行的函数
+            args: 参数
+            deadline: 文档提取的截止时间，拿到槽位后按剩余时间限制本次执行
+        """
+        slots = self._get_slots()
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline.remaining()
+                if timeout <= 0:
+                    raise PDFExtractionTimeoutError(f"PDF提取超时（超过{self.document_timeout:g}秒）")
+            executor = self.start()
+            loop = asyncio.get_running_loop()
+            result, rss = await loop.run_in_executor(executor, run_with_watchdog, func, args, timeout)
+            if self.recycle_rss_mb and rss > self.recycle_rss_mb * 1024 * 1024:
+                self._recycle(executor, f"常驻内存{rss / 1024 / 1024:.0f}MB，超过{self.recycle_rss_mb}MB")
+            return result
+        except PDFExtractionTimeoutError:
+            self._timeouts += 1
+            raise
+        except PDFExtractionMemoryError:
+            # 触及内存上限后进程的堆可能已经很大，直接回收
+            self._memory_errors += 1
+            self._recycle(executor, "提取超出内存上限")
+            raise
+        except BrokenProcessPool:
+            # 工作进程被系统杀死（如内存不足，或卡在C扩展中超过CPU时间上限），重建进程池后由调用方重试
+            logger.error(f"PDF提取进程异常退出: {args[0] if args else ''}")
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            if deadline is not None and deadline.remaining() <= 0:
+                self._timeouts += 1
+                raise PDFExtractionTimeoutError(f"PDF提取超时（超过{self.document_timeout:g}秒），提取进程已终止")
+            raise PDFParseError("PDF解析进程异常退出，请重试")
+        finally:
+            self._running -= 1
+            slots.release()
+
+    async def extract(self, file_path: str,
+                      progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None,
+                      content_hash: Optional[str] = None) -> str:
+        """
+        在工作进程中提取PDF文本，参数和异常与extract_document相同
+
+        Returns:
+            str: 清理后的文本内容
+        """
+        document = await self.extract_document(file_path, progress_callback, content_hash)
+        return document["text"]
+
+    async def extract_document(self, file_path: str,
+                               progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None,
+                               content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        在工作进程中提取PDF文本和提取元数据
+
+        先按文件内容哈希查询提取缓存，未命中时才提交到工作进程。
+        页数超过shard_min_pages的文档先在一个工作进程中验证、探测并选择提取引擎，
+        再按页码范围分段并行提取，最后按页码顺序拼接并清理。
+
+        Args:
+            file_path: PDF文件路径
+            progress_callback: 分段提取时每完成一段调用一次，参数为(已完成页数, 总页数)
+            content_hash: 文件内容的SHA-256，不传时在需要查询缓存时计算
+
+        Returns:
+            Dict[str, Any]: text为清理后的文本，metadata为提取元数据（使用的引擎和原因等）
+
+        Raises:
+            ExtractionPoolBusyError: 排队任务数已达上限
+            PDFExtractionTimeoutError: 提取超过document_timeout
+            PDFExtractionMemoryError: 提取超过工作进程的内存上限
+            PDFParseError: 文本提取失败或工作进程异常退出
+        """
+        if self.cache is not None:
+            if content_hash is None:
+                content_hash = await asyncio.to_thread(compute_file_sha256, file_path)
+            cached = await asyncio.to_thread(self.cache.get, content_hash)
+            if cached is not None:
+                logger.info(f"提取缓存命中: {content_hash}")
+                return cached
+
+        if self._get_slots().locked() and self._waiting >= self.max_pending:
+            raise ExtractionPoolBusyError("PDF解析任务过多，请稍后重试")
+
+        deadline = DocumentDeadline(self.document_timeout) if self.document_timeout else None
+        try:
+            if not self.shard_min_pages:
+                document = await self._run(_extract_document, file_path, deadline=deadline)
+            else:
+                document = await self._run(_extract_or_probe, file_path, self.shard_min_pages, deadline=deadline)
+                if "text" not in document:
+                    document = await self._extract_sharded(
+                        file_path, document["num_pages"], document["probe"], progress_callback, deadline
+                    )
+            self._completed += 1
+        except Exception:
+            self._failed += 1
+            raise
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, content_hash, document)
+        return document
+
+    async def _extract_sharded(self, file_path: str, num_pages: int, probe: Dict[str, Any],
+                               progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None,
+                               deadline: Optional[DocumentDeadline] = None) -> Dict[str, Any]:
+        """分段并行提取并按页码顺序拼接"""
+        shards = plan_page_shards(num_pages, self.max_workers, self.shard_min_pages)
+        logger.info(f"分段提取PDF: {file_path}, 页数: {num_pages}, 分段数: {len(shards)}, 引擎: {probe['engine']}")
+
+        done_pages = 0
+
+        async def extract_shard(shard: range) -> List[str]:
+            nonlocal done_pages
+            texts = await self._run(_extract_page_range, file_path, shard.start, shard.stop,
+                                    probe["engine"], deadline=deadline)
+            done_pages += len(shard)
+            if progress_callback:
+                await progress_callback(done_pages, num_pages)
+            return texts
+
+        shard_texts = await asyncio.gather(*[extract_shard(shard) for shard in shards])
+        page_texts = [page_text for texts in shard_texts for page_text in texts]
+        return await self._run(_assemble_page_texts, file_path, page_texts, probe, deadline=deadline)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取进程池运行统计
+
+        Returns:
+            Dict[str, Any]: 进程数、执行中和排队中的任务数、累计完成和失败数，
+                以及超时、超出内存上限和回收进程池的次数
+        """
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "memory_errors": self._memory_errors,
+            "recycled": self._recycled
+        }
+
+
+def create_extraction_pool(config: Optional[Dict[str, Any]] = None) -> ExtractionPool:
+    """
+    根据配置创建提取进程池
+
+    Args:
+        config: 进程池配置，默认使用EXTRACTION_POOL_CONFIG
+
+    Returns:
+        ExtractionPool: 进程池实例
+    """
+    config = config or EXTRACTION_POOL_CONFIG
+    return ExtractionPool(
+        max_workers=config["max_workers"],
+        max_tasks_per_child=config["max_tasks_per_child"],
+        max_pending=config["max_pending"],
+        preload_modules=config["preload_modules"],
+        shard_min_pages=config["shard_min_pages"],
+        cache=create_extraction_cache(),
+        document_timeout=config.get("document_timeout"),
+        memory_limit_mb=config.get("memory_limit_mb"),
+        recycle_rss_mb=config.get("recycle_rss_mb")
+    )
+
+
+# 创建全局实例
+extraction_pool = create_extraction_pool()
@@ -0,0 +1,161 @@
+"""
+PDF提取看门狗
+在提取工作进程内限制每个文档的耗时和内存：
+
+- 内存：工作进程启动时设置地址空间上限（RLIMIT_AS），解压炸弹等超大分配直接失败，
+  不会拖垮整台机器
+- 时间：每个任务开始时设置SIGALRM定时器，超时后在提取代码中抛出异常中止任务；
+  同时设置CPU时间上限（RLIMIT_CPU）兜底，卡在C扩展中收不到信号时由系统终止进程
+- 回收：任务结束后返回进程的常驻内存，由进程池判断是否需要重建工作进程
+
+超时和内存不足都转换为PDFParseError的子类，工作进程本身保持可用，后续任务继续执行。
+resource和SIGALRM只在类Unix系统上可用，其他平台上这些限制不生效。
+"""
+
+import os
+import math
+import signal
+import logging
+import threading
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from backend.services.pdf_parser import PDFExtractionTimeoutError, PDFExtractionMemoryError
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# SIGALRM未能中止任务时，再多给的CPU秒数，之后由RLIMIT_CPU终止进程
+CPU_LIMIT_GRACE_SECONDS = 5
+
+
+class _WatchdogTimeout(BaseException):
+    """
+    定时器触发时在提取代码中抛出
+
+    继承BaseException，不会被pdfplumber和逐页提取中的except Exception吞掉
+    """
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _WatchdogTimeout()
+
+
+def apply_memory_limit(memory_limit_mb: Optional[int]) -> bool:
+    """
+    为当前进程设置地址空间上限，只应在工作进程中调用
+
+    Args:
+        memory_limit_mb: 上限（MB），为空或0时不限制
+
+    Returns:
+        bool: 是否设置成功
+    """
+    if not memory_limit_mb or resource is None:
+        return False
+    limit = memory_limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError) as e:
+        logger.warning(f"设置提取进程内存上限失败: {str(e)}")
+        return False
+    return True
+
+
+def current_rss_bytes() -> int:
+    """
+    获取当前进程的常驻内存（字节）
+
+    优先读取/proc/self/statm得到当前值，不可用时退而使用峰值（ru_maxrss），都不可用时返回0
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return 0
+        # Linux上单位为KB
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _caused_by_memory_error(error: BaseException) -> bool:
+    """异常本身或其原因链中是否有MemoryError（提取代码会把底层异常包装为PDFParseError）"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, MemoryError):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _set_cpu_limit(seconds: Optional[int]) -> Optional[Tuple[int, int]]:
+    """把CPU时间软上限设为已用时间加seconds，返回原来的上限；seconds为None时不修改"""
+    if seconds is None or resource is None:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    limit = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    soft, hard = previous
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    if soft != resource.RLIM_INFINITY:
+        limit = min(limit, soft)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    return previous
+
+
+def run_with_watchdog(func: Callable, args: Sequence[Any], timeout: Optional[float]) -> Tuple[Any, int]:
+    """
+    在时间限制内执行提取函数
+
+    定时器只能在主线程中设置，进程池的工作进程在主线程中执行任务；
+    在其他线程中调用时不做时间限制。
+
+    Args:
+        func: 提取函数
+        args: 参数
+        timeout: 时间限制（秒），为空或0时不限制
+
+    Returns:
+        Tuple[Any, int]: (函数结果, 执行后的常驻内存字节数)
+
+    Raises:
+        PDFExtractionTimeoutError: 超过时间限制
+        PDFExtractionMemoryError: 超过内存上限
+    """
+    timed = bool(timeout) and hasattr(signal, "setitimer") and \
+        threading.current_thread() is threading.main_thread()
+    previous_handler = None
+    previous_cpu_limit = None
+    if timed:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        previous_cpu_limit = _set_cpu_limit(math.ceil(timeout) + CPU_LIMIT_GRACE_SECONDS)
+
+    try:
+        result = func(*args)
+    except _WatchdogTimeout:
+        raise PDFExtractionTimeoutError(f"PDF提取超时（超过{timeout:g}秒），文件可能已损坏或内容过于复杂") from None
+    except Exception as e:
+        if _caused_by_memory_error(e):
+            raise PDFExtractionMemoryError("PDF提取超出内存限制，文件可能已损坏或包含异常大的内容") from None
+        raise
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+            if previous_cpu_limit is not None:
+                resource.setrlimit(resource.RLIMIT_CPU, previous_cpu_limit)
+
+    return result, current_rss_bytes()
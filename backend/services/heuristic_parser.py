@@ -0,0 +1,257 @@
+"""
+本地规则简历解析
+按章节切分结果和预提取的联系方式、时间段，用规则直接构建ResumeData，不调用AI：
+
+- 开头部分：姓名、所在地区（联系方式由ContactExtractor提取）
+- 工作经历、教育背景：含时间段的行作为一段经历的标题行，之后的行是工作描述和技术栈
+- 专业技能：按"分类：技能（熟练程度）、..."的写法拆分
+- 自我评价：整段作为个人简介
+
+同时返回覆盖率（被规则识别的行占全部非空行的比例），和完整性评分一起作为结果的置信度依据。
+模板化、结构清晰的简历可以直接使用本地结果，其余交给通义千问解析。
+"""
+
+import re
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from backend.models.resume import ResumeData, PersonalInfo, WorkExperience, Education, Skill
+from backend.services.contact_extractor import contact_extractor
+from backend.services.section_segmenter import (
+    section_segmenter,
+    SECTION_PREAMBLE,
+    SECTION_PERSONAL_INFO,
+    SECTION_WORK_EXPERIENCE,
+    SECTION_EDUCATION,
+    SECTION_SKILLS,
+    SECTION_SUMMARY,
+)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 经历标题行中的时间段标记（由ContactExtractor替换）
+_DATE_MARKER = re.compile(r'\[(D\d+)\]')
+# 标题行中的字段分隔：竖线、制表符或连续空格
+_FIELD_SEPARATOR = re.compile(r'\s*[|｜]\s*|\t+|\s{2,}')
+# 列表项前缀，如"-"、"•"、"1."、"2、"
+_BULLET = re.compile(r'^(?:[-–•·●▪*]|\d{1,2}[.、)）])\s*')
+# 技术栈行
+_TECHNOLOGY_LABEL = re.compile(r'^(?:技术栈|技术|使用技术|tech(?:nology|nologies)?(?:\s+stack)?)\s*[:：]\s*', re.IGNORECASE)
+# 列表中的分隔符
+_ITEM_SEPARATOR = re.compile(r'\s*[、,，;；/]\s*')
+# "Python（精通）"写法的熟练程度
+_SKILL_LEVEL = re.compile(r'^(.+?)\s*[（(]\s*([^）)]+?)\s*[）)]$')
+# 技能行的分类标签
+_SKILL_LABEL = re.compile(r'^([^:：]{1,12})[:：]\s*(.+)$')
+
+_COMPANY_HINT = re.compile(r'公司|集团|科技|银行|研究院|研究所|工作室|事务所|\b(?:inc|ltd|llc|corp|co)\b\.?', re.IGNORECASE)
+_SCHOOL_HINT = re.compile(r'大学|学院|学校|university|college|institute|school', re.IGNORECASE)
+_DEGREE = re.compile(r'^(?:本科|学士|硕士|研究生|博士|大专|专科|MBA|bachelor|master|ph\.?d|b\.?s\.?|m\.?s\.?)', re.IGNORECASE)
+_NAME = re.compile(r'^(?:姓名\s*[:：]\s*)?([一-鿿]{2,4}|[A-Za-z][A-Za-z.\'-]*(?: [A-Za-z][A-Za-z.\'-]*){0,3})$')
+_LOCATION_LABEL = re.compile(r'(?:所在地|现居|居住地|所在城市|城市|地址|location)\s*[:：]\s*([^|｜,，;；]+)', re.IGNORECASE)
+
+# 无标签时识别为所在地区的常见城市
+KNOWN_CITIES = {
+    "北京", "上海", "广州", "深圳", "杭州", "成都", "南京", "武汉", "西安", "苏州",
+    "天津", "重庆", "长沙", "厦门", "青岛", "合肥", "郑州", "大连", "香港", "台北",
+}
+
+# 熟练程度写法 -> SkillLevel取值
+SKILL_LEVEL_LABELS = {
+    "了解": "beginner", "初级": "beginner", "入门": "beginner",
+    "熟悉": "intermediate", "熟练": "intermediate", "良好": "intermediate",
+    "精通": "advanced", "高级": "advanced",
+    "专家": "expert", "资深": "expert",
+}
+
+
+def _skill_category(label: str) -> str:
+    """按技能行的分类标签确定SkillCategory取值，编程语言属于技术技能"""
+    if re.search(r'编程|程序|框架|数据库|工具|技术|technical', label, re.IGNORECASE):
+        return "technical"
+    if re.search(r'软技能|通用|soft', label, re.IGNORECASE):
+        return "soft"
+    if re.search(r'语言|外语|language', label, re.IGNORECASE):
+        return "language"
+    return "technical"
+
+
+class HeuristicResumeParser:
+    """本地规则简历解析器"""
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """
+        用规则解析简历文本
+
+        Args:
+            text: 规范化后的简历文本
+
+        Returns:
+            Dict[str, Any]: 解析结果
+                resume: 构建的ResumeData，缺少必填信息（如姓名、邮箱）无法构建时为None
+                coverage: 被规则识别的非空行比例（0到1）
+                error: 无法构建时的原因
+        """
+        extracted = contact_extractor.extract(text)
+        masked = extracted["text"]
+        sections = section_segmenter.segment(masked)
+
+        covered = 0
+        personal_info: Dict[str, Any] = {**extracted["personal_info"], "name": None, "location": None, "summary": None}
+        work_experience: List[Dict[str, Any]] = []
+        education: List[Dict[str, Any]] = []
+        skills: List[Dict[str, Any]] = []
+
+        for section in sections:
+            lines = [line.strip() for line in masked[section["content_start"]:section["end"]].split('\n')]
+            lines = [line for line in lines if line]
+            if section["title"]:
+                covered += 1
+
+            if section["type"] in (SECTION_PREAMBLE, SECTION_PERSONAL_INFO):
+                covered += self._parse_header(lines, personal_info)
+            elif section["type"] == SECTION_WORK_EXPERIENCE:
+                covered += self._parse_entries(lines, extracted["date_ranges"], work_experience, self._work_entry)
+            elif section["type"] == SECTION_EDUCATION:
+                covered += self._parse_entries(lines, extracted["date_ranges"], education, self._education_entry)
+            elif section["type"] == SECTION_SKILLS:
+                covered += self._parse_skills(lines, skills)
+            elif section["type"] == SECTION_SUMMARY and lines:
+                personal_info["summary"] = "".join(lines)[:500]
+                covered += len(lines)
+
+        total = len([line for line in masked.split('\n') if line.strip()])
+        coverage = covered / total if total else 0.0
+
+        try:
+            resume = ResumeData(
+                id=f"resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                personal_info=PersonalInfo(**personal_info),
+                work_experience=[WorkExperience(**entry) for entry in work_experience],
+                education=[Education(**entry) for entry in education],
+                skills=[Skill(**skill) for skill in skills]
+            )
+        except ValidationError as e:
+            return {"resume": None, "coverage": coverage, "error": f"规则解析结果不完整: {e.errors()[0]['loc']}"}
+        return {"resume": resume, "coverage": coverage, "error": None}
+
+    @staticmethod
+    def _parse_header(lines: List[str], personal_info: Dict[str, Any]) -> int:
+        """识别姓名和所在地区，返回识别的行数"""
+        covered = 0
+        for line in lines:
+            recognized = False
+            name = _NAME.match(line)
+            if name and personal_info["name"] is None:
+                personal_info["name"] = name.group(1)
+                recognized = True
+            if personal_info["location"] is None:
+                label = _LOCATION_LABEL.search(line)
+                parts = [part.strip() for part in re.split(r'[|｜,，;；]', line)]
+                city = next((part for part in parts if part in KNOWN_CITIES), None)
+                if label or city:
+                    personal_info["location"] = label.group(1).strip() if label else city
+                    recognized = True
+            covered += recognized
+        return covered
+
+    @staticmethod
+    def _split_fields(line: str) -> List[str]:
+        parts = [part.strip() for part in _FIELD_SEPARATOR.split(line) if part.strip()]
+        if len(parts) == 1 and ' ' in parts[0]:
+            parts = parts[0].split()
+        return parts
+
+    def _parse_entries(self, lines: List[str], date_ranges: Dict[str, Dict[str, Optional[str]]],
+                       entries: List[Dict[str, Any]], build_entry) -> int:
+        """
+        按含时间段标记的标题行拆分经历，返回识别的行数
+
+        标题行之后的行：技术栈行拆分为技术列表，其余作为描述。第一个标题行之前的行不识别。
+        """
+        covered = 0
+        current: Optional[Dict[str, Any]] = None
+        for line in lines:
+            marker = _DATE_MARKER.search(line)
+            if marker and marker.group(1) in date_ranges:
+                fields = self._split_fields(_DATE_MARKER.sub(' ', line).strip(' |｜'))
+                current = build_entry(fields)
+                if current is None:
+                    continue
+                current.update(date_ranges[marker.group(1)])
+                entries.append(current)
+                covered += 1
+                continue
+            if current is None:
+                continue
+
+            technologies = _TECHNOLOGY_LABEL.match(line)
+            if technologies and "technologies" in current:
+                current["technologies"] = [
+                    item for item in _ITEM_SEPARATOR.split(line[technologies.end():]) if item
+                ]
+            elif "description" in current:
+                current["description"].append(_BULLET.sub('', line))
+            else:
+                # 教育经历的附加行（如GPA、主修课程）不识别
+                gpa = re.search(r'GPA\s*[:：]?\s*([\d.]+(?:\s*/\s*[\d.]+)?)', line, re.IGNORECASE)
+                if gpa:
+                    current["gpa"] = gpa.group(1).replace(' ', '')
+                else:
+                    continue
+            covered += 1
+        return covered
+
+    @staticmethod
+    def _work_entry(fields: List[str]) -> Optional[Dict[str, Any]]:
+        """从标题行字段中识别公司和职位，带有公司特征词的字段作为公司名"""
+        if len(fields) < 2:
+            return None
+        company_index = next((index for index, field in enumerate(fields) if _COMPANY_HINT.search(field)), 0)
+        company = fields[company_index]
+        position = next(field for index, field in enumerate(fields) if index != company_index)
+        return {"company": company, "position": position, "description": [], "technologies": None}
+
+    @staticmethod
+    def _education_entry(fields: List[str]) -> Optional[Dict[str, Any]]:
+        """从标题行字段中识别学校、学位和专业"""
+        school_index = next((index for index, field in enumerate(fields) if _SCHOOL_HINT.search(field)), None)
+        degree_index = next((index for index, field in enumerate(fields) if _DEGREE.match(field)), None)
+        if school_index is None or degree_index is None:
+            return None
+        others = [field for index, field in enumerate(fields) if index not in (school_index, degree_index)]
+        return {
+            "institution": fields[school_index],
+            "degree": fields[degree_index],
+            "major": others[0] if others else None,
+            "gpa": None
+        }
+
+    @staticmethod
+    def _parse_skills(lines: List[str], skills: List[Dict[str, Any]]) -> int:
+        """拆分技能行，返回识别的行数"""
+        covered = 0
+        for line in lines:
+            line = _BULLET.sub('', line)
+            label = _SKILL_LABEL.match(line)
+            category = _skill_category(label.group(1)) if label else "technical"
+            items = [item for item in _ITEM_SEPARATOR.split(label.group(2) if label else line) if item]
+            for item in items:
+                level = None
+                match = _SKILL_LEVEL.match(item)
+                if match:
+                    item, level = match.group(1), SKILL_LEVEL_LABELS.get(match.group(2))
+                if 0 < len(item) <= 50:
+                    skills.append({"category": category, "name": item, "level": level})
+            covered += bool(items)
+        return covered
+
+
+# 创建全局实例
+heuristic_parser = HeuristicResumeParser()
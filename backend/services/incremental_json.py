@@ -0,0 +1,226 @@
+"""
+增量JSON解析
+逐段接收模型的流式输出，在顶层对象的字段值（如personal_info）和顶层数组字段中的每一项
+（如work_experience中的每段经历）完整生成后立即产出，不必等待整个响应结束。
+
+解析器同时按JSON语法逐字符校验输出，出现不可能构成有效JSON的字符（如JSON之前或之后的说明文字、
+缺少冒号或逗号）时立即报错，调用方可以中止生成。开头的```json代码块标记和结尾的```允许出现。
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalJSONError(ValueError):
+    """流式输出不是有效的JSON"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message}（第{position}个字符）")
+        self.position = position
+
+
+# 语法状态
+_START = "start"                  # 等待顶层值（可以先出现代码块标记）
+_VALUE = "value"                  # 等待值
+_VALUE_OR_END = "value_or_end"    # "["之后：等待值或"]"
+_KEY_OR_END = "key_or_end"        # "{"之后：等待键或"}"
+_KEY = "key"                      # 对象中的","之后：等待键
+_COLON = "colon"                  # 键之后：等待":"
+_AFTER_VALUE = "after_value"      # 值之后：等待","或容器结束
+_DONE = "done"                    # 顶层值结束，只允许空白和代码块结束标记
+
+_CODE_FENCE = "```json"
+_LITERAL_CHARS = set("0123456789+-.eEtrufalsn")
+
+
+class IncrementalJSONParser:
+    """增量JSON解析器"""
+
+    def __init__(self):
+        self._text: List[str] = []
+        self._length = 0
+        self._state = _START
+        self._fence = ""
+        # 容器栈，元素为"{"或"["
+        self._stack: List[str] = []
+        self._keys: List[Optional[str]] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._string_start = 0
+        self._literal_start: Optional[int] = None
+        # 顶层字段值和顶层数组中当前项的起始偏移
+        self._field_start = 0
+        self._item_start = 0
+        self._item_index = 0
+
+    @property
+    def done(self) -> bool:
+        """顶层值是否已经完整"""
+        return self._state == _DONE
+
+    @property
+    def text(self) -> str:
+        """目前收到的全部文本"""
+        return "".join(self._text)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        接收一段输出
+
+        Args:
+            chunk: 新生成的文本
+
+        Returns:
+            List[Dict[str, Any]]: 本段输出中完整生成的值，按完成顺序排列：
+                顶层字段的值为{"key": 字段名, "value": 值}，
+                顶层数组字段中的一项为{"key": 字段名, "index": 序号, "value": 值}
+
+        Raises:
+            IncrementalJSONError: 输出不可能构成有效的JSON时
+        """
+        events: List[Dict[str, Any]] = []
+        base = self._length
+        self._text.append(chunk)
+        self._length += len(chunk)
+        for offset, char in enumerate(chunk):
+            self._consume(char, base + offset, events)
+        return events
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        输出结束，完成最后的数字或字面量
+
+        Raises:
+            IncrementalJSONError: 输出在JSON结束之前中断时
+        """
+        events: List[Dict[str, Any]] = []
+        if self._literal_start is not None:
+            self._finish_literal(self._length, events)
+        if self._state != _DONE:
+            raise IncrementalJSONError("输出在JSON结束之前中断", self._length)
+        return events
+
+    def _consume(self, char: str, position: int, events: List[Dict[str, Any]]):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._keys[-1] = json.loads(self._slice(self._string_start, position + 1), strict=False)
+                    self._state = _COLON
+                else:
+                    self._finish_value(position + 1, events)
+            return
+
+        if self._literal_start is not None:
+            if char in _LITERAL_CHARS:
+                return
+            self._finish_literal(position, events)
+
+        if char.isspace():
+            return
+
+        state = self._state
+        if state == _START:
+            if _CODE_FENCE.startswith(self._fence + char):
+                self._fence += char
+                return
+            if char not in "{[":
+                raise IncrementalJSONError("输出不是JSON", position)
+            self._start_value(char, position)
+        elif state in (_VALUE, _VALUE_OR_END):
+            if state == _VALUE_OR_END and char == "]":
+                self._close_container("[", position, events)
+            else:
+                self._start_value(char, position)
+        elif state in (_KEY_OR_END, _KEY):
+            if char == '"':
+                self._start_string(position, is_key=True)
+            elif state == _KEY_OR_END and char == "}":
+                self._close_container("{", position, events)
+            else:
+                raise IncrementalJSONError("对象中应为字段名", position)
+        elif state == _COLON:
+            if char != ":":
+                raise IncrementalJSONError("字段名之后应为冒号", position)
+            self._state = _VALUE
+        elif state == _AFTER_VALUE:
+            if char == ",":
+                self._state = _KEY if self._stack[-1] == "{" else _VALUE
+            elif char in "}]":
+                self._close_container("{" if char == "}" else "[", position, events)
+            else:
+                raise IncrementalJSONError("值之后应为逗号或结束括号", position)
+        elif state == _DONE:
+            if char != "`":
+                raise IncrementalJSONError("JSON之后出现多余内容", position)
+
+    def _start_value(self, char: str, position: int):
+        depth = len(self._stack)
+        if depth == 1 and self._stack[0] == "{":
+            self._field_start = position
+        elif depth == 2 and self._stack == ["{", "["]:
+            self._item_start = position
+
+        if char in "{[":
+            self._stack.append(char)
+            self._keys.append(None)
+            self._state = _KEY_OR_END if char == "{" else _VALUE_OR_END
+            if depth == 1 and char == "[" and self._stack[0] == "{":
+                self._item_index = 0
+        elif char == '"':
+            self._start_string(position, is_key=False)
+        elif char in _LITERAL_CHARS:
+            self._literal_start = position
+        else:
+            raise IncrementalJSONError("应为JSON值", position)
+
+    def _start_string(self, position: int, is_key: bool):
+        self._in_string = True
+        self._string_is_key = is_key
+        self._string_start = position
+
+    def _finish_literal(self, end: int, events: List[Dict[str, Any]]):
+        start = self._literal_start
+        self._literal_start = None
+        try:
+            json.loads(self._slice(start, end))
+        except json.JSONDecodeError:
+            raise IncrementalJSONError("无效的数字或字面量", start)
+        self._finish_value(end, events)
+
+    def _close_container(self, opener: str, position: int, events: List[Dict[str, Any]]):
+        if not self._stack or self._stack[-1] != opener:
+            raise IncrementalJSONError("括号不匹配", position)
+        self._stack.pop()
+        self._keys.pop()
+        self._finish_value(position + 1, events)
+
+    def _finish_value(self, end: int, events: List[Dict[str, Any]]):
+        """一个值结束后产出完整的顶层字段和顶层数组项，并转到等待逗号或结束括号的状态"""
+        depth = len(self._stack)
+        if depth == 0:
+            self._state = _DONE
+            return
+        self._state = _AFTER_VALUE
+        if self._stack[0] != "{":
+            return
+        if depth == 1:
+            events.append({"key": self._keys[0], "value": self._load(self._field_start, end)})
+        elif depth == 2 and self._stack[1] == "[":
+            events.append({"key": self._keys[0], "index": self._item_index,
+                           "value": self._load(self._item_start, end)})
+            self._item_index += 1
+
+    def _load(self, start: int, end: int) -> Any:
+        return json.loads(self._slice(start, end), strict=False)
+
+    def _slice(self, start: int, end: int) -> str:
+        # 合并已收到的分段，避免每次取值都重新拼接
+        if len(self._text) > 1:
+            self._text = ["".join(self._text)]
+        return self._text[0][start:end]
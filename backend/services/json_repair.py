@@ -0,0 +1,328 @@
+"""
+模型输出的JSON修复
+通义千问偶尔输出不完全合法的JSON，重新调用一次要付出整段生成的费用和延迟。
+这里在本地按JSON语法逐字符扫描输出，修复常见的错误：
+
+- 代码块标记，JSON之前和之后的说明文字
+- 数组和对象末尾多余的逗号，值之间缺少的逗号
+- 字符串中未转义的双引号（引号之后不是逗号、冒号或结束括号时视为字符串内容）
+- Python风格的字面量（True、False、None）
+- 缺少或多余的结束括号
+- 输出被截断：回退到最后一个完整的值（最大的有效前缀），再补全未闭合的数组和对象
+
+fill_defaults按字段模式补全缺失的必要字段，并去掉缺少无默认值的必要字段的不完整条目
+（通常是截断时生成到一半的最后一段经历）。
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JSONRepairError(ValueError):
+    """输出无法修复为有效的JSON"""
+    pass
+
+
+# 修复类型，用于统计
+REPAIR_CODE_FENCE = "code_fence"
+REPAIR_LEADING_TEXT = "leading_text"
+REPAIR_TRAILING_TEXT = "trailing_text"
+REPAIR_TRAILING_COMMA = "trailing_comma"
+REPAIR_MISSING_COMMA = "missing_comma"
+REPAIR_UNESCAPED_QUOTE = "unescaped_quote"
+REPAIR_LITERAL = "literal"
+REPAIR_BRACKET = "bracket"
+REPAIR_TRUNCATED = "truncated"
+REPAIR_MISSING_FIELD = "missing_field"
+REPAIR_INCOMPLETE_ENTRY = "incomplete_entry"
+
+# 字段模式中没有默认值的必要字段
+REQUIRED = object()
+
+# 语法状态，与增量JSON解析器相同
+_VALUE = "value"                  # 等待值
+_VALUE_OR_END = "value_or_end"    # "["之后：等待值或"]"
+_KEY_OR_END = "key_or_end"        # "{"之后：等待键或"}"
+_KEY = "key"                      # 对象中的","之后：等待键
+_COLON = "colon"                  # 键之后：等待":"
+_AFTER_VALUE = "after_value"      # 值之后：等待","或容器结束
+_DONE = "done"
+
+_LITERAL = re.compile(r'[A-Za-z0-9+\-.]+')
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+# 未转义的引号之后紧跟另一个字段名时，是缺少逗号的字符串结束引号
+_NEXT_KEY = re.compile(r'\s*"[^"\n]*"\s*:')
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    解析模型输出的JSON，解析失败时修复后再解析
+
+    Args:
+        text: 模型输出
+
+    Returns:
+        Tuple[Any, List[str]]: 解析出的值和做过的修复类型（去重，按首次出现的顺序）；
+            输出本身是有效的JSON时修复类型为空
+
+    Raises:
+        JSONRepairError: 输出中没有JSON，或修复后仍然不是有效的JSON时
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), []
+    except json.JSONDecodeError:
+        pass
+
+    repaired, repairs = _RepairScanner(stripped).run()
+    try:
+        value = json.loads(repaired, strict=False)
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"修复后仍然不是有效的JSON: {e}")
+    return value, list(dict.fromkeys(repairs))
+
+
+class _RepairScanner:
+    """逐字符扫描输出，写出修复后的JSON文本"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.out: List[str] = []
+        self.stack: List[str] = []
+        self.state = _VALUE
+        self.repairs: List[str] = []
+        # 最后一个完整的值之后（或最后一个容器开始之后）的输出长度和容器栈，截断时回退到这里
+        self.safe_point: Optional[Tuple[int, List[str]]] = None
+
+    def run(self) -> Tuple[str, List[str]]:
+        text = self.text
+        start = min((index for index in (text.find("{"), text.find("[")) if index >= 0), default=-1)
+        if start < 0:
+            raise JSONRepairError("输出中没有JSON")
+        if start > 0:
+            fence = text[:start].strip().lstrip("`").strip().lower() in ("", "json")
+            self.repairs.append(REPAIR_CODE_FENCE if fence else REPAIR_LEADING_TEXT)
+
+        position = start
+        while position < len(text) and self.state != _DONE:
+            position = self._step(position)
+
+        if self.state != _DONE:
+            self._close_truncated()
+        else:
+            rest = text[position:].strip()
+            if rest:
+                self.repairs.append(REPAIR_CODE_FENCE if rest == "```" else REPAIR_TRAILING_TEXT)
+        return "".join(self.out), self.repairs
+
+    def _step(self, position: int) -> int:
+        """处理position处的字符，返回下一个待处理的位置"""
+        char = self.text[position]
+        if char.isspace():
+            self.out.append(char)
+            return position + 1
+
+        state = self.state
+        if char in "{[":
+            if state == _AFTER_VALUE:
+                self._insert_comma()
+            elif state not in (_VALUE, _VALUE_OR_END):
+                raise JSONRepairError(f"第{position}个字符处不应出现'{char}'")
+            self.out.append(char)
+            self.stack.append(char)
+            self.state = _KEY_OR_END if char == "{" else _VALUE_OR_END
+            self._mark_safe()
+            return position + 1
+
+        if char in "}]":
+            return self._close(char, position)
+
+        if char == ",":
+            if state == _AFTER_VALUE:
+                self.out.append(char)
+                self.state = _KEY if self.stack[-1] == "{" else _VALUE
+            elif state in (_KEY, _VALUE, _KEY_OR_END, _VALUE_OR_END):
+                # 连续的逗号或容器开始后的逗号
+                self.repairs.append(REPAIR_TRAILING_COMMA)
+            else:
+                raise JSONRepairError(f"第{position}个字符处不应出现逗号")
+            return position + 1
+
+        if char == ":":
+            if state != _COLON:
+                raise JSONRepairError(f"第{position}个字符处不应出现冒号")
+            self.out.append(char)
+            self.state = _VALUE
+            return position + 1
+
+        if char == '"':
+            if state == _AFTER_VALUE:
+                self._insert_comma()
+                state = self.state
+            if state in (_KEY, _KEY_OR_END):
+                return self._string(position, is_key=True)
+            if state in (_VALUE, _VALUE_OR_END):
+                return self._string(position, is_key=False)
+            raise JSONRepairError(f"第{position}个字符处不应出现引号")
+
+        match = _LITERAL.match(self.text, position)
+        if match and (state in (_VALUE, _VALUE_OR_END) or (state == _AFTER_VALUE and self.stack[-1] == "[")):
+            return self._literal(match)
+        raise JSONRepairError(f"第{position}个字符处不应出现'{char}'")
+
+    def _string(self, position: int, is_key: bool) -> int:
+        """复制一个字符串，修复其中未转义的引号；输出在字符串中截断时保持未闭合"""
+        text = self.text
+        chars = ['"']
+        index = position + 1
+        while index < len(text):
+            char = text[index]
+            if char == "\\" and index + 1 < len(text):
+                chars.append(text[index:index + 2])
+                index += 2
+                continue
+            if char == '"':
+                if is_key or self._ends_string(index + 1):
+                    chars.append('"')
+                    self.out.append("".join(chars))
+                    if is_key:
+                        self.state = _COLON
+                    else:
+                        self._finish_value()
+                    return index + 1
+                chars.append('\\"')
+                self.repairs.append(REPAIR_UNESCAPED_QUOTE)
+            else:
+                chars.append(char)
+            index += 1
+        # 字符串被截断，留给_close_truncated回退
+        return index
+
+    def _ends_string(self, position: int) -> bool:
+        """
+        判断引号是否为字符串的结束引号：之后是逗号、冒号、结束括号、输出结尾，
+        或者缺少逗号时的下一个字段名（对象中）、下一个字符串（数组中）
+        """
+        rest = self.text[position:].lstrip()
+        if not rest or rest[0] in ",:}]`":
+            return True
+        if self.stack[-1] == "[":
+            return rest[0] == '"'
+        return bool(_NEXT_KEY.match(self.text, position))
+
+    def _literal(self, match: "re.Match") -> int:
+        literal = match.group(0)
+        if match.end() == len(self.text):
+            # 输出结尾的数字或字面量可能不完整
+            try:
+                json.loads(literal)
+            except json.JSONDecodeError:
+                return match.end()
+        if literal in _PYTHON_LITERALS:
+            literal = _PYTHON_LITERALS[literal]
+            self.repairs.append(REPAIR_LITERAL)
+        try:
+            json.loads(literal)
+        except json.JSONDecodeError:
+            raise JSONRepairError(f"第{match.start()}个字符处的'{literal}'不是有效的数字或字面量")
+        if self.state == _AFTER_VALUE:
+            self._insert_comma()
+        self.out.append(literal)
+        self._finish_value()
+        return match.end()
+
+    def _close(self, char: str, position: int) -> int:
+        opener = "{" if char == "}" else "["
+        if opener not in self.stack:
+            # 多余的结束括号
+            self.repairs.append(REPAIR_BRACKET)
+            return position + 1
+        if self.state == _COLON or (self.state == _VALUE and self.stack[-1] == "{"):
+            raise JSONRepairError(f"第{position}个字符处的字段缺少值")
+        if self.state in (_KEY, _VALUE):
+            self._drop_trailing_comma()
+        # 缺少的内层结束括号
+        while self.stack[-1] != opener:
+            self.out.append(_CLOSERS[self.stack.pop()])
+            self.repairs.append(REPAIR_BRACKET)
+        self.stack.pop()
+        self.out.append(char)
+        self._finish_value()
+        return position + 1
+
+    def _finish_value(self):
+        self.state = _AFTER_VALUE if self.stack else _DONE
+        self._mark_safe()
+
+    def _mark_safe(self):
+        self.safe_point = (len(self.out), list(self.stack))
+
+    def _insert_comma(self):
+        self.out.append(",")
+        self.state = _KEY if self.stack[-1] == "{" else _VALUE
+        self.repairs.append(REPAIR_MISSING_COMMA)
+
+    def _drop_trailing_comma(self):
+        for index in range(len(self.out) - 1, -1, -1):
+            if self.out[index] == ",":
+                del self.out[index]
+                break
+            if not self.out[index].isspace():
+                break
+        self.repairs.append(REPAIR_TRAILING_COMMA)
+
+    def _close_truncated(self):
+        """输出被截断：回退到最后一个完整的值，补全未闭合的容器"""
+        length, stack = self.safe_point
+        del self.out[length:]
+        self.out.extend(_CLOSERS[opener] for opener in reversed(stack))
+        self.repairs.append(REPAIR_TRUNCATED)
+
+
+def fill_defaults(data: Dict[str, Any], schema: Dict[str, Any]) -> List[str]:
+    """
+    按字段模式补全缺失的字段（原地修改）
+
+    模式中的值为字典时，data中对应的值应为对象，值为[字典]时应为对象数组；
+    内层字典是条目的字段和默认值，默认值为REQUIRED的字段没有默认值，
+    数组中缺少这类字段（或值为空）的条目被去掉。
+
+    Args:
+        data: 解析出的JSON对象
+        schema: 字段模式
+
+    Returns:
+        List[str]: 做过的修复类型（REPAIR_MISSING_FIELD、REPAIR_INCOMPLETE_ENTRY）
+    """
+    repairs = []
+    for key, field_schema in schema.items():
+        is_list = isinstance(field_schema, list)
+        fields = field_schema[0] if is_list else field_schema
+        value = data.get(key)
+        if not isinstance(value, list if is_list else dict):
+            data[key] = value = [] if is_list else {}
+            repairs.append(REPAIR_MISSING_FIELD)
+        entries = value if is_list else [value]
+
+        complete = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            missing = False
+            for field, default in fields.items():
+                if entry.get(field) not in (None, "", []):
+                    continue
+                if default is REQUIRED:
+                    missing = True
+                elif field not in entry:
+                    entry[field] = default
+                    repairs.append(REPAIR_MISSING_FIELD)
+            if missing and is_list:
+                repairs.append(REPAIR_INCOMPLETE_ENTRY)
+                continue
+            complete.append(entry)
+        if is_list:
+            data[key] = complete
+    return list(dict.fromkeys(repairs))
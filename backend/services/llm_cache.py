@@ -0,0 +1,330 @@
+"""
+AI解析结果缓存
+按(规范化文本哈希, 模型, 温度, 提示模板版本)缓存通过校验的结构化简历JSON，
+重试、重复上传和重新解析相同内容时直接返回缓存结果，不再调用通义千问API
+
+缓存分两层：进程内LRU缓存（TTL较短）在前，多个worker共享的Redis缓存在后，
+Redis命中时回填进程内缓存。提示模板版本由模板内容自动计算，
+修改_build_parse_prompt后旧条目自然失效。
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import redis
+
+from backend.config.pipeline_config import LLM_CACHE_CONFIG
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 计算提示模板版本时代替简历文本的占位符，不会出现在真实简历中
+PROMPT_TEMPLATE_PLACEHOLDER = "\x00RESUME_TEXT\x00"
+
+
+def compute_prompt_version(build_prompt: Callable[[str], str]) -> str:
+    """
+    根据提示模板内容计算版本号
+
+    用占位符代替简历文本渲染一次提示，取其哈希作为版本号，模板的任何修改都会得到新版本。
+
+    Args:
+        build_prompt: 提示构建函数，参数为简历文本
+
+    Returns:
+        str: 12位十六进制版本号
+    """
+    template = build_prompt(PROMPT_TEMPLATE_PLACEHOLDER)
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_cache_text(text: str) -> str:
+    """合并所有空白，只有空白差异的文本得到相同的缓存键"""
+    return " ".join(text.split())
+
+
+def make_llm_cache_key(text: str, model: str, temperature: float, prompt_version: str) -> str:
+    """
+    生成缓存键
+
+    Args:
+        text: 简历文本
+        model: 模型名称
+        temperature: 温度
+        prompt_version: 提示模板版本
+
+    Returns:
+        str: 缓存键，任一参数变化时得到不同的键
+    """
+    digest = hashlib.sha256(normalize_cache_text(text).encode('utf-8')).hexdigest()
+    return f"{digest}-{model}-t{temperature:g}-p{prompt_version}"
+
+
+class LLMCache(ABC):
+    """
+    AI解析结果缓存接口
+
+    缓存内容为JSON可序列化的字典。读写失败时记录警告并视为未命中，不影响解析。
+    """
+
+    backend_name = "none"
+
+    def __init__(self):
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存，不存在或已过期时返回None"""
+
+    @abstractmethod
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        """写入缓存"""
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取解析结果
+
+        Args:
+            key: make_llm_cache_key生成的缓存键
+
+        Returns:
+            Optional[Dict[str, Any]]: 缓存的结构化简历，未命中时返回None
+        """
+        try:
+            payload = self._load(key)
+        except Exception as e:
+            # 缓存不可用时退化为调用API
+            logger.warning(f"读取AI解析缓存失败: {e}")
+            payload = None
+        self._record(payload is not None)
+        return payload
+
+    def set(self, key: str, payload: Dict[str, Any]) -> None:
+        """
+        写入解析结果
+
+        Args:
+            key: make_llm_cache_key生成的缓存键
+            payload: 通过校验的结构化简历
+        """
+        try:
+            self._store(key, payload)
+        except Exception as e:
+            logger.warning(f"写入AI解析缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存命中统计
+
+        Returns:
+            Dict[str, Any]: 命中数、未命中数和命中率
+        """
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "backend": self.backend_name,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0
+        }
+
+
+class MemoryLLMCache(LLMCache):
+    """
+    进程内AI解析缓存，条目按TTL过期，超过条目上限时淘汰最久未使用的条目
+
+    条目以JSON字符串保存，调用方修改返回的字典不会影响缓存。
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: 最大条目数
+            ttl: 条目存活秒数，None表示不过期
+            clock: 时间函数（测试时可替换）
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        # 缓存键 -> (过期时间, JSON字符串)，按最近使用时间排序
+        self._entries: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(raw)
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        raw = json.dumps(payload, ensure_ascii=False)
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, raw)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({"entries": len(self._entries), "max_entries": self.max_entries})
+        return stats
+
+
+class RedisLLMCache(LLMCache):
+    """
+    Redis AI解析缓存，多个worker进程和服务实例共享
+
+    条目按TTL过期；另用一个有序集合记录每个条目的最近使用时间，
+    条目数超过上限时淘汰最久未使用的条目，不依赖Redis实例的maxmemory淘汰策略。
+    """
+
+    backend_name = "redis"
+
+    def __init__(self, redis_client: redis.Redis, ttl: Optional[int] = None,
+                 max_entries: Optional[int] = None, key_prefix: str = "llm:"):
+        """
+        Args:
+            redis_client: Redis客户端（需要decode_responses=True）
+            ttl: 条目存活秒数，None表示不过期
+            max_entries: 最大条目数，None表示不限制
+            key_prefix: 键前缀
+        """
+        super().__init__()
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self._lru_key = f"{key_prefix}lru"
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        pipe = self.redis_client.pipeline()
+        pipe.get(f"{self.key_prefix}{key}")
+        # 只更新已有成员的使用时间
+        pipe.zadd(self._lru_key, {key: time.time()}, xx=True)
+        raw, _ = pipe.execute()
+        return json.loads(raw) if raw else None
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        pipe = self.redis_client.pipeline()
+        pipe.set(f"{self.key_prefix}{key}", json.dumps(payload, ensure_ascii=False), ex=self.ttl)
+        pipe.zadd(self._lru_key, {key: now})
+        if self.ttl:
+            # 清理已经过期的条目留下的索引
+            pipe.zremrangebyscore(self._lru_key, "-inf", now - self.ttl)
+        pipe.zcard(self._lru_key)
+        size = pipe.execute()[-1]
+
+        if self.max_entries and size > self.max_entries:
+            evicted = self.redis_client.zpopmin(self._lru_key, size - self.max_entries)
+            if evicted:
+                self.redis_client.delete(*[f"{self.key_prefix}{member}" for member, _ in evicted])
+                logger.info(f"淘汰AI解析缓存{len(evicted)}条")
+
+
+class TieredLLMCache(LLMCache):
+    """
+    两级AI解析缓存：先查进程内缓存，未命中再查Redis，Redis命中时回填进程内缓存
+
+    写入时同时写两级。Redis不可用时只记录警告，进程内缓存继续工作。
+    """
+
+    backend_name = "tiered"
+
+    def __init__(self, local: MemoryLLMCache, remote: RedisLLMCache):
+        """
+        Args:
+            local: 进程内缓存
+            remote: Redis缓存
+        """
+        super().__init__()
+        self.local = local
+        self.remote = remote
+        self._local_hits = 0
+        self._remote_hits = 0
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.local._load(key)
+        if payload is not None:
+            with self._lock:
+                self._local_hits += 1
+            return payload
+
+        try:
+            payload = self.remote._load(key)
+        except Exception as e:
+            logger.warning(f"读取Redis AI解析缓存失败: {e}")
+            return None
+        if payload is not None:
+            self.local._store(key, payload)
+            with self._lock:
+                self._remote_hits += 1
+        return payload
+
+    def _store(self, key: str, payload: Dict[str, Any]) -> None:
+        self.local._store(key, payload)
+        self.remote._store(key, payload)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({"local_hits": self._local_hits, "remote_hits": self._remote_hits})
+        local_stats = self.local.get_stats()
+        stats.update({"local_entries": local_stats["entries"], "local_max_entries": local_stats["max_entries"]})
+        return stats
+
+
+def create_llm_cache(config: Optional[Dict[str, Any]] = None) -> Optional[LLMCache]:
+    """
+    根据配置创建AI解析缓存
+
+    Args:
+        config: 缓存配置，默认使用LLM_CACHE_CONFIG
+
+    Returns:
+        Optional[LLMCache]: 缓存实例，配置为none时返回None
+    """
+    config = config or LLM_CACHE_CONFIG
+    backend = config["backend"]
+    if backend == "none":
+        return None
+    if backend not in ("memory", "redis", "tiered"):
+        raise ValueError(f"不支持的AI解析缓存类型: {backend}")
+
+    local = MemoryLLMCache(config["local_max_entries"], config["local_ttl"] or None)
+    if backend == "memory":
+        return local
+
+    client = redis.from_url(config["redis_url"], decode_responses=True, health_check_interval=30)
+    remote = RedisLLMCache(client, config["ttl"] or None, config["max_entries"] or None, config["key_prefix"])
+    if backend == "redis":
+        return remote
+    return TieredLLMCache(local, remote)
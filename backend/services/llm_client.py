@@ -0,0 +1,324 @@
+"""
+通义千问异步HTTP客户端
+直接调用DashScope原生文本生成接口，所有请求共享一个保持长连接的httpx连接池，
+并发请求数受信号量限制，超出的请求在事件循环中排队，不会阻塞事件循环，也不会打满上游接口。
+流式调用通过SSE逐段返回新生成的文本
+"""
+
+import json
+import random
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+
+import httpx
+
+from backend.config.pipeline_config import LLM_CLIENT_CONFIG
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# DashScope原生文本生成接口路径
+GENERATION_PATH = "/api/v1/services/aigc/text-generation/generation"
+
+# 可以重试的HTTP状态码（限流和服务端错误）
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMClientError(Exception):
+    """LLM接口调用异常"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class AsyncQwenClient:
+    """通义千问异步客户端"""
+
+    def __init__(self, api_key: str, config: Optional[Dict[str, Any]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        初始化客户端，连接池在第一次请求时创建
+
+        Args:
+            api_key: DashScope API密钥
+            config: 客户端配置，默认使用LLM_CLIENT_CONFIG
+            transport: 自定义传输层（测试时可传入httpx.MockTransport）
+        """
+        config = {**LLM_CLIENT_CONFIG, **(config or {})}
+        self.api_key = api_key
+        self.base_url = config["base_url"].rstrip("/")
+        self.max_concurrency = max(1, config["max_concurrency"])
+        self.max_retries = config["max_retries"]
+        self.retry_backoff = config["retry_backoff"]
+        self.timeout = httpx.Timeout(
+            connect=config["connect_timeout"],
+            read=config["read_timeout"],
+            write=config["write_timeout"],
+            pool=config["pool_timeout"]
+        )
+        self.limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+            keepalive_expiry=config["keepalive_expiry"]
+        )
+        self.transport = transport
+
+        # 连接池和信号量都绑定到创建它们的事件循环
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # 事件循环变化时（如测试中每个用例一个循环）旧连接池不能再使用，直接丢弃
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._slots = None
+            self._loop = None
+
+    async def generate(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                       top_p: float = 0.8) -> str:
+        """
+        调用文本生成接口
+
+        Args:
+            prompt: 提示文本
+            model: 模型名称
+            max_tokens: 最大生成token数
+            temperature: 温度
+            top_p: 核采样概率
+
+        Returns:
+            str: 生成的文本
+
+        Raises:
+            LLMClientError: 接口返回错误、响应格式不正确或重试后仍然失败
+        """
+        text, _ = await self.generate_with_usage(prompt, model, max_tokens, temperature, top_p)
+        return text
+
+    async def generate_with_usage(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                                  top_p: float = 0.8) -> Tuple[str, Dict[str, int]]:
+        """
+        调用文本生成接口，同时返回token用量，参数和异常与generate相同
+
+        Returns:
+            Tuple[str, Dict[str, int]]: 生成的文本和用量（input_tokens、output_tokens，响应中没有时为空字典）
+        """
+        payload = {
+            "model": model,
+            "input": {"prompt": prompt},
+            "parameters": {
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "result_format": "text"
+            }
+        }
+        data = await self._post(GENERATION_PATH, payload)
+        try:
+            return data["output"]["text"], data.get("usage") or {}
+        except (KeyError, TypeError, AttributeError):
+            raise LLMClientError(f"API响应格式不正确: {str(data)[:200]}")
+
+    async def stream_with_usage(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                                top_p: float = 0.8) -> AsyncIterator[Tuple[str, Dict[str, int]]]:
+        """
+        流式调用文本生成接口，逐段产出新生成的文本，参数与generate相同
+
+        收到响应之前的限流、服务端和网络错误按generate的规则重试，开始产出文本后出错不再重试。
+        调用方可以提前结束迭代（如发现输出格式错误），应配合contextlib.aclosing使用，
+        确保及时关闭连接、释放并发槽位。
+
+        Yields:
+            Tuple[str, Dict[str, int]]: 新生成的文本片段和目前的用量（input_tokens、output_tokens）
+
+        Raises:
+            LLMClientError: 接口返回错误、响应格式不正确或重试后仍然失败
+        """
+        payload = {
+            "model": model,
+            "input": {"prompt": prompt},
+            "parameters": {
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "result_format": "text",
+                "incremental_output": True
+            }
+        }
+        async with self._slot() as client:
+            attempt = 0
+            while True:
+                self._requests += 1
+                started = False
+                try:
+                    async with client.stream("POST", GENERATION_PATH, json=payload,
+                                             headers={"X-DashScope-SSE": "enable"}) as response:
+                        if response.status_code == 200:
+                            started = True
+                            async for chunk in self._sse_chunks(response):
+                                yield chunk
+                            return
+                        await response.aread()
+                        error = self._error_from_response(response)
+                        if response.status_code not in RETRYABLE_STATUS_CODES:
+                            self._failures += 1
+                            raise error
+                        retry_after = response.headers.get("Retry-After")
+                except httpx.TimeoutException as e:
+                    error = LLMClientError(f"调用通义千问API超时: {type(e).__name__}")
+                    retry_after = None
+                except httpx.HTTPError as e:
+                    error = LLMClientError(f"调用通义千问API时网络错误: {str(e)}")
+                    retry_after = None
+                except LLMClientError:
+                    if started:
+                        self._failures += 1
+                    raise
+
+                if started or attempt >= self.max_retries:
+                    self._failures += 1
+                    raise error
+                attempt += 1
+                self._retries += 1
+                delay = self._retry_delay(attempt, retry_after)
+                logger.warning(f"{str(error)}，{delay:.2f}秒后第{attempt}次重试")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _sse_chunks(response: httpx.Response) -> AsyncIterator[Tuple[str, Dict[str, int]]]:
+        """解析DashScope的SSE事件流，error事件转为异常"""
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                try:
+                    data = json.loads(line[5:])
+                except ValueError:
+                    raise LLMClientError(f"流式响应格式不正确: {line[:200]}")
+                if event == "error" or data.get("code"):
+                    raise LLMClientError(f"API调用失败，错误信息: {data.get('message')}", code=data.get("code"))
+                try:
+                    yield data["output"]["text"] or "", data.get("usage") or {}
+                except (KeyError, TypeError):
+                    raise LLMClientError(f"流式响应格式不正确: {line[:200]}")
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[httpx.AsyncClient]:
+        """占用一个并发槽位，超出并发上限的请求在此排队"""
+        client = self._get_client()
+        slots = self._slots
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            yield client
+        finally:
+            self._in_flight -= 1
+            slots.release()
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """占用一个并发槽位发送请求，限流和服务端错误按指数退避重试"""
+        async with self._slot() as client:
+            attempt = 0
+            while True:
+                self._requests += 1
+                try:
+                    response = await client.post(path, json=payload)
+                except httpx.TimeoutException as e:
+                    error = LLMClientError(f"调用通义千问API超时: {type(e).__name__}")
+                    retry_after = None
+                except httpx.HTTPError as e:
+                    error = LLMClientError(f"调用通义千问API时网络错误: {str(e)}")
+                    retry_after = None
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    error = self._error_from_response(response)
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        self._failures += 1
+                        raise error
+                    retry_after = response.headers.get("Retry-After")
+
+                if attempt >= self.max_retries:
+                    self._failures += 1
+                    raise error
+                attempt += 1
+                self._retries += 1
+                delay = self._retry_delay(attempt, retry_after)
+                logger.warning(f"{str(error)}，{delay:.2f}秒后第{attempt}次重试")
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """重试等待时间：优先使用Retry-After，否则为带随机抖动的指数退避"""
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+
+    @staticmethod
+    def _error_from_response(response: httpx.Response) -> LLMClientError:
+        """根据错误响应生成异常，DashScope的错误响应体包含code和message"""
+        code = None
+        message = response.text[:200]
+        try:
+            body = response.json()
+            code = body.get("code")
+            message = body.get("message") or message
+        except ValueError:
+            pass
+        return LLMClientError(
+            f"API调用失败，状态码: {response.status_code}, 错误信息: {message}",
+            status_code=response.status_code,
+            code=code
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取客户端运行统计
+
+        Returns:
+            Dict[str, Any]: 并发上限、进行中和排队中的请求数、累计请求、重试和失败次数
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "requests": self._requests,
+            "retries": self._retries,
+            "failures": self._failures
+        }
@@ -5,35 +5,276 @@ PDF文本提取服务
 
 import PyPDF2
 import pdfplumber
+from pdfminer.pdfdocument import PDFPasswordIncorrect
 import re
 import os
-from typing import Optional, Dict, Any
+import asyncio
+from functools import cached_property
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator, Tuple
 from pathlib import Path
 import logging
 
+from backend.services.text_normalizer import text_normalizer
+from backend.services.section_segmenter import section_segmenter
+from backend.services.contact_extractor import EMAIL_PATTERN, PHONE_PATTERN
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 提取器和清理规则版本，修改后提取结果会变化时递增，使提取缓存中的旧结果失效
+EXTRACTOR_VERSION = "3"
+CLEANING_VERSION = "1"
+
+# 提取引擎
+ENGINE_PDFPLUMBER = "pdfplumber"  # 布局分析，处理多栏等复杂排版更好
+ENGINE_PYPDF2 = "pypdf2"          # 直接读取文本指令，速度快，部分字体编码下效果更好
+ENGINE_NONE = "none"              # 没有可提取的文本（扫描件或纯图片）
+ENGINE_AUTO = "auto"              # 无法判断时先用pdfplumber，文本过少再用PyPDF2
+
+# 文本少于该字符数视为提取失败
+MIN_TEXT_CHARS = 50
+# 探测阶段采样的页数
+PROBE_SAMPLE_PAGES = 2
+# 扫描仪和扫描软件的生成工具名称关键字（小写）
+SCANNER_PRODUCER_KEYWORDS = ("scan", "paperport", "omnipage", "abbyy", "twain")
+
+# 内容流中的文本绘制指令：字符串或数组操作数后紧跟Tj、TJ、'或"
+_TEXT_OPERATOR_PATTERN = re.compile(rb'[)>\]]\s*(?:Tj|TJ|\'|")')
+
+
+def choose_engine(features: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    根据探测得到的文档特征选择提取引擎
+
+    Args:
+        features: probe_document得到的特征，包括采样页的文本指令数、字体数、
+            两种引擎在第一页提取的字符数和生成工具名称
+
+    Returns:
+        Tuple[str, str]: (引擎, 选择原因)
+    """
+    producer = features.get("producer") or ""
+    pdfplumber_chars = features["pdfplumber_chars"]
+    pypdf2_chars = features["pypdf2_chars"]
+
+    if features["text_operators"] == 0 and features["font_count"] == 0:
+        return ENGINE_NONE, "采样页面没有字体和文本绘制指令，判断为扫描件或图片PDF"
+
+    if (any(keyword in producer.lower() for keyword in SCANNER_PRODUCER_KEYWORDS)
+            and max(pdfplumber_chars, pypdf2_chars) < MIN_TEXT_CHARS):
+        return ENGINE_NONE, f"生成工具为扫描软件（{producer}）且采样页没有文本，判断为扫描件"
+
+    if pdfplumber_chars >= MIN_TEXT_CHARS:
+        return ENGINE_PDFPLUMBER, f"pdfplumber采样页文本正常（{pdfplumber_chars}字符），使用布局分析提取"
+
+    if pypdf2_chars >= MIN_TEXT_CHARS:
+        return ENGINE_PYPDF2, (
+            f"pdfplumber采样页只有{pdfplumber_chars}字符，PyPDF2可提取{pypdf2_chars}字符，"
+            f"可能是特殊字体编码"
+        )
+
+    return ENGINE_AUTO, "采样页文本过少，无法判断，先用pdfplumber提取，文本过少时再用PyPDF2"
+
+
 class PDFParseError(Exception):
     """PDF解析异常"""
     pass
 
 
+class PDFExtractionTimeoutError(PDFParseError):
+    """PDF提取超过时间限制"""
+    pass
+
+
+class PDFExtractionMemoryError(PDFParseError):
+    """PDF提取超过内存限制"""
+    pass
+
+
+class PDFDocumentSession:
+    """
+    PDF文档会话
+
+    文件只打开并解析一次（pdfplumber，底层为pdfminer），页数、加密状态和每页文本
+    都从同一个解析结构中读取并缓存在会话上。需要PyPDF2时（探测采样或选用PyPDF2引擎），
+    复用同一个文件句柄构建读取器。
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: PDF文件路径，首次访问文档内容时才打开
+        """
+        self.file_path = file_path
+        self._pdf = None
+        self._page_texts: Dict[int, str] = {}
+        self._fallback_page_texts: Dict[int, str] = {}
+        # 由PDFParser写入的处理结果
+        self.probe: Optional[Dict[str, Any]] = None
+        self.document: Optional[Dict[str, Any]] = None
+        self.statistics: Optional[Dict[str, Any]] = None
+
+    def __enter__(self) -> "PDFDocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """关闭文件句柄"""
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    @property
+    def pdf(self):
+        """pdfplumber文档对象，首次访问时打开文件"""
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.file_path)
+        return self._pdf
+
+    @cached_property
+    def is_encrypted(self) -> bool:
+        """文件是否加密（包括空密码加密）"""
+        try:
+            return bool(self.pdf.doc.encryption)
+        except PDFPasswordIncorrect:
+            # 需要密码才能打开
+            return True
+
+    @cached_property
+    def num_pages(self) -> int:
+        """页数"""
+        return len(self.pdf.pages)
+
+    def page_text(self, page_num: int) -> str:
+        """
+        获取单页文本（pdfplumber），提取失败的页面返回空字符串
+
+        Args:
+            page_num: 页码，从0开始
+
+        Returns:
+            str: 页面文本
+        """
+        if page_num not in self._page_texts:
+            page = self.pdf.pages[page_num]
+            try:
+                self._page_texts[page_num] = page.extract_text() or ""
+            except MemoryError:
+                # 内存不足不是单页的问题，交给提取看门狗处理
+                raise
+            except Exception as e:
+                logger.warning(f"第{page_num + 1}页文本提取失败: {str(e)}")
+                self._page_texts[page_num] = ""
+            finally:
+                # 文本已缓存，释放页面的字符和布局缓存，长文档的内存占用不随页数增长
+                page.flush_cache()
+        return self._page_texts[page_num]
+
+    @property
+    def page_texts(self) -> List[str]:
+        """所有页面的文本（pdfplumber）"""
+        return [self.page_text(page_num) for page_num in range(self.num_pages)]
+
+    @cached_property
+    def pypdf2_reader(self) -> PyPDF2.PdfReader:
+        """PyPDF2读取器，复用已打开的文件句柄"""
+        return PyPDF2.PdfReader(self.pdf.stream)
+
+    def fallback_page_text(self, page_num: int) -> str:
+        """
+        获取单页文本（PyPDF2），提取失败的页面返回空字符串
+
+        Args:
+            page_num: 页码，从0开始
+
+        Returns:
+            str: 页面文本
+        """
+        if page_num not in self._fallback_page_texts:
+            try:
+                self._fallback_page_texts[page_num] = self.pypdf2_reader.pages[page_num].extract_text() or ""
+            except MemoryError:
+                raise
+            except Exception as e:
+                logger.warning(f"第{page_num + 1}页文本提取失败: {str(e)}")
+                self._fallback_page_texts[page_num] = ""
+        return self._fallback_page_texts[page_num]
+
+    @property
+    def fallback_page_texts(self) -> List[str]:
+        """所有页面的文本（PyPDF2）"""
+        return [self.fallback_page_text(page_num) for page_num in range(len(self.pypdf2_reader.pages))]
+
+    @property
+    def producer(self) -> str:
+        """文档信息中的生成工具名称"""
+        producer = self.pdf.metadata.get("Producer") or ""
+        return producer.decode('latin-1') if isinstance(producer, bytes) else str(producer)
+
+    def sample_text_features(self, sample_pages: int) -> Dict[str, int]:
+        """
+        用PyPDF2统计采样页的文本绘制指令数和字体数（包括页面引用的表单XObject）
+
+        Args:
+            sample_pages: 采样的页数（从第一页开始）
+
+        Returns:
+            Dict[str, int]: text_operators和font_count
+        """
+        text_operators = 0
+        fonts = set()
+        pending = [page for page in self.pypdf2_reader.pages[:sample_pages]]
+        while pending:
+            obj = pending.pop()
+            resources = obj.get("/Resources")
+            resources = resources.get_object() if resources is not None else {}
+
+            font_dict = resources.get("/Font")
+            if font_dict is not None:
+                for font in font_dict.get_object().values():
+                    fonts.add(str(font.get_object().get("/BaseFont", font)))
+
+            xobjects = resources.get("/XObject")
+            if xobjects is not None:
+                for xobject in xobjects.get_object().values():
+                    xobject = xobject.get_object()
+                    if xobject.get("/Subtype") == "/Form":
+                        pending.append(xobject)
+
+            if hasattr(obj, "get_contents"):
+                contents = obj.get_contents()
+                data = contents.get_data() if contents is not None else b""
+            else:
+                data = obj.get_data()
+            if data:
+                text_operators += len(_TEXT_OPERATOR_PATTERN.findall(data))
+
+        return {"text_operators": text_operators, "font_count": len(fonts)}
+
+
 class PDFParser:
     """PDF文本提取器"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache: 提取结果缓存（ExtractionCache），传入时extract_text_from_pdf先按文件哈希查询缓存
+        """
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         self.supported_extensions = ['.pdf']
+        self.cache = cache
     
-    def validate_pdf_file(self, file_path: str) -> Dict[str, Any]:
+    def validate_pdf_file(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> Dict[str, Any]:
         """
         验证PDF文件格式和完整性
         
         Args:
             file_path: PDF文件路径
+            session: 已创建的文档会话，传入时验证读取的内容会被后续提取复用
             
         Returns:
             验证结果字典，包含is_valid, error_message, file_info
@@ -66,50 +307,153 @@ class PDFParser:
                 return result
             
             # 尝试打开PDF文件验证完整性
+            owns_session = session is None
+            if owns_session:
+                session = PDFDocumentSession(file_path)
             try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    
-                    # 检查是否加密
-                    if pdf_reader.is_encrypted:
-                        result['error_message'] = 'PDF文件已加密，无法处理'
-                        return result
-                    
-                    # 获取基本信息
-                    num_pages = len(pdf_reader.pages)
-                    if num_pages == 0:
-                        result['error_message'] = 'PDF文件为空'
-                        return result
-                    
-                    # 尝试读取第一页验证可读性
-                    first_page = pdf_reader.pages[0]
-                    first_page.extract_text()
-                    
-                    result['file_info'] = {
-                        'file_size': file_size,
-                        'num_pages': num_pages,
-                        'file_name': Path(file_path).name
-                    }
-                    
+                # 检查是否加密
+                if session.is_encrypted:
+                    result['error_message'] = 'PDF文件已加密，无法处理'
+                    return result
+                
+                # 获取基本信息
+                num_pages = session.num_pages
+                if num_pages == 0:
+                    result['error_message'] = 'PDF文件为空'
+                    return result
+                
+                # 尝试读取第一页验证可读性，结果缓存在会话中
+                session.page_text(0)
+                
+                result['file_info'] = {
+                    'file_size': file_size,
+                    'num_pages': num_pages,
+                    'file_name': Path(file_path).name
+                }
+                
+            except MemoryError:
+                raise
             except Exception as e:
                 result['error_message'] = f'PDF文件损坏或格式错误: {str(e)}'
                 return result
+            finally:
+                if owns_session:
+                    session.close()
             
             result['is_valid'] = True
             logger.info(f"PDF文件验证成功: {file_path}")
             return result
             
+        except MemoryError:
+            raise
         except Exception as e:
             logger.error(f"PDF文件验证失败: {str(e)}")
             result['error_message'] = f'文件验证过程中发生错误: {str(e)}'
             return result
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    def open_session(self, file_path: str) -> PDFDocumentSession:
+        """
+        创建文档会话，验证、提取和统计共享同一次文件解析
+        
+        Args:
+            file_path: PDF文件路径
+            
+        Returns:
+            PDFDocumentSession: 文档会话，使用完毕后需要关闭
+        """
+        return PDFDocumentSession(file_path)
+    
+    def probe_document(self, session: PDFDocumentSession) -> Dict[str, Any]:
+        """
+        探测文档特征并选择唯一的提取引擎，结果缓存在会话中
+        
+        用PyPDF2采样前几页的字体和文本绘制指令，并比较两种引擎在第一页提取的字符数
+        （pdfplumber的第一页文本在验证时已提取并缓存），额外开销只有一页的PyPDF2提取。
+        
+        Args:
+            session: 已通过验证的文档会话
+            
+        Returns:
+            Dict[str, Any]: engine、reason和features
+        """
+        if session.probe is not None:
+            return session.probe
+        
+        try:
+            features = session.sample_text_features(PROBE_SAMPLE_PAGES)
+            features.update({
+                "sampled_pages": min(PROBE_SAMPLE_PAGES, session.num_pages),
+                "producer": session.producer,
+                "pdfplumber_chars": len(session.page_text(0).strip()),
+                "pypdf2_chars": len(session.fallback_page_text(0).strip())
+            })
+            engine, reason = choose_engine(features)
+        except MemoryError:
+            raise
+        except Exception as e:
+            logger.warning(f"PDF文档探测失败: {str(e)}")
+            features = {}
+            engine, reason = ENGINE_AUTO, f"文档探测失败（{str(e)}），先用pdfplumber提取，文本过少时再用PyPDF2"
+        
+        logger.info(f"选择提取引擎: {engine}，原因: {reason}")
+        session.probe = {"engine": engine, "reason": reason, "features": features}
+        return session.probe
+    
+    def extract_document(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> Dict[str, Any]:
+        """
+        从PDF文件中提取文本内容和提取元数据
+        
+        Args:
+            file_path: PDF文件路径
+            session: 已创建的文档会话，不传时在内部创建并关闭
+            
+        Returns:
+            Dict[str, Any]: text为清理后的文本，metadata包含实际使用的引擎、选择原因、探测特征和版本号
+            
+        Raises:
+            PDFParseError: 当文本提取失败时
+        """
+        if session is None:
+            if self.cache is not None and os.path.exists(file_path):
+                return self._extract_with_cache(file_path)
+            with self.open_session(file_path) as session:
+                return self.extract_document(file_path, session)
+        
+        if session.document is not None:
+            return session.document
+        
+        # 首先验证文件
+        validation_result = self.validate_pdf_file(file_path, session=session)
+        if not validation_result['is_valid']:
+            raise PDFParseError(validation_result['error_message'])
+        
+        probe = self.probe_document(session)
+        if probe["engine"] == ENGINE_NONE:
+            # 扫描件不再做两遍完整提取
+            raise PDFParseError("PDF文件中未找到可提取的文本内容")
+        
+        try:
+            if probe["engine"] == ENGINE_PYPDF2:
+                logger.info("使用PyPDF2提取文本...")
+                extracted_text = self._extract_with_pypdf2(file_path, session)
+            else:
+                # 优先使用pdfplumber，处理复杂布局更好
+                logger.info("使用pdfplumber提取文本...")
+                extracted_text = self._extract_with_pdfplumber(file_path, session)
+        except Exception as e:
+            logger.error(f"PDF文本提取失败: {str(e)}")
+            raise PDFParseError(f"无法提取PDF文本内容: {str(e)}")
+        
+        session.document = self._build_document(file_path, extracted_text, probe, session.num_pages, session)
+        return session.document
+    
+    def extract_text_from_pdf(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> str:
         """
         从PDF文件中提取文本内容
         
         Args:
             file_path: PDF文件路径
+            session: 已创建的文档会话，不传时在内部创建并关闭
             
         Returns:
             提取的文本内容
@@ -117,24 +461,135 @@ class PDFParser:
         Raises:
             PDFParseError: 当文本提取失败时
         """
-        # 首先验证文件
-        validation_result = self.validate_pdf_file(file_path)
+        return self.extract_document(file_path, session)["text"]
+    
+    def _extract_with_cache(self, file_path: str) -> Dict[str, Any]:
+        """按文件内容哈希查询提取缓存，未命中时提取并写入缓存"""
+        # extraction_cache依赖本模块的版本号，在这里导入避免循环导入
+        from backend.services.extraction_cache import compute_file_sha256
+        
+        content_hash = compute_file_sha256(file_path)
+        cached = self.cache.get(content_hash)
+        if cached is not None:
+            return cached
+        
+        with self.open_session(file_path) as session:
+            document = self.extract_document(file_path, session)
+        self.cache.set(content_hash, document)
+        return document
+    
+    def iter_pages(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐页提取并清理文本，每提取完一页立即返回
+        
+        调用方可以在整个文档提取完成前开始后续处理或上报页级进度。
+        每页提取后释放该页的解析缓存，内存占用与页数无关。
+        
+        Args:
+            file_path: PDF文件路径
+            session: 已创建的文档会话，不传时在内部创建并在迭代结束后关闭
+            
+        Yields:
+            Dict[str, Any]: page_num（从1开始）、total_pages和清理后的text，提取失败的页面text为空字符串
+            
+        Raises:
+            PDFParseError: 当文件验证失败时
+        """
+        if session is None:
+            with self.open_session(file_path) as session:
+                yield from self.iter_pages(file_path, session)
+            return
+        
+        validation_result = self.validate_pdf_file(file_path, session=session)
         if not validation_result['is_valid']:
             raise PDFParseError(validation_result['error_message'])
         
-        extracted_text = ""
+        total_pages = session.num_pages
+        for page_num in range(total_pages):
+            yield {
+                "page_num": page_num + 1,
+                "total_pages": total_pages,
+                "text": self.clean_and_preprocess_text(session.page_text(page_num))
+            }
+    
+    async def aiter_pages(self, file_path: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        iter_pages的异步版本，每页在线程池中提取，不阻塞事件循环
         
+        Args:
+            file_path: PDF文件路径
+            
+        Yields:
+            Dict[str, Any]: 与iter_pages相同的页面信息
+            
+        Raises:
+            PDFParseError: 当文件验证失败时
+        """
+        session = self.open_session(file_path)
+        pages = self.iter_pages(file_path, session)
         try:
-            # 方法1: 优先使用pdfplumber，处理复杂布局更好
-            logger.info("尝试使用pdfplumber提取文本...")
-            extracted_text = self._extract_with_pdfplumber(file_path)
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+                yield page
+        finally:
+            pages.close()
+            await asyncio.to_thread(session.close)
+    
+    def extract_page_range(self, file_path: str, start: int, end: int,
+                           engine: str = ENGINE_PDFPLUMBER) -> List[str]:
+        """
+        提取指定页码范围内每页的文本，用于多进程分段提取长文档
+        
+        Args:
+            file_path: PDF文件路径
+            start: 起始页码（从0开始，包含）
+            end: 结束页码（不包含），超出页数时截断
+            engine: 探测阶段选择的提取引擎
+            
+        Returns:
+            List[str]: 每页文本，提取失败的页面为空字符串
+        """
+        with self.open_session(file_path) as session:
+            page_text = session.fallback_page_text if engine == ENGINE_PYPDF2 else session.page_text
+            return [page_text(page_num) for page_num in range(start, min(end, session.num_pages))]
+    
+    def assemble_page_texts(self, file_path: str, page_texts: List[str], probe: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将分段提取的逐页文本按顺序拼接，并执行与extract_document相同的备用提取和清理
+        
+        Args:
+            file_path: PDF文件路径（引擎为auto且文本过少时用于PyPDF2备用提取）
+            page_texts: 按页码顺序排列的每页文本
+            probe: 探测阶段的结果
             
-            # 如果pdfplumber提取的文本太少，尝试PyPDF2
-            if len(extracted_text.strip()) < 50:
-                logger.info("pdfplumber提取文本较少，尝试使用PyPDF2...")
-                pypdf2_text = self._extract_with_pypdf2(file_path)
-                if len(pypdf2_text.strip()) > len(extracted_text.strip()):
-                    extracted_text = pypdf2_text
+        Returns:
+            Dict[str, Any]: 与extract_document相同的提取结果
+            
+        Raises:
+            PDFParseError: 当文本提取失败时
+        """
+        return self._build_document(file_path, self._join_pages(page_texts), probe, len(page_texts))
+    
+    def _build_document(self, file_path: str, extracted_text: str, probe: Dict[str, Any],
+                        num_pages: int, session: Optional[PDFDocumentSession] = None) -> Dict[str, Any]:
+        """
+        对提取的文本执行备用提取、空文本检查和清理，生成提取结果
+        
+        只有探测无法判断（引擎为auto）时，才在pdfplumber文本过少时再用PyPDF2提取一遍
+        """
+        engine = probe["engine"]
+        reason = probe["reason"]
+        try:
+            if engine == ENGINE_AUTO:
+                engine = ENGINE_PDFPLUMBER
+                if len(extracted_text.strip()) < MIN_TEXT_CHARS:
+                    logger.info("pdfplumber提取文本较少，尝试使用PyPDF2...")
+                    pypdf2_text = self._extract_with_pypdf2(file_path, session)
+                    if len(pypdf2_text.strip()) > len(extracted_text.strip()):
+                        extracted_text = pypdf2_text
+                        engine = ENGINE_PYPDF2
             
         except Exception as e:
             logger.error(f"PDF文本提取失败: {str(e)}")
@@ -147,38 +602,57 @@ class PDFParser:
         cleaned_text = self.clean_and_preprocess_text(extracted_text)
         
         logger.info(f"成功提取PDF文本，长度: {len(cleaned_text)} 字符")
-        return cleaned_text
+        return {
+            "text": cleaned_text,
+            # 章节区间的偏移量对应清理后的文本
+            "sections": section_segmenter.segment(cleaned_text),
+            "metadata": {
+                "engine": engine,
+                "engine_reason": reason,
+                "probe_features": probe["features"],
+                "num_pages": num_pages,
+                "extractor_version": EXTRACTOR_VERSION,
+                "cleaning_version": CLEANING_VERSION
+            }
+        }
+    
+    def get_document_statistics(self, session: PDFDocumentSession) -> Dict[str, Any]:
+        """
+        获取文档会话的文本统计信息，结果缓存在会话中
+        
+        Args:
+            session: 文档会话
+            
+        Returns:
+            统计信息字典
+        """
+        if session.statistics is None:
+            session.statistics = self.get_text_statistics(
+                self.extract_text_from_pdf(session.file_path, session)
+            )
+        return session.statistics
     
-    def _extract_with_pdfplumber(self, file_path: str) -> str:
+    def _join_pages(self, page_texts: List[str]) -> str:
+        """拼接带页面分隔符的文本"""
+        return "".join(
+            f"\n--- 第{page_num + 1}页 ---\n{page_text}\n"
+            for page_num, page_text in enumerate(page_texts)
+            if page_text
+        )
+    
+    def _extract_with_pdfplumber(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> str:
         """使用pdfplumber提取文本"""
-        text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"\n--- 第{page_num + 1}页 ---\n"
-                        text += page_text + "\n"
-                except Exception as e:
-                    logger.warning(f"第{page_num + 1}页文本提取失败: {str(e)}")
-                    continue
-        return text
+        if session is None:
+            with self.open_session(file_path) as session:
+                return self._join_pages(session.page_texts)
+        return self._join_pages(session.page_texts)
     
-    def _extract_with_pypdf2(self, file_path: str) -> str:
+    def _extract_with_pypdf2(self, file_path: str, session: Optional[PDFDocumentSession] = None) -> str:
         """使用PyPDF2提取文本"""
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"\n--- 第{page_num + 1}页 ---\n"
-                        text += page_text + "\n"
-                except Exception as e:
-                    logger.warning(f"第{page_num + 1}页文本提取失败: {str(e)}")
-                    continue
-        return text
+        if session is None:
+            with self.open_session(file_path) as session:
+                return self._join_pages(session.fallback_page_texts)
+        return self._join_pages(session.fallback_page_texts)
     
     def clean_and_preprocess_text(self, raw_text: str) -> str:
         """
@@ -190,50 +664,11 @@ class PDFParser:
         Returns:
             清理后的文本
         """
-        if not raw_text:
-            return ""
-        
-        # 移除页面分隔符
-        text = re.sub(r'--- 第\d+页 ---\n?', '', raw_text)
-        
-        # 统一换行符
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # 移除多余的空白字符
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # 多个连续换行变为两个
-        text = re.sub(r'[ \t]+', ' ', text)      # 多个空格/制表符变为一个空格
-        
-        # 移除行首行尾空白
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
-        # 移除开头和结尾的空白
-        text = text.strip()
-        
-        # 修复常见的PDF提取问题
-        text = self._fix_common_pdf_issues(text)
-        
-        return text
+        return text_normalizer.normalize(raw_text)
     
     def _fix_common_pdf_issues(self, text: str) -> str:
         """修复PDF提取中的常见问题"""
-        
-        # 修复被分割的单词（英文）
-        text = re.sub(r'([a-z])-\s*\n\s*([a-z])', r'\1\2', text)
-        
-        # 修复电子邮件地址被分割的问题
-        text = re.sub(r'([a-zA-Z0-9._%-]+)\s+([a-zA-Z0-9._%-]+)\s*@\s*([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', r'\1\2@\3', text)
-        text = re.sub(r'([a-zA-Z0-9._%-]+)\s*@\s*([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', r'\1@\2', text)
-        
-        # 修复电话号码格式
-        text = re.sub(r'(\d{3})\s*-\s*(\d{4})\s*-\s*(\d{4})', r'\1-\2-\3', text)
-        text = re.sub(r'(\d{3})\s+(\d{4})\s+(\d{4})', r'\1-\2-\3', text)
-        
-        # 修复日期格式
-        text = re.sub(r'(\d{4})\s*/\s*(\d{1,2})\s*/\s*(\d{1,2})', r'\1/\2/\3', text)
-        text = re.sub(r'(\d{4})\s*-\s*(\d{1,2})\s*-\s*(\d{1,2})', r'\1-\2-\3', text)
-        
-        return text
+        return text_normalizer.fix_common_pdf_issues(text)
     
     def get_text_statistics(self, text: str) -> Dict[str, Any]:
         """
@@ -261,23 +696,12 @@ class PDFParser:
         line_count = len([line for line in text.split('\n') if line.strip()])
         
         # 检查是否包含关键信息
-        has_email = bool(re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text))
-        has_phone = bool(re.search(r'(\d{3}[-.\s]?\d{3,4}[-.\s]?\d{4})', text))
-        
-        # 估算简历章节数量（基于常见标题关键词）
-        section_keywords = [
-            '个人信息', '基本信息', '联系方式',
-            '工作经历', '工作经验', '职业经历',
-            '教育背景', '教育经历', '学历',
-            '技能', '专业技能', '技术技能',
-            '项目经验', '项目经历',
-            '自我评价', '个人简介'
-        ]
-        
-        estimated_sections = 0
-        for keyword in section_keywords:
-            if keyword in text:
-                estimated_sections += 1
+        # 与AI解析前的联系方式预提取使用同样的规则
+        has_email = bool(EMAIL_PATTERN.search(text))
+        has_phone = bool(PHONE_PATTERN.search(text))
+        
+        # 估算简历章节数量（一次扫描找出所有标题行，按章节类型计数）
+        estimated_sections = len(section_segmenter.section_types(text))
         
         return {
             'char_count': char_count,
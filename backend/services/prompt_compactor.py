@@ -0,0 +1,200 @@
+"""
+提示词压缩
+在调用通义千问之前压缩简历文本，减少提示词token：
+
+- 去除空行、页码行（如"第1页/共2页"、"Page 2 of 3"、"- 2 -"）和简历模板套话；
+  "2/3"形式的行只有组成页码序列时才去除，单独的数字不视为页码（表格简历中的单元格）
+- 去除重复行：较长的行和出现多次的行（多页简历每页重复的页眉页脚）只保留第一次出现
+- 超出token预算时，先截短自我评价、项目经历等低价值章节，
+  联系方式、工作经历、教育背景和技能最后才会被截短
+
+token数在本地估计，不调用任何接口。
+"""
+
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.config.pipeline_config import PROMPT_COMPACTION_CONFIG
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.section_segmenter import (
+    section_segmenter,
+    SECTION_PREAMBLE,
+    SECTION_PERSONAL_INFO,
+)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 压缩规则版本，规则变化时AI解析缓存随之失效
+COMPACTION_VERSION = "2"
+
+# 页码行
+_PAGE_NUMBER = re.compile(
+    r'^(?:第\s*\d+\s*页(?:\s*[/，,]?\s*共\s*\d+\s*页)?|共\s*\d+\s*页\s*第\s*\d+\s*页'
+    r'|page\s+\d+(?:\s*(?:of|/)\s*\d+)?|[-–—]\s*\d{1,3}\s*[-–—])$',
+    re.IGNORECASE
+)
+
+# "当前页/总页数"形式的行，与评分等表格内容（如"4/5"）无法单独区分，需按序列判断
+_PAGE_FRACTION = re.compile(r'^(\d{1,3})\s*/\s*(\d{1,3})$')
+
+# 不含信息的模板套话
+_BOILERPLATE = re.compile(
+    r'^(?:个人简历|求职简历|简历|resume|curriculum vitae|cv'
+    r'|references available upon request|以上信息真实有效.*|本人承诺以上信息.*)$',
+    re.IGNORECASE
+)
+
+# 只在最后才截短的章节（联系方式所在的开头部分）
+_CONTACT_SECTIONS = {SECTION_PREAMBLE, SECTION_PERSONAL_INFO}
+
+
+class PromptCompactor:
+    """简历文本压缩器"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 压缩配置，覆盖PROMPT_COMPACTION_CONFIG中的同名项
+        """
+        config = {**PROMPT_COMPACTION_CONFIG, **(config or {})}
+        self.text_token_budget = config["text_token_budget"]
+        self.min_duplicate_chars = config["min_duplicate_chars"]
+        self.repeat_threshold = config["repeat_threshold"]
+        self.low_value_sections = list(config["low_value_sections"])
+
+    def compact(self, text: str, token_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        压缩简历文本
+
+        Args:
+            text: 规范化后的简历文本
+            token_budget: 简历文本的token预算，默认使用配置中的text_token_budget，0表示不限制
+
+        Returns:
+            Dict[str, Any]: 压缩结果
+                text: 压缩后的文本
+                tokens_before: 压缩前的估计token数
+                tokens_after: 压缩后的估计token数
+                removed_lines: 去除的页码、套话和重复行数
+                trimmed_sections: 因超出预算被截短或删除的章节类型
+        """
+        budget = self.text_token_budget if token_budget is None else token_budget
+        tokens_before = estimate_tokens(text)
+
+        compacted, removed_lines = self._remove_redundant_lines(text)
+        trimmed_sections: List[str] = []
+        if budget and estimate_tokens(compacted) > budget:
+            compacted, trimmed_sections = self._trim_to_budget(compacted, budget)
+
+        return {
+            "text": compacted,
+            "tokens_before": tokens_before,
+            "tokens_after": estimate_tokens(compacted),
+            "removed_lines": removed_lines,
+            "trimmed_sections": trimmed_sections
+        }
+
+    def _remove_redundant_lines(self, text: str) -> Tuple[str, int]:
+        """去除空行、页码行、套话和重复行，返回(文本, 去除的非空行数)"""
+        lines = [line.strip() for line in text.split('\n')]
+        counts = Counter(lines)
+        page_fractions = self._page_fraction_lines(lines)
+        seen = set()
+        kept = []
+        removed = 0
+        for line in lines:
+            if not line:
+                continue
+            if _PAGE_NUMBER.match(line) or _BOILERPLATE.match(line) or line in page_fractions:
+                removed += 1
+                continue
+            # 较短的行（如"Python"、"2020-2022"）在不同经历中重复是正常的，只有反复出现时才视为页眉页脚
+            if line in seen and (len(line) >= self.min_duplicate_chars or counts[line] >= self.repeat_threshold):
+                removed += 1
+                continue
+            seen.add(line)
+            kept.append(line)
+        return '\n'.join(kept), removed
+
+    @staticmethod
+    def _page_fraction_lines(lines: List[str]) -> Set[str]:
+        """
+        找出组成页码序列的"当前页/总页数"行
+
+        总页数相同的行中，每个页码只出现一次、页码连续且以最后一页结束时视为页码
+        （第一页常常没有页码，不要求从1开始），否则视为表格内容（如技能评分"4/5"）。
+        """
+        lines_by_total: Dict[int, Dict[int, List[str]]] = {}
+        for line in lines:
+            match = _PAGE_FRACTION.match(line)
+            if match:
+                lines_by_total.setdefault(int(match.group(2)), {}).setdefault(int(match.group(1)), []).append(line)
+
+        page_lines = set()
+        for total, lines_by_page in lines_by_total.items():
+            pages = sorted(lines_by_page)
+            once = all(len(found) == 1 for found in lines_by_page.values())
+            if once and pages[0] >= 1 and pages[-1] == total and pages[-1] - pages[0] == len(pages) - 1:
+                page_lines.update(found[0] for found in lines_by_page.values())
+        return page_lines
+
+    def _trim_to_budget(self, text: str, budget: int) -> Tuple[str, List[str]]:
+        """
+        按章节价值从低到高截短，直到估计token数不超过预算
+
+        顺序：配置的低价值章节 -> 其他章节（从长到短）-> 联系方式所在章节。
+        每个章节从末尾按行截短，有标题的章节只剩标题行时整个删除。
+        """
+        sections = section_segmenter.segment(text)
+        pieces = [[section["type"], text[section["start"]:section["end"]].strip()] for section in sections]
+        tokens = [estimate_tokens(piece) for _, piece in pieces]
+        total = sum(tokens)
+
+        low_value = [
+            index for section_type in self.low_value_sections
+            for index in reversed(range(len(pieces))) if pieces[index][0] == section_type
+        ]
+        others = sorted(
+            (index for index in range(len(pieces))
+             if pieces[index][0] not in self.low_value_sections and pieces[index][0] not in _CONTACT_SECTIONS),
+            key=lambda index: tokens[index], reverse=True
+        )
+        contact = [index for index in range(len(pieces)) if pieces[index][0] in _CONTACT_SECTIONS]
+
+        trimmed_sections = []
+        for index in low_value + others + contact:
+            if total <= budget:
+                break
+            allowed = max(0, tokens[index] - (total - budget))
+            pieces[index][1] = self._truncate_lines(pieces[index][1], allowed, bool(sections[index]["title"]))
+            new_tokens = estimate_tokens(pieces[index][1])
+            total -= tokens[index] - new_tokens
+            tokens[index] = new_tokens
+            trimmed_sections.append(pieces[index][0])
+
+        return '\n'.join(piece for _, piece in pieces if piece), trimmed_sections
+
+    @staticmethod
+    def _truncate_lines(piece: str, allowed_tokens: int, has_title: bool) -> str:
+        """保留开头不超过allowed_tokens的整行，有标题的章节只剩标题行时返回空字符串"""
+        kept = []
+        used = 0
+        for line in piece.split('\n'):
+            # 加上换行符的token
+            line_tokens = estimate_tokens(line) + 1
+            if used + line_tokens > allowed_tokens:
+                break
+            kept.append(line)
+            used += line_tokens
+        if has_title and len(kept) <= 1:
+            return ""
+        return '\n'.join(kept)
+
+
+# 创建全局实例
+prompt_compactor = PromptCompactor()
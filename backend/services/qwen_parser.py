@@ -1,33 +1,107 @@
 """
 通义千问API集成服务
-实现简历文本的AI解析功能
+实现简历文本的AI解析功能。
+同步接口通过dashscope SDK调用，供脚本和示例使用；
+服务端使用异步接口，通过共享连接池的AsyncQwenClient调用，不阻塞事件循环。
+配置了解析缓存时，相同内容的简历直接返回缓存的结构化结果，不再调用API。
+启用按章节解析时，简历按章节拆分为多个并发的较小请求，结果合并后再构建ResumeData。
+响应不是有效的JSON时先在本地修复，只有无法修复时才重新调用API
 """
 
+import re
 import json
+import time
+import asyncio
 import logging
 import os
-from typing import Dict, Any, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from datetime import datetime
 import dashscope
 from dashscope import Generation
 from pydantic import ValidationError
 
 from models.resume import ResumeData, PersonalInfo, WorkExperience, Education, Skill
+from backend.services.llm_client import AsyncQwenClient, LLMClientError
+from backend.services.llm_cache import LLMCache, compute_prompt_version, make_llm_cache_key
+from backend.services.rate_limiter import RateLimiter, RateLimitTimeoutError, estimate_tokens
+from backend.services.prompt_compactor import prompt_compactor, COMPACTION_VERSION
+from backend.services.contact_extractor import (
+    contact_extractor,
+    PRE_EXTRACTION_VERSION,
+    PRE_EXTRACTION_INSTRUCTIONS,
+)
+from backend.services.incremental_json import IncrementalJSONParser, IncrementalJSONError
+from backend.services.json_repair import repair_json, fill_defaults, JSONRepairError
+from backend.services.response_formats import (
+    RESPONSE_FORMAT_FULL,
+    RESPONSE_FORMAT_COMPACT,
+    RESPONSE_FORMATS,
+    COMPACT_FORMAT_INSTRUCTIONS,
+    COMPACT_KEYS,
+    RESPONSE_SCHEMA,
+    decode_compact_response,
+)
+from backend.services.sectioned_extraction import (
+    sectioned_extractor,
+    SECTIONED_EXTRACTION_VERSION,
+    PART_PERSONAL_INFO,
+    PART_WORK_EXPERIENCE,
+    PART_EDUCATION,
+    PART_SKILLS,
+    PARTS,
+)
+from backend.config.pipeline_config import PROMPT_COMPACTION_CONFIG, QWEN_PARSE_CONFIG, SECTIONED_PARSING_CONFIG
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 解析提示中每个部分的要求
+PART_REQUIREMENTS = {
+    PART_PERSONAL_INFO: "仔细识别个人基本信息，包括姓名、联系方式等",
+    PART_WORK_EXPERIENCE: "按时间顺序整理工作经历，提取公司、职位、时间、工作内容",
+    PART_EDUCATION: "提取教育背景信息",
+    PART_SKILLS: "从专业技能、项目经历中提取技能信息，并进行合理分类",
+}
+
+# 按章节解析时每个部分的名称
+PART_LABELS = {
+    PART_PERSONAL_INFO: "个人基本信息",
+    PART_WORK_EXPERIENCE: "工作经历",
+    PART_EDUCATION: "教育背景",
+    PART_SKILLS: "技能信息",
+}
+
+
+# 流式输出中JSON的开始
+_JSON_START = re.compile(r'[{\[]')
+
+
 class QwenParseError(Exception):
     """通义千问解析异常"""
     pass
 
 
+class QwenOutputError(QwenParseError):
+    """AI输出无法解析（不是有效的JSON且无法修复，或结构不正确），重新调用可能成功"""
+    pass
+
+
 class QwenResumeParser:
     """通义千问简历解析器"""
     
-    def __init__(self):
+    def __init__(self, client_config: Optional[Dict[str, Any]] = None, cache: Optional[LLMCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            client_config: 异步客户端配置，覆盖LLM_CLIENT_CONFIG中的同名项（如测试时指定base_url）
+            cache: AI解析结果缓存，不传时不缓存
+            rate_limiter: API调用限流器，不传时不限流
+        """
         # 从环境变量获取API密钥
         self.api_key = os.getenv("DASHSCOPE_API_KEY")
         if not self.api_key:
@@ -40,13 +114,65 @@ class QwenResumeParser:
         self.model = "qwen-turbo"  # 可选: qwen-plus, qwen-max
         self.max_tokens = 2000
         self.temperature = 0.1  # 较低的温度确保输出稳定
+        self.top_p = 0.8
+        
+        # 默认的响应格式，每次解析可以单独指定
+        self.response_format = QWEN_PARSE_CONFIG["response_format"]
+        
+        # 异步客户端，所有解析任务共享连接池
+        self.client = AsyncQwenClient(self.api_key, client_config)
+        
+        # 异步接口流式生成，已完成的字段通过进度回调上报，输出格式错误时提前中止
+        self.stream = QWEN_PARSE_CONFIG["stream"]
+        self.stream_progress_tokens = QWEN_PARSE_CONFIG["stream_progress_tokens"]
+        self.expected_output_ratio = QWEN_PARSE_CONFIG["expected_output_ratio"]
+        
+        # 响应不是有效的JSON时先在本地修复，无法修复时才重新调用
+        self.json_repair = QWEN_PARSE_CONFIG["json_repair"]
+        self.repair_recalls = QWEN_PARSE_CONFIG["repair_recalls"]
+        self._repair_counts: Counter = Counter()
+        self._repair_types: Counter = Counter()
+        
+        # 联系方式和时间段在本地预提取，提示中不再要求AI输出这些字段
+        self.pre_extractor = contact_extractor if QWEN_PARSE_CONFIG["pre_extract"] else None
+        pre_extracted = self.pre_extractor is not None
+        
+        # 提示词压缩，去除页码、套话和重复行，超出预算时截短低价值章节
+        self.compactor = prompt_compactor if PROMPT_COMPACTION_CONFIG["enabled"] else None
+        self._template_tokens = {
+            response_format: estimate_tokens(self._build_parse_prompt("", response_format, pre_extracted))
+            for response_format in RESPONSE_FORMATS
+        }
+        
+        # 按章节拆分为多个并发的较小请求，总耗时取决于最慢的请求
+        self.sectioned = sectioned_extractor if SECTIONED_PARSING_CONFIG["enabled"] else None
+        sectioned = self.sectioned is not None
+        
+        # 解析结果缓存，提示模板版本随各格式的模板内容（和压缩、预提取、拆分规则）变化，修改后旧缓存自然失效
+        self.cache = cache
+        self.prompt_version = compute_prompt_version(
+            lambda text: "\n".join(
+                [self._build_parse_prompt(text, response_format, pre_extracted) for response_format in RESPONSE_FORMATS]
+                + [self._build_section_prompt(part, text, pre_extracted) for part in PARTS if sectioned]
+            )
+        )
+        if self.compactor is not None:
+            self.prompt_version += f"-c{COMPACTION_VERSION}"
+        if pre_extracted:
+            self.prompt_version += f"-x{PRE_EXTRACTION_VERSION}"
+        if sectioned:
+            self.prompt_version += f"-s{SECTIONED_EXTRACTION_VERSION}"
+        
+        # 调用限流器，超出额度的请求排队等待
+        self.rate_limiter = rate_limiter
     
-    def parse_resume_text(self, resume_text: str) -> ResumeData:
+    def parse_resume_text(self, resume_text: str, response_format: Optional[str] = None) -> ResumeData:
         """
         使用通义千问API解析简历文本
         
         Args:
             resume_text: 从PDF提取的简历文本
+            response_format: 响应格式（full或compact），默认使用配置中的格式
             
         Returns:
             解析后的结构化简历数据
@@ -56,20 +182,100 @@ class QwenResumeParser:
         """
         if not resume_text or not resume_text.strip():
             raise QwenParseError("简历文本为空，无法进行解析")
+        response_format = self._resolve_response_format(response_format)
         
         try:
-            # 构建解析提示
-            prompt = self._build_parse_prompt(resume_text)
+            # 查询解析缓存
+            cache_key = self._cache_key(resume_text, response_format)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("命中AI解析缓存，跳过API调用")
+                    return self._build_resume_data(cached)
             
-            # 调用通义千问API
-            logger.info("开始调用通义千问API解析简历...")
-            response = self._call_qwen_api(prompt)
+            # 预提取联系方式和时间段
+            extracted = self._pre_extract(resume_text)
+            text = extracted["text"] if extracted else resume_text
+            
+            sections = self._plan_sections(text, extracted is not None)
+            if sections:
+                # 按章节并发调用通义千问API并合并结果
+                parsed_data = self._parse_sections(sections)
+            else:
+                # 压缩简历文本并构建解析提示，调用通义千问API
+                prompt = self._prepare_prompt(text, response_format, extracted is not None)
+                logger.info("开始调用通义千问API解析简历...")
+                
+                # 解析API响应，无法修复时重新调用
+                _, parsed_data = self._call_and_parse(
+                    prompt, lambda response: self._parse_api_response(response, response_format)
+                )
+            
+            # 合并本地提取的字段，验证和构建ResumeData对象
+            resume_data = self._build_resume_data(parsed_data, extracted)
+            
+            # 只缓存通过校验的结果
+            if cache_key is not None:
+                self.cache.set(cache_key, self._cache_payload(resume_data))
+            
+            logger.info("简历解析成功完成")
+            return resume_data
+            
+        except Exception as e:
+            logger.error(f"简历解析失败: {str(e)}")
+            raise QwenParseError(f"简历解析过程中发生错误: {str(e)}")
+    
+    async def parse_resume_text_async(self, resume_text: str,
+                                      on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None,
+                                      response_format: Optional[str] = None,
+                                      on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> ResumeData:
+        """
+        使用通义千问API异步解析简历文本，返回值和异常与parse_resume_text相同
+        
+        请求通过共享连接池发送，等待响应期间不阻塞事件循环。
+        启用流式生成时边生成边解析；未启用JSON修复时，输出不是有效JSON立即中止，不等待生成结束。
+        
+        Args:
+            resume_text: 从PDF提取的简历文本
+            on_queued: 因限流排队时的回调，参数为排队位置（从1开始）和已等待秒数
+            response_format: 响应格式（full或compact），默认使用配置中的格式
+            on_progress: 生成进度回调，参数包含progress（0到1的估计进度）、generated_tokens
+                和partial_result（已完成的字段，完整格式，已合并本地预提取的值）
+        """
+        if not resume_text or not resume_text.strip():
+            raise QwenParseError("简历文本为空，无法进行解析")
+        response_format = self._resolve_response_format(response_format)
+        
+        try:
+            # Redis缓存的读写是阻塞调用，放到线程中执行
+            cache_key = self._cache_key(resume_text, response_format)
+            if cache_key is not None:
+                cached = await asyncio.to_thread(self.cache.get, cache_key)
+                if cached is not None:
+                    logger.info("命中AI解析缓存，跳过API调用")
+                    return self._build_resume_data(cached)
+            
+            extracted = self._pre_extract(resume_text)
+            text = extracted["text"] if extracted else resume_text
             
-            # 解析API响应
-            parsed_data = self._parse_api_response(response)
+            sections = self._plan_sections(text, extracted is not None)
+            if sections:
+                parsed_data = await self._parse_sections_async(sections, on_queued, on_progress, extracted)
+            else:
+                prompt = self._prepare_prompt(text, response_format, extracted is not None)
+                logger.info("开始调用通义千问API解析简历...")
+                make_on_chunk = None
+                if self.stream:
+                    expected_tokens = estimate_tokens(text) * self.expected_output_ratio[response_format]
+                    make_on_chunk = lambda: self._stream_handler(response_format, expected_tokens, extracted, on_progress)
+                _, parsed_data = await self._call_and_parse_async(
+                    prompt, lambda response: self._parse_api_response(response, response_format),
+                    on_queued, make_on_chunk
+                )
+            resume_data = self._build_resume_data(parsed_data, extracted)
             
-            # 验证和构建ResumeData对象
-            resume_data = self._build_resume_data(parsed_data)
+            if cache_key is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, self._cache_payload(resume_data))
             
             logger.info("简历解析成功完成")
             return resume_data
@@ -78,8 +284,146 @@ class QwenResumeParser:
             logger.error(f"简历解析失败: {str(e)}")
             raise QwenParseError(f"简历解析过程中发生错误: {str(e)}")
     
-    def _build_parse_prompt(self, resume_text: str) -> str:
-        """构建解析提示模板"""
+    def _resolve_response_format(self, response_format: Optional[str]) -> str:
+        """确定本次解析的响应格式"""
+        response_format = response_format or self.response_format
+        if response_format not in RESPONSE_FORMATS:
+            raise QwenParseError(f"不支持的响应格式: {response_format}")
+        return response_format
+    
+    def _cache_key(self, resume_text: str, response_format: str = RESPONSE_FORMAT_FULL) -> Optional[str]:
+        """生成解析缓存键，未配置缓存时返回None"""
+        if self.cache is None:
+            return None
+        return make_llm_cache_key(resume_text, self.model, self.temperature, f"{self.prompt_version}-{response_format}")
+    
+    @staticmethod
+    def _cache_payload(resume_data: ResumeData) -> Dict[str, Any]:
+        """缓存内容为校验后的结构化简历，不含每次解析都会重新生成的ID和时间"""
+        return resume_data.model_dump(mode="json", exclude={"id", "created_at", "updated_at"})
+    
+    def _pre_extract(self, resume_text: str) -> Optional[Dict[str, Any]]:
+        """在本地提取联系方式和时间段，未启用预提取时返回None"""
+        if self.pre_extractor is None:
+            return None
+        
+        extracted = self.pre_extractor.extract(resume_text)
+        found = [field for field, value in extracted["personal_info"].items() if value]
+        logger.info(
+            f"本地预提取: 联系方式{len(found)}项（{', '.join(found) or '无'}），时间段{len(extracted['date_ranges'])}个"
+        )
+        return extracted
+    
+    def _prepare_prompt(self, resume_text: str, response_format: str = RESPONSE_FORMAT_FULL,
+                        pre_extracted: bool = False) -> str:
+        """压缩简历文本后构建解析提示，记录压缩前后提示词的估计token数"""
+        if self.compactor is None:
+            return self._build_parse_prompt(resume_text, response_format, pre_extracted)
+        
+        result = self.compactor.compact(resume_text)
+        tokens_before = self._template_tokens[response_format] + result["tokens_before"]
+        tokens_after = self._template_tokens[response_format] + result["tokens_after"]
+        message = (
+            f"提示词token估计: 压缩前{tokens_before}，压缩后{tokens_after}，"
+            f"节省{(tokens_before - tokens_after) / tokens_before:.0%}，去除{result['removed_lines']}行"
+        )
+        if result["trimmed_sections"]:
+            message += f"，超出预算截短章节: {', '.join(result['trimmed_sections'])}"
+        logger.info(message)
+        return self._build_parse_prompt(result["text"], response_format, pre_extracted)
+    
+    def _plan_sections(self, resume_text: str, pre_extracted: bool = False) -> List[Tuple[str, str]]:
+        """
+        按章节拆分解析请求，未启用按章节解析或没有可拆分的章节时返回空列表
+        
+        只去除页码、套话和重复行，不按预算截短章节：超出分块预算的章节切块后分别解析
+        
+        Returns:
+            List[Tuple[str, str]]: (部分, 解析提示)
+        """
+        if self.sectioned is None:
+            return []
+        if self.compactor is not None:
+            resume_text = self.compactor.compact(resume_text, token_budget=0)["text"]
+        
+        pieces = self.sectioned.plan(resume_text)
+        if not pieces:
+            logger.info("未识别到可拆分的章节，整体解析简历")
+            return []
+        
+        counts = Counter(piece["part"] for piece in pieces)
+        logger.info(f"按章节并发解析: {len(pieces)}个请求（{', '.join(f'{part}×{count}' for part, count in counts.items())}）")
+        return [
+            (piece["part"], self._build_section_prompt(
+                piece["part"], piece["text"], pre_extracted, piece["index"], piece["total"]
+            ))
+            for piece in pieces
+        ]
+    
+    def _parse_sections(self, sections: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """在线程池中并发调用各部分的解析请求，合并为完整格式的字典"""
+        def extract(section: Tuple[str, str]) -> Tuple[str, Any, float]:
+            part, prompt = section
+            start = time.perf_counter()
+            _, value = self._call_and_parse(prompt, lambda response: self._parse_section_response(response, part))
+            return part, value, time.perf_counter() - start
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            results = list(executor.map(extract, sections))
+        return self._reduce_sections(results, time.perf_counter() - start)
+    
+    async def _parse_sections_async(self, sections: List[Tuple[str, str]],
+                                    on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None,
+                                    on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                                    extracted: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """并发发送各部分的解析请求（各自经过限流器），每个请求完成时上报进度，合并为完整格式的字典"""
+        completed: List[Tuple[str, Any]] = []
+        generated = 0
+        
+        async def extract(part: str, prompt: str) -> Tuple[str, Any, float]:
+            nonlocal generated
+            start = time.perf_counter()
+            response, value = await self._call_and_parse_async(
+                prompt, lambda response: self._parse_section_response(response, part), on_queued
+            )
+            if on_progress is not None:
+                completed.append((part, value))
+                generated += estimate_tokens(response)
+                await on_progress({
+                    "progress": round(len(completed) / len(sections), 3),
+                    "generated_tokens": generated,
+                    "partial_result": self._partial_result(self.sectioned.reduce(completed), extracted)
+                })
+            return part, value, time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*(extract(part, prompt) for part, prompt in sections))
+        return self._reduce_sections(results, time.perf_counter() - start)
+    
+    def _reduce_sections(self, results: List[Tuple[str, Any, float]], elapsed: float) -> Dict[str, Any]:
+        """记录总耗时和最慢的请求，合并各部分的结果"""
+        slowest = max(results, key=lambda result: result[2])
+        logger.info(
+            f"按章节解析完成: 总耗时{elapsed * 1000:.0f}ms，最慢的请求为{slowest[0]}（{slowest[2] * 1000:.0f}ms），"
+            f"各请求耗时合计{sum(result[2] for result in results) * 1000:.0f}ms"
+        )
+        return self.sectioned.reduce((part, value) for part, value, _ in results)
+    
+    def _build_parse_prompt(self, resume_text: str, response_format: str = RESPONSE_FORMAT_FULL,
+                            pre_extracted: bool = False) -> str:
+        """
+        构建解析提示模板
+        
+        pre_extracted为True时联系方式和时间段已在本地提取：简历文本后附加预提取说明，
+        完整格式中不再列出联系方式字段，工作和教育经历只输出时间段标记
+        """
+        if pre_extracted:
+            resume_text = f"{resume_text}\n\n{PRE_EXTRACTION_INSTRUCTIONS}"
+        if response_format == RESPONSE_FORMAT_COMPACT:
+            return self._build_compact_parse_prompt(resume_text)
+        
+        schema = ",\n".join(self._template_parts(pre_extracted).values())
         prompt = f"""
 你是一个专业的简历解析助手。请仔细分析以下简历文本，提取结构化信息。
 
@@ -89,109 +433,462 @@ class QwenResumeParser:
 请严格按照以下JSON格式返回，确保所有字段都存在：
 
 {{
-  "personal_info": {{
-    "name": "姓名（必填）",
-    "email": "邮箱地址",
-    "phone": "电话号码",
-    "location": "所在地区",
-    "summary": "个人简介或自我评价",
-    "linkedin": "LinkedIn链接（如果有）",
-    "github": "GitHub链接（如果有）",
-    "website": "个人网站（如果有）"
-  }},
-  "work_experience": [
+{schema}
+}}
+
+解析要求：
+1. {PART_REQUIREMENTS[PART_PERSONAL_INFO]}
+2. {PART_REQUIREMENTS[PART_WORK_EXPERIENCE]}
+3. {PART_REQUIREMENTS[PART_EDUCATION]}
+4. {PART_REQUIREMENTS[PART_SKILLS]}
+5. 如果某些信息在简历中没有明确提及，对应字段可以为空字符串或null
+6. 确保返回的是有效的JSON格式
+7. 所有日期尽量统一为YYYY-MM格式
+
+请只返回JSON数据，不要包含其他解释文字。
+"""
+        return prompt
+    
+    def _template_parts(self, pre_extracted: bool = False) -> Dict[str, str]:
+        """完整格式JSON示例中每个顶层字段的部分，预提取后不再列出联系方式字段，工作和教育经历只输出时间段标记"""
+        personal_info_fields = [
+            ("name", "姓名（必填）"),
+            ("email", "邮箱地址"),
+            ("phone", "电话号码"),
+            ("location", "所在地区"),
+            ("summary", "个人简介或自我评价"),
+            ("linkedin", "LinkedIn链接（如果有）"),
+            ("github", "GitHub链接（如果有）"),
+            ("website", "个人网站（如果有）"),
+        ]
+        work_dates = [
+            ("start_date", "开始时间（格式：YYYY-MM 或 YYYY年MM月）"),
+            ("end_date", "结束时间（格式：YYYY-MM 或 YYYY年MM月，如果是当前工作则为null）"),
+        ]
+        education_dates = [("start_date", "开始时间"), ("end_date", "结束时间")]
+        if pre_extracted:
+            personal_info_fields = [field for field in personal_info_fields if field[0] in ("name", "location", "summary")]
+            work_dates = [("start_date", "时间段标记（如D1）")]
+            education_dates = [("start_date", "时间段标记（如D2）")]
+        
+        return {
+            PART_PERSONAL_INFO: f"""  "personal_info": {{
+{self._template_fields(personal_info_fields, 4)}
+  }}""",
+            PART_WORK_EXPERIENCE: f"""  "work_experience": [
     {{
       "company": "公司名称",
       "position": "职位名称",
-      "start_date": "开始时间（格式：YYYY-MM 或 YYYY年MM月）",
-      "end_date": "结束时间（格式：YYYY-MM 或 YYYY年MM月，如果是当前工作则为null）",
+{self._template_fields(work_dates, 6)},
       "description": ["工作描述1", "工作描述2", "工作描述3"],
       "technologies": ["技术栈1", "技术栈2"]
     }}
-  ],
-  "education": [
+  ]""",
+            PART_EDUCATION: f"""  "education": [
     {{
       "institution": "学校名称",
       "degree": "学位（如：本科、硕士、博士）",
       "major": "专业名称",
-      "start_date": "开始时间",
-      "end_date": "结束时间",
+{self._template_fields(education_dates, 6)},
       "gpa": "GPA（如果有）"
     }}
-  ],
-  "skills": [
+  ]""",
+            PART_SKILLS: f"""  "skills": [
     {{
       "category": "技能分类（请使用：编程语言、技术技能、软技能、语言 中的一个）",
       "name": "具体技能名称",
       "level": "熟练程度（请使用：了解、熟练、精通、专家 中的一个，可以为空）"
     }}
-  ]
+  ]""",
+        }
+    
+    def _build_section_prompt(self, part: str, text: str, pre_extracted: bool = False,
+                              index: int = 1, total: int = 1) -> str:
+        """
+        构建按章节解析时单个部分的提示，只要求输出该部分对应的顶层字段
+        
+        Args:
+            part: 部分（personal_info、work_experience、education或skills）
+            text: 该部分的简历片段
+            pre_extracted: 联系方式和时间段是否已在本地提取
+            index: 片段在该部分中的序号
+            total: 该部分的片段数
+        """
+        if pre_extracted and part != PART_SKILLS:
+            text = f"{text}\n\n{PRE_EXTRACTION_INSTRUCTIONS}"
+        label = f"（第{index}/{total}段）" if total > 1 else ""
+        return f"""你是一个专业的简历解析助手。以下是一份简历中的部分内容{label}，请只提取其中的{PART_LABELS[part]}。
+
+简历片段：
+{text}
+
+请严格按照以下JSON格式返回：
+
+{{
+{self._template_parts(pre_extracted)[part]}
 }}
 
 解析要求：
-1. 仔细识别个人基本信息，包括姓名、联系方式等
-2. 按时间顺序整理工作经历，提取公司、职位、时间、工作内容
-3. 提取教育背景信息
-4. 从专业技能、项目经历中提取技能信息，并进行合理分类
-5. 如果某些信息在简历中没有明确提及，对应字段可以为空字符串或null
-6. 确保返回的是有效的JSON格式
-7. 所有日期尽量统一为YYYY-MM格式
+1. {PART_REQUIREMENTS[part]}
+2. 如果某些信息在片段中没有明确提及，对应字段可以为空字符串或null
+3. 所有日期尽量统一为YYYY-MM格式
 
 请只返回JSON数据，不要包含其他解释文字。
 """
-        return prompt
+    
+    @staticmethod
+    def _template_fields(fields, indent: int) -> str:
+        """把(字段名, 说明)列表渲染为JSON格式示例中的多行字段"""
+        return ",\n".join(f'{" " * indent}"{name}": "{description}"' for name, description in fields)
+    
+    def _build_compact_parse_prompt(self, resume_text: str) -> str:
+        """构建紧凑响应格式的解析提示，输出使用短键名和按位置排列的数组"""
+        return f"""你是一个专业的简历解析助手。请仔细分析以下简历文本，提取结构化信息。
+
+简历文本：
+{resume_text}
+
+{COMPACT_FORMAT_INSTRUCTIONS}
+"""
+    
+    def _estimate_request_tokens(self, prompt: str) -> int:
+        """预估一次调用消耗的token数：提示长度加最大生成长度，调用完成后按实际用量退还差额"""
+        return estimate_tokens(prompt) + self.max_tokens
+    
+    @staticmethod
+    def _total_tokens(usage: Any) -> Optional[int]:
+        """从用量信息中取输入加输出token数，没有用量信息时返回None"""
+        if not usage:
+            return None
+        try:
+            return int(usage["input_tokens"]) + int(usage["output_tokens"])
+        except (KeyError, TypeError, ValueError):
+            return None
     
     def _call_qwen_api(self, prompt: str) -> str:
         """调用通义千问API"""
+        used_tokens = None
+        lease = None
         try:
+            if self.rate_limiter is not None:
+                lease = self.rate_limiter.acquire_blocking(self._estimate_request_tokens(prompt))
+            
             response = Generation.call(
                 model=self.model,
                 prompt=prompt,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                top_p=0.8,
+                top_p=self.top_p,
                 api_key=self.api_key
             )
             
             if response.status_code == 200:
+                used_tokens = self._total_tokens(response.usage)
                 return response.output.text
             else:
                 raise QwenParseError(f"API调用失败，状态码: {response.status_code}, 错误信息: {response.message}")
                 
         except Exception as e:
             raise QwenParseError(f"调用通义千问API时发生错误: {str(e)}")
+        finally:
+            if lease is not None:
+                self.rate_limiter.release(lease, used_tokens)
     
-    def _parse_api_response(self, response_text: str) -> Dict[str, Any]:
-        """解析API响应文本"""
+    async def _call_qwen_api_async(self, prompt: str,
+                                   on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None,
+                                   on_chunk: Optional[Callable[[str, Dict[str, int]], Awaitable[None]]] = None) -> str:
+        """
+        异步调用通义千问API，配置了限流器时先排队获取调用额度
+        
+        传入on_chunk时流式生成，每收到一段输出调用一次（参数为新生成的文本和目前的用量），
+        on_chunk抛出异常时关闭连接、中止生成，按已生成的用量归还限流额度
+        """
+        used_tokens = None
+        lease = None
         try:
-            # 清理响应文本，移除可能的markdown格式
-            cleaned_text = response_text.strip()
-            if cleaned_text.startswith('```json'):
-                cleaned_text = cleaned_text[7:]
-            if cleaned_text.endswith('```'):
-                cleaned_text = cleaned_text[:-3]
-            cleaned_text = cleaned_text.strip()
+            if self.rate_limiter is not None:
+                lease = await self.rate_limiter.acquire(self._estimate_request_tokens(prompt), on_queued)
+            
+            if on_chunk is None:
+                text, usage = await self.client.generate_with_usage(
+                    prompt,
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    top_p=self.top_p
+                )
+                used_tokens = self._total_tokens(usage)
+                return text
+            
+            parts = []
+            stream = self.client.stream_with_usage(
+                prompt,
+                model=self.model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                top_p=self.top_p
+            )
+            async with aclosing(stream) as chunks:
+                async for chunk, usage in chunks:
+                    used_tokens = self._total_tokens(usage) or used_tokens
+                    parts.append(chunk)
+                    await on_chunk(chunk, usage)
+            return "".join(parts)
+        except (LLMClientError, RateLimitTimeoutError) as e:
+            raise QwenParseError(f"调用通义千问API时发生错误: {str(e)}")
+        finally:
+            if lease is not None:
+                await asyncio.to_thread(self.rate_limiter.release, lease, used_tokens)
+    
+    def _call_and_parse(self, prompt: str, parse: Callable[[str], Any]) -> Tuple[str, Any]:
+        """
+        调用通义千问API并解析响应，输出无法解析（修复失败）时重新调用，最多repair_recalls次
+        
+        Returns:
+            Tuple[str, Any]: 最后一次的响应文本和parse的返回值
+        """
+        for attempt in range(self.repair_recalls + 1):
+            response = self._call_qwen_api(prompt)
+            try:
+                return response, parse(response)
+            except QwenOutputError as e:
+                if attempt == self.repair_recalls:
+                    raise
+                self._repair_counts["recalls"] += 1
+                logger.warning(f"AI输出无法解析，重新调用通义千问API（第{attempt + 1}次）: {e}")
+    
+    async def _call_and_parse_async(self, prompt: str, parse: Callable[[str], Any],
+                                    on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None,
+                                    make_on_chunk: Optional[Callable[[], Callable[[str, Dict[str, int]], Awaitable[None]]]] = None
+                                    ) -> Tuple[str, Any]:
+        """
+        异步调用通义千问API并解析响应，与_call_and_parse相同
+        
+        make_on_chunk用于流式生成，每次调用都构建新的处理函数；流式生成因输出格式错误中止时同样重新调用
+        """
+        for attempt in range(self.repair_recalls + 1):
+            try:
+                on_chunk = make_on_chunk() if make_on_chunk is not None else None
+                response = await self._call_qwen_api_async(prompt, on_queued, on_chunk)
+                return response, parse(response)
+            except QwenOutputError as e:
+                if attempt == self.repair_recalls:
+                    raise
+                self._repair_counts["recalls"] += 1
+                logger.warning(f"AI输出无法解析，重新调用通义千问API（第{attempt + 1}次）: {e}")
+    
+    def _stream_handler(self, response_format: str, expected_tokens: float,
+                        extracted: Optional[Dict[str, Any]] = None,
+                        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+                        ) -> Callable[[str, Dict[str, int]], Awaitable[None]]:
+        """
+        构建流式输出的处理函数：增量解析输出，字段完成或生成足够多token时上报进度
+        
+        输出不可能构成有效JSON时，未启用JSON修复则抛出QwenOutputError，调用方随即中止生成；
+        启用修复时JSON之前的说明文字直接跳过，其他格式错误只停止上报部分结果，
+        生成结束后由修复处理（多余的逗号、未转义的引号等都可以修复，中止反而浪费已生成的部分）。
+        生成结束之前进度最多为0.95。部分结果只用于展示，整理或上报失败时停止上报，不影响解析。
+        
+        Args:
+            response_format: 响应格式
+            expected_tokens: 预计的输出token数
+            extracted: 本地预提取的结果，部分结果与其合并后上报
+            on_progress: 进度回调
+        """
+        parser = IncrementalJSONParser()
+        partial: Dict[str, Any] = {}
+        state = {"generated": 0, "reported": 0, "started": not self.json_repair, "failed": False, "silenced": False}
+        
+        async def on_chunk(chunk: str, usage: Dict[str, int]):
+            state["generated"] = usage.get("output_tokens") or state["generated"] + estimate_tokens(chunk)
+            text = chunk
+            if not state["started"]:
+                match = _JSON_START.search(text)
+                text = text[match.start():] if match else ""
+                state["started"] = match is not None
             
-            # 解析JSON
-            parsed_data = json.loads(cleaned_text)
+            events = []
+            if text and not state["failed"]:
+                try:
+                    events = parser.feed(text)
+                except IncrementalJSONError as e:
+                    if not self.json_repair:
+                        logger.warning(f"AI输出不是有效的JSON，中止生成: {e}，已收到的输出: {parser.text[:200]}")
+                        raise QwenOutputError(f"AI输出不是有效的JSON，已中止生成: {e}")
+                    state["failed"] = True
+                    logger.warning(f"AI输出不是有效的JSON，停止上报部分结果，生成结束后修复: {e}")
+            
+            if on_progress is None or state["silenced"]:
+                return
+            try:
+                updated = False
+                for event in events:
+                    updated = self._apply_stream_event(partial, event, response_format) or updated
+                if updated or state["generated"] - state["reported"] >= self.stream_progress_tokens:
+                    state["reported"] = state["generated"]
+                    await on_progress({
+                        "progress": round(min(0.95, state["generated"] / max(expected_tokens, 1)), 3),
+                        "generated_tokens": state["generated"],
+                        "partial_result": self._partial_result(partial, extracted)
+                    })
+            except Exception as e:
+                state["silenced"] = True
+                logger.warning(f"上报部分解析结果失败，停止上报: {e}")
+        
+        return on_chunk
+    
+    @staticmethod
+    def _apply_stream_event(partial: Dict[str, Any], event: Dict[str, Any], response_format: str) -> bool:
+        """
+        把增量解析产出的字段或数组项写入部分结果（完整格式），紧凑格式先解码，返回是否有更新
+        
+        只有经历、教育和技能的数组项作为一条记录；个人信息（紧凑格式中是按位置排列的数组）
+        只在整个字段完成时写入
+        """
+        key, value = event["key"], event["value"]
+        is_item = "index" in event
+        part = COMPACT_KEYS.get(key) if response_format == RESPONSE_FORMAT_COMPACT else key
+        if part not in PARTS or (is_item and part == PART_PERSONAL_INFO):
+            return False
+        if response_format == RESPONSE_FORMAT_COMPACT:
+            value = decode_compact_response({key: [value] if is_item else value})[part]
+            if is_item:
+                if not value:
+                    return False
+                value = value[0]
+        key = part
+        
+        if is_item:
+            partial.setdefault(key, []).append(value)
+        else:
+            partial[key] = value
+        return True
+    
+    @staticmethod
+    def _partial_result(partial: Dict[str, Any], extracted: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """合并本地预提取的联系方式和时间段，只保留已出现的字段"""
+        if extracted is None:
+            return dict(partial)
+        merged = contact_extractor.merge(partial, extracted)
+        return {key: merged[key] for key in PARTS if key in partial or key == PART_PERSONAL_INFO}
+    
+    @staticmethod
+    def _strip_code_fence(response_text: str) -> str:
+        """清理响应文本，移除可能的markdown格式"""
+        cleaned_text = response_text.strip()
+        if cleaned_text.startswith('```json'):
+            cleaned_text = cleaned_text[7:]
+        if cleaned_text.endswith('```'):
+            cleaned_text = cleaned_text[:-3]
+        return cleaned_text.strip()
+    
+    def _load_response(self, response_text: str, label: str = "API响应") -> Tuple[Any, List[str]]:
+        """
+        解析响应中的JSON，启用修复时修复常见的格式错误
+        
+        Returns:
+            Tuple[Any, List[str]]: 解析出的值和做过的修复类型
+        
+        Raises:
+            QwenOutputError: 不是有效的JSON且无法修复时
+        """
+        self._repair_counts["responses"] += 1
+        cleaned_text = self._strip_code_fence(response_text)
+        try:
+            if self.json_repair:
+                return repair_json(cleaned_text)
+            return json.loads(cleaned_text), []
+        except (json.JSONDecodeError, JSONRepairError) as e:
+            self._repair_counts["failed"] += 1
+            logger.error(f"JSON解析失败，原始响应: {response_text}")
+            raise QwenOutputError(f"{label}不是有效的JSON格式: {str(e)}")
+    
+    def _record_repairs(self, repairs: List[str]):
+        """记录一次成功解析的响应做过的修复"""
+        if repairs:
+            self._repair_counts["repaired"] += 1
+            self._repair_types.update(repairs)
+            logger.info(f"AI输出已在本地修复: {', '.join(repairs)}")
+    
+    def _parse_api_response(self, response_text: str, response_format: str = RESPONSE_FORMAT_FULL) -> Dict[str, Any]:
+        """
+        解析API响应文本，紧凑格式先解码为完整格式的字典
+        
+        启用JSON修复时，缺失的必要字段按RESPONSE_SCHEMA补全默认值，缺少必要字段的不完整条目被去掉；
+        未启用时缺少顶层字段直接报错。
+        
+        Raises:
+            QwenOutputError: 响应无法解析或结构不正确时
+        """
+        try:
+            parsed_data, repairs = self._load_response(response_text)
+            if not isinstance(parsed_data, dict):
+                raise QwenOutputError("API响应不是JSON对象")
+            if response_format == RESPONSE_FORMAT_COMPACT:
+                parsed_data = decode_compact_response(parsed_data)
             
             # 验证必要字段
-            required_fields = ['personal_info', 'work_experience', 'education', 'skills']
-            for field in required_fields:
-                if field not in parsed_data:
-                    raise QwenParseError(f"API响应缺少必要字段: {field}")
+            if self.json_repair:
+                repairs += fill_defaults(parsed_data, RESPONSE_SCHEMA)
+            else:
+                required_fields = ['personal_info', 'work_experience', 'education', 'skills']
+                for field in required_fields:
+                    if field not in parsed_data:
+                        raise QwenOutputError(f"API响应缺少必要字段: {field}")
             
+            self._record_repairs(repairs)
             return parsed_data
             
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON解析失败，原始响应: {response_text}")
-            raise QwenParseError(f"API响应不是有效的JSON格式: {str(e)}")
+        except QwenParseError:
+            raise
         except Exception as e:
-            raise QwenParseError(f"解析API响应时发生错误: {str(e)}")
+            raise QwenOutputError(f"解析API响应时发生错误: {str(e)}")
+    
+    def _parse_section_response(self, response_text: str, part: str) -> Any:
+        """解析按章节请求的响应，返回该部分的值（个人信息为字典，其余为列表）"""
+        parsed_data, repairs = self._load_response(response_text, f"{part}部分的API响应")
+        
+        # 列表部分允许直接返回数组
+        if isinstance(parsed_data, dict) and part in parsed_data:
+            parsed_data = parsed_data[part]
+        expected = dict if part == PART_PERSONAL_INFO else list
+        if parsed_data is None:
+            parsed_data = expected()
+        if not isinstance(parsed_data, expected):
+            raise QwenOutputError(f"{part}部分的API响应格式不正确")
+        if self.json_repair:
+            wrapped = {part: parsed_data}
+            repairs += fill_defaults(wrapped, {part: RESPONSE_SCHEMA[part]})
+            parsed_data = wrapped[part]
+        self._record_repairs(repairs)
+        return parsed_data
     
-    def _build_resume_data(self, parsed_data: Dict[str, Any]) -> ResumeData:
-        """构建ResumeData对象"""
+    def get_repair_stats(self) -> Dict[str, Any]:
+        """
+        获取AI输出修复统计
+        
+        Returns:
+            Dict[str, Any]: 是否启用修复、解析的响应数、修复成功的响应数和修复率、
+                无法解析的响应数、重新调用次数，以及每种修复出现的次数
+        """
+        responses = self._repair_counts["responses"]
+        return {
+            "enabled": self.json_repair,
+            "responses": responses,
+            "repaired": self._repair_counts["repaired"],
+            "repair_rate": round(self._repair_counts["repaired"] / responses, 3) if responses else 0.0,
+            "failed": self._repair_counts["failed"],
+            "recalls": self._repair_counts["recalls"],
+            "repairs": dict(self._repair_types)
+        }
+    
+    def _build_resume_data(self, parsed_data: Dict[str, Any],
+                           extracted: Optional[Dict[str, Any]] = None) -> ResumeData:
+        """构建ResumeData对象，extracted为本地预提取的结果，合并时本地值优先"""
         try:
+            if extracted is not None:
+                parsed_data = contact_extractor.merge(parsed_data, extracted)
+            
             # 生成唯一ID
             resume_id = f"resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
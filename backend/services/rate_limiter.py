@@ -0,0 +1,484 @@
+"""
+通义千问调用限流器
+所有worker共享的令牌桶限流和并发闸门，超出上游配额的请求排队等待而不是直接失败：
+
+- 每秒请求数（RPS）令牌桶，允许一定的突发
+- 每分钟token数（TPM）令牌桶，请求前按提示长度和max_tokens预估扣减，完成后按实际用量退还
+- 同时进行的请求数上限，崩溃的worker占用的名额在租约到期后自动释放
+
+排队按先来先服务：只有队首的请求可以尝试获取额度，后面的请求只查询自己的排队位置，
+调用方可以通过回调把排队位置和已等待时间展示给用户。
+Redis不可用时记录警告并放行请求，不影响解析。
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+
+from backend.config.pipeline_config import RATE_LIMIT_CONFIG
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估计文本的token数
+
+    中日韩字符大约每个字符一个token，其他字符大约每4个字符一个token。
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 估计的token数
+    """
+    cjk = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class RateLimitTimeoutError(Exception):
+    """排队等待超过上限"""
+    pass
+
+
+class RateLimitLease:
+    """一次获取到的调用额度，调用结束后通过release归还"""
+
+    def __init__(self, lease_id: str, tokens: int, waited: float):
+        self.id = lease_id
+        self.tokens = tokens
+        self.waited = waited
+
+
+class RateLimiter(ABC):
+    """
+    限流器接口
+
+    子类实现_try_acquire、_release和_cancel三个原子操作，等待和排队位置上报由基类完成。
+    """
+
+    backend_name = "none"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 限流配置，覆盖RATE_LIMIT_CONFIG中的同名项
+        """
+        config = {**RATE_LIMIT_CONFIG, **(config or {})}
+        self.rps = config["rps"]
+        self.rps_burst = max(1.0, config["rps_burst"])
+        self.tpm = config["tpm"]
+        self.max_in_flight = config["max_in_flight"]
+        self.lease_ttl = config["lease_ttl"]
+        self.waiter_ttl = config["waiter_ttl"]
+        self.poll_interval = config["poll_interval"]
+        self.max_poll_interval = config["max_poll_interval"]
+        self.report_interval = config["report_interval"]
+        self.max_wait = config["max_wait"]
+
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._queued = 0
+        self._waiting = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._timeouts = 0
+        self._errors = 0
+
+    @abstractmethod
+    def _try_acquire(self, waiter_id: str, tokens: int) -> Tuple[bool, int, float]:
+        """
+        尝试获取额度，未获取到时登记或保持排队位置
+
+        Returns:
+            Tuple[bool, int, float]: (是否获取到, 前面排队的请求数, 建议的等待秒数)
+        """
+
+    @abstractmethod
+    def _release(self, lease_id: str, refund_tokens: int) -> None:
+        """归还并发名额，退还多预估的token"""
+
+    @abstractmethod
+    def _cancel(self, waiter_id: str) -> None:
+        """放弃排队；取消时可能已经获取到额度，同时归还并发名额"""
+
+    def _step(self, waiter_id: str, tokens: int) -> Tuple[bool, int, float]:
+        """执行一次_try_acquire，后端出错时放行"""
+        try:
+            return self._try_acquire(waiter_id, tokens)
+        except Exception as e:
+            logger.warning(f"限流器不可用，直接放行请求: {e}")
+            with self._lock:
+                self._errors += 1
+            return True, 0, 0.0
+
+    def _next_delay(self, suggested: float) -> float:
+        return min(max(suggested, self.poll_interval), self.max_poll_interval)
+
+    def _should_report(self, position: int, reported: Optional[int], last_report: float, now: float) -> bool:
+        return position != reported or now - last_report >= self.report_interval
+
+    def _record_acquired(self, waited: float, queued: bool):
+        with self._lock:
+            self._acquired += 1
+            if queued:
+                self._queued += 1
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+
+    def _raise_timeout(self, waited: float):
+        with self._lock:
+            self._timeouts += 1
+        raise RateLimitTimeoutError(f"AI解析请求排队超过{waited:.0f}秒，请稍后重试")
+
+    async def acquire(self, tokens: int,
+                      on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None) -> RateLimitLease:
+        """
+        排队获取一次调用额度
+
+        Args:
+            tokens: 预估消耗的token数
+            on_queued: 排队时的回调，参数为排队位置（从1开始）和已等待秒数，
+                位置变化或每隔report_interval秒调用一次
+
+        Returns:
+            RateLimitLease: 调用额度，调用结束后必须release
+
+        Raises:
+            RateLimitTimeoutError: 排队超过max_wait秒
+        """
+        waiter_id = uuid.uuid4().hex
+        start = time.monotonic()
+        reported, last_report, queued = None, start, False
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                # Redis调用是阻塞的，放到线程中执行
+                acquired, ahead, suggested = await asyncio.to_thread(self._step, waiter_id, tokens)
+                now = time.monotonic()
+                if acquired:
+                    self._record_acquired(now - start, queued)
+                    return RateLimitLease(waiter_id, tokens, now - start)
+                queued = True
+                if now - start >= self.max_wait:
+                    self._raise_timeout(now - start)
+                if on_queued and self._should_report(ahead, reported, last_report, now):
+                    await on_queued(ahead + 1, now - start)
+                    reported, last_report = ahead, now
+                await asyncio.sleep(self._next_delay(suggested))
+        except BaseException:
+            # 超时、取消或回调出错时让出排队位置
+            await asyncio.to_thread(self.cancel, waiter_id)
+            raise
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def acquire_blocking(self, tokens: int,
+                         on_queued: Optional[Callable[[int, float], None]] = None) -> RateLimitLease:
+        """
+        排队获取一次调用额度（同步版本），参数、返回值和异常与acquire相同
+        """
+        waiter_id = uuid.uuid4().hex
+        start = time.monotonic()
+        reported, last_report, queued = None, start, False
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                acquired, ahead, suggested = self._step(waiter_id, tokens)
+                now = time.monotonic()
+                if acquired:
+                    self._record_acquired(now - start, queued)
+                    return RateLimitLease(waiter_id, tokens, now - start)
+                queued = True
+                if now - start >= self.max_wait:
+                    self._raise_timeout(now - start)
+                if on_queued and self._should_report(ahead, reported, last_report, now):
+                    on_queued(ahead + 1, now - start)
+                    reported, last_report = ahead, now
+                time.sleep(self._next_delay(suggested))
+        except BaseException:
+            self.cancel(waiter_id)
+            raise
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self, lease: RateLimitLease, used_tokens: Optional[int] = None) -> None:
+        """
+        归还调用额度
+
+        Args:
+            lease: acquire返回的额度
+            used_tokens: 实际消耗的token数，小于预估值时把差额退还给TPM令牌桶
+        """
+        refund = max(0, lease.tokens - used_tokens) if used_tokens is not None else 0
+        try:
+            self._release(lease.id, refund)
+        except Exception as e:
+            # 并发名额在租约到期后自动释放
+            logger.warning(f"归还限流额度失败: {e}")
+
+    def cancel(self, waiter_id: str) -> None:
+        """放弃排队，后端出错时忽略（排队记录在waiter_ttl秒后自动清理）"""
+        try:
+            self._cancel(waiter_id)
+        except Exception as e:
+            logger.warning(f"取消限流排队失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取限流统计
+
+        Returns:
+            Dict[str, Any]: 限额配置、当前等待数、累计获取和排队次数、平均和最长等待时间、超时次数
+        """
+        with self._lock:
+            return {
+                "backend": self.backend_name,
+                "rps": self.rps,
+                "tpm": self.tpm,
+                "max_in_flight": self.max_in_flight,
+                "waiting": self._waiting,
+                "acquired": self._acquired,
+                "queued": self._queued,
+                "avg_wait_seconds": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait_seconds": self._max_wait_seen,
+                "timeouts": self._timeouts,
+                "errors": self._errors
+            }
+
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    进程内限流器，只限制当前进程的调用，适用于单进程部署和测试
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            config: 限流配置，覆盖RATE_LIMIT_CONFIG中的同名项
+            clock: 时间函数（测试时可替换）
+        """
+        super().__init__(config)
+        self._clock = clock
+        self._state_lock = threading.Lock()
+        # 排队中的请求 -> 最近一次轮询时间，按到达顺序排列
+        self._queue: "OrderedDict[str, float]" = OrderedDict()
+        # 进行中的请求 -> 租约到期时间
+        self._in_flight: Dict[str, float] = {}
+        now = clock()
+        self._rps_tokens, self._tpm_tokens, self._refilled_at = self.rps_burst, float(self.tpm), now
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._refilled_at)
+        if self.rps:
+            self._rps_tokens = min(self.rps_burst, self._rps_tokens + elapsed * self.rps)
+        if self.tpm:
+            self._tpm_tokens = min(float(self.tpm), self._tpm_tokens + elapsed * self.tpm / 60)
+        self._refilled_at = now
+
+    def _try_acquire(self, waiter_id: str, tokens: int) -> Tuple[bool, int, float]:
+        with self._state_lock:
+            now = self._clock()
+            # 已在队列中的请求只更新轮询时间，位置不变
+            self._queue[waiter_id] = now
+            # 清理不再轮询的队首请求（调用方已经退出）
+            for head in list(self._queue):
+                if head == waiter_id or now - self._queue[head] <= self.waiter_ttl:
+                    break
+                del self._queue[head]
+
+            ahead = 0
+            for queued_id in self._queue:
+                if queued_id == waiter_id:
+                    break
+                ahead += 1
+            if ahead:
+                return False, ahead, self.poll_interval
+
+            for lease_id, expires_at in list(self._in_flight.items()):
+                if expires_at <= now:
+                    del self._in_flight[lease_id]
+            if self.max_in_flight and len(self._in_flight) >= self.max_in_flight:
+                return False, 0, self.poll_interval
+
+            self._refill(now)
+            # 超过整个桶容量的请求在桶满时放行，避免永远等不到
+            needed = min(tokens, self.tpm) if self.tpm else 0
+            wait = 0.0
+            if self.rps and self._rps_tokens < 1:
+                wait = (1 - self._rps_tokens) / self.rps
+            if self.tpm and self._tpm_tokens < needed:
+                wait = max(wait, (needed - self._tpm_tokens) * 60 / self.tpm)
+            if wait > 0:
+                return False, 0, wait
+
+            if self.rps:
+                self._rps_tokens -= 1
+            if self.tpm:
+                self._tpm_tokens -= needed
+            del self._queue[waiter_id]
+            self._in_flight[waiter_id] = now + self.lease_ttl
+            return True, 0, 0.0
+
+    def _release(self, lease_id: str, refund_tokens: int) -> None:
+        with self._state_lock:
+            self._in_flight.pop(lease_id, None)
+            if self.tpm and refund_tokens:
+                self._tpm_tokens = min(float(self.tpm), self._tpm_tokens + refund_tokens)
+
+    def _cancel(self, waiter_id: str) -> None:
+        with self._state_lock:
+            self._queue.pop(waiter_id, None)
+            self._in_flight.pop(waiter_id, None)
+
+
+# 在Redis中原子地完成排队、清理过期记录、检查并发上限和两个令牌桶、扣减额度
+# 时间取Redis服务器时间，各worker的时钟偏差不影响令牌补充
+_ACQUIRE_SCRIPT = """
+local queue, waiters, in_flight, buckets = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local waiter_id = ARGV[1]
+local tokens = tonumber(ARGV[2])
+local rps, rps_burst, tpm = tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+local max_in_flight, lease_ttl, waiter_ttl = tonumber(ARGV[6]), tonumber(ARGV[7]), tonumber(ARGV[8])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+if redis.call('HEXISTS', waiters, waiter_id) == 0 then
+  redis.call('ZADD', queue, redis.call('HINCRBY', buckets, 'seq', 1), waiter_id)
+end
+redis.call('HSET', waiters, waiter_id, now)
+
+while true do
+  local head = redis.call('ZRANGE', queue, 0, 0)[1]
+  if not head or head == waiter_id then break end
+  local seen = tonumber(redis.call('HGET', waiters, head) or '0')
+  if now - seen <= waiter_ttl then break end
+  redis.call('ZREM', queue, head)
+  redis.call('HDEL', waiters, head)
+end
+
+local ahead = redis.call('ZRANK', queue, waiter_id)
+if ahead > 0 then
+  return {0, ahead, 0}
+end
+
+redis.call('ZREMRANGEBYSCORE', in_flight, '-inf', now)
+if max_in_flight > 0 and redis.call('ZCARD', in_flight) >= max_in_flight then
+  return {0, 0, 0}
+end
+
+local state = redis.call('HMGET', buckets, 'rps_tokens', 'tpm_tokens', 'refilled_at')
+local rps_tokens = tonumber(state[1]) or rps_burst
+local tpm_tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+if rps > 0 then rps_tokens = math.min(rps_burst, rps_tokens + elapsed * rps) end
+if tpm > 0 then tpm_tokens = math.min(tpm, tpm_tokens + elapsed * tpm / 60) end
+
+local needed = 0
+if tpm > 0 then needed = math.min(tokens, tpm) end
+local wait = 0
+if rps > 0 and rps_tokens < 1 then wait = (1 - rps_tokens) / rps end
+if tpm > 0 and tpm_tokens < needed then wait = math.max(wait, (needed - tpm_tokens) * 60 / tpm) end
+
+if wait > 0 then
+  redis.call('HSET', buckets, 'rps_tokens', tostring(rps_tokens), 'tpm_tokens', tostring(tpm_tokens), 'refilled_at', tostring(now))
+  return {0, 0, math.ceil(wait * 1000)}
+end
+
+if rps > 0 then rps_tokens = rps_tokens - 1 end
+tpm_tokens = tpm_tokens - needed
+redis.call('HSET', buckets, 'rps_tokens', tostring(rps_tokens), 'tpm_tokens', tostring(tpm_tokens), 'refilled_at', tostring(now))
+redis.call('ZREM', queue, waiter_id)
+redis.call('HDEL', waiters, waiter_id)
+redis.call('ZADD', in_flight, now + lease_ttl, waiter_id)
+return {1, 0, 0}
+"""
+
+# 归还并发名额，退还的token在下次补充时受桶容量限制
+_RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+local refund = tonumber(ARGV[2])
+if refund > 0 and redis.call('HEXISTS', KEYS[2], 'tpm_tokens') == 1 then
+  local tpm_tokens = tonumber(redis.call('HGET', KEYS[2], 'tpm_tokens'))
+  redis.call('HSET', KEYS[2], 'tpm_tokens', tostring(math.min(tonumber(ARGV[3]), tpm_tokens + refund)))
+end
+return 1
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Redis限流器，所有worker进程和服务实例共享同一组额度和同一个排队队列
+    """
+
+    backend_name = "redis"
+
+    def __init__(self, redis_client: redis.Redis, config: Optional[Dict[str, Any]] = None,
+                 key_prefix: str = "ratelimit:qwen:"):
+        """
+        Args:
+            redis_client: Redis客户端
+            config: 限流配置，覆盖RATE_LIMIT_CONFIG中的同名项
+            key_prefix: 键前缀
+        """
+        super().__init__(config)
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self._keys = [f"{key_prefix}{name}" for name in ("queue", "waiters", "in_flight", "buckets")]
+        self._acquire_script = redis_client.register_script(_ACQUIRE_SCRIPT)
+        self._release_script = redis_client.register_script(_RELEASE_SCRIPT)
+
+    def _try_acquire(self, waiter_id: str, tokens: int) -> Tuple[bool, int, float]:
+        acquired, ahead, wait_ms = self._acquire_script(keys=self._keys, args=[
+            waiter_id, tokens, self.rps, self.rps_burst, self.tpm,
+            self.max_in_flight, self.lease_ttl, self.waiter_ttl
+        ])
+        return bool(int(acquired)), int(ahead), int(wait_ms) / 1000
+
+    def _release(self, lease_id: str, refund_tokens: int) -> None:
+        self._release_script(keys=[self._keys[2], self._keys[3]], args=[lease_id, refund_tokens, self.tpm])
+
+    def _cancel(self, waiter_id: str) -> None:
+        pipe = self.redis_client.pipeline()
+        pipe.zrem(self._keys[0], waiter_id)
+        pipe.hdel(self._keys[1], waiter_id)
+        pipe.zrem(self._keys[2], waiter_id)
+        pipe.execute()
+
+
+def create_rate_limiter(config: Optional[Dict[str, Any]] = None) -> Optional[RateLimiter]:
+    """
+    根据配置创建限流器
+
+    Args:
+        config: 限流配置，默认使用RATE_LIMIT_CONFIG
+
+    Returns:
+        Optional[RateLimiter]: 限流器实例，配置为none时返回None
+    """
+    config = {**RATE_LIMIT_CONFIG, **(config or {})}
+    backend = config["backend"]
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryRateLimiter(config)
+    if backend == "redis":
+        client = redis.from_url(config["redis_url"], decode_responses=True, health_check_interval=30)
+        return RedisRateLimiter(client, config, config["key_prefix"])
+    raise ValueError(f"不支持的限流器类型: {backend}")
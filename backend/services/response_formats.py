@@ -0,0 +1,135 @@
+"""
+AI解析响应格式
+full为原有的完整JSON格式（长字段名，每条记录一个对象）；
+compact为紧凑格式：短键名、重复记录用按位置排列的数组、技能分类和熟练程度用短代码，
+生成的token数明显减少。两种格式都解码为同样的字典结构，再交给_build_resume_data构建简历对象。
+
+紧凑格式示例：
+    {"p": ["张三", "zhangsan@example.com", "138-1234-5678", "北京", null, null, null, null],
+     "w": [["ABC公司", "工程师", "2020-01", null, ["负责后端开发"], ["Python"]]],
+     "e": [["清华大学", "本科", "计算机科学", "2012-09", "2016-06", null]],
+     "s": [["t", "Python", 3]]}
+"""
+
+from typing import Any, Dict, List, Optional
+
+from backend.services.json_repair import REQUIRED
+
+# 响应格式
+RESPONSE_FORMAT_FULL = "full"
+RESPONSE_FORMAT_COMPACT = "compact"
+RESPONSE_FORMATS = (RESPONSE_FORMAT_FULL, RESPONSE_FORMAT_COMPACT)
+
+# 紧凑格式的顶层短键名 -> 完整格式的字段名
+COMPACT_KEYS = {"p": "personal_info", "w": "work_experience", "e": "education", "s": "skills"}
+
+# 紧凑格式中各类记录的字段顺序
+PERSONAL_INFO_FIELDS = ["name", "email", "phone", "location", "summary", "linkedin", "github", "website"]
+WORK_EXPERIENCE_FIELDS = ["company", "position", "start_date", "end_date", "description", "technologies"]
+EDUCATION_FIELDS = ["institution", "degree", "major", "start_date", "end_date", "gpa"]
+SKILL_FIELDS = ["category", "name", "level"]
+
+# 解码后（完整格式）的必要字段和缺失时的默认值，用于修复不完整的响应；
+# 缺少REQUIRED字段的经历、教育和技能条目无法构建为简历对象，修复时去掉
+RESPONSE_SCHEMA: Dict[str, Any] = {
+    "personal_info": {},
+    "work_experience": [{"company": REQUIRED, "position": REQUIRED, "start_date": "", "description": REQUIRED}],
+    "education": [{"institution": REQUIRED, "degree": REQUIRED, "start_date": ""}],
+    "skills": [{"name": REQUIRED, "category": "technical"}]
+}
+
+# 技能分类和熟练程度的短代码（取值与SkillCategory、SkillLevel一致）
+SKILL_CATEGORY_CODES = {"t": "technical", "s": "soft", "l": "language"}
+SKILL_LEVEL_CODES = {1: "beginner", 2: "intermediate", 3: "advanced", 4: "expert"}
+
+# 紧凑格式的输出要求，拼接在简历文本之后
+COMPACT_FORMAT_INSTRUCTIONS = """请只返回一个紧凑JSON对象，数组按位置表示字段，缺失的字段填null：
+{"p":[姓名,邮箱,电话,所在地区,个人简介,LinkedIn,GitHub,个人网站],
+"w":[[公司,职位,开始时间,结束时间,[工作描述,...],[技术栈,...]],...],
+"e":[[学校,学位,专业,开始时间,结束时间,GPA],...],
+"s":[[分类,技能名称,熟练程度],...]}
+
+要求：
+1. 工作经历按时间顺序，当前工作的结束时间为null
+2. 所有日期尽量统一为YYYY-MM格式
+3. 从专业技能、项目经历中提取技能；分类：t=技术技能（含编程语言） s=软技能 l=语言
+4. 熟练程度：1=了解 2=熟练 3=精通 4=专家，无法判断时为null
+5. 不要输出任何解释文字或多余空格"""
+
+
+def _record(values: Any, fields: List[str]) -> Dict[str, Any]:
+    """按位置把数组还原为字典，数组较短时缺失的字段为None，已经是字典时原样返回"""
+    if isinstance(values, dict):
+        return values
+    if not isinstance(values, (list, tuple)):
+        return {}
+    return {field: values[index] if index < len(values) else None for index, field in enumerate(fields)}
+
+
+def _decode_skill_level(level: Any) -> Optional[str]:
+    if isinstance(level, str) and level.isdigit():
+        level = int(level)
+    if isinstance(level, int) and not isinstance(level, bool):
+        return SKILL_LEVEL_CODES.get(level)
+    return level
+
+
+def decode_compact_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把紧凑格式的响应解码为完整格式的字典
+
+    Args:
+        data: 紧凑格式的JSON对象
+
+    Returns:
+        Dict[str, Any]: 与完整格式相同结构的字典（personal_info、work_experience、education、skills）
+    """
+    skills = []
+    for values in data.get("s") or []:
+        skill = _record(values, SKILL_FIELDS)
+        if not skill:
+            continue
+        category = skill.get("category")
+        skill["category"] = SKILL_CATEGORY_CODES.get(category, category)
+        skill["level"] = _decode_skill_level(skill.get("level"))
+        skills.append(skill)
+
+    work_experience = []
+    for values in data.get("w") or []:
+        experience = _record(values, WORK_EXPERIENCE_FIELDS)
+        if experience:
+            # 空的工作描述和技术栈还原为空列表，与完整格式的默认值一致
+            experience["description"] = experience.get("description") or []
+            work_experience.append(experience)
+
+    return {
+        "personal_info": _record(data.get("p") or [], PERSONAL_INFO_FIELDS),
+        "work_experience": work_experience,
+        "education": [record for record in (_record(values, EDUCATION_FIELDS) for values in data.get("e") or []) if record],
+        "skills": skills
+    }
+
+
+def encode_compact_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把完整格式的字典编码为紧凑格式（decode_compact_response的逆过程），用于评估和测试
+
+    Args:
+        data: 完整格式的字典，技能分类和熟练程度为SkillCategory、SkillLevel的取值
+
+    Returns:
+        Dict[str, Any]: 紧凑格式的JSON对象
+    """
+    category_codes = {value: code for code, value in SKILL_CATEGORY_CODES.items()}
+    level_codes = {value: code for code, value in SKILL_LEVEL_CODES.items()}
+    personal_info = data.get("personal_info") or {}
+    return {
+        "p": [personal_info.get(field) for field in PERSONAL_INFO_FIELDS],
+        "w": [[record.get(field) for field in WORK_EXPERIENCE_FIELDS] for record in data.get("work_experience") or []],
+        "e": [[record.get(field) for field in EDUCATION_FIELDS] for record in data.get("education") or []],
+        "s": [
+            [category_codes.get(skill.get("category"), skill.get("category")), skill.get("name"),
+             level_codes.get(skill.get("level"), skill.get("level"))]
+            for skill in data.get("skills") or []
+        ]
+    }
@@ -0,0 +1,171 @@
+"""
+简历章节切分
+把所有章节标题词编译成一个多模式正则，对全文做一次扫描找出标题行，
+返回带类型和偏移量的章节区间，供提示词构建、规则抽取等下游环节只处理相关片段
+"""
+
+import re
+import logging
+from typing import Dict, Any, List, Iterable, Optional, Set
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 章节类型（与ResumeData的字段对应，项目经历和自我评价单独成类）
+SECTION_PREAMBLE = "preamble"
+SECTION_PERSONAL_INFO = "personal_info"
+SECTION_WORK_EXPERIENCE = "work_experience"
+SECTION_EDUCATION = "education"
+SECTION_SKILLS = "skills"
+SECTION_PROJECTS = "projects"
+SECTION_SUMMARY = "summary"
+
+# 章节类型 -> 标题词（英文标题不区分大小写）
+SECTION_HEADERS: Dict[str, List[str]] = {
+    SECTION_PERSONAL_INFO: [
+        '个人信息', '基本信息', '联系方式',
+        'Personal Information', 'Personal Info', 'Contact', 'Contact Information',
+    ],
+    SECTION_WORK_EXPERIENCE: [
+        '工作经历', '工作经验', '职业经历', '实习经历',
+        'Work Experience', 'Professional Experience', 'Employment History', 'Experience',
+    ],
+    SECTION_EDUCATION: [
+        '教育背景', '教育经历', '学历',
+        'Education', 'Education Background',
+    ],
+    SECTION_SKILLS: [
+        '技能', '专业技能', '技术技能', '技能特长',
+        'Skills', 'Technical Skills', 'Core Skills',
+    ],
+    SECTION_PROJECTS: [
+        '项目经验', '项目经历',
+        'Projects', 'Project Experience',
+    ],
+    SECTION_SUMMARY: [
+        '自我评价', '个人简介', '个人总结',
+        'Summary', 'Profile', 'About Me', 'Self Evaluation',
+    ],
+}
+
+# 标题行前的编号和装饰，如"一、"、"1."、"（二）"、"■"、"【"
+_HEADER_PREFIX = r'[ \t　]*(?:[(（]?[一二三四五六七八九十0-9]{1,2}[)）]?[、.．]?[ \t　]*)?[■●◆▶•·★#*【\[]*[ \t　]*'
+# 标题词之后只允许右括号、冒号和空白，之后就是行尾
+_HEADER_SUFFIX = r'[ \t　]*[】\]]?[ \t　]*[:：]?[ \t　]*$'
+
+
+def _compile_headers(headers: Dict[str, List[str]]) -> re.Pattern:
+    """把标题词编译成一个按行首锚定的多模式正则，较长的标题词优先匹配"""
+    keywords = sorted({keyword for words in headers.values() for keyword in words}, key=len, reverse=True)
+    alternation = '|'.join(re.escape(keyword) for keyword in keywords)
+    return re.compile(f'^{_HEADER_PREFIX}(?P<title>{alternation}){_HEADER_SUFFIX}', re.MULTILINE | re.IGNORECASE)
+
+
+class SectionSegmenter:
+    """简历章节切分器"""
+
+    def __init__(self, headers: Optional[Dict[str, List[str]]] = None):
+        """
+        初始化切分器
+
+        Args:
+            headers: 章节类型 -> 标题词，默认使用SECTION_HEADERS
+        """
+        self.headers = headers or SECTION_HEADERS
+        self._section_types = {
+            keyword.lower(): section_type
+            for section_type, words in self.headers.items()
+            for keyword in words
+        }
+        self._pattern = _compile_headers(self.headers)
+
+    def segment(self, text: str) -> List[Dict[str, Any]]:
+        """
+        把文本切分为章节区间
+
+        只有独占一行的标题（可带编号、括号和冒号）才会开始新章节，
+        正文中出现的标题词（如"负责技能培训"）不会被当作标题。
+        第一个标题之前的非空内容（通常是姓名和联系方式）作为preamble章节。
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            List[Dict[str, Any]]: 按出现顺序排列的章节，每个章节包含：
+                type: 章节类型
+                title: 文本中的标题（preamble为空字符串）
+                start: 章节在文本中的起始偏移（标题行的开头）
+                content_start: 正文的起始偏移（标题行的结尾）
+                end: 章节的结束偏移（下一个章节的开头或文本结尾）
+        """
+        if not text:
+            return []
+
+        sections: List[Dict[str, Any]] = []
+        for match in self._pattern.finditer(text):
+            title = match.group('title')
+            if sections:
+                sections[-1]["end"] = match.start()
+            elif text[:match.start()].strip():
+                sections.append({
+                    "type": SECTION_PREAMBLE,
+                    "title": "",
+                    "start": 0,
+                    "content_start": 0,
+                    "end": match.start()
+                })
+            sections.append({
+                "type": self._section_types[title.lower()],
+                "title": title,
+                "start": match.start(),
+                "content_start": match.end(),
+                "end": len(text)
+            })
+
+        if not sections and text.strip():
+            sections.append({
+                "type": SECTION_PREAMBLE,
+                "title": "",
+                "start": 0,
+                "content_start": 0,
+                "end": len(text)
+            })
+        return sections
+
+    def section_types(self, text: str) -> Set[str]:
+        """
+        返回文本中出现的章节类型（不含preamble）
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            Set[str]: 章节类型集合
+        """
+        return {self._section_types[match.group('title').lower()] for match in self._pattern.finditer(text)}
+
+    def get_section_text(self, text: str, sections: List[Dict[str, Any]],
+                         section_types: Iterable[str]) -> str:
+        """
+        拼接指定类型章节的正文
+
+        Args:
+            text: 切分时使用的文本
+            sections: segment返回的章节区间
+            section_types: 需要的章节类型
+
+        Returns:
+            str: 按原顺序拼接的章节内容（包含标题行），没有匹配的章节时返回空字符串
+        """
+        wanted = set(section_types)
+        return '\n\n'.join(
+            text[section["start"]:section["end"]].strip()
+            for section in sections
+            if section["type"] in wanted
+        )
+
+
+# 创建全局实例
+section_segmenter = SectionSegmenter()
@@ -0,0 +1,192 @@
+"""
+按章节拆分的简历解析
+把简历文本按章节归入四个部分，每部分（超出分块预算时每块）作为一个较小的请求并发发给通义千问，
+再把各请求返回的部分结果合并为完整格式的字典：
+
+- personal_info：开头部分、个人信息和自我评价
+- work_experience：工作经历
+- education：教育背景
+- skills：专业技能和项目经历（从项目经历中提取技能）
+
+超出预算的部分按行切块，尽量在经历的标题行（含时间段或时间段标记的行）处切开，
+避免一段经历被拆到两个请求中；合并时按公司和开始时间、学校和开始时间、技能名称去重，
+被拆开的同一段经历合并描述和技术栈。
+"""
+
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.config.pipeline_config import SECTIONED_PARSING_CONFIG
+from backend.services.contact_extractor import DATE_RANGE_PATTERN
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.section_segmenter import (
+    section_segmenter,
+    SECTION_PREAMBLE,
+    SECTION_PERSONAL_INFO,
+    SECTION_WORK_EXPERIENCE,
+    SECTION_EDUCATION,
+    SECTION_SKILLS,
+    SECTION_PROJECTS,
+    SECTION_SUMMARY,
+)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 拆分规则版本，规则变化时AI解析缓存随之失效
+SECTIONED_EXTRACTION_VERSION = "1"
+
+# 拆分后的部分，与完整格式的顶层字段同名
+PART_PERSONAL_INFO = "personal_info"
+PART_WORK_EXPERIENCE = "work_experience"
+PART_EDUCATION = "education"
+PART_SKILLS = "skills"
+PARTS = (PART_PERSONAL_INFO, PART_WORK_EXPERIENCE, PART_EDUCATION, PART_SKILLS)
+
+# 章节类型 -> 所属部分
+SECTION_PARTS = {
+    SECTION_PREAMBLE: PART_PERSONAL_INFO,
+    SECTION_PERSONAL_INFO: PART_PERSONAL_INFO,
+    SECTION_SUMMARY: PART_PERSONAL_INFO,
+    SECTION_WORK_EXPERIENCE: PART_WORK_EXPERIENCE,
+    SECTION_EDUCATION: PART_EDUCATION,
+    SECTION_SKILLS: PART_SKILLS,
+    SECTION_PROJECTS: PART_SKILLS,
+}
+
+# 合并列表部分时判断是同一项的字段
+_MERGE_KEYS = {
+    PART_WORK_EXPERIENCE: ("company", "start_date"),
+    PART_EDUCATION: ("institution", "start_date"),
+    PART_SKILLS: ("name",),
+}
+
+# 经历的标题行：含时间段，或预提取后的时间段标记
+_ENTRY_MARKER = re.compile(r'\[D\d+\]')
+
+
+class SectionedExtractor:
+    """按章节拆分解析请求并合并结果"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 按章节解析配置，覆盖SECTIONED_PARSING_CONFIG中的同名项
+        """
+        config = {**SECTIONED_PARSING_CONFIG, **(config or {})}
+        self.chunk_token_budget = config["chunk_token_budget"]
+
+    def plan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        把简历文本拆分为多个解析请求的片段
+
+        Args:
+            text: 简历文本（预提取和压缩之后）
+
+        Returns:
+            List[Dict[str, Any]]: 按部分顺序排列的片段，每个片段包含part、text、
+                index（同一部分中的序号，从1开始）和total（同一部分的片段数）；
+                没有识别到工作经历、教育背景、技能或项目经历章节时返回空列表，由调用方整体解析
+        """
+        sections = section_segmenter.segment(text)
+        if not any(SECTION_PARTS[section["type"]] != PART_PERSONAL_INFO for section in sections):
+            return []
+
+        grouped: Dict[str, List[str]] = {part: [] for part in PARTS}
+        for section in sections:
+            piece = text[section["start"]:section["end"]].strip()
+            if piece:
+                grouped[SECTION_PARTS[section["type"]]].append(piece)
+
+        pieces = []
+        for part in PARTS:
+            if not grouped[part]:
+                continue
+            chunks = self._chunk('\n\n'.join(grouped[part]))
+            pieces.extend(
+                {"part": part, "text": chunk, "index": index, "total": len(chunks)}
+                for index, chunk in enumerate(chunks, 1)
+            )
+        return pieces
+
+    def _chunk(self, text: str) -> List[str]:
+        """按行切块，超出预算时在最近的经历标题行处切开；单段经历超出预算时按行切开"""
+        budget = self.chunk_token_budget
+        if not budget or estimate_tokens(text) <= budget:
+            return [text]
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        entry_start = 0
+        for line in text.split('\n'):
+            tokens = estimate_tokens(line) + 1
+            if current and current_tokens + tokens > budget:
+                cut = entry_start or len(current)
+                chunks.append('\n'.join(current[:cut]).strip())
+                current = current[cut:]
+                current_tokens = sum(estimate_tokens(kept) + 1 for kept in current)
+                entry_start = 0
+            if current and (_ENTRY_MARKER.search(line) or DATE_RANGE_PATTERN.search(line)):
+                entry_start = len(current)
+            current.append(line)
+            current_tokens += tokens
+        chunks.append('\n'.join(current).strip())
+        return [chunk for chunk in chunks if chunk]
+
+    @staticmethod
+    def reduce(results: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        """
+        合并各请求返回的部分结果
+
+        Args:
+            results: (部分, 该部分的解析结果)，personal_info为字典，其余为列表
+
+        Returns:
+            Dict[str, Any]: 完整格式的字典；个人信息每个字段取第一个非空值，
+                列表部分按出现顺序合并，同一项只保留一条并补全其他片段中的字段
+        """
+        merged: Dict[str, Any] = {part: [] for part in PARTS}
+        merged[PART_PERSONAL_INFO] = {}
+        for part, value in results:
+            if part == PART_PERSONAL_INFO:
+                for field, field_value in value.items():
+                    if field_value and not merged[part].get(field):
+                        merged[part][field] = field_value
+            else:
+                merged[part] = _merge_entries(merged[part], value, _MERGE_KEYS[part])
+        return merged
+
+
+def _entry_key(entry: Dict[str, Any], fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(str(entry.get(field) or '').strip().lower() for field in fields)
+
+
+def _merge_entries(entries: List[Dict[str, Any]], new_entries: List[Any],
+                   fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """把new_entries合并到entries，同一项补全空字段、追加列表字段中没有的元素"""
+    merged = [dict(entry) for entry in entries]
+    index = {_entry_key(entry, fields): entry for entry in merged}
+    for entry in new_entries:
+        if not isinstance(entry, dict):
+            continue
+        key = _entry_key(entry, fields)
+        existing = index.get(key)
+        if existing is None:
+            existing = dict(entry)
+            merged.append(existing)
+            index[key] = existing
+            continue
+        for field, value in entry.items():
+            if isinstance(value, list) and isinstance(existing.get(field), list):
+                existing[field] = existing[field] + [item for item in value if item not in existing[field]]
+            elif value and not existing.get(field):
+                existing[field] = value
+    return merged
+
+
+# 创建全局实例
+sectioned_extractor = SectionedExtractor()
@@ -0,0 +1,338 @@
+"""
+任务状态存储
+为上传、解析等后台任务提供可插拔的状态存储，
+Redis实现可在多个worker进程间共享，内存实现带TTL和容量淘汰
+"""
+
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+import redis
+
+from backend.config.pipeline_config import STATUS_STORE_CONFIG
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StatusStore(ABC):
+    """
+    任务状态存储接口
+
+    每条记录是一个扁平的字段字典，更新时只写入变化的字段。
+    get返回记录的副本，修改副本不会影响存储，需要调用update写回。
+    """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态，不存在或已过期时返回None"""
+
+    @abstractmethod
+    def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        """合并更新任务状态字段，记录不存在时创建"""
+
+    @abstractmethod
+    def remove_fields(self, job_id: str, *fields: str) -> None:
+        """删除任务状态中的指定字段"""
+
+    @abstractmethod
+    def set_field_if_absent(self, job_id: str, field: str, value: Any) -> bool:
+        """字段不存在时写入，返回是否写入成功（用于跨进程互斥）"""
+
+    @abstractmethod
+    def replace_field_if_equal(self, job_id: str, field: str, expected: Any, value: Any) -> bool:
+        """字段当前值等于expected时替换为value，返回是否替换成功（用于跨进程抢占失效的锁）"""
+
+    @abstractmethod
+    def remove_fields_and_count(self, job_id: str, *fields: str) -> int:
+        """
+        原子地删除指定字段并返回剩余字段数，没有剩余字段时同时删除记录（用于跨进程的引用计数）
+        """
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        """删除任务状态，返回记录是否存在"""
+
+    @abstractmethod
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """按最近更新时间倒序列出任务状态"""
+
+    def get_many(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """批量获取任务状态，顺序与job_ids一致"""
+        return [self.get(job_id) for job_id in job_ids]
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+
+class InMemoryStatusStore(StatusStore):
+    """进程内状态存储，按TTL过期并按最近更新时间淘汰最旧的记录"""
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            ttl: 记录的存活秒数，None表示不过期
+            max_entries: 最多保存的记录数，None表示不限制
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # job_id -> (字段字典, 过期时间)，按最近更新时间排序
+        self._records: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        # 写操作可能来自线程池，读改写需要互斥
+        self._lock = threading.RLock()
+
+    def _expires_at(self) -> Optional[float]:
+        return time.monotonic() + self.ttl if self.ttl else None
+
+    def _live_record(self, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._records.get(job_id)
+        if entry is None:
+            return None
+        fields, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._records[job_id]
+            return None
+        return fields
+
+    def _evict(self):
+        """淘汰过期记录和超出容量的最旧记录"""
+        now = time.monotonic()
+        # 记录按更新时间排序，最旧的在前，遇到未过期的记录即可停止
+        while self._records:
+            _, (_, expires_at) = next(iter(self._records.items()))
+            if expires_at is not None and expires_at <= now:
+                self._records.popitem(last=False)
+            elif self.max_entries is not None and len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+            else:
+                break
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        fields = self._live_record(job_id)
+        return dict(fields) if fields is not None else None
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            record = self._live_record(job_id)
+            if record is None:
+                record = {}
+            record.update(fields)
+            self._records[job_id] = (record, self._expires_at())
+            self._records.move_to_end(job_id)
+            self._evict()
+
+    def remove_fields(self, job_id: str, *fields: str) -> None:
+        with self._lock:
+            record = self._live_record(job_id)
+            if record is not None:
+                for field in fields:
+                    record.pop(field, None)
+
+    def remove_fields_and_count(self, job_id: str, *fields: str) -> int:
+        with self._lock:
+            self.remove_fields(job_id, *fields)
+            record = self._live_record(job_id)
+            if not record:
+                self._records.pop(job_id, None)
+                return 0
+            return len(record)
+
+    def set_field_if_absent(self, job_id: str, field: str, value: Any) -> bool:
+        with self._lock:
+            record = self._live_record(job_id)
+            if record is not None and field in record:
+                return False
+            self.update(job_id, {field: value})
+            return True
+
+    def replace_field_if_equal(self, job_id: str, field: str, expected: Any, value: Any) -> bool:
+        with self._lock:
+            record = self._live_record(job_id)
+            if record is None or field not in record or record[field] != expected:
+                return False
+            record[field] = value
+            return True
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            return self._records.pop(job_id, None) is not None
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        self._evict()
+        result = []
+        for job_id in reversed(list(self._records.keys())):
+            fields = self._live_record(job_id)
+            if fields is None:
+                continue
+            result.append((job_id, dict(fields)))
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+# 删除字段并返回剩余字段数，哈希为空时Redis自动删除键，这里同时从索引中移除
+_REMOVE_FIELDS_AND_COUNT = """
+redis.call('HDEL', KEYS[1], unpack(ARGV, 2))
+local remaining = redis.call('HLEN', KEYS[1])
+if remaining == 0 then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+end
+return remaining
+"""
+
+# 字段的JSON编码值等于期望值时替换
+_REPLACE_FIELD_IF_EQUAL = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+return 1
+"""
+
+
+class RedisStatusStore(StatusStore):
+    """
+    Redis状态存储，多个worker进程共享
+
+    每条记录保存为一个Redis哈希，字段值以JSON编码；另有一个按更新时间
+    排序的有序集合作为索引，用于列表查询。
+    """
+
+    def __init__(self, redis_client: redis.Redis, namespace: str,
+                 ttl: Optional[int] = None, key_prefix: str = "status:"):
+        """
+        Args:
+            redis_client: Redis客户端（需要decode_responses=True）
+            namespace: 命名空间，如upload、parse
+            ttl: 记录的存活秒数，None表示不过期
+            key_prefix: 键前缀
+        """
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._key_prefix = f"{key_prefix}{namespace}:"
+        self._index_key = f"{key_prefix}{namespace}:index"
+        self._remove_fields_and_count = redis_client.register_script(_REMOVE_FIELDS_AND_COUNT)
+        self._replace_field_if_equal = redis_client.register_script(_REPLACE_FIELD_IF_EQUAL)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self._key_prefix}{job_id}"
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Dict[str, Any]:
+        return {field: json.loads(value) for field, value in raw.items()}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis_client.hgetall(self._key(job_id))
+        return self._decode(raw) if raw else None
+
+    def get_many(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self._key(job_id))
+        return [self._decode(raw) if raw else None for raw in pipe.execute()]
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(job_id)
+        now = time.time()
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping={field: json.dumps(value, ensure_ascii=False) for field, value in fields.items()})
+        pipe.zadd(self._index_key, {job_id: now})
+        if self.ttl:
+            pipe.expire(key, self.ttl)
+            # 顺带清理索引中已过期的记录
+            pipe.zremrangebyscore(self._index_key, 0, now - self.ttl)
+        pipe.execute()
+
+    def remove_fields(self, job_id: str, *fields: str) -> None:
+        if fields:
+            self.redis_client.hdel(self._key(job_id), *fields)
+
+    def remove_fields_and_count(self, job_id: str, *fields: str) -> int:
+        if not fields:
+            return int(self.redis_client.hlen(self._key(job_id)))
+        # 在一个Lua脚本中执行，其他进程的写入不会插在删除和计数之间
+        return int(self._remove_fields_and_count(keys=[self._key(job_id), self._index_key], args=[job_id, *fields]))
+
+    def set_field_if_absent(self, job_id: str, field: str, value: Any) -> bool:
+        key = self._key(job_id)
+        created = bool(self.redis_client.hsetnx(key, field, json.dumps(value, ensure_ascii=False)))
+        if created:
+            self.redis_client.zadd(self._index_key, {job_id: time.time()})
+            if self.ttl:
+                self.redis_client.expire(key, self.ttl)
+        return created
+
+    def replace_field_if_equal(self, job_id: str, field: str, expected: Any, value: Any) -> bool:
+        # 比较和写入在一个Lua脚本中执行，两个进程不会同时替换成功
+        return bool(self._replace_field_if_equal(
+            keys=[self._key(job_id)],
+            args=[field, json.dumps(expected, ensure_ascii=False), json.dumps(value, ensure_ascii=False)]
+        ))
+
+    def delete(self, job_id: str) -> bool:
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(self._key(job_id))
+        pipe.zrem(self._index_key, job_id)
+        deleted, _ = pipe.execute()
+        return bool(deleted)
+
+    def items(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        end = limit - 1 if limit else -1
+        job_ids = self.redis_client.zrevrange(self._index_key, 0, end)
+        if not job_ids:
+            return []
+
+        result = []
+        expired = []
+        for job_id, record in zip(job_ids, self.get_many(job_ids)):
+            if record is not None:
+                result.append((job_id, record))
+            else:
+                expired.append(job_id)
+        if expired:
+            self.redis_client.zrem(self._index_key, *expired)
+        return result
+
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def _get_redis_client() -> redis.Redis:
+    """获取进程内共享的Redis客户端"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            STATUS_STORE_CONFIG["redis_url"],
+            decode_responses=True,
+            health_check_interval=30
+        )
+    return _redis_client
+
+
+def create_status_store(namespace: str, persistent: bool = False) -> StatusStore:
+    """
+    根据配置创建状态存储
+
+    Args:
+        namespace: 命名空间，如upload、parse
+        persistent: 是否长期保存（不过期、不淘汰），用于引用计数等不能丢失的数据
+
+    Returns:
+        StatusStore: 状态存储实例
+    """
+    ttl = None if persistent else STATUS_STORE_CONFIG["ttl"]
+    max_entries = None if persistent else STATUS_STORE_CONFIG["max_entries"]
+
+    backend = STATUS_STORE_CONFIG["backend"]
+    if backend == "redis":
+        logger.info(f"使用Redis状态存储: {namespace}")
+        return RedisStatusStore(_get_redis_client(), namespace, ttl, STATUS_STORE_CONFIG["key_prefix"])
+    if backend != "memory":
+        raise ValueError(f"不支持的状态存储类型: {backend}")
+    return InMemoryStatusStore(ttl, max_entries)
@@ -0,0 +1,233 @@
+"""
+PDF提取文本规范化
+与原先逐条执行的正则替换规则输出完全一致，但不再对全文逐条做正则替换：
+
+- 版面规范化（统一换行、合并空格、去除行首行尾空白、合并空行）只用字符串方法，
+  逐行处理只遍历一次
+- 修复规则（断词、邮箱、电话、日期）从各自的触发位置（换行前的连字符、@、数字间的空白）出发，
+  在局部按原规则的最左匹配语义改写，不再在每个字符位置尝试回溯，长行上耗时与行长成线性关系
+"""
+
+import re
+import logging
+from typing import Callable, List, Match, Optional, Tuple
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 页面分隔符
+_PAGE_SEPARATOR = re.compile(r'--- 第\d+页 ---\n?')
+
+# 断词修复：连字符后跟换行，再跟小写字母
+_HYPHEN_BREAK = re.compile(r'-\s*\n\s*([a-z])')
+
+# 邮箱本地部分的字符（与原规则的[a-zA-Z0-9._%-]一致）
+_EMAIL_LOCAL_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%-"
+# @之后的可选空白和域名
+_EMAIL_DOMAIN = re.compile(r'\s*([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+
+# 电话和日期规则只会匹配数字、空白、/和-组成的片段，只有片段内部（两端非空白字符之间）有空白时才会改写
+_DIGIT_SPACING = re.compile(r'[\d/-]\s+[\d/-]')
+_DIGIT_SEGMENT_TAIL = re.compile(r'[\d\s/-]*')
+
+
+def _join_groups(separator: str) -> Callable[[Match], str]:
+    """生成用分隔符连接三个分组的替换函数（比模板替换少一次模板展开）"""
+    return lambda match: f"{match[1]}{separator}{match[2]}{separator}{match[3]}"
+
+
+_DIGIT_RULES = [
+    # 电话号码格式
+    (re.compile(r'(\d{3})\s*-\s*(\d{4})\s*-\s*(\d{4})'), _join_groups('-')),
+    (re.compile(r'(\d{3})\s+(\d{4})\s+(\d{4})'), _join_groups('-')),
+    # 日期格式
+    (re.compile(r'(\d{4})\s*/\s*(\d{1,2})\s*/\s*(\d{1,2})'), _join_groups('/')),
+    (re.compile(r'(\d{4})\s*-\s*(\d{1,2})\s*-\s*(\d{1,2})'), _join_groups('-')),
+]
+
+
+class TextNormalizer:
+    """PDF提取文本规范化器"""
+
+    def normalize(self, raw_text: str) -> str:
+        """
+        清理和预处理提取的文本
+
+        Args:
+            raw_text: 原始提取的文本
+
+        Returns:
+            清理后的文本
+        """
+        if not raw_text:
+            return ""
+
+        # 移除页面分隔符
+        text = _PAGE_SEPARATOR.sub('', raw_text) if '--- 第' in raw_text else raw_text
+
+        # 统一换行符
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+        # 多个空格/制表符变为一个空格（重复替换，每次C层面扫描一遍，连续空格越长次数按对数增长）
+        if '\t' in text:
+            text = text.replace('\t', ' ')
+        while '  ' in text:
+            text = text.replace('  ', ' ')
+
+        # 移除行首行尾空白（str.strip与正则\s的空白字符集相同），只含空白的行变为空行
+        text = '\n'.join([line.strip() for line in text.split('\n')])
+
+        # 多个连续空行变为一个空行，与原先先合并\n\s*\n再去除行首行尾空白的结果相同
+        while '\n\n\n' in text:
+            text = text.replace('\n\n\n', '\n\n')
+
+        # 修复常见的PDF提取问题
+        return self.fix_common_pdf_issues(text.strip())
+
+    def fix_common_pdf_issues(self, text: str) -> str:
+        """
+        修复PDF提取中的常见问题：被分割的英文单词、邮箱地址、电话号码和日期格式
+
+        规则按固定顺序执行，后面的规则作用于前面规则的结果。
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            修复后的文本
+        """
+        if '-' in text and '\n' in text:
+            text = self._join_hyphenated_words(text)
+        if '@' in text:
+            text = self._join_split_emails(text)
+            text = self._strip_email_spaces(text)
+        return self._fix_digit_formats(text)
+
+    def _join_hyphenated_words(self, text: str) -> str:
+        """修复被分割的单词（英文），等价于([a-z])-\\s*\\n\\s*([a-z]) -> \\1\\2"""
+        pieces: List[str] = []
+        copied = 0
+        # 连字符前的字母被上一次匹配消耗后，不能再作为下一次匹配的开头
+        resume = 0
+        match = _HYPHEN_BREAK.search(text, 1)
+        while match:
+            dash = match.start()
+            if dash - 1 >= resume and 'a' <= text[dash - 1] <= 'z':
+                pieces.append(text[copied:dash])
+                pieces.append(match.group(1))
+                copied = resume = match.end()
+                match = _HYPHEN_BREAK.search(text, resume + 1)
+            else:
+                match = _HYPHEN_BREAK.search(text, dash + 1)
+        if not pieces:
+            return text
+        pieces.append(text[copied:])
+        return ''.join(pieces)
+
+    def _join_split_emails(self, text: str) -> str:
+        """
+        修复邮箱本地部分被空白分成两段的问题，
+        等价于([a-zA-Z0-9._%-]+)\\s+([a-zA-Z0-9._%-]+)\\s*@\\s*(域名) -> \\1\\2@\\3
+        """
+        def rewrite(head: str) -> Optional[Tuple[int, str]]:
+            # head末尾依次为：第一段、空白、第二段、空白（可为空）
+            before_at = head.rstrip()
+            second = len(before_at) - len(before_at.rstrip(_EMAIL_LOCAL_CHARS))
+            if not second:
+                return None
+            before_second = before_at[:-second]
+            spaced = before_second.rstrip()
+            if len(spaced) == len(before_second):
+                return None
+            first = len(spaced) - len(spaced.rstrip(_EMAIL_LOCAL_CHARS))
+            if not first:
+                return None
+            return len(spaced) - first, spaced[-first:] + before_at[-second:]
+
+        return self._rewrite_emails(text, rewrite)
+
+    def _strip_email_spaces(self, text: str) -> str:
+        """去除邮箱@两侧的空白，等价于([a-zA-Z0-9._%-]+)\\s*@\\s*(域名) -> \\1@\\2"""
+        def rewrite(head: str) -> Optional[Tuple[int, str]]:
+            before_at = head.rstrip()
+            local = len(before_at) - len(before_at.rstrip(_EMAIL_LOCAL_CHARS))
+            if not local:
+                return None
+            return len(before_at) - local, before_at[-local:]
+
+        return self._rewrite_emails(text, rewrite)
+
+    def _rewrite_emails(self, text: str, rewrite: Callable) -> str:
+        """
+        按@的位置依次改写邮箱
+
+        原规则的每个匹配恰好包含一个@，匹配的开头只能在@之前、上一个@之后，
+        且不早于上一次匹配的结尾（在单词中间恢复扫描时从该位置开始匹配）。
+
+        Args:
+            text: 文本内容
+            rewrite: 接收@之前的文本片段，返回(匹配开头在片段中的位置, @之前的替换文本)，不匹配时返回None
+        """
+        pieces: List[str] = []
+        copied = 0
+        resume = 0
+        previous_at = -1
+        at = text.find('@')
+        while at != -1:
+            # 先检查域名（一次C层面的匹配），大部分不是邮箱的@在这里就被排除
+            domain = _EMAIL_DOMAIN.match(text, at + 1)
+            if domain:
+                start = max(resume, previous_at + 1)
+                result = rewrite(text[start:at])
+                if result is not None:
+                    offset, local = result
+                    pieces.append(text[copied:start + offset])
+                    pieces.append(f"{local}@{domain.group(1)}")
+                    copied = resume = domain.end()
+            previous_at = at
+            at = text.find('@', at + 1)
+        if not pieces:
+            return text
+        pieces.append(text[copied:])
+        return ''.join(pieces)
+
+    def _fix_digit_formats(self, text: str) -> str:
+        """
+        修复电话号码和日期格式
+
+        这些规则只匹配由数字、空白、/和-组成的片段，任何其他字符都会截断匹配，
+        因此在每个最大片段内依次执行原规则，结果与对全文执行相同。
+        匹配都以数字开头和结尾，不含空白的匹配替换后不变，
+        所以只需处理内部有空白的片段，如"138 1234 5678"、"2020 / 01 / 15"。
+        """
+        pieces: List[str] = []
+        copied = 0
+        trigger = _DIGIT_SPACING.search(text)
+        while trigger:
+            # 向前扩展到片段开头（str.isdecimal与正则\d、str.isspace与\s的字符集相同）
+            start = trigger.start()
+            while start > copied:
+                ch = text[start - 1]
+                if not (ch.isdecimal() or ch.isspace() or ch == '/' or ch == '-'):
+                    break
+                start -= 1
+            end = _DIGIT_SEGMENT_TAIL.match(text, trigger.start()).end()
+
+            segment = text[start:end]
+            for pattern, replacement in _DIGIT_RULES:
+                segment = pattern.sub(replacement, segment)
+            pieces.append(text[copied:start])
+            pieces.append(segment)
+            copied = end
+            trigger = _DIGIT_SPACING.search(text, end)
+        if not pieces:
+            return text
+        pieces.append(text[copied:])
+        return ''.join(pieces)
+
+
+# 创建全局实例
+text_normalizer = TextNormalizer()
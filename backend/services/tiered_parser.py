@@ -0,0 +1,155 @@
+"""
+分层简历解析
+先用本地规则解析，置信度达到阈值时直接使用本地结果；否则交给通义千问解析。
+
+置信度 = validate_parsed_data的完整性评分 × 规则解析的覆盖率，
+必要信息缺失（validate_parsed_data判定无效）或无法构建简历对象时置信度为0。
+统计每一层处理的简历数、占比和延迟分位数。
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from backend.config.pipeline_config import TIERED_PARSING_CONFIG
+from backend.services.heuristic_parser import HeuristicResumeParser, heuristic_parser
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# 解析层
+TIER_HEURISTIC = "heuristic"
+TIER_LLM = "llm"
+TIERS = (TIER_HEURISTIC, TIER_LLM)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    """延迟分位数（毫秒，最近秩法）"""
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0}
+    ordered = sorted(samples)
+    return {
+        f"p{percent}": round(ordered[max(0, -(-len(ordered) * percent // 100) - 1)], 3)
+        for percent in (50, 90, 99)
+    }
+
+
+class TieredResumeParser:
+    """分层简历解析器"""
+
+    def __init__(self, llm_parser, heuristic: Optional[HeuristicResumeParser] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            llm_parser: 通义千问解析器（QwenResumeParser），同时提供validate_parsed_data
+            heuristic: 本地规则解析器，默认使用全局实例
+            config: 分层解析配置，覆盖TIERED_PARSING_CONFIG中的同名项
+        """
+        config = {**TIERED_PARSING_CONFIG, **(config or {})}
+        self.llm_parser = llm_parser
+        self.heuristic = heuristic or heuristic_parser
+        self.enabled = config["enabled"]
+        self.confidence_threshold = config["confidence_threshold"]
+
+        self._counts = {tier: 0 for tier in TIERS}
+        self._latencies = {tier: deque(maxlen=config["latency_samples"]) for tier in TIERS}
+        # 升级到通义千问时，花在本地解析上的时间
+        self._escalation_overhead: Deque[float] = deque(maxlen=config["latency_samples"])
+
+    def score(self, text: str) -> Dict[str, Any]:
+        """
+        本地解析并计算置信度
+
+        Args:
+            text: 规范化后的简历文本
+
+        Returns:
+            Dict[str, Any]: resume（无法构建时为None）、confidence、completeness_score、coverage
+                以及validate_parsed_data给出的warnings
+        """
+        result = self.heuristic.parse(text)
+        resume = result["resume"]
+        if resume is None:
+            return {"resume": None, "confidence": 0.0, "completeness_score": 0.0,
+                    "coverage": round(result["coverage"], 3), "warnings": [result["error"]]}
+
+        validation = self.llm_parser.validate_parsed_data(resume)
+        completeness = validation["completeness_score"]
+        confidence = completeness * result["coverage"] if validation["is_valid"] else 0.0
+        return {
+            "resume": resume,
+            "confidence": round(confidence, 3),
+            "completeness_score": round(completeness, 3),
+            "coverage": round(result["coverage"], 3),
+            "warnings": validation["warnings"]
+        }
+
+    async def parse(self, text: str,
+                    on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None,
+                    response_format: Optional[str] = None,
+                    on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """
+        分层解析简历文本
+
+        Args:
+            text: 规范化后的简历文本
+            on_queued: 交给通义千问时因限流排队的回调
+            response_format: 交给通义千问时的响应格式
+            on_progress: 交给通义千问时的生成进度回调
+
+        Returns:
+            Dict[str, Any]: resume（ResumeData）、tier（heuristic或llm）、confidence（本地解析的置信度）
+
+        Raises:
+            QwenParseError: 交给通义千问后解析失败时
+        """
+        start = time.perf_counter()
+        confidence = None
+        if self.enabled:
+            scored = self.score(text)
+            confidence = scored["confidence"]
+            if scored["resume"] is not None and confidence >= self.confidence_threshold:
+                return self._record(TIER_HEURISTIC, start, scored["resume"], confidence)
+            self._escalation_overhead.append((time.perf_counter() - start) * 1000)
+            logger.info(f"本地解析置信度{confidence:.2f}低于阈值{self.confidence_threshold}，交给通义千问解析")
+
+        resume = await self.llm_parser.parse_resume_text_async(
+            text,
+            on_queued=on_queued,
+            response_format=response_format,
+            on_progress=on_progress
+        )
+        return self._record(TIER_LLM, start, resume, confidence)
+
+    def _record(self, tier: str, start: float, resume, confidence: Optional[float]) -> Dict[str, Any]:
+        latency = (time.perf_counter() - start) * 1000
+        self._counts[tier] += 1
+        self._latencies[tier].append(latency)
+        logger.info(f"简历由{tier}层解析，耗时{latency:.0f}ms")
+        return {"resume": resume, "tier": tier, "confidence": confidence}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取分层解析统计
+
+        Returns:
+            Dict[str, Any]: 是否启用、置信度阈值，以及每一层的简历数、占比和最近的延迟分位数（毫秒），
+                llm层的延迟包含之前本地解析的时间，escalation_overhead_ms为其中本地解析的部分
+        """
+        total = sum(self._counts.values())
+        stats: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "confidence_threshold": self.confidence_threshold,
+            "total": total
+        }
+        for tier in TIERS:
+            stats[tier] = {
+                "count": self._counts[tier],
+                "share": round(self._counts[tier] / total, 3) if total else 0.0,
+                "latency_ms": _percentiles(self._latencies[tier])
+            }
+        stats["escalation_overhead_ms"] = _percentiles(self._escalation_overhead)
+        return stats
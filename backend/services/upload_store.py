@@ -0,0 +1,139 @@
+"""
+内容寻址的上传文件存储
+按文件内容的SHA-256存储上传的PDF，相同内容只保存一份，
+多个上传任务通过引用计数共享同一个文件
+"""
+
+import os
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from backend.services.status_store import StatusStore, InMemoryStatusStore
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ContentAddressedUploadStore:
+    """内容寻址的上传文件存储"""
+
+    def __init__(self, base_dir: str, refs: Optional[StatusStore] = None):
+        """
+        初始化存储
+
+        Args:
+            base_dir: 上传文件根目录，文件保存在其下的blobs子目录
+            refs: 引用计数存储，多进程部署时应使用共享存储
+        """
+        self.blob_dir = os.path.join(base_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        # 内容哈希 -> {引用该文件的上传ID: True}
+        self._refs = refs if refs is not None else InMemoryStatusStore()
+
+    def blob_path(self, sha256: str) -> str:
+        """
+        获取内容哈希对应的文件路径
+
+        Args:
+            sha256: 文件内容的SHA-256
+
+        Returns:
+            str: 文件路径（按哈希前两位分目录）
+        """
+        return os.path.join(self.blob_dir, sha256[:2], f"{sha256}.pdf")
+
+    def commit(self, temp_path: str, sha256: str, upload_id: str) -> Tuple[str, bool]:
+        """
+        将已写完的临时文件提交到存储，并登记上传ID的引用
+
+        Args:
+            temp_path: 已完整写入的临时文件路径
+            sha256: 文件内容的SHA-256
+            upload_id: 上传任务ID
+
+        Returns:
+            Tuple[str, bool]: (文件路径, 是否为重复内容)
+        """
+        path = self.blob_path(sha256)
+        # 先登记引用再检查文件，并发的release看到这个引用后会保留（或恢复）文件
+        self._refs.update(sha256, {upload_id: True})
+        is_duplicate = os.path.exists(path)
+
+        if is_duplicate:
+            # 内容已存在，丢弃临时文件
+            os.remove(temp_path)
+            logger.info(f"检测到重复上传，复用已有文件: {sha256}")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+
+        return path, is_duplicate
+
+    def release(self, sha256: str, upload_id: str) -> bool:
+        """
+        释放上传ID对文件的引用，最后一个引用释放时删除文件
+
+        删除引用和检查剩余引用数是一个原子操作，引用数为0时才删除文件。删除时先把文件移到
+        临时位置再检查一次引用：其间有并发的commit登记了新引用时把文件移回，不会删掉新上传的文件。
+
+        Args:
+            sha256: 文件内容的SHA-256
+            upload_id: 上传任务ID
+
+        Returns:
+            bool: 文件是否已被删除
+        """
+        remaining = self._refs.remove_fields_and_count(sha256, upload_id)
+        if remaining:
+            logger.info(f"文件仍被 {remaining} 个上传引用，保留: {sha256}")
+            return False
+
+        path = self.blob_path(sha256)
+        tombstone = f"{path}.{upload_id}.deleting"
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            return True
+        if self.refcount(sha256):
+            os.replace(tombstone, path)
+            logger.info(f"文件在删除时被重新引用，保留: {sha256}")
+            return False
+        os.remove(tombstone)
+        logger.info(f"文件删除成功: {path}")
+        return True
+
+    def refcount(self, sha256: str) -> int:
+        """
+        获取文件的引用计数
+
+        Args:
+            sha256: 文件内容的SHA-256
+
+        Returns:
+            int: 引用该文件的上传数量
+        """
+        return len(self._refs.get(sha256) or {})
+
+    def release_orphans(self, is_live: Callable[[List[str]], List[bool]]) -> int:
+        """
+        释放已不存在的上传任务的引用
+
+        引用计数长期保存，而上传状态记录会过期或被淘汰；状态记录消失后无法再通过接口删除上传，
+        这里释放这些上传的引用，最后一个引用释放时删除文件。
+
+        Args:
+            is_live: 判断上传ID是否仍然存在，参数为上传ID列表，返回顺序一致的布尔值列表
+
+        Returns:
+            int: 释放的引用数
+        """
+        released = 0
+        for sha256, refs in self._refs.items():
+            upload_ids = list(refs)
+            for upload_id, live in zip(upload_ids, is_live(upload_ids)):
+                if not live:
+                    self.release(sha256, upload_id)
+                    released += 1
+        return released
@@ -6,6 +6,7 @@
 import asyncio
 import os
 import sys
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -13,6 +14,7 @@ from datetime import datetime
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from backend.benchmarks.synthetic_pdf import build_synthetic_resume_pdf
 from backend.services.pdf_parser import PDFParser
 from backend.services.qwen_parser import QwenResumeParser
 from backend.services.redis_manager import RedisDataManager
@@ -23,8 +25,12 @@ from backend.models.resume import WebsiteConfig, ColorScheme
 async def test_full_pipeline():
     """测试完整的后端流程"""
     
-    # 测试文件路径
-    pdf_path = r"D:\面试\简历\java开发工程师_陈俊杰.pdf"
+    # 测试文件路径：可通过RESUME_PDF_PATH指定真实简历，默认生成一份合成的中文简历
+    pdf_path = os.getenv("RESUME_PDF_PATH")
+    if not pdf_path:
+        pdf_path = os.path.join(tempfile.gettempdir(), "synthetic_resume.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(build_synthetic_resume_pdf(num_pages=2, cjk_ratio=0.8, seed=0))
     
     print("🚀 开始完整后端流程测试")
     print("=" * 60)
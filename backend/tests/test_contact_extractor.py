@@ -0,0 +1,141 @@
+"""
+联系方式和时间段预提取测试
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from backend.benchmarks.bench_pre_extraction import run_offline
+from backend.config.pipeline_config import QWEN_PARSE_CONFIG
+from backend.services.contact_extractor import ContactExtractor, PRE_EXTRACTION_INSTRUCTIONS
+from backend.services.qwen_parser import QwenResumeParser
+
+RESUME_TEXT = """张三
+邮箱：zhangsan@example.com | 电话：+86 138 1234 5678 | 北京
+GitHub：github.com/zhangsan/ | 个人网站：https://zhangsan.dev
+工作经历
+ABC科技有限公司 | 高级工程师 | 2020.03 ~ 至今
+- 负责后端开发，对接https://api.example.com/docs
+XYZ公司 | 工程师 | 2017年7月-2020年2月
+教育背景
+清华大学 | 本科 | 2013-2017"""
+
+
+@pytest.fixture
+def extracted():
+    return ContactExtractor().extract(RESUME_TEXT)
+
+
+class TestContactExtractor:
+    """预提取测试类"""
+
+    def test_contact_fields(self, extracted):
+        """测试提取联系方式，链接补全协议并去掉末尾斜杠"""
+        assert extracted["personal_info"] == {
+            "email": "zhangsan@example.com",
+            "phone": "+86 138 1234 5678",
+            "linkedin": None,
+            "github": "https://github.com/zhangsan",
+            "website": "https://zhangsan.dev"
+        }
+
+    def test_date_ranges(self, extracted):
+        """测试不同写法的时间段统一为YYYY-MM，"至今"的结束时间为None，只有年份时保留年份"""
+        assert extracted["date_ranges"] == {
+            "D1": {"start_date": "2020-03", "end_date": None},
+            "D2": {"start_date": "2017-07", "end_date": "2020-02"},
+            "D3": {"start_date": "2013", "end_date": "2017"}
+        }
+
+    def test_masked_text(self, extracted):
+        """测试联系方式从文本中移除，只剩标签的行整行删除，时间段替换为标记，其他链接保留"""
+        lines = extracted["text"].split("\n")
+        assert lines[:2] == ["张三", "北京"]
+        assert "ABC科技有限公司 | 高级工程师 | [D1]" in lines
+        assert "清华大学 | 本科 | [D3]" in lines
+        assert "https://api.example.com/docs" in extracted["text"]
+        assert "zhangsan@example.com" not in extracted["text"]
+
+    def test_merge_prefers_local_values(self, extracted):
+        """测试合并时本地值优先，标记还原为时间段，无法识别的日期保留AI返回的值"""
+        parsed = {
+            "personal_info": {"name": "张三", "email": "wrong@example.com", "location": "北京"},
+            "work_experience": [
+                {"company": "ABC科技有限公司", "position": "高级工程师", "start_date": "D1"},
+                {"company": "XYZ公司", "position": "工程师", "start_date": "[D2]", "end_date": None},
+                {"company": "某公司", "position": "实习生", "start_date": "2016-07", "end_date": "2016-09"}
+            ],
+            "education": [{"institution": "清华大学", "start_date": "D9"}],
+            "skills": []
+        }
+        merged = ContactExtractor.merge(parsed, extracted)
+
+        assert merged["personal_info"]["email"] == "zhangsan@example.com"
+        assert merged["personal_info"]["location"] == "北京"
+        assert [(entry["start_date"], entry["end_date"]) for entry in merged["work_experience"]] == [
+            ("2020-03", None), ("2017-07", "2020-02"), ("2016-07", "2016-09")
+        ]
+        assert merged["education"][0]["start_date"] == "D9"
+        assert parsed["personal_info"]["email"] == "wrong@example.com"
+
+    def test_digits_in_text_not_taken_as_dates_or_phones(self):
+        """测试普通数字不会被当成电话或时间段"""
+        result = ContactExtractor().extract("接口延迟降低40%，QPS从2000提升到12000\n2019年获得优秀员工")
+        assert result["personal_info"]["phone"] is None
+        assert result["date_ranges"] == {}
+
+
+class TestQwenParserPreExtraction:
+    """简历解析器预提取集成测试类"""
+
+    def test_parse_merges_local_fields(self, monkeypatch):
+        """测试提示中不含联系方式和日期，AI返回的标记和缺失的联系方式由本地值补全"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser()
+        response = {
+            "personal_info": {"name": "张三", "location": "北京"},
+            "work_experience": [
+                {"company": "ABC科技有限公司", "position": "高级工程师", "start_date": "D1",
+                 "description": ["负责后端开发"]}
+            ],
+            "education": [{"institution": "清华大学", "degree": "本科", "start_date": "D3"}],
+            "skills": []
+        }
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(response, ensure_ascii=False)) as call:
+            resume = parser.parse_resume_text(RESUME_TEXT)
+
+        prompt = call.call_args.args[0]
+        assert PRE_EXTRACTION_INSTRUCTIONS in prompt
+        assert "zhangsan@example.com" not in prompt
+        assert "2020.03" not in prompt
+        assert '"email"' not in prompt
+        assert resume.personal_info.email == "zhangsan@example.com"
+        assert resume.personal_info.github == "https://github.com/zhangsan"
+        assert (resume.work_experience[0].start_date, resume.work_experience[0].end_date) == ("2020-03", None)
+        assert resume.education[0].end_date == "2017"
+
+    def test_disabled(self, monkeypatch):
+        """测试关闭预提取时提示词保持原样"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        monkeypatch.setitem(QWEN_PARSE_CONFIG, "pre_extract", False)
+        parser = QwenResumeParser()
+        assert parser.pre_extractor is None
+        assert "-x" not in parser.prompt_version
+        assert '"email"' in parser._build_parse_prompt("简历")
+
+
+class TestPreExtractionBenchmark:
+    """预提取评估测试类"""
+
+    def test_offline_report(self, monkeypatch):
+        """测试合成语料上本地提取全部正确，且提示和输出的token都减少"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        report = run_offline(docs=5, seed=0)
+
+        assert set(report["local_accuracy"].values()) == {1.0}
+        assert report["merge_success_rate"] == 1.0
+        tokens = report["tokens"]
+        assert tokens["prompt_after"]["mean"] < tokens["prompt_before"]["mean"]
+        assert tokens["output_after"]["mean"] < tokens["output_before"]["mean"]
@@ -0,0 +1,152 @@
+"""
+PDF提取结果缓存测试
+测试磁盘缓存的LRU淘汰、版本失效、命中统计，以及与提取进程池的集成
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from backend.benchmarks.synthetic_pdf import write_resume_pdf
+from backend.services import extraction_cache
+from backend.services.extraction_cache import (
+    DiskExtractionCache,
+    RedisExtractionCache,
+    compute_file_sha256,
+    create_extraction_cache,
+)
+from backend.services.extraction_pool import ExtractionPool
+from backend.services.pdf_parser import PDFParser
+
+
+class TestDiskExtractionCache:
+    """磁盘提取缓存测试类"""
+
+    def test_hit_and_miss(self, tmp_path):
+        """测试命中和未命中计数"""
+        cache = DiskExtractionCache(str(tmp_path), max_bytes=1024 * 1024)
+
+        assert cache.get("a" * 64) is None
+        cache.set("a" * 64, {"text": "张三 简历"})
+        assert cache.get("a" * 64) == {"text": "张三 简历"}
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """测试总大小超过上限时淘汰最久未使用的条目"""
+        payload = {"text": "x" * 400}
+        entry_size = len(json.dumps(payload))
+        cache = DiskExtractionCache(str(tmp_path), max_bytes=entry_size * 2)
+
+        cache.set("a" * 64, payload)
+        cache.set("b" * 64, payload)
+        cache.get("a" * 64)  # a变为最近使用
+        cache.set("c" * 64, payload)
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.get("c" * 64) is not None
+        assert cache.get_stats()["size_bytes"] <= entry_size * 2
+
+    def test_index_rebuilt_from_disk(self, tmp_path):
+        """测试重启后从磁盘恢复缓存索引"""
+        DiskExtractionCache(str(tmp_path), max_bytes=1024 * 1024).set("a" * 64, {"text": "cached"})
+
+        cache = DiskExtractionCache(str(tmp_path), max_bytes=1024 * 1024)
+
+        assert cache.get_stats()["entries"] == 1
+        assert cache.get("a" * 64) == {"text": "cached"}
+
+    def test_version_change_invalidates(self, tmp_path, monkeypatch):
+        """测试清理规则版本变化后旧缓存不再命中"""
+        cache = DiskExtractionCache(str(tmp_path), max_bytes=1024 * 1024)
+        cache.set("a" * 64, {"text": "old"})
+
+        monkeypatch.setattr(extraction_cache, "CLEANING_VERSION", "999")
+
+        assert cache.get("a" * 64) is None
+
+
+class TestRedisExtractionCache:
+    """Redis提取缓存测试类"""
+
+    def test_get_and_set(self):
+        """测试读写键和过期时间"""
+        client = Mock()
+        client.get.return_value = json.dumps({"text": "cached"})
+        cache = RedisExtractionCache(client, ttl=60)
+
+        cache.set("abc", {"text": "cached"})
+        result = cache.get("abc")
+
+        key = f"extraction:{extraction_cache.make_cache_key('abc')}"
+        client.set.assert_called_once_with(key, json.dumps({"text": "cached"}), ex=60)
+        client.get.assert_called_once_with(key)
+        client.hincrby.assert_called_once_with("extraction:stats", "hits", 1)
+        assert result == {"text": "cached"}
+
+    def test_redis_error_degrades_to_miss(self):
+        """测试Redis不可用时视为未命中"""
+        client = Mock()
+        client.get.side_effect = ConnectionError("down")
+        cache = RedisExtractionCache(client)
+
+        assert cache.get("abc") is None
+
+    def test_cluster_stats(self):
+        """测试读取集群共享的命中统计"""
+        client = Mock()
+        client.hgetall.return_value = {"hits": "3", "misses": "1"}
+        cache = RedisExtractionCache(client)
+
+        assert cache.get_stats()["cluster"]["hit_ratio"] == 0.75
+
+
+class TestCreateExtractionCache:
+    """提取缓存工厂测试类"""
+
+    def test_none_backend(self):
+        assert create_extraction_cache({"backend": "none"}) is None
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_extraction_cache({"backend": "memcached"})
+
+
+class TestCachedExtraction:
+    """缓存与提取流程的集成测试类"""
+
+    @pytest.mark.asyncio
+    async def test_pool_skips_worker_on_hit(self, tmp_path):
+        """测试缓存命中时不提交到工作进程"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"))
+        cache = DiskExtractionCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+        pool = ExtractionPool(max_workers=1, max_pending=1, cache=cache)
+        try:
+            first = await pool.extract(path)
+            second = await pool.extract(path, content_hash=compute_file_sha256(path))
+        finally:
+            pool.shutdown()
+
+        assert first == second
+        assert pool.get_stats()["completed"] == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_parser_uses_cache(self, tmp_path):
+        """测试PDFParser传入缓存后重复提取直接返回缓存"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"))
+        cache = DiskExtractionCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+        parser = PDFParser(cache=cache)
+
+        first = parser.extract_text_from_pdf(path)
+        with patch('pdfplumber.open') as mock_open_pdf:
+            second = parser.extract_text_from_pdf(path)
+            mock_open_pdf.assert_not_called()
+
+        assert first == second
+        assert cache.get_stats()["hits"] == 1
@@ -0,0 +1,198 @@
+"""
+PDF提取进程池测试
+使用真实的工作进程提取合成PDF
+"""
+
+import time
+import asyncio
+
+import pytest
+
+from backend.benchmarks.synthetic_pdf import build_dense_text_pdf, build_flate_bomb_pdf, write_resume_pdf
+from backend.services.extraction_pool import ExtractionPool, ExtractionPoolBusyError, plan_page_shards
+from backend.services.extraction_watchdog import run_with_watchdog
+from backend.services.pdf_parser import (
+    PDFParser, PDFParseError, PDFExtractionTimeoutError, PDFExtractionMemoryError
+)
+
+
+@pytest.fixture
+def pool():
+    """单进程的提取进程池"""
+    pool = ExtractionPool(max_workers=1, max_tasks_per_child=2, max_pending=0,
+                          preload_modules=["pdfplumber", "PyPDF2"])
+    yield pool
+    pool.shutdown()
+
+
+class TestExtractionPool:
+    """提取进程池测试类"""
+
+    @pytest.mark.asyncio
+    async def test_extract_in_worker(self, pool, tmp_path):
+        """测试在工作进程中提取文本，并在达到任务上限后继续工作"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=2)
+
+        for _ in range(3):
+            text = await pool.extract(path)
+            assert "john.smith@example.com" in text
+
+        stats = pool.get_stats()
+        assert stats["completed"] == 3
+        assert stats["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_extract_error_propagates(self, pool, tmp_path):
+        """测试工作进程中的解析异常传回调用方"""
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"%PDF-1.4 not really a pdf")
+
+        with pytest.raises(PDFParseError):
+            await pool.extract(str(path))
+        assert pool.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self, pool, tmp_path):
+        """测试排队任务数达到上限时拒绝新任务"""
+        slots = pool._get_slots()
+        await slots.acquire()
+        try:
+            with pytest.raises(ExtractionPoolBusyError):
+                await pool.extract(str(tmp_path / "resume.pdf"))
+        finally:
+            slots.release()
+
+    @pytest.mark.asyncio
+    async def test_sharded_extraction_matches_serial(self, tmp_path):
+        """测试分段并行提取的结果与单进程提取完全一致"""
+        path = write_resume_pdf(str(tmp_path / "long.pdf"), num_pages=5)
+        pool = ExtractionPool(max_workers=2, max_pending=4, shard_min_pages=2)
+        progress = []
+
+        async def report(done_pages, total_pages):
+            progress.append((done_pages, total_pages))
+
+        try:
+            text = await pool.extract(path, progress_callback=report)
+        finally:
+            pool.shutdown()
+
+        assert text == PDFParser().extract_text_from_pdf(path)
+        # 两段（3页和2页）完成顺序不确定，每完成一段上报一次累计页数
+        assert len(progress) == 2
+        assert progress[-1] == (5, 5)
+        assert text.index("Project 1.") < text.index("Project 3.") < text.index("Project 5.")
+
+    @pytest.mark.asyncio
+    async def test_sharded_extraction_records_engine(self, tmp_path):
+        """测试分段提取的结果包含探测选择的引擎"""
+        path = write_resume_pdf(str(tmp_path / "long.pdf"), num_pages=5)
+        pool = ExtractionPool(max_workers=2, max_pending=4, shard_min_pages=2)
+        try:
+            document = await pool.extract_document(path)
+        finally:
+            pool.shutdown()
+
+        assert document["metadata"]["engine"] == "pdfplumber"
+        assert document["metadata"]["num_pages"] == 5
+
+
+def _raise_wrapped_memory_error():
+    try:
+        raise MemoryError()
+    except MemoryError as e:
+        raise PDFParseError("无法提取PDF文本内容") from e
+
+
+class TestExtractionWatchdog:
+    """提取看门狗测试类"""
+
+    @pytest.mark.asyncio
+    async def test_pathological_pdfs_fail_cleanly_and_queue_keeps_flowing(self, tmp_path):
+        """测试解压炸弹和超慢文档以各自的异常失败，同一工作进程后面排队的文档正常提取"""
+        bomb = tmp_path / "bomb.pdf"
+        bomb.write_bytes(build_flate_bomb_pdf(decompressed_mb=400))
+        dense = tmp_path / "dense.pdf"
+        dense.write_bytes(build_dense_text_pdf(num_glyphs=40000))
+        resumes = [write_resume_pdf(str(tmp_path / f"resume_{i}.pdf"), num_pages=2) for i in range(2)]
+
+        pool = ExtractionPool(max_workers=1, max_pending=8, preload_modules=["pdfplumber", "PyPDF2"],
+                              document_timeout=1.0, memory_limit_mb=256)
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                pool.extract(str(bomb)), pool.extract(str(dense)), *[pool.extract(path) for path in resumes],
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+
+        assert isinstance(results[0], PDFExtractionMemoryError)
+        assert isinstance(results[1], PDFExtractionTimeoutError)
+        for text in results[2:]:
+            assert "john.smith@example.com" in text
+        # 超慢文档完整提取需要十秒以上
+        assert elapsed < 8
+
+        stats = pool.get_stats()
+        assert stats["completed"] == 2
+        assert stats["failed"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["memory_errors"] == 1
+        assert stats["recycled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recycles_worker_when_memory_creeps(self, tmp_path):
+        """测试任务结束后常驻内存超过阈值时重建进程池，之后的任务在新进程中执行"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=2)
+        pool = ExtractionPool(max_workers=1, max_pending=4, recycle_rss_mb=1)
+        try:
+            first_executor = pool.start()
+            assert "john.smith@example.com" in await pool.extract(path)
+            assert pool._executor is None
+            assert "john.smith@example.com" in await pool.extract(path)
+            assert pool._executor is not first_executor
+        finally:
+            pool.shutdown()
+
+        assert pool.get_stats()["recycled"] == 2
+
+    def test_timeout_in_current_process(self):
+        """测试看门狗中止超时的函数，并恢复原来的信号处理"""
+        with pytest.raises(PDFExtractionTimeoutError):
+            run_with_watchdog(time.sleep, (5,), timeout=0.2)
+
+        result, rss = run_with_watchdog(sum, ([1, 2, 3],), timeout=1)
+        assert result == 6
+        assert rss > 0
+        # 定时器已取消
+        time.sleep(1.1)
+
+    def test_wrapped_memory_error(self):
+        """测试原因链中的MemoryError转换为PDFExtractionMemoryError"""
+        with pytest.raises(PDFExtractionMemoryError):
+            run_with_watchdog(_raise_wrapped_memory_error, (), timeout=None)
+
+        with pytest.raises(PDFParseError) as exc_info:
+            run_with_watchdog(PDFParser().extract_text_from_pdf, ("missing.pdf",), timeout=None)
+        assert not isinstance(exc_info.value, PDFExtractionMemoryError)
+
+
+class TestPlanPageShards:
+    """页码分段测试类"""
+
+    def test_even_split(self):
+        """测试按进程数均分页码"""
+        shards = plan_page_shards(50, 4, 8)
+        assert [(shard.start, shard.stop) for shard in shards] == [(0, 13), (13, 26), (26, 39), (39, 50)]
+
+    def test_min_pages_per_shard(self):
+        """测试分段不少于最小页数"""
+        shards = plan_page_shards(20, 8, 8)
+        assert [(shard.start, shard.stop) for shard in shards] == [(0, 8), (8, 16), (16, 20)]
+
+    def test_covers_all_pages_in_order(self):
+        """测试分段连续覆盖所有页面"""
+        shards = plan_page_shards(37, 3, 1)
+        assert [page for shard in shards for page in shard] == list(range(37))
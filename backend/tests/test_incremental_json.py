@@ -0,0 +1,101 @@
+"""
+增量JSON解析测试
+"""
+
+import json
+
+import pytest
+
+from backend.services.incremental_json import IncrementalJSONParser, IncrementalJSONError
+
+RESUME = {
+    "personal_info": {"name": "王五", "email": "wangwu@example.com"},
+    "work_experience": [
+        {"company": "ABC公司", "position": "工程师", "description": ["开发\"核心\"模块"]},
+        {"company": "XYZ公司", "position": "实习生", "description": []}
+    ],
+    "education": [],
+    "years": 5
+}
+
+
+def _feed_all(text: str, size: int):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    events.extend(parser.close())
+    return parser, events
+
+
+class TestIncrementalJSONParser:
+    """增量JSON解析器测试类"""
+
+    @pytest.mark.parametrize("size", [1, 3, 64])
+    def test_fields_and_items(self, size):
+        """测试按任意分段输入时顶层字段和顶层数组的每一项依次产出"""
+        text = json.dumps(RESUME, ensure_ascii=False, indent=2)
+        parser, events = _feed_all(text, size)
+
+        assert parser.done
+        assert parser.text == text
+        assert [(event["key"], event.get("index")) for event in events] == [
+            ("personal_info", None),
+            ("work_experience", 0), ("work_experience", 1), ("work_experience", None),
+            ("education", None),
+            ("years", None),
+        ]
+        assert events[0]["value"] == RESUME["personal_info"]
+        assert events[1]["value"]["description"] == ['开发"核心"模块']
+        assert events[3]["value"] == RESUME["work_experience"]
+
+    def test_item_emitted_before_response_ends(self):
+        """测试第一段经历的结束括号到达时立即产出，不等待后续内容"""
+        text = json.dumps(RESUME, ensure_ascii=False)
+        cut = text.index("}", text.index("ABC公司")) + 1
+        parser = IncrementalJSONParser()
+
+        events = parser.feed(text[:cut])
+
+        assert events[-1] == {"key": "work_experience", "index": 0, "value": RESUME["work_experience"][0]}
+        assert not parser.done
+
+    def test_code_fence_allowed(self):
+        """测试允许```json代码块标记"""
+        _, events = _feed_all("```json\n" + json.dumps({"skills": []}) + "\n```", 2)
+        assert events == [{"key": "skills", "value": []}]
+
+    @pytest.mark.parametrize("text, message", [
+        ("好的，以下是结果：{}", "输出不是JSON"),
+        ('{"name" "王五"}', "字段名之后应为冒号"),
+        ('{"a": 1 "b": 2}', "值之后应为逗号或结束括号"),
+        ('{"a": 1}\n以上是解析结果', "JSON之后出现多余内容"),
+        ('{"a": [1}', "括号不匹配"),
+        ('{"a": nul}', "无效的数字或字面量"),
+        ("{name: 1}", "对象中应为字段名"),
+    ])
+    def test_malformed_detected(self, text, message):
+        """测试不可能构成有效JSON的输出在出错的字符处报错"""
+        parser = IncrementalJSONParser()
+        with pytest.raises(IncrementalJSONError, match=message):
+            parser.feed(text)
+            parser.close()
+
+    def test_truncated_output(self):
+        """测试输出在JSON结束之前中断时close报错"""
+        parser = IncrementalJSONParser()
+        parser.feed('{"personal_info": {"name": "王五"}, "work_experience": [')
+        with pytest.raises(IncrementalJSONError, match="中断"):
+            parser.close()
+
+    def test_top_level_number_finished_on_close(self):
+        """测试结尾的数字在close时完成"""
+        parser = IncrementalJSONParser()
+        assert parser.feed('{"years": 5') == []
+        with pytest.raises(IncrementalJSONError):
+            parser.close()
+
+        parser = IncrementalJSONParser()
+        parser.feed("[1, 2")
+        parser.feed("]")
+        assert parser.close() == [] and parser.done
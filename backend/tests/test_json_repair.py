@@ -0,0 +1,174 @@
+"""
+AI输出JSON修复测试
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from backend.benchmarks.bench_json_repair import run_offline
+from backend.services.json_repair import repair_json, fill_defaults, JSONRepairError, REQUIRED
+from backend.services.qwen_parser import QwenResumeParser, QwenParseError
+from backend.services.response_formats import RESPONSE_SCHEMA
+
+RESUME_JSON = {
+    "personal_info": {"name": "王五", "email": "wangwu@example.com"},
+    "work_experience": [
+        {"company": "ABC公司", "position": "工程师", "start_date": "2020-01", "description": ["负责后端开发"]},
+        {"company": "XYZ公司", "position": "实习生", "start_date": "2019-07", "description": ["参与测试"]}
+    ],
+    "education": [{"institution": "浙江大学", "degree": "本科", "start_date": "2015-09"}],
+    "skills": [{"category": "技术技能", "name": "Python", "level": "精通"}]
+}
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+    return QwenResumeParser()
+
+
+class TestRepairJSON:
+    """JSON修复测试类"""
+
+    def test_valid_json_unchanged(self):
+        """测试有效的JSON不做修复"""
+        assert repair_json(json.dumps(RESUME_JSON)) == (RESUME_JSON, [])
+
+    @pytest.mark.parametrize("text, expected, repairs", [
+        ('好的，以下是结果：\n{"a": [1, 2,], "b": {"c": "x",},}\n以上是解析结果。',
+         {"a": [1, 2], "b": {"c": "x"}}, ["leading_text", "trailing_comma", "trailing_text"]),
+        ('{"d": ["负责"核心"模块", "测试"]}', {"d": ['负责"核心"模块', "测试"]}, ["unescaped_quote"]),
+        ('{"a": "x"\n"b": "y"}', {"a": "x", "b": "y"}, ["missing_comma"]),
+        ('{"a": True, "b": None}', {"a": True, "b": None}, ["literal"]),
+        ('{"a": [1, 2}', {"a": [1, 2]}, ["bracket"]),
+        ('```\n{"a": 1}\n```', {"a": 1}, ["code_fence"]),
+    ])
+    def test_syntax_repairs(self, text, expected, repairs):
+        """测试修复说明文字、多余和缺少的逗号、未转义的引号、字面量和括号"""
+        assert repair_json(text) == (expected, repairs)
+
+    @pytest.mark.parametrize("cut, expected", [
+        ('"负责订', [{"c": "A", "d": ["x", "y"]}, {"c": "B", "d": []}]),
+        ('"负责订单系统开发", "优', [{"c": "A", "d": ["x", "y"]}, {"c": "B", "d": ["负责订单系统开发"]}]),
+        ('"负责订单系统开发"], "t', [{"c": "A", "d": ["x", "y"]}, {"c": "B", "d": ["负责订单系统开发"]}]),
+    ])
+    def test_truncated_keeps_largest_valid_prefix(self, cut, expected):
+        """测试截断的输出回退到最后一个完整的值，再补全未闭合的数组和对象"""
+        text = '{"p": {"name": "王五"}, "w": [{"c": "A", "d": ["x", "y"]}, {"c": "B", "d": [' + cut
+        value, repairs = repair_json(text)
+
+        assert value == {"p": {"name": "王五"}, "w": expected}
+        assert repairs == ["truncated"]
+
+    @pytest.mark.parametrize("text", ["这不是JSON", '{"a": }', "{a: 1}"])
+    def test_unrepairable(self, text):
+        """测试没有JSON或无法判断原意的输出报错"""
+        with pytest.raises(JSONRepairError):
+            repair_json(text)
+
+
+class TestFillDefaults:
+    """按字段模式补全测试类"""
+
+    def test_missing_fields_and_incomplete_entries(self):
+        """测试补全缺失的顶层字段和有默认值的字段，去掉缺少必要字段的条目"""
+        data = {"personal_info": {"name": "王五"}, "work_experience": [
+            {"company": "ABC公司", "position": "工程师", "description": ["开发"]},
+            {"company": "XYZ公司", "position": "实习生"}
+        ], "skills": [{"name": "Python"}, "Go"]}
+
+        repairs = fill_defaults(data, RESPONSE_SCHEMA)
+
+        assert data["work_experience"] == [
+            {"company": "ABC公司", "position": "工程师", "description": ["开发"], "start_date": ""}
+        ]
+        assert data["education"] == []
+        assert data["skills"] == [{"name": "Python", "category": "technical"}]
+        assert repairs == ["missing_field", "incomplete_entry"]
+
+    def test_complete_data_unchanged(self):
+        """测试完整的数据不做修改"""
+        data = json.loads(json.dumps(RESUME_JSON))
+        assert fill_defaults(data, RESPONSE_SCHEMA) == []
+        assert data == RESUME_JSON
+
+    def test_required_in_object_kept(self):
+        """测试对象（非数组）缺少必要字段时保留，由后续校验报错"""
+        data = {"info": {}}
+        assert fill_defaults(data, {"info": {"name": REQUIRED}}) == []
+        assert data == {"info": {}}
+
+
+class TestQwenParserRepair:
+    """简历解析器修复和重新调用测试类"""
+
+    def test_truncated_response_repaired_without_recall(self, parser):
+        """测试被截断的响应在本地修复，去掉生成到一半的经历，不重新调用"""
+        text = json.dumps(RESUME_JSON, ensure_ascii=False)
+        truncated = text[:text.index("参与测试")]
+        with patch.object(parser, "_call_qwen_api", return_value=truncated) as api:
+            resume = parser.parse_resume_text("王五的简历")
+
+        assert api.call_count == 1
+        assert [work.company for work in resume.work_experience] == ["ABC公司"]
+        assert resume.education == [] and resume.skills == []
+        stats = parser.get_repair_stats()
+        assert (stats["responses"], stats["repaired"], stats["repair_rate"], stats["recalls"]) == (1, 1, 1.0, 0)
+        assert stats["repairs"] == {"truncated": 1, "missing_field": 1, "incomplete_entry": 1}
+
+    def test_recall_when_repair_fails(self, parser):
+        """测试无法修复时重新调用一次"""
+        responses = ["抱歉，我无法解析这份简历", json.dumps(RESUME_JSON, ensure_ascii=False)]
+        with patch.object(parser, "_call_qwen_api", side_effect=responses) as api:
+            resume = parser.parse_resume_text("王五的简历")
+
+        assert api.call_count == 2
+        assert resume.personal_info.name == "王五"
+        stats = parser.get_repair_stats()
+        assert (stats["responses"], stats["failed"], stats["recalls"], stats["repaired"]) == (2, 1, 1, 0)
+
+    def test_recall_limit(self, parser):
+        """测试重新调用后仍然无法修复时解析失败"""
+        with patch.object(parser, "_call_qwen_api", return_value="抱歉") as api:
+            with pytest.raises(QwenParseError, match="不是有效的JSON格式"):
+                parser.parse_resume_text("王五的简历")
+        assert api.call_count == parser.repair_recalls + 1
+
+    def test_api_error_not_recalled(self, parser):
+        """测试API调用失败不属于输出错误，不重新调用"""
+        with patch.object(parser, "_call_qwen_api", side_effect=QwenParseError("API调用失败")) as api:
+            with pytest.raises(QwenParseError):
+                parser.parse_resume_text("王五的简历")
+        assert api.call_count == 1
+
+    def test_compact_response_repaired(self, parser):
+        """测试紧凑格式的响应先修复再解码，截断在技能名称之后时保留已完整的字段"""
+        response = '{"p": ["王五", "wangwu@example.com"], "w": [["ABC公司", "工程师", "2020-01", null, ["开发"]],], "s": [["t", "Go"'
+        resume = parser._build_resume_data(parser._parse_api_response(response, "compact"))
+
+        assert resume.work_experience[0].description == ["开发"]
+        assert [(skill.name, skill.level) for skill in resume.skills] == [("Go", None)]
+
+    def test_section_response_repaired(self, parser):
+        """测试按章节解析的响应同样修复，并去掉不完整的条目"""
+        response = '以下是工作经历：[{"company": "ABC公司", "position": "工程师", "description": ["开发"]}, {"company": "X'
+        assert parser._parse_section_response(response, "work_experience") == [
+            {"company": "ABC公司", "position": "工程师", "description": ["开发"], "start_date": ""}
+        ]
+
+
+class TestJSONRepairBenchmark:
+    """JSON修复评估测试类"""
+
+    def test_corruptions_repaired(self, monkeypatch):
+        """测试各类格式错误不修复时都无法解析，修复后全部解析成功，除截断外与标注完全一致"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        report = run_offline(docs=3, seed=0, truncate_ratio=0.7, tokens_per_second=40.0, first_token_latency=0.8)
+
+        for kind, result in report["corruptions"].items():
+            assert result["baseline_success_rate"] == 0.0, kind
+            assert result["repair_success_rate"] == 1.0, kind
+            assert result["exact_match_rate"] == (0.0 if kind == "truncated" else 1.0), kind
+        assert report["recalls_avoided"] == 3 * len(report["corruptions"])
@@ -0,0 +1,229 @@
+"""
+AI解析结果缓存测试
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.services.llm_cache import (
+    MemoryLLMCache,
+    RedisLLMCache,
+    TieredLLMCache,
+    compute_prompt_version,
+    create_llm_cache,
+    make_llm_cache_key,
+)
+from backend.services.qwen_parser import QwenResumeParser, QwenParseError
+
+RESUME_JSON = {
+    "personal_info": {"name": "王五", "email": "wangwu@example.com", "phone": "139-5678-9012"},
+    "work_experience": [],
+    "education": [],
+    "skills": [{"category": "编程语言", "name": "Python", "level": "熟练"}]
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheKey:
+    """缓存键测试类"""
+
+    def test_whitespace_differences_share_key(self):
+        """测试只有空白差异的文本得到相同的键"""
+        first = make_llm_cache_key("张三\n邮箱：a@b.com\n\n", "qwen-turbo", 0.1, "v1")
+        second = make_llm_cache_key("  张三  邮箱：a@b.com", "qwen-turbo", 0.1, "v1")
+        assert first == second
+
+    def test_parameters_change_key(self):
+        """测试文本、模型、温度和提示模板版本任一变化都得到不同的键"""
+        base = make_llm_cache_key("张三", "qwen-turbo", 0.1, "v1")
+        assert make_llm_cache_key("李四", "qwen-turbo", 0.1, "v1") != base
+        assert make_llm_cache_key("张三", "qwen-plus", 0.1, "v1") != base
+        assert make_llm_cache_key("张三", "qwen-turbo", 0.2, "v1") != base
+        assert make_llm_cache_key("张三", "qwen-turbo", 0.1, "v2") != base
+
+    def test_prompt_version_follows_template(self):
+        """测试提示模板内容变化时版本变化，与简历文本无关"""
+        version = compute_prompt_version(lambda text: f"解析以下简历：\n{text}")
+        assert version == compute_prompt_version(lambda text: f"解析以下简历：\n{text}")
+        assert version != compute_prompt_version(lambda text: f"请解析以下简历：\n{text}")
+
+
+class TestMemoryLLMCache:
+    """进程内缓存测试类"""
+
+    def test_roundtrip_returns_copy(self):
+        """测试读写，以及修改返回的字典不影响缓存"""
+        cache = MemoryLLMCache(max_entries=10)
+        cache.set("k", RESUME_JSON)
+        payload = cache.get("k")
+        assert payload == RESUME_JSON
+        payload["skills"].clear()
+        assert cache.get("k") == RESUME_JSON
+        assert cache.get("missing") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+
+    def test_lru_eviction(self):
+        """测试超过条目上限时淘汰最久未使用的条目"""
+        cache = MemoryLLMCache(max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")
+        cache.set("c", {"v": 3})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+
+    def test_ttl_expiry(self):
+        """测试条目过期后视为未命中并被删除"""
+        clock = FakeClock()
+        cache = MemoryLLMCache(max_entries=10, ttl=60, clock=clock)
+        cache.set("k", {"v": 1})
+        clock.now += 59
+        assert cache.get("k") == {"v": 1}
+        clock.now += 2
+        assert cache.get("k") is None
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestRedisLLMCache:
+    """Redis缓存测试类"""
+
+    def test_load_touches_lru_index(self):
+        """测试读取时更新最近使用时间"""
+        client = MagicMock()
+        pipe = client.pipeline.return_value
+        pipe.execute.return_value = [json.dumps(RESUME_JSON), 0]
+        cache = RedisLLMCache(client, ttl=60, key_prefix="llm:")
+
+        assert cache.get("k") == RESUME_JSON
+        pipe.get.assert_called_once_with("llm:k")
+        assert pipe.zadd.call_args.args[0] == "llm:lru"
+        assert pipe.zadd.call_args.kwargs == {"xx": True}
+
+    def test_store_sets_ttl_and_evicts_lru(self):
+        """测试写入时设置TTL，条目数超过上限时淘汰最久未使用的条目"""
+        client = MagicMock()
+        pipe = client.pipeline.return_value
+        pipe.execute.return_value = [True, 1, 0, 4]
+        client.zpopmin.return_value = [("old", 1.0)]
+        cache = RedisLLMCache(client, ttl=60, max_entries=3, key_prefix="llm:")
+
+        cache.set("k", RESUME_JSON)
+        assert pipe.set.call_args.kwargs == {"ex": 60}
+        client.zpopmin.assert_called_once_with("llm:lru", 1)
+        client.delete.assert_called_once_with("llm:old")
+
+    def test_redis_error_degrades_to_miss(self):
+        """测试Redis不可用时视为未命中，写入失败不抛出异常"""
+        client = MagicMock()
+        client.pipeline.return_value.execute.side_effect = ConnectionError("refused")
+        cache = RedisLLMCache(client)
+        assert cache.get("k") is None
+        cache.set("k", RESUME_JSON)
+        assert cache.get_stats()["misses"] == 1
+
+
+class TestTieredLLMCache:
+    """两级缓存测试类"""
+
+    def test_remote_hit_fills_local(self):
+        """测试Redis命中后回填进程内缓存，再次读取不访问Redis"""
+        remote = MemoryLLMCache(max_entries=10)
+        remote.set("k", RESUME_JSON)
+        cache = TieredLLMCache(MemoryLLMCache(max_entries=10), remote)
+
+        assert cache.get("k") == RESUME_JSON
+        assert cache.get("k") == RESUME_JSON
+        stats = cache.get_stats()
+        assert (stats["remote_hits"], stats["local_hits"], stats["local_entries"]) == (1, 1, 1)
+
+    def test_remote_failure_keeps_local_tier(self):
+        """测试Redis不可用时进程内缓存继续工作"""
+        remote = MagicMock()
+        remote._load.side_effect = ConnectionError("refused")
+        remote._store.side_effect = ConnectionError("refused")
+        cache = TieredLLMCache(MemoryLLMCache(max_entries=10), remote)
+
+        assert cache.get("k") is None
+        cache.set("k", RESUME_JSON)
+        assert cache.get("k") == RESUME_JSON
+
+    def test_create_from_config(self):
+        """测试按配置创建各类缓存"""
+        config = {
+            "backend": "tiered", "redis_url": "redis://localhost:6379", "key_prefix": "llm:",
+            "ttl": 60, "max_entries": 100, "local_ttl": 10, "local_max_entries": 5
+        }
+        with patch("backend.services.llm_cache.redis.from_url"):
+            assert isinstance(create_llm_cache(config), TieredLLMCache)
+            assert isinstance(create_llm_cache({**config, "backend": "redis"}), RedisLLMCache)
+        assert isinstance(create_llm_cache({**config, "backend": "memory"}), MemoryLLMCache)
+        assert create_llm_cache({**config, "backend": "none"}) is None
+        with pytest.raises(ValueError):
+            create_llm_cache({**config, "backend": "sqlite"})
+
+
+class TestQwenParserCache:
+    """简历解析器缓存集成测试类"""
+
+    @pytest.fixture
+    def parser(self, monkeypatch):
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        return QwenResumeParser(cache=MemoryLLMCache(max_entries=10))
+
+    def test_repeat_parse_skips_api(self, parser):
+        """测试相同内容再次解析时直接返回缓存结果"""
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(RESUME_JSON)) as call:
+            first = parser.parse_resume_text("王五\n邮箱：wangwu@example.com")
+            second = parser.parse_resume_text("王五  邮箱：wangwu@example.com\n")
+
+        assert call.call_count == 1
+        assert second.personal_info.name == "王五"
+        assert second.skills[0].category == first.skills[0].category
+        assert second.skills[0].level == first.skills[0].level
+
+    @pytest.mark.asyncio
+    async def test_async_shares_cache_with_sync(self, parser):
+        """测试异步接口读取同一份缓存"""
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(RESUME_JSON)):
+            parser.parse_resume_text("王五的简历")
+        with patch.object(parser, "_call_qwen_api_async") as call:
+            result = await parser.parse_resume_text_async("王五的简历")
+        call.assert_not_called()
+        assert result.personal_info.email == "wangwu@example.com"
+
+    def test_model_and_prompt_changes_miss(self, parser, monkeypatch):
+        """测试更换模型或修改提示模板后不再命中旧缓存"""
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(RESUME_JSON)) as call:
+            parser.parse_resume_text("王五的简历")
+            parser.model = "qwen-plus"
+            parser.parse_resume_text("王五的简历")
+            assert call.call_count == 2
+
+            class EditedPromptParser(QwenResumeParser):
+                def _build_parse_prompt(self, resume_text: str, *args) -> str:
+                    return "新版提示\n" + super()._build_parse_prompt(resume_text, *args)
+
+            edited = EditedPromptParser(cache=parser.cache)
+            assert edited.prompt_version != parser.prompt_version
+            with patch.object(edited, "_call_qwen_api", return_value=json.dumps(RESUME_JSON)) as edited_call:
+                edited.parse_resume_text("王五的简历")
+            assert edited_call.call_count == 1
+
+    def test_failed_parse_not_cached(self, parser):
+        """测试未通过校验的结果不写入缓存"""
+        invalid = {**RESUME_JSON, "personal_info": {"name": "", "email": "not-an-email"}}
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(invalid)):
+            with pytest.raises(QwenParseError):
+                parser.parse_resume_text("坏简历")
+        assert parser.cache.get_stats()["entries"] == 0
@@ -0,0 +1,445 @@
+"""
+通义千问异步客户端测试
+在本地启动一个模拟DashScope文本生成接口的替身服务，客户端通过真实的HTTP连接访问
+"""
+
+import json
+import time
+import socket
+import asyncio
+import threading
+
+import pytest
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.services.llm_client import AsyncQwenClient, LLMClientError, GENERATION_PATH
+from backend.services.qwen_parser import QwenResumeParser, QwenParseError
+
+RESUME_JSON = {
+    "personal_info": {"name": "王五", "email": "wangwu@example.com", "phone": "139-5678-9012"},
+    "work_experience": [],
+    "education": [],
+    "skills": [{"category": "编程语言", "name": "Python", "level": "熟练"}]
+}
+
+
+class StandInState:
+    """替身服务的行为和观测数据"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.failures = []          # 依次返回的错误状态码，用完后正常返回
+        self.text = json.dumps(RESUME_JSON, ensure_ascii=False)
+        self.chunk_size = 16        # 流式响应每个事件的字符数
+        self.chunk_delay = 0.0
+        self.stream_closed = False  # 客户端是否在流式响应结束前断开
+        self.requests = []
+        self.client_ports = set()
+        self.active = 0
+        self.max_active = 0
+
+    def reset(self):
+        self.__init__()
+
+
+async def _sse_events(state: StandInState):
+    """按DashScope的SSE格式逐段返回state.text（增量输出）"""
+    chunks = [state.text[i:i + state.chunk_size] for i in range(0, len(state.text), state.chunk_size)]
+    try:
+        for index, chunk in enumerate(chunks, 1):
+            await asyncio.sleep(state.chunk_delay)
+            data = {
+                "output": {"text": chunk, "finish_reason": "stop" if index == len(chunks) else "null"},
+                "usage": {"input_tokens": 10, "output_tokens": index},
+                "request_id": "stand-in"
+            }
+            yield f"id:{index}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(data, ensure_ascii=False)}\n\n"
+    except asyncio.CancelledError:
+        state.stream_closed = True
+        raise
+
+
+def _build_stand_in_app(state: StandInState) -> FastAPI:
+    app = FastAPI()
+
+    @app.post(GENERATION_PATH)
+    async def generation(request: Request):
+        body = await request.json()
+        state.requests.append({"headers": dict(request.headers), "body": body})
+        state.client_ports.add(request.client.port)
+        state.active += 1
+        state.max_active = max(state.max_active, state.active)
+        try:
+            await asyncio.sleep(state.delay)
+        finally:
+            state.active -= 1
+
+        if state.failures:
+            status_code = state.failures.pop(0)
+            return JSONResponse(status_code=status_code, content={"code": f"E{status_code}", "message": "stand-in error"})
+        if request.headers.get("x-dashscope-sse") == "enable":
+            return StreamingResponse(_sse_events(state), media_type="text/event-stream")
+        return {
+            "output": {"text": state.text, "finish_reason": "stop"},
+            "usage": {"input_tokens": 10, "output_tokens": 20},
+            "request_id": "stand-in"
+        }
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def stand_in():
+    """在后台线程中运行替身服务，返回(base_url, state)"""
+    state = StandInState()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(_build_stand_in_app(state), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}", state
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def server(stand_in):
+    base_url, state = stand_in
+    # 等待上一个测试中客户端已放弃（如读取超时）的请求处理完，避免其消耗本测试设置的错误状态码
+    deadline = time.time() + 5
+    while state.active and time.time() < deadline:
+        time.sleep(0.01)
+    state.reset()
+    return base_url, state
+
+
+def _client(base_url: str, **config) -> AsyncQwenClient:
+    return AsyncQwenClient("test_key", {"base_url": base_url, "retry_backoff": 0.01, **config})
+
+
+class TestAsyncQwenClient:
+    """异步客户端测试类"""
+
+    @pytest.mark.asyncio
+    async def test_generate(self, server):
+        """测试请求格式和返回文本"""
+        base_url, state = server
+        client = _client(base_url)
+        try:
+            text = await client.generate("简历文本", model="qwen-turbo", max_tokens=100, temperature=0.1)
+        finally:
+            await client.aclose()
+
+        assert json.loads(text) == RESUME_JSON
+        request = state.requests[0]
+        assert request["headers"]["authorization"] == "Bearer test_key"
+        assert request["body"]["model"] == "qwen-turbo"
+        assert request["body"]["input"] == {"prompt": "简历文本"}
+        assert request["body"]["parameters"]["max_tokens"] == 100
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_bounded_pool(self, server):
+        """测试大量并发请求受并发上限限制，并复用长连接"""
+        base_url, state = server
+        state.delay = 0.1
+        client = _client(base_url, max_concurrency=8)
+        try:
+            start = time.perf_counter()
+            texts = await asyncio.gather(*[
+                client.generate(f"简历{i}", model="qwen-turbo", max_tokens=100, temperature=0.1)
+                for i in range(40)
+            ])
+            elapsed = time.perf_counter() - start
+        finally:
+            await client.aclose()
+
+        assert len(texts) == 40
+        assert state.max_active <= 8
+        # 40个请求以8路并发执行，每个0.1秒
+        assert elapsed < 40 * 0.1 / 2
+        # 连接被复用，连接数不超过并发上限
+        assert len(state.client_ports) <= 8
+        stats = client.get_stats()
+        assert stats["requests"] == 40
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self, server):
+        """测试等待响应期间事件循环可以处理其他任务"""
+        base_url, state = server
+        state.delay = 0.3
+        client = _client(base_url)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            await client.generate("简历", model="qwen-turbo", max_tokens=100, temperature=0.1)
+        finally:
+            ticker_task.cancel()
+            await client.aclose()
+
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_and_server_errors(self, server):
+        """测试限流和服务端错误按退避重试"""
+        base_url, state = server
+        state.failures = [429, 503]
+        client = _client(base_url, max_retries=2)
+        try:
+            text = await client.generate("简历", model="qwen-turbo", max_tokens=100, temperature=0.1)
+        finally:
+            await client.aclose()
+
+        assert json.loads(text) == RESUME_JSON
+        assert len(state.requests) == 3
+        assert client.get_stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_client_error_not_retried(self, server):
+        """测试参数错误等客户端错误不重试，异常包含状态码和错误码"""
+        base_url, state = server
+        state.failures = [400]
+        client = _client(base_url, max_retries=2)
+        try:
+            with pytest.raises(LLMClientError) as exc_info:
+                await client.generate("简历", model="qwen-turbo", max_tokens=100, temperature=0.1)
+        finally:
+            await client.aclose()
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.code == "E400"
+        assert len(state.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_timeout(self, server):
+        """测试读取超时在重试用尽后抛出异常"""
+        base_url, state = server
+        state.delay = 0.5
+        client = _client(base_url, read_timeout=0.1, max_retries=1)
+        try:
+            with pytest.raises(LLMClientError) as exc_info:
+                await client.generate("简历", model="qwen-turbo", max_tokens=100, temperature=0.1)
+        finally:
+            await client.aclose()
+
+        assert "超时" in str(exc_info.value)
+        assert client.get_stats()["failures"] == 1
+
+
+class TestAsyncQwenClientStream:
+    """异步客户端流式调用测试类"""
+
+    @pytest.mark.asyncio
+    async def test_stream_chunks(self, server):
+        """测试流式请求带SSE请求头和增量输出参数，逐段返回文本和用量"""
+        base_url, state = server
+        client = _client(base_url)
+        try:
+            chunks = [chunk async for chunk in client.stream_with_usage(
+                "简历", model="qwen-turbo", max_tokens=100, temperature=0.1
+            )]
+        finally:
+            await client.aclose()
+
+        assert "".join(text for text, _ in chunks) == state.text
+        assert len(chunks) > 1
+        assert chunks[-1][1] == {"input_tokens": 10, "output_tokens": len(chunks)}
+        request = state.requests[0]
+        assert request["headers"]["x-dashscope-sse"] == "enable"
+        assert request["body"]["parameters"]["incremental_output"] is True
+        assert client.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_retries_before_first_chunk(self, server):
+        """测试收到响应之前的服务端错误按退避重试"""
+        base_url, state = server
+        state.failures = [503]
+        client = _client(base_url, max_retries=1)
+        try:
+            chunks = [text async for text, _ in client.stream_with_usage(
+                "简历", model="qwen-turbo", max_tokens=100, temperature=0.1
+            )]
+        finally:
+            await client.aclose()
+
+        assert "".join(chunks) == state.text
+        assert client.get_stats()["retries"] == 1
+
+
+class TestQwenParserAsync:
+    """简历解析器异步接口测试类"""
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_text_async(self, server, monkeypatch):
+        """测试异步解析经由替身服务返回结构化简历"""
+        base_url, state = server
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        try:
+            results = await asyncio.gather(*[parser.parse_resume_text_async(f"王五的简历{i}") for i in range(12)])
+        finally:
+            await parser.client.aclose()
+
+        for result in results:
+            assert result.personal_info.name == "王五"
+            assert result.skills[0].name == "Python"
+        assert len(state.requests) == 12
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_text_async_api_error(self, server, monkeypatch):
+        """测试接口错误转换为QwenParseError"""
+        base_url, state = server
+        state.failures = [401]
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        try:
+            with pytest.raises(QwenParseError):
+                await parser.parse_resume_text_async("王五的简历")
+        finally:
+            await parser.client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_reports_partial_results(self, server, monkeypatch):
+        """测试流式生成时personal_info和每段经历完成后立即上报，进度随生成的token增加"""
+        base_url, state = server
+        state.text = json.dumps({
+            **RESUME_JSON,
+            "work_experience": [
+                {"company": "ABC公司", "position": "工程师", "start_date": "2020-01", "description": ["开发"]},
+                {"company": "XYZ公司", "position": "实习生", "start_date": "2019-07", "description": ["测试"]}
+            ]
+        }, ensure_ascii=False)
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        updates = []
+
+        async def on_progress(update):
+            updates.append(update)
+
+        try:
+            resume = await parser.parse_resume_text_async("王五的简历", on_progress=on_progress)
+        finally:
+            await parser.client.aclose()
+
+        assert len(resume.work_experience) == 2
+        partials = [update["partial_result"] for update in updates]
+        assert partials[0]["personal_info"]["name"] == "王五"
+        assert [len(partial.get("work_experience", [])) for partial in partials][:3] == [0, 1, 2]
+        progress = [update["progress"] for update in updates]
+        assert progress == sorted(progress) and progress[-1] <= 0.95
+
+    @pytest.mark.asyncio
+    async def test_stream_compact_format(self, server, monkeypatch):
+        """测试紧凑格式流式生成：个人信息数组不按元素上报，经历按记录上报"""
+        base_url, state = server
+        state.text = json.dumps({
+            "p": ["王五", "wangwu@example.com", "139-5678-9012", None, None, None, None, None],
+            "w": [["ABC公司", "工程师", "2020-01", None, ["开发"], ["Go"]],
+                  ["XYZ公司", "实习生", "2019-07", "2019-12", ["测试"], None]],
+            "e": [],
+            "s": [["t", "Python", 2]]
+        }, ensure_ascii=False, separators=(",", ":"))
+        state.chunk_size = 8
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        updates = []
+
+        async def on_progress(update):
+            updates.append(update)
+
+        try:
+            resume = await parser.parse_resume_text_async("王五的简历", response_format="compact", on_progress=on_progress)
+        finally:
+            await parser.client.aclose()
+
+        assert resume.personal_info.name == "王五"
+        assert [work.company for work in resume.work_experience] == ["ABC公司", "XYZ公司"]
+        partials = [update["partial_result"] for update in updates]
+        assert all(isinstance(partial["personal_info"], dict) for partial in partials)
+        assert partials[0]["personal_info"]["name"] == "王五"
+        companies = [[work["company"] for work in partial.get("work_experience", [])] for partial in partials]
+        assert ["ABC公司"] in companies and companies[-1] == ["ABC公司", "XYZ公司"]
+
+    @pytest.mark.asyncio
+    async def test_stream_progress_failure_ignored(self, server, monkeypatch):
+        """测试进度回调出错时停止上报，不影响解析"""
+        base_url, _ = server
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        calls = []
+
+        async def on_progress(update):
+            calls.append(update)
+            raise RuntimeError("状态存储不可用")
+
+        try:
+            resume = await parser.parse_resume_text_async("王五的简历", on_progress=on_progress)
+        finally:
+            await parser.client.aclose()
+
+        assert resume.personal_info.name == "王五"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_aborts_on_malformed_output(self, server, monkeypatch):
+        """测试未启用JSON修复时，输出不是JSON在生成结束前中止，并关闭连接"""
+        base_url, state = server
+        state.text = "好的，以下是解析结果：" + json.dumps(RESUME_JSON, ensure_ascii=False)
+        state.chunk_size = 4
+        state.chunk_delay = 0.02
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        parser.json_repair = False
+        parser.repair_recalls = 0
+        start = time.perf_counter()
+        try:
+            with pytest.raises(QwenParseError, match="已中止生成"):
+                await parser.parse_resume_text_async("王五的简历")
+        finally:
+            await parser.client.aclose()
+
+        # 完整输出需要数十个事件，中止时只收到第一个
+        assert time.perf_counter() - start < len(state.text) / state.chunk_size * state.chunk_delay / 2
+        assert parser.client.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_repairs_malformed_output(self, server, monkeypatch):
+        """测试启用JSON修复时跳过说明文字继续上报部分结果，格式错误生成结束后修复，不重新调用"""
+        base_url, state = server
+        text = json.dumps({
+            **RESUME_JSON,
+            "work_experience": [{"company": "ABC公司", "position": "工程师", "start_date": "2020-01",
+                                 "description": ["负责后端开发"]}]
+        }, ensure_ascii=False)
+        state.text = "好的，以下是解析结果：" + text.replace("负责后端开发", '负责"核心"后端开发')
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(client_config={"base_url": base_url})
+        updates = []
+
+        async def on_progress(update):
+            updates.append(update)
+
+        try:
+            resume = await parser.parse_resume_text_async("王五的简历", on_progress=on_progress)
+        finally:
+            await parser.client.aclose()
+
+        assert resume.work_experience[0].description == ['负责"核心"后端开发']
+        assert updates[0]["partial_result"]["personal_info"]["name"] == "王五"
+        assert len(state.requests) == 1
+        stats = parser.get_repair_stats()
+        assert (stats["repaired"], stats["recalls"]) == (1, 0)
+        assert set(stats["repairs"]) == {"leading_text", "unescaped_quote"}
@@ -0,0 +1,206 @@
+"""
+简历解析API测试
+测试解析任务的创建、状态跟踪和结果复用
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import BackgroundTasks
+
+# parse模块导入时会连接Redis，这里用模拟客户端代替
+with patch('redis.from_url', return_value=MagicMock()):
+    from backend.api import parse as parse_api
+    from backend.api import upload as upload_api
+from backend.services.status_store import InMemoryStatusStore
+from backend.models.resume import ResumeData, PersonalInfo
+
+
+@pytest.fixture
+def uploaded_file(tmp_path, monkeypatch):
+    """创建一个已上传成功的文件记录"""
+    file_path = tmp_path / "resume.pdf"
+    file_path.write_bytes(b'%PDF-1.4\n')
+
+    upload_status = InMemoryStatusStore()
+    upload_status.update("upload-1", {
+        "status": "success",
+        "progress": 100,
+        "message": "文件上传成功",
+        "updated_at": "2025-01-01T00:00:00",
+        "file_path": str(file_path),
+        "file_info": {"filename": "resume.pdf", "size": 9, "sha256": "abc123"}
+    })
+    monkeypatch.setattr(upload_api, "upload_status", upload_status)
+    monkeypatch.setattr(parse_api, "parse_status", InMemoryStatusStore())
+    monkeypatch.setattr(parse_api, "parse_results_by_hash", InMemoryStatusStore())
+    return "upload-1"
+
+
+class TestParseAPI:
+    """解析API测试类"""
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_schedules_background_task(self, uploaded_file):
+        """测试未解析过的文件会创建后台任务"""
+        background_tasks = BackgroundTasks()
+
+        response = await parse_api.parse_resume(uploaded_file, background_tasks)
+        body = json.loads(response.body)
+
+        assert "reused" not in body
+        assert len(background_tasks.tasks) == 1
+        assert background_tasks.tasks[0].args[3] == "abc123"
+        assert parse_api.parse_status.get(body["parse_id"])["status"] == parse_api.ParseStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_reuses_result_for_known_hash(self, uploaded_file, monkeypatch):
+        """测试相同内容的文件直接复用已有解析结果"""
+        parse_api.parse_results_by_hash.update(parse_api.reuse_key("abc123"), {"resume_id": "resume-1"})
+        get_resume = AsyncMock(return_value={"id": "resume-1"})
+        monkeypatch.setattr(parse_api.redis_manager, "get_resume", get_resume)
+        background_tasks = BackgroundTasks()
+
+        response = await parse_api.parse_resume(uploaded_file, background_tasks)
+        body = json.loads(response.body)
+
+        assert body["reused"] is True
+        assert background_tasks.tasks == []
+        status_info = parse_api.parse_status.get(body["parse_id"])
+        assert status_info["status"] == parse_api.ParseStatus.SUCCESS
+        assert status_info["data"]["resume_id"] == "resume-1"
+        assert status_info["data"]["upload_id"] == uploaded_file
+        get_resume.assert_awaited_once_with("resume-1")
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_reparses_when_reused_resume_missing(self, uploaded_file, monkeypatch):
+        """测试登记的简历已被删除时清除登记并重新解析"""
+        key = parse_api.reuse_key("abc123")
+        parse_api.parse_results_by_hash.update(key, {"resume_id": "resume-1"})
+        monkeypatch.setattr(parse_api.redis_manager, "get_resume", AsyncMock(return_value=None))
+        background_tasks = BackgroundTasks()
+
+        response = await parse_api.parse_resume(uploaded_file, background_tasks)
+        body = json.loads(response.body)
+
+        assert "reused" not in body
+        assert len(background_tasks.tasks) == 1
+        assert parse_api.parse_results_by_hash.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_parse_resume_not_reused_across_pipeline_versions(self, uploaded_file, monkeypatch):
+        """测试响应格式或提示模板版本不同时不复用已有解析结果"""
+        parse_api.parse_results_by_hash.update(parse_api.reuse_key("abc123", "full"), {"resume_id": "resume-1"})
+        monkeypatch.setattr(parse_api.redis_manager, "get_resume", AsyncMock(return_value={"id": "resume-1"}))
+
+        background_tasks = BackgroundTasks()
+        body = json.loads((await parse_api.parse_resume(uploaded_file, background_tasks, "compact")).body)
+        assert "reused" not in body and len(background_tasks.tasks) == 1
+
+        monkeypatch.setattr(parse_api.qwen_parser, "prompt_version", parse_api.qwen_parser.prompt_version + "-new")
+        background_tasks = BackgroundTasks()
+        body = json.loads((await parse_api.parse_resume(uploaded_file, background_tasks, "full")).body)
+        assert "reused" not in body and len(background_tasks.tasks) == 1
+
+    @pytest.mark.asyncio
+    async def test_background_parse_uses_async_llm_call(self, uploaded_file, monkeypatch):
+        """测试后台任务异步调用AI解析，并用解析出的简历数据生成新的简历记录"""
+        file_path = upload_api.upload_status.get(uploaded_file)["file_path"]
+        document = {"text": "张三 高级工程师 " * 10, "metadata": {"engine": "pdfplumber"}, "sections": []}
+        parsed = ResumeData(id="parser-id", personal_info=PersonalInfo(name="张三", email="zhangsan@example.com"))
+
+        monkeypatch.setattr(parse_api.extraction_pool, "extract_document", AsyncMock(return_value=document))
+        parse_async = AsyncMock(return_value=parsed)
+        monkeypatch.setattr(parse_api.qwen_parser, "parse_resume_text_async", parse_async)
+        save_resume = AsyncMock(return_value="saved")
+        monkeypatch.setattr(parse_api.redis_manager, "save_resume", save_resume)
+
+        await parse_api.parse_resume_background("parse-1", file_path, uploaded_file, "abc123")
+
+        status = parse_api.parse_status.get("parse-1")
+        assert status["status"] == parse_api.ParseStatus.SUCCESS, status["message"]
+        parse_async.assert_awaited_once()
+        assert parse_async.await_args.args[0] == document["text"]
+        saved = save_resume.await_args.args[0]
+        assert saved.personal_info.name == "张三"
+        assert saved.id == status["data"]["resume_id"] != "parser-id"
+        assert parse_api.parse_results_by_hash.get(parse_api.reuse_key("abc123"))["resume_id"] == saved.id
+
+    @pytest.mark.asyncio
+    async def test_background_parse_reports_queue_position(self, uploaded_file, monkeypatch):
+        """测试AI调用因限流排队时，解析状态消息显示排队位置和等待时间"""
+        file_path = upload_api.upload_status.get(uploaded_file)["file_path"]
+        document = {"text": "张三 高级工程师 " * 10, "metadata": {"engine": "pdfplumber"}, "sections": []}
+        parsed = ResumeData(id="parser-id", personal_info=PersonalInfo(name="张三", email="zhangsan@example.com"))
+        messages = []
+
+        async def parse_async(text, on_queued=None, response_format=None, on_progress=None):
+            await on_queued(4, 3.2)
+            messages.append(parse_api.parse_status.get("parse-1")["message"])
+            return parsed
+
+        monkeypatch.setattr(parse_api.extraction_pool, "extract_document", AsyncMock(return_value=document))
+        monkeypatch.setattr(parse_api.qwen_parser, "parse_resume_text_async", parse_async)
+        monkeypatch.setattr(parse_api.redis_manager, "save_resume", AsyncMock(return_value="saved"))
+
+        await parse_api.parse_resume_background("parse-1", file_path, uploaded_file, "abc123")
+
+        assert messages == ["AI解析排队中（第4位，已等待3秒）"]
+        assert parse_api.parse_status.get("parse-1")["status"] == parse_api.ParseStatus.SUCCESS
+
+    @pytest.mark.asyncio
+    async def test_background_parse_reports_partial_result(self, uploaded_file, monkeypatch):
+        """测试流式生成时状态接口返回进度和已完成的部分结果，解析结束后不再返回"""
+        file_path = upload_api.upload_status.get(uploaded_file)["file_path"]
+        document = {"text": "张三 高级工程师 " * 10, "metadata": {"engine": "pdfplumber"}, "sections": []}
+        parsed = ResumeData(id="parser-id", personal_info=PersonalInfo(name="张三", email="zhangsan@example.com"))
+        statuses = []
+
+        async def parse_async(text, on_queued=None, response_format=None, on_progress=None):
+            await on_progress({"progress": 0.5, "generated_tokens": 300,
+                               "partial_result": {"personal_info": {"name": "张三"}}})
+            response = await parse_api.get_parse_status("parse-1")
+            statuses.append(json.loads(response.body))
+            return parsed
+
+        monkeypatch.setattr(parse_api.extraction_pool, "extract_document", AsyncMock(return_value=document))
+        monkeypatch.setattr(parse_api.qwen_parser, "parse_resume_text_async", parse_async)
+        monkeypatch.setattr(parse_api.redis_manager, "save_resume", AsyncMock(return_value="saved"))
+        monkeypatch.setattr(parse_api.redis_manager, "get_resume", AsyncMock(return_value={}))
+
+        await parse_api.parse_resume_background("parse-1", file_path, uploaded_file, "abc123")
+
+        assert statuses[0]["progress"] == 59
+        assert statuses[0]["partial_result"] == {"personal_info": {"name": "张三"}}
+        final = json.loads((await parse_api.get_parse_status("parse-1")).body)
+        assert final["status"] == parse_api.ParseStatus.SUCCESS
+        assert "partial_result" not in final
+        assert "partial_result" not in parse_api.parse_status.get("parse-1")
+
+    @pytest.mark.asyncio
+    async def test_background_parse_uses_heuristic_tier(self, uploaded_file, monkeypatch):
+        """测试结构清晰的简历由本地规则解析，不调用AI，并记录解析层和置信度"""
+        file_path = upload_api.upload_status.get(uploaded_file)["file_path"]
+        text = "\n".join([
+            "张三", "邮箱：zhangsan@example.com | 北京", "工作经历",
+            "ABC科技有限公司 | 高级工程师 | 2020-01 - 至今", "- 负责后端开发",
+            "教育背景", "清华大学 | 本科 | 计算机科学 | 2012-09 - 2016-06", "专业技能", "技术技能：Python（精通）"
+        ])
+        document = {"text": text, "metadata": {"engine": "pdfplumber"}, "sections": []}
+        parse_async = AsyncMock()
+
+        monkeypatch.setattr(parse_api.extraction_pool, "extract_document", AsyncMock(return_value=document))
+        monkeypatch.setattr(parse_api.qwen_parser, "parse_resume_text_async", parse_async)
+        save_resume = AsyncMock(return_value="saved")
+        monkeypatch.setattr(parse_api.redis_manager, "save_resume", save_resume)
+        monkeypatch.setattr(parse_api.tiered_parser, "enabled", True)
+
+        await parse_api.parse_resume_background("parse-1", file_path, uploaded_file, "abc123")
+
+        status = parse_api.parse_status.get("parse-1")
+        assert status["status"] == parse_api.ParseStatus.SUCCESS, status["message"]
+        assert status["parse_tier"] == "heuristic"
+        assert status["heuristic_confidence"] >= parse_api.tiered_parser.confidence_threshold
+        parse_async.assert_not_awaited()
+        assert save_resume.await_args.args[0].work_experience[0].company == "ABC科技有限公司"
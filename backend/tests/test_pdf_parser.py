@@ -4,11 +4,17 @@ PDF解析器测试
 
 import pytest
 import os
+import PyPDF2
+import pdfplumber
 import tempfile
 from pathlib import Path
 from unittest.mock import patch, mock_open, MagicMock
 
-from backend.services.pdf_parser import PDFParser, PDFParseError
+from backend.services.pdf_parser import (
+    PDFParser, PDFParseError, PDFDocumentSession, choose_engine,
+    ENGINE_PDFPLUMBER, ENGINE_PYPDF2, ENGINE_NONE, ENGINE_AUTO
+)
+from backend.benchmarks.synthetic_pdf import write_resume_pdf, build_image_only_pdf
 
 
 class TestPDFParser:
@@ -65,13 +71,13 @@ class TestPDFParser:
                 except PermissionError:
                     pass  # 忽略Windows文件权限问题
     
-    @patch('PyPDF2.PdfReader')
-    def test_validate_pdf_file_encrypted(self, mock_pdf_reader):
+    @patch('pdfplumber.open')
+    def test_validate_pdf_file_encrypted(self, mock_pdfplumber):
         """测试加密PDF文件"""
         # 模拟加密的PDF
-        mock_reader_instance = MagicMock()
-        mock_reader_instance.is_encrypted = True
-        mock_pdf_reader.return_value = mock_reader_instance
+        mock_pdf = MagicMock()
+        mock_pdf.doc.encryption = ([b'id'], {'Filter': 'Standard'})
+        mock_pdfplumber.return_value = mock_pdf
         
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
             tmp_file.write(b"fake pdf content")
@@ -88,14 +94,14 @@ class TestPDFParser:
                 except PermissionError:
                     pass  # 忽略Windows文件权限问题
     
-    @patch('PyPDF2.PdfReader')
-    def test_validate_pdf_file_empty(self, mock_pdf_reader):
+    @patch('pdfplumber.open')
+    def test_validate_pdf_file_empty(self, mock_pdfplumber):
         """测试空PDF文件"""
         # 模拟空的PDF
-        mock_reader_instance = MagicMock()
-        mock_reader_instance.is_encrypted = False
-        mock_reader_instance.pages = []
-        mock_pdf_reader.return_value = mock_reader_instance
+        mock_pdf = MagicMock()
+        mock_pdf.doc.encryption = None
+        mock_pdf.pages = []
+        mock_pdfplumber.return_value = mock_pdf
         
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
             tmp_file.write(b"fake pdf content")
@@ -112,17 +118,17 @@ class TestPDFParser:
                 except PermissionError:
                     pass  # 忽略Windows文件权限问题
     
-    @patch('PyPDF2.PdfReader')
-    def test_validate_pdf_file_success(self, mock_pdf_reader):
+    @patch('pdfplumber.open')
+    def test_validate_pdf_file_success(self, mock_pdfplumber):
         """测试成功验证PDF文件"""
         # 模拟正常的PDF
         mock_page = MagicMock()
         mock_page.extract_text.return_value = "test content"
         
-        mock_reader_instance = MagicMock()
-        mock_reader_instance.is_encrypted = False
-        mock_reader_instance.pages = [mock_page]
-        mock_pdf_reader.return_value = mock_reader_instance
+        mock_pdf = MagicMock()
+        mock_pdf.doc.encryption = None
+        mock_pdf.pages = [mock_page]
+        mock_pdfplumber.return_value = mock_pdf
         
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
             tmp_file.write(b"fake pdf content")
@@ -325,5 +331,175 @@ class TestPDFParser:
                 assert "未找到可提取的文本内容" in str(exc_info.value)
 
 
+
+class TestPDFDocumentSession:
+    """PDF文档会话测试类"""
+    
+    def test_single_open_shared_by_validation_and_extraction(self, tmp_path):
+        """测试验证、提取和统计只打开一次文件"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=2)
+        parser = PDFParser()
+        
+        with patch('pdfplumber.open', wraps=pdfplumber.open) as mock_open_pdf:
+            with patch('PyPDF2.PdfReader', wraps=PyPDF2.PdfReader) as mock_pypdf2:
+                with parser.open_session(path) as session:
+                    text = parser.extract_text_from_pdf(path, session)
+                    stats = parser.get_document_statistics(session)
+                    
+                    assert mock_open_pdf.call_count == 1
+                    # 探测采样复用同一个文件句柄
+                    mock_pypdf2.assert_called_once_with(session.pdf.stream)
+                    assert session.num_pages == 2
+                    assert not session.is_encrypted
+                    assert "john.smith@example.com" in session.page_text(0)
+                    assert stats['has_email']
+                    assert parser.extract_text_from_pdf(path, session) is text
+                    assert parser.get_document_statistics(session) is stats
+    
+    def test_fallback_reuses_open_file(self, tmp_path):
+        """测试PyPDF2备用方案复用已打开的文件句柄"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=2)
+        
+        with PDFDocumentSession(path) as session:
+            texts = session.fallback_page_texts
+            assert len(texts) == 2
+            assert "john.smith@example.com" in texts[0]
+    
+    def test_iter_pages_yields_cleaned_pages(self, tmp_path):
+        """测试逐页返回清理后的文本并释放页面缓存"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=3)
+        parser = PDFParser()
+        
+        with parser.open_session(path) as session:
+            pages = list(parser.iter_pages(path, session))
+            
+            assert [page['page_num'] for page in pages] == [1, 2, 3]
+            assert all(page['total_pages'] == 3 for page in pages)
+            assert "john.smith@example.com" in pages[0]['text']
+            assert "Project 3." in pages[2]['text']
+            assert all(not hasattr(page, '_objects') for page in session.pdf.pages)
+    
+    def test_iter_pages_validation_failed(self):
+        """测试文件验证失败时在第一次迭代抛出异常"""
+        with pytest.raises(PDFParseError):
+            next(PDFParser().iter_pages("nonexistent.pdf"))
+    
+    @pytest.mark.asyncio
+    async def test_aiter_pages(self, tmp_path):
+        """测试异步逐页提取"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=2)
+        
+        pages = [page async for page in PDFParser().aiter_pages(path)]
+        
+        assert [page['page_num'] for page in pages] == [1, 2]
+        assert "Senior Software Engineer" in pages[0]['text']
+    
+    def test_extract_without_session(self, tmp_path):
+        """测试不传会话时与原接口行为一致"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=1)
+        
+        result = PDFParser().extract_text_from_pdf(path)
+        
+        assert "--- 第1页 ---" not in result
+        assert "Senior Software Engineer" in result
+
+
 if __name__ == "__main__":
-    pytest.main([__file__])
\ No newline at end of file
+    pytest.main([__file__])
+
+
+def _features(**overrides):
+    """构造探测特征，默认为正常的文本PDF"""
+    features = {
+        "text_operators": 80,
+        "font_count": 1,
+        "producer": "",
+        "pdfplumber_chars": 2000,
+        "pypdf2_chars": 2000
+    }
+    features.update(overrides)
+    return features
+
+
+class TestExtractorProbe:
+    """提取引擎探测测试类"""
+    
+    def test_choose_pdfplumber_for_normal_text(self):
+        """测试文本正常时使用pdfplumber"""
+        assert choose_engine(_features())[0] == ENGINE_PDFPLUMBER
+    
+    def test_choose_pypdf2_when_pdfplumber_fails(self):
+        """测试只有PyPDF2能提取到文本时使用PyPDF2"""
+        assert choose_engine(_features(pdfplumber_chars=3))[0] == ENGINE_PYPDF2
+    
+    def test_choose_none_without_text_operators(self):
+        """测试没有字体和文本指令时判断为扫描件"""
+        features = _features(text_operators=0, font_count=0, pdfplumber_chars=0, pypdf2_chars=0)
+        assert choose_engine(features)[0] == ENGINE_NONE
+    
+    def test_choose_none_for_scanner_producer(self):
+        """测试扫描软件生成且采样页没有文本时判断为扫描件"""
+        features = _features(producer="Canon ScanGear", pdfplumber_chars=0, pypdf2_chars=5)
+        assert choose_engine(features)[0] == ENGINE_NONE
+    
+    def test_choose_auto_when_ambiguous(self):
+        """测试有文本指令但采样页文本过少时无法判断"""
+        assert choose_engine(_features(pdfplumber_chars=10, pypdf2_chars=10))[0] == ENGINE_AUTO
+    
+    def test_text_pdf_uses_single_engine(self, tmp_path):
+        """测试文本PDF只用pdfplumber完整提取一遍，并在元数据中记录引擎和原因"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=3)
+        parser = PDFParser()
+        
+        with parser.open_session(path) as session:
+            document = parser.extract_document(path, session)
+            # PyPDF2只提取了探测采样的第一页
+            assert list(session._fallback_page_texts) == [0]
+        
+        metadata = document["metadata"]
+        assert metadata["engine"] == ENGINE_PDFPLUMBER
+        assert metadata["engine_reason"]
+        assert metadata["probe_features"]["font_count"] == 1
+        assert metadata["num_pages"] == 3
+        assert "john.smith@example.com" in document["text"]
+    
+    def test_pypdf2_engine_skips_pdfplumber_pages(self, tmp_path):
+        """测试选择PyPDF2时不再用pdfplumber提取其余页面"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=3)
+        parser = PDFParser()
+        
+        with parser.open_session(path) as session:
+            with patch.object(parser, 'probe_document', return_value={
+                "engine": ENGINE_PYPDF2, "reason": "test", "features": {}
+            }):
+                document = parser.extract_document(path, session)
+            assert list(session._page_texts) == [0]
+        
+        assert document["metadata"]["engine"] == ENGINE_PYPDF2
+        assert "Project 3." in document["text"]
+    
+    def test_image_only_pdf_fails_fast(self, tmp_path):
+        """测试扫描件在探测阶段直接报错，不做完整提取"""
+        path = tmp_path / "scan.pdf"
+        path.write_bytes(build_image_only_pdf(num_pages=5, producer="Canon ScanGear"))
+        parser = PDFParser()
+        
+        with parser.open_session(str(path)) as session:
+            with pytest.raises(PDFParseError) as exc_info:
+                parser.extract_document(str(path), session)
+            assert session.probe["engine"] == ENGINE_NONE
+            assert list(session._page_texts) == [0]
+        
+        assert "未找到可提取的文本内容" in str(exc_info.value)
+    
+    def test_probe_failure_falls_back_to_auto(self, tmp_path):
+        """测试探测异常时保留原有的先pdfplumber后PyPDF2的行为"""
+        path = write_resume_pdf(str(tmp_path / "resume.pdf"), num_pages=1)
+        parser = PDFParser()
+        
+        with parser.open_session(path) as session:
+            with patch.object(PDFDocumentSession, 'sample_text_features', side_effect=ValueError("bad xref")):
+                document = parser.extract_document(path, session)
+        
+        assert session.probe["engine"] == ENGINE_AUTO
+        assert document["metadata"]["engine"] == ENGINE_PDFPLUMBER
@@ -0,0 +1,117 @@
+"""
+提示词压缩测试
+"""
+
+import logging
+
+from backend.services.prompt_compactor import PromptCompactor
+from backend.services.qwen_parser import QwenResumeParser
+from backend.services.rate_limiter import estimate_tokens
+
+HEADER = "张三 | 高级后端工程师 | zhangsan@example.com"
+
+
+def _resume(summary_lines: int = 2, project_lines: int = 2, work_lines: int = 2) -> str:
+    lines = [HEADER, "电话：138-1234-5678", "", "自我评价"]
+    lines += [f"热爱技术，具有良好的沟通能力和团队精神，第{i}条" for i in range(summary_lines)]
+    lines += ["工作经历", "ABC科技有限公司 高级工程师 2020-01 至今"]
+    lines += [f"负责核心交易系统第{i}个模块的设计与开发" for i in range(work_lines)]
+    lines += ["项目经历"]
+    lines += [f"电商平台重构项目，负责订单服务拆分，第{i}期" for i in range(project_lines)]
+    lines += ["教育背景", "清华大学 计算机科学 本科 2012-2016", "技能", "Python", "Go"]
+    return "\n".join(lines)
+
+
+class TestRedundantLines:
+    """重复行和套话去除测试类"""
+
+    def test_page_numbers_and_boilerplate(self):
+        """测试去除页码行、模板套话和空行"""
+        text = "个人简历\n张三\n\n第1页/共2页\nPython\n- 2 -\nPage 2 of 2\nGo\n2/2"
+        result = PromptCompactor({"text_token_budget": 0}).compact(text)
+        assert result["text"] == "张三\nPython\nGo"
+        assert result["removed_lines"] == 5
+        assert result["tokens_after"] < result["tokens_before"]
+
+    def test_table_cell_numbers_kept(self):
+        """测试表格简历中单独成行的数字和评分保留，只有组成页码序列的"n/m"行视为页码"""
+        text = "技能\nPython\n5\n4/5\nGo\n3\n3/5\n项目\n1/3\n经历\n2 / 3\n教育\n3/3"
+        result = PromptCompactor({"text_token_budget": 0}).compact(text)
+        assert result["text"] == "技能\nPython\n5\n4/5\nGo\n3\n3/5\n项目\n经历\n教育"
+        assert result["removed_lines"] == 3
+
+    def test_repeated_page_header_kept_once(self):
+        """测试每页重复的页眉只保留第一次出现"""
+        page = f"{HEADER}\n工作经历\n负责系统设计"
+        result = PromptCompactor({"text_token_budget": 0}).compact("\n".join([page, page.replace("系统设计", "性能优化")]))
+        assert result["text"].count(HEADER) == 1
+        assert "性能优化" in result["text"]
+
+    def test_short_lines_repeated_across_entries_kept(self):
+        """测试不同经历中重复出现一两次的短行（技术栈、年份）保留，反复出现的短行只保留一次"""
+        compactor = PromptCompactor({"text_token_budget": 0, "min_duplicate_chars": 12, "repeat_threshold": 3})
+        assert compactor.compact("A公司\nPython\nB公司\nPython")["text"].count("Python") == 2
+        assert compactor.compact("页眉\nA\n页眉\nB\n页眉\nC")["text"] == "页眉\nA\nB\nC"
+
+
+class TestTokenBudget:
+    """token预算截短测试类"""
+
+    def test_low_value_sections_trimmed_first(self):
+        """测试超出预算时先截短自我评价和项目经历，保留联系方式、工作、教育和技能"""
+        text = _resume(summary_lines=40, project_lines=40)
+        full = PromptCompactor({"text_token_budget": 0}).compact(text)
+        budget = full["tokens_after"] - 600
+        result = PromptCompactor({"text_token_budget": budget}).compact(text)
+
+        assert result["tokens_after"] <= budget + 2
+        assert result["trimmed_sections"][0] == "summary"
+        for kept in [HEADER, "138-1234-5678", "负责核心交易系统第1个模块", "清华大学", "Python"]:
+            assert kept in result["text"]
+        # 截短自我评价已经足够，项目经历保持完整
+        assert "第39条" not in result["text"]
+        assert "第39期" in result["text"]
+        assert result["trimmed_sections"] == ["summary"]
+
+    def test_protected_sections_trimmed_last(self):
+        """测试低价值章节删完仍超出预算时才截短工作经历，联系方式保留到最后"""
+        text = _resume(summary_lines=1, project_lines=1, work_lines=200)
+        result = PromptCompactor({"text_token_budget": 400}).compact(text)
+
+        assert result["tokens_after"] <= 402
+        assert result["trimmed_sections"][:2] == ["summary", "projects"]
+        assert "work_experience" in result["trimmed_sections"]
+        assert result["text"].startswith(HEADER)
+        assert "负责核心交易系统第0个模块" in result["text"]
+        assert "负责核心交易系统第199个模块" not in result["text"]
+
+    def test_within_budget_untouched(self):
+        """测试未超出预算时不截短"""
+        text = _resume()
+        result = PromptCompactor({"text_token_budget": 100000}).compact(text)
+        assert result["trimmed_sections"] == []
+        assert result["text"] == "\n".join(line for line in text.split("\n") if line)
+
+
+class TestQwenParserCompaction:
+    """简历解析器提示词压缩测试类"""
+
+    def test_prompt_uses_compacted_text_and_logs_tokens(self, monkeypatch, caplog):
+        """测试提示词使用压缩后的文本，并记录压缩前后的token数"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser()
+        text = "\n\n".join([f"{HEADER}\n第{i}页/共3页\n负责模块{i}" for i in range(1, 4)])
+
+        with caplog.at_level(logging.INFO, logger="backend.services.qwen_parser"):
+            prompt = parser._prepare_prompt(text)
+
+        assert prompt.count(HEADER) == 1
+        assert "第2页/共3页" not in prompt
+        assert "负责模块3" in prompt
+        assert estimate_tokens(prompt) < estimate_tokens(parser._build_parse_prompt(text))
+        assert any("压缩前" in record.getMessage() and "压缩后" in record.getMessage() for record in caplog.records)
+
+    def test_prompt_version_includes_compaction(self, monkeypatch):
+        """测试压缩规则版本计入提示模板版本"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        assert "-c" in QwenResumeParser().prompt_version
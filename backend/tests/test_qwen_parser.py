@@ -128,9 +128,13 @@ class TestQwenResumeParser:
         assert "不是有效的JSON格式" in str(exc_info.value)
     
     def test_parse_api_response_missing_fields(self):
-        """测试缺少必要字段的响应"""
+        """测试缺少必要字段的响应：启用修复时补全默认值，未启用时报错"""
         response_text = '{"personal_info": {"name": "张三"}}'
         
+        result = self.parser._parse_api_response(response_text)
+        assert result == {"personal_info": {"name": "张三"}, "work_experience": [], "education": [], "skills": []}
+        
+        self.parser.json_repair = False
         with pytest.raises(QwenParseError) as exc_info:
             self.parser._parse_api_response(response_text)
         assert "缺少必要字段" in str(exc_info.value)
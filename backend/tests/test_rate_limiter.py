@@ -0,0 +1,215 @@
+"""
+通义千问调用限流器测试
+"""
+
+import json
+import time
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.services.rate_limiter import (
+    MemoryRateLimiter,
+    RedisRateLimiter,
+    RateLimitLease,
+    RateLimitTimeoutError,
+    create_rate_limiter,
+    estimate_tokens,
+)
+from backend.services.qwen_parser import QwenResumeParser
+
+UNLIMITED = {"rps": 0, "tpm": 0, "max_in_flight": 0, "poll_interval": 0.01, "max_poll_interval": 0.05}
+
+
+def _limiter(**config) -> MemoryRateLimiter:
+    return MemoryRateLimiter({**UNLIMITED, **config})
+
+
+def limiter_lease(lease_id: str, tokens: int) -> RateLimitLease:
+    return RateLimitLease(lease_id, tokens, 0.0)
+
+
+class TestEstimateTokens:
+    """token估计测试类"""
+
+    def test_cjk_and_latin(self):
+        """测试中文按字计数，英文约4个字符一个token"""
+        assert estimate_tokens("张三李四") == 4
+        assert estimate_tokens("abcdefgh") == 2
+        assert estimate_tokens("") == 0
+
+
+class TestMemoryRateLimiter:
+    """进程内限流器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_limit_queues_fifo(self):
+        """测试达到并发上限后按到达顺序排队，并上报排队位置"""
+        limiter = _limiter(max_in_flight=1)
+        first = await limiter.acquire(10)
+        order, positions = [], {}
+
+        async def worker(name):
+            async def on_queued(position, waited):
+                positions.setdefault(name, []).append(position)
+            lease = await limiter.acquire(10, on_queued)
+            order.append(name)
+            await asyncio.sleep(0.02)
+            limiter.release(lease)
+
+        tasks = []
+        for name in ["b", "c", "d"]:
+            tasks.append(asyncio.create_task(worker(name)))
+            await asyncio.sleep(0.03)
+
+        assert limiter.get_stats()["waiting"] == 3
+        limiter.release(first)
+        await asyncio.gather(*tasks)
+
+        assert order == ["b", "c", "d"]
+        assert positions["b"][0] == 1
+        assert positions["d"][0] == 3
+        assert positions["d"][-1] == 1
+        stats = limiter.get_stats()
+        assert (stats["acquired"], stats["queued"], stats["waiting"]) == (4, 3, 0)
+
+    @pytest.mark.asyncio
+    async def test_rps_bucket(self):
+        """测试突发额度用完后按每秒请求数放行"""
+        limiter = _limiter(rps=20, rps_burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.release(await limiter.acquire(1))
+        # 前2个使用突发额度，后4个每个等待约0.05秒
+        assert time.monotonic() - start >= 0.15
+
+    def test_tpm_bucket_refund(self):
+        """测试token额度不足时排队，实际用量小于预估时退还差额"""
+        clock_time = [0.0]
+        limiter = MemoryRateLimiter({**UNLIMITED, "tpm": 6000}, clock=lambda: clock_time[0])
+
+        assert limiter._try_acquire("a", 5000)[0]
+        acquired, ahead, wait = limiter._try_acquire("b", 2000)
+        assert not acquired and ahead == 0
+        # 每秒补充100个token，还差1000个
+        assert wait == pytest.approx(10.0)
+
+        limiter.release(limiter_lease("a", 5000), used_tokens=1000)
+        assert limiter._try_acquire("b", 2000)[0]
+
+    def test_oversized_request_waits_for_full_bucket(self):
+        """测试超过桶容量的请求在桶满时放行，不会永远等待"""
+        limiter = _limiter(tpm=1000)
+        assert limiter.acquire_blocking(5000).tokens == 5000
+
+    @pytest.mark.asyncio
+    async def test_timeout_leaves_queue(self):
+        """测试排队超时后抛出异常并让出位置"""
+        limiter = _limiter(max_in_flight=1, max_wait=0.1)
+        lease = await limiter.acquire(1)
+        with pytest.raises(RateLimitTimeoutError):
+            await limiter.acquire(1)
+        assert limiter.get_stats()["timeouts"] == 1
+
+        # 超时的请求不再挡在队首
+        limiter.release(lease)
+        assert (await limiter.acquire(1)).waited < 0.1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """测试取消排队中的任务后，后面的请求前移"""
+        limiter = _limiter(max_in_flight=1)
+        lease = await limiter.acquire(1)
+        cancelled = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0.03)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        limiter.release(lease)
+        assert (await limiter.acquire(1)).waited < 0.1
+
+    def test_stale_head_removed(self):
+        """测试不再轮询的队首请求过期后被移出队列"""
+        clock_time = [0.0]
+        limiter = MemoryRateLimiter({**UNLIMITED, "max_in_flight": 1, "waiter_ttl": 5},
+                                    clock=lambda: clock_time[0])
+        assert limiter._try_acquire("holder", 1)[0]
+        assert limiter._try_acquire("gone", 1) == (False, 0, limiter.poll_interval)
+        assert limiter._try_acquire("next", 1)[1] == 1
+
+        clock_time[0] = 6.0
+        limiter.release(limiter_lease("holder", 1))
+        assert limiter._try_acquire("next", 1)[0]
+
+
+class TestRedisRateLimiter:
+    """Redis限流器测试类"""
+
+    def test_script_arguments_and_result(self):
+        """测试脚本的键和参数，以及返回值转换"""
+        client = MagicMock()
+        acquire_script, release_script = MagicMock(), MagicMock()
+        client.register_script.side_effect = [acquire_script, release_script]
+        acquire_script.return_value = [0, 3, 250]
+        limiter = RedisRateLimiter(client, {"rps": 5, "rps_burst": 10, "tpm": 1000, "max_in_flight": 4})
+
+        assert limiter._try_acquire("w1", 100) == (False, 3, 0.25)
+        kwargs = acquire_script.call_args.kwargs
+        assert kwargs["keys"] == [f"ratelimit:qwen:{name}" for name in ("queue", "waiters", "in_flight", "buckets")]
+        assert kwargs["args"][:6] == ["w1", 100, 5, 10, 1000, 4]
+
+        limiter.release(limiter_lease("w1", 100), used_tokens=40)
+        assert release_script.call_args.kwargs["args"] == ["w1", 60, 1000]
+
+    def test_redis_error_fails_open(self):
+        """测试Redis不可用时放行请求"""
+        client = MagicMock()
+        client.register_script.return_value.side_effect = ConnectionError("refused")
+        limiter = RedisRateLimiter(client, UNLIMITED)
+        lease = limiter.acquire_blocking(10)
+        limiter.release(lease)
+        assert limiter.get_stats()["errors"] == 1
+
+    def test_create_from_config(self):
+        """测试按配置创建限流器"""
+        assert isinstance(create_rate_limiter({"backend": "memory"}), MemoryRateLimiter)
+        assert create_rate_limiter({"backend": "none"}) is None
+        with patch("backend.services.rate_limiter.redis.from_url"):
+            assert isinstance(create_rate_limiter({"backend": "redis"}), RedisRateLimiter)
+        with pytest.raises(ValueError):
+            create_rate_limiter({"backend": "sqlite"})
+
+
+class TestQwenParserRateLimit:
+    """简历解析器限流集成测试类"""
+
+    @pytest.mark.asyncio
+    async def test_async_call_queues_and_refunds(self, monkeypatch):
+        """测试异步调用排队时上报位置，完成后按实际用量退还token"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        limiter = _limiter(max_in_flight=1, tpm=100000)
+        parser = QwenResumeParser(rate_limiter=limiter)
+        text = json.dumps({"personal_info": {}, "work_experience": [], "education": [], "skills": []})
+
+        async def generate(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return text, {"input_tokens": 10, "output_tokens": 5}
+
+        positions = []
+
+        async def on_queued(position, waited):
+            positions.append(position)
+
+        with patch.object(parser.client, "generate_with_usage", side_effect=generate):
+            results = await asyncio.gather(
+                parser._call_qwen_api_async("提示一"),
+                parser._call_qwen_api_async("提示二", on_queued)
+            )
+
+        assert results == [text, text]
+        assert positions and positions[0] == 1
+        # 预估的max_tokens在调用结束后退还，只扣除实际用量
+        assert limiter._tpm_tokens >= 100000 - 30
+        assert limiter._in_flight == {}
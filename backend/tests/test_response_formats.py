@@ -0,0 +1,126 @@
+"""
+AI解析响应格式测试
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from backend.benchmarks.bench_response_format import compare, format_output, run_offline
+from backend.benchmarks.synthetic_resume import build_synthetic_resume
+from backend.services.llm_cache import MemoryLLMCache
+from backend.services.qwen_parser import QwenResumeParser, QwenParseError
+from backend.services.rate_limiter import estimate_tokens
+from backend.services.response_formats import (
+    COMPACT_FORMAT_INSTRUCTIONS,
+    decode_compact_response,
+    encode_compact_response,
+)
+
+with patch('redis.from_url', return_value=MagicMock()):
+    from backend.api import parse as parse_api
+
+COMPACT_JSON = {
+    "p": ["张三", "zhangsan@example.com", "138-1234-5678", "北京"],
+    "w": [["ABC公司", "高级工程师", "2020-01", None, ["负责后端开发"], ["Python"]]],
+    "e": [["清华大学", "本科", "计算机科学", "2012-09", "2016-06", None]],
+    "s": [["t", "Python", 3], ["s", "团队合作", None], ["l", "英语", "2"]]
+}
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+    return QwenResumeParser()
+
+
+class TestCompactCodec:
+    """紧凑格式编解码测试类"""
+
+    def test_decode(self):
+        """测试按位置还原字段，缺失的字段为None，技能代码还原为枚举值"""
+        data = decode_compact_response(COMPACT_JSON)
+        assert data["personal_info"]["name"] == "张三"
+        assert data["personal_info"]["github"] is None
+        assert data["work_experience"][0]["end_date"] is None
+        assert data["work_experience"][0]["technologies"] == ["Python"]
+        assert data["education"][0]["major"] == "计算机科学"
+        assert [(skill["category"], skill["level"]) for skill in data["skills"]] == [
+            ("technical", "advanced"), ("soft", None), ("language", "intermediate")
+        ]
+
+    def test_round_trip(self):
+        """测试编码后再解码得到原来的字典"""
+        _, data = build_synthetic_resume(3)
+        assert decode_compact_response(encode_compact_response(data)) == data
+
+
+class TestQwenParserResponseFormat:
+    """简历解析器响应格式测试类"""
+
+    def test_compact_prompt(self, parser):
+        """测试紧凑格式的提示词包含格式说明且比完整格式短"""
+        prompt = parser._build_parse_prompt("简历内容", "compact")
+        assert COMPACT_FORMAT_INSTRUCTIONS in prompt
+        assert "简历内容" in prompt
+        assert estimate_tokens(prompt) < estimate_tokens(parser._build_parse_prompt("简历内容"))
+
+    def test_parse_compact_response(self, parser):
+        """测试按指定格式解析和构建简历对象"""
+        response = "```json\n" + json.dumps(COMPACT_JSON, ensure_ascii=False) + "\n```"
+        with patch.object(parser, "_call_qwen_api", return_value=response) as call:
+            resume = parser.parse_resume_text("张三的简历", response_format="compact")
+
+        assert COMPACT_FORMAT_INSTRUCTIONS in call.call_args.args[0]
+        assert resume.personal_info.name == "张三"
+        assert resume.work_experience[0].company == "ABC公司"
+        assert [skill.level for skill in resume.skills] == ["advanced", None, "intermediate"]
+
+    def test_compact_response_must_be_object(self, parser):
+        """测试紧凑格式的响应不是JSON对象时报错"""
+        with pytest.raises(QwenParseError):
+            parser._parse_api_response("[1, 2]", "compact")
+
+    def test_unknown_format_rejected(self, parser):
+        """测试不支持的响应格式"""
+        with pytest.raises(QwenParseError):
+            parser.parse_resume_text("张三的简历", response_format="xml")
+
+    def test_cache_keys_per_format(self, monkeypatch):
+        """测试两种格式的解析结果分别缓存"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser(cache=MemoryLLMCache(max_entries=10, ttl=60))
+        assert parser._cache_key("简历", "full") != parser._cache_key("简历", "compact")
+
+
+class TestParseAPIResponseFormat:
+    """解析接口响应格式参数测试类"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_format_rejected(self):
+        """测试不支持的响应格式返回400"""
+        with pytest.raises(HTTPException) as exc_info:
+            await parse_api.parse_resume("upload-1", BackgroundTasks(), response_format="xml")
+        assert exc_info.value.status_code == 400
+
+
+class TestResponseFormatBenchmark:
+    """响应格式对比基准测试类"""
+
+    def test_offline_report(self, monkeypatch):
+        """测试离线对比中紧凑格式输出更少的token，且能还原为同样的简历对象"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        results = run_offline(docs=3, seed=0, tokens_per_second=40.0, first_token_latency=0.5)
+
+        assert [result["parse_success_rate"] for result in results] == [1.0, 1.0]
+        comparison = compare(results)
+        assert comparison["output_tokens_reduction"] > 0.3
+        assert comparison["latency_reduction"] > 0
+
+    def test_full_format_output_uses_chinese_labels(self):
+        """测试完整格式的模拟输出与提示示例一致，使用中文的技能分类"""
+        _, data = build_synthetic_resume(0)
+        assert "技术技能" in format_output(data, "full")
+        assert '"t"' in format_output(data, "compact")
@@ -0,0 +1,147 @@
+"""
+简历章节切分测试
+"""
+
+import time
+
+import pytest
+
+from backend.benchmarks.bench_text_normalizer import CHINESE_RESUME_PAGE
+from backend.services.pdf_parser import PDFParser
+from backend.services.section_segmenter import (
+    SectionSegmenter,
+    section_segmenter,
+    SECTION_PREAMBLE,
+    SECTION_PERSONAL_INFO,
+    SECTION_WORK_EXPERIENCE,
+    SECTION_EDUCATION,
+    SECTION_SKILLS,
+    SECTION_PROJECTS,
+)
+
+CHINESE_RESUME = """张三
+高级Python工程师
+
+一、基本信息
+电话：138-1234-5678
+邮箱：zhangsan@example.com
+
+二、工作经历：
+2020.01-至今 某某科技有限公司
+负责技能培训和工作经历整理系统的开发
+
+【教育背景】
+2014.09-2018.06 北京大学 计算机科学 本科
+
+专业技能
+Python、Redis、FastAPI
+
+项目经历：
+简历解析系统"""
+
+
+class TestSectionSegmenter:
+    """章节切分器测试类"""
+
+    def test_segment_chinese_resume(self):
+        """测试中文简历切分出带类型和偏移量的章节"""
+        sections = section_segmenter.segment(CHINESE_RESUME)
+
+        assert [section["type"] for section in sections] == [
+            SECTION_PREAMBLE, SECTION_PERSONAL_INFO, SECTION_WORK_EXPERIENCE,
+            SECTION_EDUCATION, SECTION_SKILLS, SECTION_PROJECTS
+        ]
+        assert [section["title"] for section in sections[1:]] == ["基本信息", "工作经历", "教育背景", "专业技能", "项目经历"]
+
+        # 章节首尾相接，覆盖整个文本
+        assert sections[0]["start"] == 0
+        assert sections[-1]["end"] == len(CHINESE_RESUME)
+        for previous, current in zip(sections, sections[1:]):
+            assert previous["end"] == current["start"]
+
+        work = sections[2]
+        assert CHINESE_RESUME[work["start"]:work["content_start"]] == "二、工作经历："
+        body = CHINESE_RESUME[work["content_start"]:work["end"]]
+        assert "某某科技有限公司" in body
+        assert "北京大学" not in body
+
+    def test_keywords_inside_sentences_are_not_headers(self):
+        """测试正文中的标题词不会开始新章节"""
+        text = "工作经历\n负责技能培训，整理教育背景资料\n技能：Python, Java"
+        sections = section_segmenter.segment(text)
+
+        assert [section["type"] for section in sections] == [SECTION_WORK_EXPERIENCE]
+        assert sections[0]["end"] == len(text)
+
+    def test_segment_english_resume(self):
+        """测试英文标题不区分大小写"""
+        text = "John Doe\nWORK EXPERIENCE\nAcme Corp\nEducation:\nMIT\nTechnical Skills\nPython"
+        sections = section_segmenter.segment(text)
+        assert [(section["type"], section["title"]) for section in sections] == [
+            (SECTION_PREAMBLE, ""),
+            (SECTION_WORK_EXPERIENCE, "WORK EXPERIENCE"),
+            (SECTION_EDUCATION, "Education"),
+            (SECTION_SKILLS, "Technical Skills"),
+        ]
+
+    def test_empty_and_headerless_text(self):
+        """测试空文本和没有标题的文本"""
+        assert section_segmenter.segment("") == []
+        assert section_segmenter.segment("  \n ") == []
+        assert section_segmenter.segment("只有一段话") == [{
+            "type": SECTION_PREAMBLE, "title": "", "start": 0, "content_start": 0, "end": 5
+        }]
+
+    def test_get_section_text(self):
+        """测试按类型拼接章节内容"""
+        sections = section_segmenter.segment(CHINESE_RESUME)
+        text = section_segmenter.get_section_text(CHINESE_RESUME, sections, [SECTION_EDUCATION, SECTION_PROJECTS])
+
+        assert text.startswith("【教育背景】")
+        assert "北京大学" in text
+        assert "简历解析系统" in text
+        assert "某某科技" not in text
+        assert section_segmenter.get_section_text(CHINESE_RESUME, sections, ["unknown"]) == ""
+
+    def test_custom_headers(self):
+        """测试自定义标题词"""
+        segmenter = SectionSegmenter({"awards": ["获奖情况"]})
+        sections = segmenter.segment("获奖情况\n国家奖学金\n工作经历\n某公司")
+
+        assert [section["type"] for section in sections] == ["awards"]
+
+    def test_large_text_single_pass(self):
+        """测试长文本的切分耗时"""
+        text = CHINESE_RESUME_PAGE * 20000
+        start = time.perf_counter()
+        sections = section_segmenter.segment(text)
+        elapsed = time.perf_counter() - start
+
+        # 开头的姓名和联系方式，加上每页的工作经历和项目经历
+        assert len(sections) == 1 + 40000
+        assert elapsed < 5
+
+
+class TestSectionStatistics:
+    """文本统计和提取结果中的章节信息测试类"""
+
+    @pytest.fixture
+    def parser(self):
+        return PDFParser()
+
+    def test_estimated_sections_counts_section_types(self, parser):
+        """测试章节数量按出现的章节类型计数"""
+        stats = parser.get_text_statistics(CHINESE_RESUME)
+        assert stats['estimated_sections'] == 5
+
+        # 正文中的标题词不计入
+        stats = parser.get_text_statistics("负责技能培训和工作经历整理")
+        assert stats['estimated_sections'] == 0
+
+    def test_document_contains_sections(self, parser, tmp_path):
+        """测试提取结果中保存了基于清理后文本的章节区间"""
+        probe = {"engine": "pdfplumber", "reason": "test", "features": {}}
+        document = parser._build_document(str(tmp_path / "resume.pdf"), CHINESE_RESUME, probe, num_pages=1)
+
+        assert document["sections"] == section_segmenter.segment(document["text"])
+        assert [section["type"] for section in document["sections"]][-1] == SECTION_PROJECTS
@@ -0,0 +1,189 @@
+"""
+按章节并发解析测试
+"""
+
+import json
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from backend.benchmarks.bench_sectioned_parsing import run_offline
+from backend.services.qwen_parser import QwenResumeParser
+from backend.services.sectioned_extraction import SectionedExtractor
+
+RESUME_TEXT = """王五
+邮箱：wangwu@example.com | 电话：137-1111-2222
+自我评价
+热爱技术
+工作经历
+ABC科技有限公司 | 后端工程师 | 2020.03 - 至今
+- 负责订单系统开发
+XYZ公司 | 实习生 | 2019.07 - 2020.02
+- 参与测试
+教育背景
+浙江大学 | 本科 | 软件工程 | 2015.09 - 2019.06
+项目经历
+推荐系统：使用Spark和Kafka
+专业技能
+技术技能：Python（精通）"""
+
+SECTION_RESPONSES = {
+    "personal_info": {"personal_info": {"name": "王五", "summary": "热爱技术"}},
+    "work_experience": {"work_experience": [
+        {"company": "ABC科技有限公司", "position": "后端工程师", "start_date": "D1", "description": ["负责订单系统开发"]},
+        {"company": "XYZ公司", "position": "实习生", "start_date": "D2", "description": ["参与测试"]}
+    ]},
+    "education": [{"institution": "浙江大学", "degree": "本科", "major": "软件工程", "start_date": "D3"}],
+    "skills": {"skills": [
+        {"category": "技术技能", "name": "Python", "level": "精通"},
+        {"category": "技术技能", "name": "Spark", "level": None}
+    ]},
+}
+
+
+def _part(prompt: str) -> str:
+    """按提示中要求的顶层字段判断请求的部分"""
+    return next(part for part in SECTION_RESPONSES if f'"{part}": ' in prompt)
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+    parser = QwenResumeParser()
+    parser.sectioned = SectionedExtractor({"chunk_token_budget": 1500})
+    return parser
+
+
+class TestSectionedExtractor:
+    """按章节拆分和合并测试类"""
+
+    def test_plan_groups_sections(self):
+        """测试开头和自我评价归入个人信息，项目经历归入技能"""
+        pieces = SectionedExtractor({"chunk_token_budget": 1500}).plan(RESUME_TEXT)
+
+        assert [piece["part"] for piece in pieces] == ["personal_info", "work_experience", "education", "skills"]
+        assert "热爱技术" in pieces[0]["text"] and "王五" in pieces[0]["text"]
+        assert "推荐系统" in pieces[3]["text"] and "Python" in pieces[3]["text"]
+        assert all((piece["index"], piece["total"]) == (1, 1) for piece in pieces)
+
+    def test_plan_without_sections(self):
+        """测试没有可拆分的章节时返回空列表"""
+        assert SectionedExtractor().plan("王五\n邮箱：wangwu@example.com\n热爱技术") == []
+
+    def test_chunk_at_entry_boundaries(self):
+        """测试超出预算的章节在经历标题行处切开"""
+        entries = [
+            f"公司{index} | 工程师 | [D{index}]\n- 负责模块{index}的开发和维护工作\n- 优化模块{index}的性能"
+            for index in range(1, 7)
+        ]
+        text = "工作经历\n" + "\n".join(entries)
+        pieces = SectionedExtractor({"chunk_token_budget": 60}).plan(text)
+
+        assert len(pieces) > 1
+        assert all(piece["total"] == len(pieces) for piece in pieces)
+        for piece in pieces[1:]:
+            assert piece["text"].startswith("公司")
+        assert "\n".join(piece["text"] for piece in pieces).count("[D") == 6
+
+    def test_reduce_merges_split_entries(self):
+        """测试合并时个人信息取第一个非空值，同一段经历合并描述并补全字段"""
+        merged = SectionedExtractor.reduce([
+            ("personal_info", {"name": "王五", "location": None}),
+            ("work_experience", [{"company": "ABC", "position": "工程师", "start_date": "D1",
+                                  "description": ["开发"], "technologies": None}]),
+            ("personal_info", {"name": "王", "location": "杭州"}),
+            ("work_experience", [{"company": "abc ", "position": "", "start_date": "D1",
+                                  "description": ["开发", "测试"], "technologies": ["Go"]},
+                                 {"company": "XYZ", "position": "实习生", "start_date": "D2",
+                                  "description": ["参与测试"]}]),
+            ("skills", [{"name": "Go"}, {"name": "go"}]),
+        ])
+
+        assert merged["personal_info"] == {"name": "王五", "location": "杭州"}
+        assert merged["work_experience"][0] == {
+            "company": "ABC", "position": "工程师", "start_date": "D1",
+            "description": ["开发", "测试"], "technologies": ["Go"]
+        }
+        assert len(merged["work_experience"]) == 2
+        assert merged["skills"] == [{"name": "Go"}]
+        assert merged["education"] == []
+
+
+class TestQwenParserSectioned:
+    """简历解析器按章节解析集成测试类"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_requests_merged(self, parser):
+        """测试各部分的请求并发发送，合并后补全本地预提取的联系方式和时间段"""
+        in_flight, peak = 0, 0
+
+        async def call(prompt, on_queued=None, on_chunk=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return json.dumps(SECTION_RESPONSES[_part(prompt)], ensure_ascii=False)
+
+        with patch.object(parser, "_call_qwen_api_async", side_effect=call) as api:
+            resume = await parser.parse_resume_text_async(RESUME_TEXT)
+
+        assert api.await_count == 4
+        assert peak == 4
+        assert resume.personal_info.email == "wangwu@example.com"
+        assert resume.personal_info.summary == "热爱技术"
+        assert [(work.company, work.start_date, work.end_date) for work in resume.work_experience] == [
+            ("ABC科技有限公司", "2020-03", None), ("XYZ公司", "2019-07", "2020-02")
+        ]
+        assert resume.education[0].end_date == "2019-06"
+        assert [(skill.name, skill.level) for skill in resume.skills] == [("Python", "advanced"), ("Spark", None)]
+
+    def test_sync_interface(self, parser):
+        """测试同步接口在线程池中并发调用"""
+        with patch.object(parser, "_call_qwen_api",
+                          side_effect=lambda prompt: json.dumps(SECTION_RESPONSES[_part(prompt)])) as api:
+            resume = parser.parse_resume_text(RESUME_TEXT)
+
+        assert api.call_count == 4
+        assert resume.personal_info.name == "王五"
+        assert len(resume.work_experience) == 2
+
+    def test_falls_back_to_single_call(self, parser):
+        """测试没有可拆分的章节时整体解析"""
+        response = {"personal_info": {"name": "王五"}, "work_experience": [], "education": [], "skills": []}
+        with patch.object(parser, "_call_qwen_api", return_value=json.dumps(response)) as api:
+            resume = parser.parse_resume_text("王五\n邮箱：wangwu@example.com\n热爱技术")
+
+        assert api.call_count == 1
+        assert '"skills": [' in api.call_args.args[0]
+        assert resume.personal_info.name == "王五"
+
+    def test_invalid_section_response(self, parser):
+        """测试某个部分的响应格式不正确时解析失败"""
+        with patch.object(parser, "_call_qwen_api", return_value='{"work_experience": {}}'):
+            with pytest.raises(Exception, match="响应格式不正确"):
+                parser.parse_resume_text(RESUME_TEXT)
+
+    def test_disabled_by_default(self, monkeypatch):
+        """测试默认不启用按章节解析，缓存版本不含拆分规则版本"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        parser = QwenResumeParser()
+        assert parser.sectioned is None
+        assert "-s" not in parser.prompt_version
+
+
+class TestSectionedParsingBenchmark:
+    """按章节解析评估测试类"""
+
+    def test_long_resume_not_truncated(self, monkeypatch):
+        """测试超长简历整体解析的输出被截断，按章节切块后不截断且合并结果与标注一致"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        report = run_offline(docs=2, seed=0, num_jobs=40, chunk_token_budget=600,
+                             tokens_per_second=40.0, first_token_latency=0.8)
+
+        assert report["single"]["truncated"] == 2
+        assert report["sectioned"]["truncated"] == 0
+        assert report["sectioned"]["requests"]["min"] > 4
+        assert report["sectioned_restore_rate"] == 1.0
+        assert report["sectioned"]["latency_ms"]["max"] < report["single"]["latency_ms"]["min"]
@@ -0,0 +1,236 @@
+"""
+任务状态存储测试
+测试内存存储的TTL和容量淘汰，以及Redis存储的键结构
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from backend.services import status_store
+from backend.services.status_store import (
+    InMemoryStatusStore,
+    RedisStatusStore,
+    create_status_store,
+)
+
+
+class TestInMemoryStatusStore:
+    """内存状态存储测试类"""
+
+    def test_update_merges_fields(self):
+        """测试更新时合并字段而不是覆盖"""
+        store = InMemoryStatusStore()
+        store.update("job-1", {"status": "pending", "progress": 0})
+        store.update("job-1", {"progress": 50})
+
+        assert store.get("job-1") == {"status": "pending", "progress": 50}
+        assert "job-1" in store
+        assert "job-2" not in store
+
+    def test_get_returns_copy(self):
+        """测试修改get返回的字典不影响存储"""
+        store = InMemoryStatusStore()
+        store.update("job-1", {"progress": 0})
+        store.get("job-1")["progress"] = 100
+
+        assert store.get("job-1")["progress"] == 0
+
+    def test_ttl_expiry(self):
+        """测试记录过期后不可见"""
+        store = InMemoryStatusStore(ttl=10)
+        with patch("backend.services.status_store.time.monotonic", return_value=1000.0):
+            store.update("job-1", {"status": "pending"})
+        with patch("backend.services.status_store.time.monotonic", return_value=1005.0):
+            assert store.get("job-1") is not None
+        with patch("backend.services.status_store.time.monotonic", return_value=1011.0):
+            assert store.get("job-1") is None
+            assert store.items() == []
+
+    def test_max_entries_evicts_oldest(self):
+        """测试超出容量时淘汰最久未更新的记录"""
+        store = InMemoryStatusStore(max_entries=2)
+        store.update("job-1", {"n": 1})
+        store.update("job-2", {"n": 2})
+        store.update("job-1", {"n": 3})
+        store.update("job-3", {"n": 4})
+
+        assert store.get("job-2") is None
+        assert [job_id for job_id, _ in store.items()] == ["job-3", "job-1"]
+
+    def test_items_limit(self):
+        """测试列表按更新时间倒序并限制数量"""
+        store = InMemoryStatusStore()
+        for i in range(5):
+            store.update(f"job-{i}", {"n": i})
+
+        assert [job_id for job_id, _ in store.items(limit=2)] == ["job-4", "job-3"]
+
+    def test_set_field_if_absent(self):
+        """测试字段不存在时才写入"""
+        store = InMemoryStatusStore()
+        store.update("job-1", {"status": "uploading"})
+
+        assert store.set_field_if_absent("job-1", "writing", 1) is True
+        assert store.set_field_if_absent("job-1", "writing", 2) is False
+        store.remove_fields("job-1", "writing")
+        assert store.set_field_if_absent("job-1", "writing", 3) is True
+        assert store.get("job-1")["writing"] == 3
+
+    def test_replace_field_if_equal(self):
+        """测试字段当前值等于期望值时才替换"""
+        store = InMemoryStatusStore()
+        store.update("job-1", {"status": "uploading", "writing": 1.5})
+
+        assert store.replace_field_if_equal("job-1", "writing", 1.5, 2.5) is True
+        assert store.replace_field_if_equal("job-1", "writing", 1.5, 3.5) is False
+        assert store.get("job-1")["writing"] == 2.5
+        assert store.replace_field_if_equal("job-1", "missing", None, 1) is False
+        assert store.replace_field_if_equal("job-2", "writing", 1.5, 1) is False
+
+    def test_remove_fields_and_count(self):
+        """测试删除字段后返回剩余字段数，没有剩余字段时删除记录"""
+        store = InMemoryStatusStore()
+        store.update("abc", {"upload-1": True, "upload-2": True})
+
+        assert store.remove_fields_and_count("abc", "upload-1") == 1
+        assert store.remove_fields_and_count("abc", "upload-2") == 0
+        assert store.get("abc") is None
+        assert store.remove_fields_and_count("abc", "upload-2") == 0
+
+    def test_delete(self):
+        """测试删除记录"""
+        store = InMemoryStatusStore()
+        store.update("job-1", {"status": "pending"})
+
+        assert store.delete("job-1") is True
+        assert store.delete("job-1") is False
+        assert store.get("job-1") is None
+
+
+class TestRedisStatusStore:
+    """Redis状态存储测试类"""
+
+    @pytest.fixture
+    def mock_redis_client(self):
+        """模拟Redis客户端"""
+        client = Mock()
+        client.pipeline.return_value = Mock()
+        return client
+
+    def test_get_decodes_json_fields(self, mock_redis_client):
+        """测试读取时解码JSON字段值"""
+        mock_redis_client.hgetall.return_value = {
+            "status": json.dumps("success"),
+            "file_info": json.dumps({"filename": "简历.pdf"}, ensure_ascii=False)
+        }
+        store = RedisStatusStore(mock_redis_client, "upload", ttl=60)
+
+        result = store.get("job-1")
+
+        mock_redis_client.hgetall.assert_called_once_with("status:upload:job-1")
+        assert result == {"status": "success", "file_info": {"filename": "简历.pdf"}}
+
+    def test_get_missing(self, mock_redis_client):
+        """测试记录不存在"""
+        mock_redis_client.hgetall.return_value = {}
+        store = RedisStatusStore(mock_redis_client, "upload")
+
+        assert store.get("job-1") is None
+
+    def test_update_sets_ttl_and_index(self, mock_redis_client):
+        """测试更新时写入哈希、索引并设置过期时间"""
+        pipe = mock_redis_client.pipeline.return_value
+        store = RedisStatusStore(mock_redis_client, "parse", ttl=60)
+
+        store.update("job-1", {"progress": 50})
+
+        pipe.hset.assert_called_once_with("status:parse:job-1", mapping={"progress": "50"})
+        pipe.zadd.assert_called_once()
+        assert pipe.zadd.call_args[0][0] == "status:parse:index"
+        pipe.expire.assert_called_once_with("status:parse:job-1", 60)
+        pipe.execute.assert_called_once()
+
+    def test_update_without_ttl(self, mock_redis_client):
+        """测试长期保存的记录不设置过期时间"""
+        pipe = mock_redis_client.pipeline.return_value
+        store = RedisStatusStore(mock_redis_client, "upload_refs")
+
+        store.update("abc", {"upload-1": True})
+
+        pipe.expire.assert_not_called()
+
+    def test_replace_field_if_equal_is_one_script(self, mock_redis_client):
+        """测试比较和替换在同一个Lua脚本中执行，参数为JSON编码的值"""
+        script = mock_redis_client.register_script.return_value
+        script.return_value = 1
+        store = RedisStatusStore(mock_redis_client, "upload")
+
+        assert store.replace_field_if_equal("abc", "writing", 1.5, 2.5) is True
+
+        script.assert_called_once_with(keys=["status:upload:abc"], args=["writing", "1.5", "2.5"])
+        mock_redis_client.hset.assert_not_called()
+
+    def test_remove_fields_and_count_is_one_script(self, mock_redis_client):
+        """测试删除字段和计数在同一个Lua脚本中执行"""
+        script = mock_redis_client.register_script.return_value
+        script.return_value = 0
+        store = RedisStatusStore(mock_redis_client, "upload_refs")
+
+        assert store.remove_fields_and_count("abc", "upload-1") == 0
+
+        script.assert_called_once_with(
+            keys=["status:upload_refs:abc", "status:upload_refs:index"], args=["abc", "upload-1"]
+        )
+        mock_redis_client.hdel.assert_not_called()
+        mock_redis_client.delete.assert_not_called()
+
+    def test_items_drops_expired_index_entries(self, mock_redis_client):
+        """测试列表时清理索引中已过期的记录"""
+        mock_redis_client.zrevrange.return_value = ["job-2", "job-1"]
+        mock_redis_client.pipeline.return_value.execute.return_value = [
+            {"status": json.dumps("success")},
+            {}
+        ]
+        store = RedisStatusStore(mock_redis_client, "parse", ttl=60)
+
+        result = store.items(limit=10)
+
+        mock_redis_client.zrevrange.assert_called_once_with("status:parse:index", 0, 9)
+        assert result == [("job-2", {"status": "success"})]
+        mock_redis_client.zrem.assert_called_once_with("status:parse:index", "job-1")
+
+
+class TestCreateStatusStore:
+    """状态存储工厂测试类"""
+
+    def test_create_memory_store(self, monkeypatch):
+        """测试默认创建带TTL的内存存储"""
+        monkeypatch.setitem(status_store.STATUS_STORE_CONFIG, "backend", "memory")
+        store = create_status_store("upload")
+
+        assert isinstance(store, InMemoryStatusStore)
+        assert store.ttl == status_store.STATUS_STORE_CONFIG["ttl"]
+
+    def test_create_persistent_store(self, monkeypatch):
+        """测试长期保存的存储不过期"""
+        monkeypatch.setitem(status_store.STATUS_STORE_CONFIG, "backend", "memory")
+        store = create_status_store("upload_refs", persistent=True)
+
+        assert store.ttl is None
+        assert store.max_entries is None
+
+    def test_create_redis_store(self, monkeypatch):
+        """测试配置为Redis时创建Redis存储"""
+        monkeypatch.setitem(status_store.STATUS_STORE_CONFIG, "backend", "redis")
+        monkeypatch.setattr(status_store, "_redis_client", Mock())
+        store = create_status_store("parse")
+
+        assert isinstance(store, RedisStatusStore)
+
+    def test_unknown_backend(self, monkeypatch):
+        """测试不支持的存储类型"""
+        monkeypatch.setitem(status_store.STATUS_STORE_CONFIG, "backend", "sqlite")
+        with pytest.raises(ValueError):
+            create_status_store("parse")
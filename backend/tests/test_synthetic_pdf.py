@@ -0,0 +1,102 @@
+"""
+合成简历PDF生成器和提取基准测试套件测试
+"""
+
+import json
+
+import PyPDF2
+import pytest
+
+from backend.benchmarks.bench_extraction_suite import OPERATIONS, latency_summary, run_suite
+from backend.benchmarks.synthetic_pdf import CORPUS_VARIANTS, build_synthetic_resume_pdf, write_corpus
+from backend.services.pdf_parser import PDFParser
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestSyntheticResumePdf:
+    """合成简历生成器测试类"""
+
+    @pytest.mark.parametrize("variant", list(CORPUS_VARIANTS))
+    def test_deterministic(self, variant):
+        """测试相同参数生成逐字节相同的文件，不同种子生成不同的文件"""
+        options = CORPUS_VARIANTS[variant]
+        first = build_synthetic_resume_pdf(num_pages=2, seed=7, **options)
+        assert first == build_synthetic_resume_pdf(num_pages=2, seed=7, **options)
+        assert first != build_synthetic_resume_pdf(num_pages=2, seed=8, **options)
+
+    @pytest.mark.parametrize("embed_fonts", [False, True])
+    def test_cjk_text_extractable_by_both_engines(self, tmp_path, embed_fonts):
+        """测试中文行通过ToUnicode映射能被两种引擎提取"""
+        path = _write(tmp_path, "cjk.pdf", build_synthetic_resume_pdf(
+            num_pages=3, cjk_ratio=1.0, embed_fonts=embed_fonts, seed=1
+        ))
+
+        document = PDFParser().extract_document(path)
+        assert document["metadata"]["num_pages"] == 3
+        assert "邮箱：user" in document["text"]
+        assert "工作经历" in document["text"] or "项目经历" in document["text"]
+
+        reader = PyPDF2.PdfReader(path)
+        assert "邮箱：user" in reader.pages[0].extract_text()
+
+    def test_latin_only(self, tmp_path):
+        """测试纯英文简历使用内置字体"""
+        content = build_synthetic_resume_pdf(num_pages=1, cjk_ratio=0.0, seed=2)
+        assert b"FontFile2" not in content
+        text = PDFParser().extract_text_from_pdf(_write(tmp_path, "latin.pdf", content))
+        assert "Email: user" in text
+        assert not any(ord(ch) >= 0x2E80 for ch in text)
+
+    def test_embedded_font_program(self):
+        """测试嵌入字体时写出字体程序，文件明显变大"""
+        plain = build_synthetic_resume_pdf(num_pages=2, cjk_ratio=0.5, seed=3)
+        embedded = build_synthetic_resume_pdf(num_pages=2, cjk_ratio=0.5, embed_fonts=True, seed=3)
+        assert b"/FontFile2" in embedded
+        assert len(embedded) > len(plain) + 1024
+
+    def test_two_columns_share_lines(self, tmp_path):
+        """测试两栏布局下左右两栏的行在同一高度，提取后合并到同一行"""
+        path = _write(tmp_path, "columns.pdf", build_synthetic_resume_pdf(
+            num_pages=1, cjk_ratio=0.0, columns=2, seed=4, lines_per_column=10
+        ))
+        lines = PDFParser().extract_text_from_pdf(path).split("\n")
+        assert len(lines) == 10
+
+    def test_write_corpus(self, tmp_path):
+        """测试按页数和版式生成语料清单"""
+        manifest = write_corpus(str(tmp_path), [1, 2], {"latin": CORPUS_VARIANTS["latin"]}, docs_per_size=2)
+        assert [(entry["pages"], entry["seed"]) for entry in manifest] == [(1, 0), (1, 1), (2, 0), (2, 1)]
+        for entry in manifest:
+            assert len(PyPDF2.PdfReader(entry["path"]).pages) == entry["pages"]
+
+
+class TestExtractionSuite:
+    """提取基准测试套件测试类"""
+
+    def test_latency_summary(self):
+        """测试最近秩法分位数"""
+        summary = latency_summary([float(value) for value in range(1, 101)])
+        assert summary["p50"] == 50
+        assert summary["p90"] == 90
+        assert summary["p99"] == 99
+        assert summary["max"] == 100
+        assert latency_summary([])["p50"] == 0.0
+
+    def test_run_suite_report(self):
+        """测试报告包含每个(版式, 页数, 操作)组合的分位数和峰值内存，并且可以序列化为JSON"""
+        variants = {"cjk": CORPUS_VARIANTS["cjk"]}
+        report = run_suite([1, 2], variants, docs_per_size=1, repeat=2)
+
+        assert json.loads(json.dumps(report, ensure_ascii=False)) == report
+        combos = {(result["variant"], result["pages"], result["operation"]) for result in report["results"]}
+        assert combos == {("cjk", pages, operation) for pages in (1, 2) for operation in OPERATIONS}
+        for result in report["results"]:
+            assert result["samples"] == 2
+            assert set(result["latency_ms"]) == {"p50", "p90", "p99", "mean", "min", "max"}
+            assert result["peak_memory_kb"] > 0
+        assert report["environment"]["extractor_version"]
@@ -0,0 +1,101 @@
+"""
+文本规范化器测试
+以原先逐条正则替换的实现为参照，检查黄金语料和随机输入上的输出完全一致，
+并检查病态长行的处理耗时
+"""
+
+import time
+import random
+
+import pytest
+
+from backend.benchmarks.bench_text_normalizer import (
+    CHINESE_RESUME_PAGE,
+    build_corpus,
+    legacy_clean_text,
+    legacy_fix_common_pdf_issues,
+)
+from backend.benchmarks.synthetic_pdf import resume_lines
+from backend.services.text_normalizer import text_normalizer
+
+# 黄金语料：典型简历文本和原规则的各种边界情况
+GOLDEN_CORPUS = [
+    "",
+    "   \n\t\n  ",
+    CHINESE_RESUME_PAGE,
+    "\n".join(resume_lines(0)),
+    "\n--- 第1页 ---\n姓名：张三\n--- 第2页 ---\r\n电话：138-1234-5678\n",
+    "        姓名：张三\n        \n        \n        邮箱：zhangsan@example.com\n        ",
+    "Windows\r\nline\rendings\r\n\r\n\r\nend",
+    "tabs\t\tand   spaces \t mixed",
+    "全角　空格　保留，不间断\xa0空格\xa0也保留",
+    "trailing　\nideographic　 space",
+    # 断词
+    "experi-\nence and manage-\n\nment",
+    "a-\nb-\nc",
+    "Self-\nMotivated",
+    # 邮箱
+    "联系邮箱：zhang san @ example.com",
+    "mail john @ x.com",
+    "a@x.com b@y.com",
+    "x@a.com1 c@d.com",
+    "a b@x.com1 c @ d.com",
+    "broken @ domain and user@localhost",
+    "Tel: 138 1234 5678@qq.com",
+    # 电话和日期
+    "电话：138 1234 5678",
+    "电话：138 - 1234 - 5678",
+    "123 - 4567 - 8901 - 12 - 3",
+    "入职时间：2020 / 01 / 15",
+    "2019 - 03 - 01 至 2021 - 6 - 30",
+    "１２３ ４５６７ ８９０１",
+    "2019-03 to 2021-03, 1200 万条",
+]
+
+
+class TestTextNormalizer:
+    """文本规范化器测试类"""
+
+    @pytest.mark.parametrize("raw_text", GOLDEN_CORPUS)
+    def test_golden_corpus_matches_legacy(self, raw_text):
+        """测试黄金语料上与原实现输出完全一致"""
+        assert text_normalizer.normalize(raw_text) == legacy_clean_text(raw_text)
+        assert text_normalizer.fix_common_pdf_issues(raw_text) == legacy_fix_common_pdf_issues(raw_text)
+
+    def test_benchmark_corpus_matches_legacy(self):
+        """测试基准测试语料上与原实现输出完全一致"""
+        for text in build_corpus(pages=3).values():
+            assert text_normalizer.normalize(text) == legacy_clean_text(text)
+
+    def test_random_inputs_match_legacy(self):
+        """测试随机拼接的边界片段上与原实现输出完全一致"""
+        fragments = list("ab zZ09-/@.\n\r\t_%:张") + [
+            "@ ", " @", "qq.com", "x.com", "\x0c", " ", "　", "\xa0", "１２３",
+            "138 1234 5678", "2020 / 01 / 15", "2020 - 1 - 2", "a-\n \nb", "--- 第1页 ---\r\n",
+        ]
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 40)))
+            assert text_normalizer.normalize(text) == legacy_clean_text(text), repr(text)
+
+    def test_known_outputs(self):
+        """测试常见修复的具体结果"""
+        assert text_normalizer.normalize("邮箱： zhang.san @ example.com\n\n\n电话：138 1234 5678") == \
+            "邮箱： zhang.san@example.com\n\n电话：138-1234-5678"
+        assert text_normalizer.normalize("2020 / 01 / 15  至今") == "2020/01/15 至今"
+
+    @pytest.mark.parametrize("line", [
+        "a" * 1024 * 1024,
+        "a" * 1024 * 1024 + " b@example.com",
+        "ab cd@" * (1024 * 1024 // 6),
+        "1 " * (1024 * 1024 // 2),
+        "zhang san @ example.com 138 1234 5678 2020 / 01 / 15 ab-" * (1024 * 1024 // 60),
+    ], ids=["word", "word-then-email", "spaced-at", "spaced-digits", "dirty-resume"])
+    def test_one_megabyte_line(self, line):
+        """测试1MB无换行的长行在线性时间内完成（原实现的邮箱规则在这类输入上会回溯到超时）"""
+        start = time.perf_counter()
+        result = text_normalizer.normalize(line)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 5
+        assert "\n" not in result
@@ -0,0 +1,144 @@
+"""
+本地规则解析和分层解析测试
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.benchmarks.bench_tiered_parsing import run, unstructure
+from backend.benchmarks.synthetic_resume import build_synthetic_resume
+from backend.services.heuristic_parser import HeuristicResumeParser
+from backend.services.qwen_parser import QwenResumeParser
+from backend.services.tiered_parser import TieredResumeParser
+
+RESUME_TEXT = """李四
+邮箱：lisi@example.com | 电话：139-8765-4321
+所在地：杭州
+自我评价
+五年后端开发经验
+工作经历
+XYZ网络科技有限公司  后端工程师  2019.07 - 至今
+1. 负责支付系统开发
+2. 优化数据库性能
+技术栈：Java、MySQL
+教育背景
+浙江大学 | 硕士 | 软件工程 | 2016年9月 - 2019年6月
+GPA: 3.8/4.0
+专业技能
+编程语言：Java（精通）、Python（熟悉）
+外语：英语（熟练）"""
+
+
+@pytest.fixture
+def llm_parser(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+    parser = QwenResumeParser()
+    parser.parse_resume_text_async = AsyncMock(return_value=MagicMock(name="llm_resume"))
+    return parser
+
+
+class TestHeuristicResumeParser:
+    """本地规则解析测试类"""
+
+    def test_parse_template_resume(self):
+        """测试解析结构清晰的简历"""
+        result = HeuristicResumeParser().parse(RESUME_TEXT)
+        resume = result["resume"]
+
+        assert result["coverage"] == 1.0
+        assert (resume.personal_info.name, resume.personal_info.location) == ("李四", "杭州")
+        assert resume.personal_info.summary == "五年后端开发经验"
+        work = resume.work_experience[0]
+        assert (work.company, work.position, work.start_date, work.end_date) == (
+            "XYZ网络科技有限公司", "后端工程师", "2019-07", None
+        )
+        assert work.description == ["负责支付系统开发", "优化数据库性能"]
+        assert work.technologies == ["Java", "MySQL"]
+        education = resume.education[0]
+        assert (education.institution, education.degree, education.major, education.gpa) == (
+            "浙江大学", "硕士", "软件工程", "3.8/4.0"
+        )
+        assert [(skill.category, skill.name, skill.level) for skill in resume.skills] == [
+            ("technical", "Java", "advanced"), ("technical", "Python", "intermediate"),
+            ("language", "英语", "intermediate")
+        ]
+
+    def test_synthetic_corpus_exact(self):
+        """测试合成语料的解析结果与标注一致"""
+        parser = HeuristicResumeParser()
+        for seed in range(10):
+            text, truth = build_synthetic_resume(seed)
+            resume = parser.parse(text)["resume"]
+            assert resume.model_dump(mode="json", exclude={"id", "created_at", "updated_at"}) == truth
+
+    def test_missing_email_not_built(self):
+        """测试缺少必填的邮箱时不构建简历对象"""
+        result = HeuristicResumeParser().parse(RESUME_TEXT.replace("lisi@example.com", ""))
+        assert result["resume"] is None
+        assert "email" in result["error"]
+
+    def test_unstructured_text_low_coverage(self):
+        """测试没有章节标题的简历覆盖率低"""
+        text, _ = build_synthetic_resume(0)
+        assert HeuristicResumeParser().parse(unstructure(text))["coverage"] < 0.5
+
+
+class TestTieredResumeParser:
+    """分层解析测试类"""
+
+    @pytest.mark.asyncio
+    async def test_confident_result_used_directly(self, llm_parser):
+        """测试置信度达到阈值时直接使用本地结果，不调用通义千问"""
+        tiered = TieredResumeParser(llm_parser, config={"enabled": True, "confidence_threshold": 0.7})
+        result = await tiered.parse(RESUME_TEXT)
+
+        assert result["tier"] == "heuristic"
+        # 姓名、联系方式、工作、教育、技能和个人简介齐全，没有个人链接
+        assert result["confidence"] == round(6 / 7, 3)
+        assert result["resume"].personal_info.name == "李四"
+        llm_parser.parse_resume_text_async.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_escalates(self, llm_parser):
+        """测试置信度不足时交给通义千问，并传递排队回调和响应格式"""
+        tiered = TieredResumeParser(llm_parser, config={"enabled": True, "confidence_threshold": 0.9})
+        on_queued = AsyncMock()
+        result = await tiered.parse(RESUME_TEXT, on_queued=on_queued, response_format="compact")
+
+        assert result["tier"] == "llm"
+        assert result["confidence"] < 0.9
+        assert result["resume"] is llm_parser.parse_resume_text_async.return_value
+        llm_parser.parse_resume_text_async.assert_awaited_once_with(
+            RESUME_TEXT, on_queued=on_queued, response_format="compact", on_progress=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_stats_and_disabled(self, llm_parser):
+        """测试按层统计数量和占比，关闭时全部交给通义千问"""
+        tiered = TieredResumeParser(llm_parser, config={"enabled": True, "confidence_threshold": 0.7})
+        await tiered.parse(RESUME_TEXT)
+        await tiered.parse(unstructure(RESUME_TEXT))
+        stats = tiered.get_stats()
+        assert (stats["heuristic"]["count"], stats["llm"]["count"]) == (1, 1)
+        assert stats["heuristic"]["share"] == 0.5
+        assert stats["llm"]["latency_ms"]["p50"] >= stats["escalation_overhead_ms"]["p50"] > 0
+
+        disabled = TieredResumeParser(llm_parser, config={"enabled": False})
+        result = await disabled.parse(RESUME_TEXT)
+        assert (result["tier"], result["confidence"]) == ("llm", None)
+
+
+class TestTieredParsingBenchmark:
+    """分层解析评估测试类"""
+
+    @pytest.mark.asyncio
+    async def test_simulated_run(self, monkeypatch):
+        """测试结构清晰的简历由本地层解析且结果正确，自由格式的简历交给通义千问层"""
+        monkeypatch.setenv("DASHSCOPE_API_KEY", "test_key")
+        report = await run(docs=8, seed=0, unstructured_share=0.5, threshold=0.7, llm_latency=0)
+
+        assert report["heuristic_accuracy"] == 1.0
+        assert report["by_layout"]["structured"]["llm"] == 0
+        assert report["by_layout"]["unstructured"]["heuristic"] == 0
+        assert report["tiers"]["total"] == 8
@@ -0,0 +1,481 @@
+"""
+文件上传API测试
+测试上传文件的流式写入、校验、内存占用、分块续传和批量上传
+"""
+
+import io
+import os
+import json
+import time
+import zipfile
+import hashlib
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.api import upload as upload_api
+from backend.api import upload_session as upload_session_api
+from backend.api import batch_upload as batch_upload_api
+from backend.services import status_store as status_store_module
+from backend.services.status_store import InMemoryStatusStore
+from backend.services.upload_store import ContentAddressedUploadStore
+
+
+def make_upload_file(content: bytes, filename: str = "resume.pdf", declare_size: bool = False) -> UploadFile:
+    """创建基于磁盘临时文件的UploadFile，模拟已落盘的multipart文件"""
+    spooled = tempfile.TemporaryFile()
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(
+        file=spooled,
+        filename=filename,
+        size=len(content) if declare_size else None
+    )
+
+
+def make_pdf_bytes(size: int) -> bytes:
+    """生成指定大小、带PDF文件头的伪PDF内容"""
+    header = b'%PDF-1.4\n'
+    return header + b'0' * (size - len(header))
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """将上传目录和上传存储重定向到临时目录"""
+    monkeypatch.setattr(upload_api, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_api, "upload_store", ContentAddressedUploadStore(str(tmp_path)))
+    monkeypatch.setattr(upload_api, "upload_status", InMemoryStatusStore())
+    return tmp_path
+
+
+def list_files(directory) -> list:
+    """列出目录下的所有文件（递归）"""
+    return [name for _, _, files in os.walk(str(directory)) for name in files]
+
+
+class TestStreamUpload:
+    """流式上传测试类"""
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_success(self, upload_dir):
+        """测试流式写入成功并原子提交"""
+        content = make_pdf_bytes(300 * 1024)
+        file = make_upload_file(content)
+
+        result = await upload_api.stream_upload_to_disk(file, "upload-1")
+
+        assert result["size"] == len(content)
+        assert result["sha256"] == hashlib.sha256(content).hexdigest()
+        assert result["file_path"] == upload_api.upload_store.blob_path(result["sha256"])
+        assert result["is_duplicate"] is False
+        with open(result["file_path"], "rb") as f:
+            assert f.read() == content
+        # 临时文件已被重命名
+        assert not os.path.exists(os.path.join(str(upload_dir), ".upload-1.part"))
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_too_large(self, upload_dir, monkeypatch):
+        """测试按实际接收字节数限制大小（客户端未声明大小）"""
+        monkeypatch.setattr(upload_api, "MAX_FILE_SIZE", 256 * 1024)
+        file = make_upload_file(make_pdf_bytes(512 * 1024))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_api.stream_upload_to_disk(file, "upload-2")
+
+        assert exc_info.value.status_code == 413
+        # 中途中止后不应留下任何文件
+        assert list_files(upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_invalid_magic(self, upload_dir):
+        """测试文件头不是%PDF-时拒绝"""
+        file = make_upload_file(b'PK\x03\x04' + b'0' * 1024)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_api.stream_upload_to_disk(file, "upload-3")
+
+        assert exc_info.value.status_code == 400
+        assert list_files(upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_empty_file(self, upload_dir):
+        """测试空文件"""
+        file = make_upload_file(b'')
+
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_api.stream_upload_to_disk(file, "upload-4")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_peak_memory_constant(self, upload_dir):
+        """测试单次上传的峰值内存与文件大小无关"""
+        peaks = []
+        for index, size in enumerate([1 * 1024 * 1024, 8 * 1024 * 1024]):
+            file = make_upload_file(make_pdf_bytes(size))
+
+            tracemalloc.start()
+            try:
+                await upload_api.stream_upload_to_disk(file, f"upload-mem-{index}")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            peaks.append(peak)
+
+        # 峰值只与分块大小相关，远小于文件本身
+        assert peaks[1] < 1024 * 1024
+        assert peaks[1] < peaks[0] + 4 * upload_api.UPLOAD_CHUNK_SIZE
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_duplicate_content(self, upload_dir):
+        """测试相同内容只保存一份"""
+        content = make_pdf_bytes(64 * 1024)
+
+        first = await upload_api.stream_upload_to_disk(make_upload_file(content), "upload-a")
+        second = await upload_api.stream_upload_to_disk(make_upload_file(content), "upload-b")
+
+        assert second["is_duplicate"] is True
+        assert first["file_path"] == second["file_path"]
+        assert list_files(upload_dir) == [os.path.basename(first["file_path"])]
+        assert upload_api.upload_store.refcount(first["sha256"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_upload_releases_file(self, upload_dir, monkeypatch):
+        """测试状态记录过期的上传在之后的上传中释放引用，最后一个引用释放时删除文件"""
+        clock = [1000.0]
+        monkeypatch.setattr(status_store_module, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+        monkeypatch.setattr(upload_api, "upload_status", InMemoryStatusStore(ttl=60))
+        monkeypatch.setattr(upload_api, "_last_ref_sweep", 0.0)
+        expired = await upload_api.upload_resume(BackgroundTasks(), make_upload_file(make_pdf_bytes(4096)))
+        expired_id = json.loads(expired.body)["upload_id"]
+        file_path = upload_api.upload_status.get(expired_id)["file_path"]
+
+        clock[0] += 120
+        monkeypatch.setattr(upload_api, "_last_ref_sweep", 0.0)
+        live = await upload_api.upload_resume(BackgroundTasks(), make_upload_file(make_pdf_bytes(8192)))
+        live_path = upload_api.upload_status.get(json.loads(live.body)["upload_id"])["file_path"]
+
+        assert upload_api.upload_status.get(expired_id) is None
+        assert not os.path.exists(file_path)
+        assert os.path.exists(live_path)
+        assert upload_api.upload_store.refcount(os.path.basename(file_path)[:-len(".pdf")]) == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_upload_keeps_shared_file(self, upload_dir):
+        """测试删除上传时只有最后一个引用才删除文件"""
+        content = make_pdf_bytes(64 * 1024)
+        first = await upload_api.upload_resume(BackgroundTasks(), make_upload_file(content))
+        second = await upload_api.upload_resume(BackgroundTasks(), make_upload_file(content))
+        first_id = json.loads(first.body)["upload_id"]
+        second_id = json.loads(second.body)["upload_id"]
+        file_path = upload_api.upload_status.get(first_id)["file_path"]
+
+        await upload_api.delete_upload(first_id)
+        assert os.path.exists(file_path)
+
+        await upload_api.delete_upload(second_id)
+        assert not os.path.exists(file_path)
+
+    @pytest.mark.asyncio
+    async def test_validate_pdf_file_declared_size(self):
+        """测试声明的文件大小超限时直接拒绝"""
+        file = make_upload_file(make_pdf_bytes(1024), declare_size=True)
+        file.size = upload_api.MAX_FILE_SIZE + 1
+
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_api.validate_pdf_file(file)
+
+        assert exc_info.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_validate_pdf_file_wrong_extension(self):
+        """测试错误的文件扩展名"""
+        file = make_upload_file(make_pdf_bytes(1024), filename="resume.docx")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await upload_api.validate_pdf_file(file)
+
+        assert exc_info.value.status_code == 400
+
+
+class TestUploadSession:
+    """可续传分块上传测试类"""
+
+    @pytest.fixture
+    def client(self, upload_dir):
+        app = FastAPI()
+        app.include_router(upload_api.router)
+        app.include_router(upload_session_api.router)
+        return TestClient(app)
+
+    def create_session(self, client, size: int) -> str:
+        response = client.post("/api/upload/sessions", json={"filename": "resume.pdf", "size": size})
+        assert response.status_code == 201
+        assert response.headers["Upload-Offset"] == "0"
+        return response.json()["upload_id"]
+
+    def patch_chunk(self, client, upload_id: str, offset: int, chunk: bytes):
+        return client.patch(
+            f"/api/upload/sessions/{upload_id}",
+            content=chunk,
+            headers={"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"}
+        )
+
+    def test_chunked_upload_and_finalize(self, client):
+        """测试分块上传、进度按实际字节更新并最终提交"""
+        content = make_pdf_bytes(200 * 1024)
+        upload_id = self.create_session(client, len(content))
+
+        response = self.patch_chunk(client, upload_id, 0, content[:100 * 1024])
+        assert response.status_code == 200
+        assert response.json()["offset"] == 100 * 1024
+        assert upload_api.upload_status.get(upload_id)["progress"] == 50
+
+        response = self.patch_chunk(client, upload_id, 100 * 1024, content[100 * 1024:])
+        assert response.headers["Upload-Offset"] == str(len(content))
+
+        response = client.post(f"/api/upload/sessions/{upload_id}/finalize")
+        assert response.status_code == 200
+        assert response.json()["file_info"]["sha256"] == hashlib.sha256(content).hexdigest()
+
+        status_info = upload_api.upload_status.get(upload_id)
+        assert status_info["status"] == upload_api.UploadStatus.SUCCESS
+        assert status_info["progress"] == 100
+        with open(status_info["file_path"], "rb") as f:
+            assert f.read() == content
+
+    def test_resume_from_committed_offset(self, client):
+        """测试中断后查询偏移量并续传"""
+        content = make_pdf_bytes(64 * 1024)
+        upload_id = self.create_session(client, len(content))
+        self.patch_chunk(client, upload_id, 0, content[:10000])
+
+        response = client.get(f"/api/upload/sessions/{upload_id}")
+        offset = int(response.headers["Upload-Offset"])
+        assert offset == 10000
+
+        # 偏移量不匹配时拒绝写入
+        response = self.patch_chunk(client, upload_id, 0, content[:10000])
+        assert response.status_code == 409
+        assert response.headers["Upload-Offset"] == "10000"
+
+        self.patch_chunk(client, upload_id, offset, content[offset:])
+        response = client.post(f"/api/upload/sessions/{upload_id}/finalize")
+        assert response.status_code == 200
+
+    def test_finalize_incomplete_upload(self, client):
+        """测试未上传完整时不能提交"""
+        content = make_pdf_bytes(4096)
+        upload_id = self.create_session(client, len(content))
+        self.patch_chunk(client, upload_id, 0, content[:1000])
+
+        response = client.post(f"/api/upload/sessions/{upload_id}/finalize")
+        assert response.status_code == 409
+
+    def test_chunk_exceeding_declared_length(self, client):
+        """测试数据超出声明大小"""
+        upload_id = self.create_session(client, 1000)
+
+        response = self.patch_chunk(client, upload_id, 0, make_pdf_bytes(2000))
+        assert response.status_code == 413
+
+    def test_chunk_invalid_magic(self, client):
+        """测试首个数据块不是PDF文件头"""
+        upload_id = self.create_session(client, 1000)
+
+        response = self.patch_chunk(client, upload_id, 0, b'PK\x03\x04' + b'0' * 100)
+        assert response.status_code == 400
+
+    def test_stale_write_lock_taken_over_once(self, client, monkeypatch):
+        """测试失效的写入锁只能被一个请求抢占：另一个请求读到的仍是失效的锁时不能覆盖新锁"""
+        upload_id = self.create_session(client, 1000)
+        stale = time.time() - upload_session_api.WRITE_LOCK_TIMEOUT - 10
+        upload_api.upload_status.update(upload_id, {"writing": stale})
+        stale_snapshot = upload_api.upload_status.get(upload_id)
+
+        assert upload_session_api._acquire_write_lock(upload_id) is True
+        taken_at = upload_api.upload_status.get(upload_id)["writing"]
+        assert taken_at > stale
+
+        with monkeypatch.context() as patched:
+            patched.setattr(upload_api.upload_status, "get", lambda job_id: dict(stale_snapshot))
+            assert upload_session_api._acquire_write_lock(upload_id) is False
+        assert upload_api.upload_status.get(upload_id)["writing"] == taken_at
+
+    def test_chunk_after_concurrent_finalize(self, client, upload_dir, monkeypatch):
+        """测试获取写入锁之前会话已被提交时PATCH返回409，不创建新的临时文件"""
+        content = make_pdf_bytes(4096)
+        upload_id = self.create_session(client, len(content))
+        self.patch_chunk(client, upload_id, 0, content)
+        acquire = upload_session_api._acquire_write_lock
+
+        def finalize_then_acquire(job_id):
+            monkeypatch.setattr(upload_session_api, "_acquire_write_lock", acquire)
+            assert client.post(f"/api/upload/sessions/{upload_id}/finalize").status_code == 200
+            return acquire(job_id)
+
+        monkeypatch.setattr(upload_session_api, "_acquire_write_lock", finalize_then_acquire)
+        response = self.patch_chunk(client, upload_id, 0, content)
+
+        assert response.status_code == 409
+        assert list(os.listdir(upload_dir / "sessions")) == []
+        assert "writing" not in upload_api.upload_status.get(upload_id)
+
+    def test_finalize_while_locked(self, client):
+        """测试提交时获取写入锁，另一个请求正在提交时返回409，提交完成后不能再次提交"""
+        content = make_pdf_bytes(4096)
+        upload_id = self.create_session(client, len(content))
+        self.patch_chunk(client, upload_id, 0, content)
+
+        upload_api.upload_status.set_field_if_absent(upload_id, "writing", time.time())
+        response = client.post(f"/api/upload/sessions/{upload_id}/finalize")
+        assert response.status_code == 409
+        assert upload_api.upload_status.get(upload_id)["status"] == "uploading"
+
+        upload_api.upload_status.remove_fields(upload_id, "writing")
+        assert client.post(f"/api/upload/sessions/{upload_id}/finalize").status_code == 200
+        assert "writing" not in upload_api.upload_status.get(upload_id)
+        assert client.post(f"/api/upload/sessions/{upload_id}/finalize").status_code == 409
+        assert upload_api.upload_store.refcount(upload_api.upload_status.get(upload_id)["file_info"]["sha256"]) == 1
+
+    def test_create_session_sweeps_abandoned_parts(self, client, upload_dir, monkeypatch):
+        """测试创建会话时清理状态记录已不存在或长时间没有写入的会话临时文件"""
+        monkeypatch.setattr(upload_session_api, "_last_sweep", 0.0)
+        active = self.create_session(client, 1000)
+        idle = self.create_session(client, 1000)
+        sessions = upload_dir / "sessions"
+        orphan = sessions / "expired-session.part"
+        orphan.write_bytes(b'%PDF')
+        old = time.time() - upload_session_api.WRITE_LOCK_TIMEOUT - 10
+        os.utime(orphan, (old, old))
+        expired = time.time() - upload_session_api.SESSION_TTL - 10
+        os.utime(sessions / f"{idle}.part", (expired, expired))
+        fresh = sessions / "just-created.part"
+        fresh.write_bytes(b'')
+
+        monkeypatch.setattr(upload_session_api, "_last_sweep", 0.0)
+        self.create_session(client, 1000)
+
+        assert not orphan.exists()
+        assert not (sessions / f"{idle}.part").exists()
+        assert upload_api.upload_status.get(idle) is None
+        assert (sessions / f"{active}.part").exists()
+        assert fresh.exists()
+
+    def test_create_session_too_large(self, client):
+        """测试声明的文件大小超限"""
+        response = client.post(
+            "/api/upload/sessions",
+            json={"filename": "resume.pdf", "size": upload_api.MAX_FILE_SIZE + 1}
+        )
+        assert response.status_code == 413
+
+
+class TestBatchUpload:
+    """批量上传测试类"""
+
+    @pytest.fixture
+    def client(self, upload_dir, monkeypatch):
+        monkeypatch.setattr(batch_upload_api, "batch_status", InMemoryStatusStore())
+        app = FastAPI()
+        app.include_router(batch_upload_api.router)
+        return TestClient(app)
+
+    def test_batch_upload_multiple_pdfs(self, client):
+        """测试一次上传多个PDF，单个文件失败不影响其他文件"""
+        files = [
+            ("files", ("a.pdf", make_pdf_bytes(2048), "application/pdf")),
+            ("files", ("b.pdf", make_pdf_bytes(4096), "application/pdf")),
+            ("files", ("c.pdf", b'not a pdf', "application/pdf")),
+        ]
+
+        response = client.post("/api/upload/batch", files=files)
+        body = response.json()
+
+        assert response.status_code == 200
+        assert body["total"] == 3
+        assert body["succeeded"] == 2
+        assert body["failed"] == 1
+        failed = [upload for upload in body["uploads"] if upload["status"] == "error"]
+        assert failed[0]["filename"] == "c.pdf"
+
+    def test_batch_upload_zip_archive(self, client):
+        """测试上传ZIP压缩包，逐个条目校验并保存"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("resumes/", "")
+            archive.writestr("resumes/zhang.pdf", make_pdf_bytes(300 * 1024))
+            archive.writestr("resumes/li.pdf", make_pdf_bytes(100 * 1024))
+            archive.writestr("resumes/notes.txt", "hello")
+            archive.writestr("__MACOSX/resumes/._zhang.pdf", "meta")
+
+        response = client.post(
+            "/api/upload/batch",
+            files=[("files", ("resumes.zip", buffer.getvalue(), "application/zip"))]
+        )
+        body = response.json()
+
+        assert body["total"] == 3
+        assert body["succeeded"] == 2
+        by_name = {upload["filename"]: upload for upload in body["uploads"]}
+        assert by_name["zhang.pdf"]["size"] == 300 * 1024
+        assert by_name["notes.txt"]["status"] == "error"
+
+        # 通过批次ID统一查询
+        response = client.get(f"/api/upload/batch/{body['batch_id']}")
+        batch = response.json()
+        assert batch["total"] == 3
+        assert batch["status_counts"] == {"success": 2, "error": 1}
+
+    def test_batch_upload_zip_entry_too_large(self, client, monkeypatch):
+        """测试ZIP条目按实际解压字节数限制大小"""
+        monkeypatch.setattr(upload_api, "MAX_FILE_SIZE", 64 * 1024)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("big.pdf", make_pdf_bytes(1024 * 1024))
+
+        response = client.post(
+            "/api/upload/batch",
+            files=[("files", ("resumes.zip", buffer.getvalue(), "application/zip"))]
+        )
+        body = response.json()
+
+        assert body["failed"] == 1
+        assert "文件大小超过限制" in body["uploads"][0]["message"]
+
+    def test_batch_upload_corrupted_zip(self, client):
+        """测试损坏的ZIP文件"""
+        response = client.post(
+            "/api/upload/batch",
+            files=[("files", ("broken.zip", b'PK\x03\x04broken', "application/zip"))]
+        )
+        body = response.json()
+
+        assert body["failed"] == 1
+        assert body["uploads"][0]["upload_id"] is None
+
+    def test_batch_upload_zips_exceeding_limit_write_nothing(self, client, upload_dir, monkeypatch):
+        """测试多个ZIP的条目合计超出上限时拒绝整个批次，不留下已写入的文件"""
+        monkeypatch.setattr(batch_upload_api, "MAX_BATCH_FILES", 3)
+        archives = []
+        for name in ("a", "b"):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as archive:
+                archive.writestr(f"{name}1.pdf", make_pdf_bytes(1024) + name.encode())
+                archive.writestr(f"{name}2.pdf", make_pdf_bytes(2048) + name.encode())
+            archives.append(("files", (f"{name}.zip", buffer.getvalue(), "application/zip")))
+
+        response = client.post("/api/upload/batch", files=archives)
+
+        assert response.status_code == 413
+        assert list_files(upload_dir) == []
+        assert list(upload_api.upload_status.items()) == []
+
+    def test_get_batch_status_not_found(self, client):
+        """测试查询不存在的批次"""
+        response = client.get("/api/upload/batch/unknown")
+        assert response.status_code == 404
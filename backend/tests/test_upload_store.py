@@ -0,0 +1,104 @@
+"""
+内容寻址上传存储测试
+"""
+
+import os
+import hashlib
+
+import pytest
+
+from backend.services.upload_store import ContentAddressedUploadStore
+
+
+def write_temp(directory, name: str, content: bytes) -> str:
+    """写入一个临时文件并返回路径"""
+    path = os.path.join(str(directory), name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+class TestContentAddressedUploadStore:
+    """内容寻址上传存储测试类"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return ContentAddressedUploadStore(str(tmp_path))
+
+    def test_commit_new_content(self, store, tmp_path):
+        """测试提交新内容"""
+        content = b'%PDF-1.4 new'
+        sha256 = hashlib.sha256(content).hexdigest()
+        temp_path = write_temp(tmp_path, ".a.part", content)
+
+        path, is_duplicate = store.commit(temp_path, sha256, "upload-a")
+
+        assert not is_duplicate
+        assert path == store.blob_path(sha256)
+        assert os.path.exists(path)
+        assert not os.path.exists(temp_path)
+        assert store.refcount(sha256) == 1
+
+    def test_commit_duplicate_content(self, store, tmp_path):
+        """测试重复内容复用已有文件"""
+        content = b'%PDF-1.4 dup'
+        sha256 = hashlib.sha256(content).hexdigest()
+        store.commit(write_temp(tmp_path, ".a.part", content), sha256, "upload-a")
+        temp_path = write_temp(tmp_path, ".b.part", content)
+
+        path, is_duplicate = store.commit(temp_path, sha256, "upload-b")
+
+        assert is_duplicate
+        assert not os.path.exists(temp_path)
+        assert store.refcount(sha256) == 2
+
+    def test_release_deletes_on_last_reference(self, store, tmp_path):
+        """测试最后一个引用释放时才删除文件"""
+        content = b'%PDF-1.4 shared'
+        sha256 = hashlib.sha256(content).hexdigest()
+        store.commit(write_temp(tmp_path, ".a.part", content), sha256, "upload-a")
+        store.commit(write_temp(tmp_path, ".b.part", content), sha256, "upload-b")
+
+        assert store.release(sha256, "upload-a") is False
+        assert os.path.exists(store.blob_path(sha256))
+
+        assert store.release(sha256, "upload-b") is True
+        assert not os.path.exists(store.blob_path(sha256))
+        assert store.refcount(sha256) == 0
+
+    def test_release_orphans(self, store, tmp_path):
+        """测试释放已不存在的上传的引用，仍被其他上传引用的文件保留"""
+        shared = b'%PDF-1.4 shared'
+        single = b'%PDF-1.4 single'
+        shared_sha = hashlib.sha256(shared).hexdigest()
+        single_sha = hashlib.sha256(single).hexdigest()
+        store.commit(write_temp(tmp_path, ".a.part", shared), shared_sha, "upload-a")
+        store.commit(write_temp(tmp_path, ".b.part", shared), shared_sha, "upload-b")
+        store.commit(write_temp(tmp_path, ".c.part", single), single_sha, "upload-c")
+
+        live = {"upload-b"}
+        assert store.release_orphans(lambda upload_ids: [upload_id in live for upload_id in upload_ids]) == 2
+
+        assert store.refcount(shared_sha) == 1
+        assert os.path.exists(store.blob_path(shared_sha))
+        assert store.refcount(single_sha) == 0
+        assert not os.path.exists(store.blob_path(single_sha))
+
+    def test_release_racing_commit_keeps_file(self, store, tmp_path):
+        """测试最后一个引用释放后、删除文件前有新上传提交相同内容时，文件保留"""
+        content = b'%PDF-1.4 race'
+        sha256 = hashlib.sha256(content).hexdigest()
+        store.commit(write_temp(tmp_path, ".a.part", content), sha256, "upload-a")
+        remove_fields_and_count = store._refs.remove_fields_and_count
+
+        def remove_then_commit(job_id, *fields):
+            remaining = remove_fields_and_count(job_id, *fields)
+            store.commit(write_temp(tmp_path, ".b.part", content), sha256, "upload-b")
+            return remaining
+
+        store._refs.remove_fields_and_count = remove_then_commit
+
+        assert store.release(sha256, "upload-a") is False
+        assert os.path.exists(store.blob_path(sha256))
+        assert store.refcount(sha256) == 1
+        assert os.listdir(os.path.dirname(store.blob_path(sha256))) == [f"{sha256}.pdf"]